@@ -0,0 +1,136 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * AMD Sysfs Reader Tests
+ * Runs discovery and live reads against a fake /sys/class/drm tree in a temp directory
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { AmdSysfsReader } from "../../server/amd-sysfs-reader.js";
+
+describe("AmdSysfsReader", () => {
+  let drmPath;
+
+  /**
+   * Create a fake card directory with the given device files.
+   */
+  function writeCard(card, files) {
+    for (const [rel, content] of Object.entries(files)) {
+      const filePath = path.join(drmPath, card, "device", rel);
+      fs.mkdirSync(path.dirname(filePath), { recursive: true });
+      fs.writeFileSync(filePath, `${content}\n`);
+    }
+  }
+
+  beforeEach(() => {
+    drmPath = fs.mkdtempSync(path.join(os.tmpdir(), "fake-drm-"));
+    writeCard("card0", {
+      vendor: "0x1002",
+      product_name: "Radeon RX 7900 XTX",
+      mem_info_vram_total: 25753026560,
+      mem_info_vram_used: 1073741824,
+      gpu_busy_percent: 42,
+      "hwmon/hwmon3/power1_average": 187000000,
+      "hwmon/hwmon3/temp1_input": 61000,
+    });
+    writeCard("card1", { vendor: "0x10de", device: "0x2684" });
+    // Connector entries share the prefix and must be skipped
+    fs.mkdirSync(path.join(drmPath, "card0-DP-1"));
+  });
+
+  afterEach(() => {
+    fs.rmSync(drmPath, { recursive: true, force: true });
+    jest.restoreAllMocks();
+  });
+
+  it("should discover only AMD cards and cache static info", async () => {
+    const reader = new AmdSysfsReader({ drmPath });
+
+    const devices = await reader.discover();
+
+    expect(devices).toHaveLength(1);
+    expect(devices[0]).toMatchObject({
+      card: "card0",
+      name: "Radeon RX 7900 XTX",
+      memoryTotal: 25753026560,
+    });
+  });
+
+  it("should report live utilization, VRAM used, power and temperature", async () => {
+    const reader = new AmdSysfsReader({ drmPath });
+
+    const [gpu] = await reader.read();
+
+    expect(gpu).toMatchObject({
+      vendor: "AMD",
+      usage: 42,
+      memoryUsed: 1073741824,
+      memoryTotal: 25753026560,
+      power: 187,
+      temperature: 61,
+      hasUtilizationData: true,
+    });
+  });
+
+  it("should not rescan the DRM directory on later reads", async () => {
+    const reader = new AmdSysfsReader({ drmPath });
+    await reader.read();
+    const readdirSpy = jest.spyOn(fs.promises, "readdir");
+
+    fs.writeFileSync(path.join(drmPath, "card0", "device", "gpu_busy_percent"), "99\n");
+    const [gpu] = await reader.read();
+
+    expect(gpu.usage).toBe(99);
+    expect(readdirSpy).not.toHaveBeenCalled();
+  });
+
+  it("should fall back to the device ID and leave missing hwmon fields null", async () => {
+    writeCard("card2", { vendor: "0x1002", device: "0x744c", mem_info_vram_total: 1024 });
+    const reader = new AmdSysfsReader({ drmPath });
+
+    const gpus = await reader.read();
+    const fallback = gpus.find((g) => g.name === "AMD GPU (0x744c)");
+
+    expect(fallback.usage).toBe(0);
+    expect(fallback.power).toBeNull();
+    expect(fallback.temperature).toBeNull();
+  });
+
+  it("should number cards in numeric order", async () => {
+    for (const card of ["card10", "card2"]) {
+      writeCard(card, { vendor: "0x1002", product_name: `Radeon ${card}`, mem_info_vram_total: 1024 });
+    }
+    const reader = new AmdSysfsReader({ drmPath });
+
+    const devices = await reader.discover();
+
+    expect(devices.map((d) => [d.index, d.card])).toEqual([
+      [0, "card0"],
+      [1, "card2"],
+      [2, "card10"],
+    ]);
+  });
+
+  it("should rediscover after a device disappears", async () => {
+    const reader = new AmdSysfsReader({ drmPath });
+    await reader.read();
+
+    fs.rmSync(path.join(drmPath, "card0"), { recursive: true, force: true });
+    const gone = await reader.read();
+    const rescanned = await reader.discover();
+
+    expect(gone).toHaveLength(0);
+    expect(rescanned).toHaveLength(0);
+  });
+
+  it("should return an empty list when sysfs is unavailable", async () => {
+    const reader = new AmdSysfsReader({ drmPath: path.join(drmPath, "missing") });
+
+    expect(await reader.read()).toEqual([]);
+  });
+});
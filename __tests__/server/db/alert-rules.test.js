@@ -0,0 +1,139 @@
+/**
+ * Alert Rules Config Tests
+ * Storage of streaming alert rules in the alert_rules table
+ */
+
+import Database from "better-sqlite3";
+import { initSchema } from "../../../server/db/schema.js";
+import { AlertEngine, getAlertValues } from "../../../server/metrics-alerts.js";
+import {
+  CounterRateTracker,
+  computeLlamaRates,
+  LLAMA_COUNTERS,
+  ALERT_RATE_WINDOW,
+} from "../../../server/llama-rates.js";
+import {
+  getAlertRules,
+  saveAlertRule,
+  deleteAlertRule,
+  seedAlertRules,
+  ALERT_RULE_DEFAULTS,
+} from "../../../server/db/config.js";
+
+describe("alert rules", () => {
+  let db;
+
+  beforeEach(() => {
+    db = new Database(":memory:");
+    initSchema(db);
+  });
+
+  afterEach(() => {
+    db.close();
+  });
+
+  it("should seed the default rules once", () => {
+    // Act
+    const first = seedAlertRules(db);
+    const second = seedAlertRules(db);
+
+    // Assert
+    expect(first).toBe(ALERT_RULE_DEFAULTS.length);
+    expect(second).toBe(0);
+    expect(getAlertRules(db).map((r) => r.id)).toEqual(ALERT_RULE_DEFAULTS.map((r) => r.id).sort());
+  });
+
+  it("should not bring back a deleted default rule", () => {
+    // Arrange
+    seedAlertRules(db);
+
+    // Act
+    const deleted = deleteAlertRule(db, "swap-growing");
+    seedAlertRules(db);
+
+    // Assert
+    expect(deleted).toBe(true);
+    expect(getAlertRules(db).map((r) => r.id)).not.toContain("swap-growing");
+  });
+
+  it("should save and replace a rule", () => {
+    // Arrange
+    const rule = { id: "cpu-high", metric: "cpu_usage", type: "threshold", above: 90 };
+
+    // Act
+    saveAlertRule(db, rule);
+    saveAlertRule(db, { ...rule, above: 80 });
+
+    // Assert
+    expect(getAlertRules(db)).toEqual([{ ...rule, above: 80 }]);
+  });
+
+  it("should require a rule id", () => {
+    // Act & Assert
+    expect(() => saveAlertRule(db, { metric: "cpu_usage" })).toThrow("Alert rule needs an id");
+  });
+
+  it("should return an empty list when the table is missing", () => {
+    // Arrange
+    const bare = new Database(":memory:");
+
+    // Act & Assert
+    expect(getAlertRules(bare)).toEqual([]);
+    bare.close();
+  });
+
+  describe("seeded tps-drop rule", () => {
+    /**
+     * Run llama-server counters through the rate tracker and the seeded rules
+     * as the sampler does: a row per second, a scrape every 5 seconds.
+     * @param {Function} speed - Generated tokens per second at time t, 0 when idle.
+     * @param {number} seconds - Length of the run.
+     * @returns {Array<Object>} Alert events with the second they happened.
+     */
+    function run(speed, seconds) {
+      seedAlertRules(db);
+      const engine = new AlertEngine();
+      engine.setRules(getAlertRules(db).filter((r) => r.id === "tps-drop"));
+      const tracker = new CounterRateTracker({ counters: LLAMA_COUNTERS });
+      const counters = { predictedTokensTotal: 0, predictedSecondsTotal: 0, nDecodeTotal: 0 };
+      const events = [];
+      let rates = null;
+
+      for (let t = 0; t < seconds; t++) {
+        const tokens = speed(t);
+        if (tokens > 0) {
+          counters.predictedTokensTotal += tokens;
+          counters.predictedSecondsTotal += 1;
+          counters.nDecodeTotal += tokens;
+        }
+        if (t % 5 === 0) {
+          tracker.observe(t * 1000, { ...counters });
+          rates = computeLlamaRates(tracker, 1);
+        }
+        const row = { llama_predicted_tps: rates?.["1m"].predictedTokensPerSecond };
+        const values = getAlertValues(row, [], rates?.[ALERT_RATE_WINDOW]);
+        for (const event of engine.evaluate(t * 1000, values)) events.push({ t, state: event.state });
+      }
+      return events;
+    }
+
+    it("should stay quiet when requests start and stop", () => {
+      // Act - 50 tokens/s in bursts with idle gaps between them
+      const events = run((t) => (t % 300 < 200 ? 50 : 0), 900);
+
+      // Assert
+      expect(events).toEqual([]);
+    });
+
+    it("should raise when generation slows down and clear once it recovers", () => {
+      // Act - 50 tokens/s, 20 tokens/s between 200s and 300s
+      const events = run((t) => (t >= 200 && t < 300 ? 20 : 50), 400);
+
+      // Assert
+      expect(events.map((e) => e.state)).toEqual(["raised", "cleared"]);
+      expect(events[0].t).toBeGreaterThanOrEqual(200);
+      expect(events[0].t).toBeLessThan(230);
+      expect(events[1].t).toBeGreaterThanOrEqual(300);
+    });
+  });
+});
@@ -0,0 +1,147 @@
+/**
+ * DB Base Tests
+ * Connection pragma resolution and the incremental auto-vacuum conversion
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import Database from "better-sqlite3";
+import { resolvePragmas, enableIncrementalVacuum, DB_PRAGMA_DEFAULTS } from "../../../server/db/db-base.js";
+
+describe("resolvePragmas", () => {
+  const ENV_VARS = ["DB_JOURNAL_MODE", "DB_SYNCHRONOUS", "DB_MMAP_SIZE", "DB_CACHE_SIZE", "DB_TEMP_STORE"];
+  let saved;
+
+  beforeEach(() => {
+    saved = Object.fromEntries(ENV_VARS.map((name) => [name, process.env[name]]));
+    ENV_VARS.forEach((name) => delete process.env[name]);
+  });
+
+  afterEach(() => {
+    for (const [name, value] of Object.entries(saved)) {
+      if (value === undefined) delete process.env[name];
+      else process.env[name] = value;
+    }
+  });
+
+  it("should default to WAL with synchronous NORMAL", () => {
+    // Act
+    const pragmas = resolvePragmas();
+
+    // Assert
+    expect(pragmas).toEqual(DB_PRAGMA_DEFAULTS);
+    expect(pragmas.journal_mode).toBe("WAL");
+    expect(pragmas.synchronous).toBe("NORMAL");
+  });
+
+  it("should apply environment variables, then explicit overrides", () => {
+    // Arrange
+    process.env.DB_SYNCHRONOUS = "full";
+    process.env.DB_MMAP_SIZE = "0";
+    process.env.DB_CACHE_SIZE = "-64000";
+
+    // Act
+    const pragmas = resolvePragmas({ mmap_size: 1048576 });
+
+    // Assert
+    expect(pragmas.synchronous).toBe("FULL");
+    expect(pragmas.cache_size).toBe(-64000);
+    expect(pragmas.mmap_size).toBe(1048576);
+  });
+
+  it("should ignore invalid and unknown values", () => {
+    // Arrange
+    process.env.DB_JOURNAL_MODE = "wal; DROP TABLE logs";
+    process.env.DB_CACHE_SIZE = "lots";
+
+    // Act
+    const pragmas = resolvePragmas({ foreign_keys: "ON", temp_store: "disk" });
+
+    // Assert
+    expect(pragmas).toEqual(DB_PRAGMA_DEFAULTS);
+  });
+});
+
+describe("enableIncrementalVacuum", () => {
+  let dir;
+  let dbPath;
+  let db;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "db-base-"));
+    dbPath = path.join(dir, "test.db");
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "warn").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    db?.close();
+    jest.restoreAllMocks();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  /**
+   * Create a database file with a table, as written by an older version
+   */
+  function createExistingDatabase() {
+    const existing = new Database(dbPath);
+    existing.exec("CREATE TABLE logs (message TEXT)");
+    existing.close();
+    db = new Database(dbPath);
+  }
+
+  it("should enable incremental auto-vacuum on a new database", () => {
+    // Arrange
+    db = new Database(dbPath);
+
+    // Act
+    const enabled = enableIncrementalVacuum(db, { dbPath });
+
+    // Assert
+    expect(enabled).toBe(true);
+    db.exec("CREATE TABLE logs (message TEXT)");
+    expect(db.pragma("auto_vacuum", { simple: true })).toBe(2);
+  });
+
+  it("should leave an existing database alone unless the conversion is asked for", () => {
+    // Arrange
+    createExistingDatabase();
+
+    // Act
+    const enabled = enableIncrementalVacuum(db, { convert: false, dbPath });
+
+    // Assert
+    expect(enabled).toBe(false);
+    expect(db.pragma("auto_vacuum", { simple: true })).toBe(0);
+    expect(console.log).toHaveBeenCalledWith(expect.stringContaining("DB_CONVERT_AUTO_VACUUM=true"));
+  });
+
+  it("should convert an existing database when asked and log before and after", () => {
+    // Arrange
+    createExistingDatabase();
+
+    // Act
+    const enabled = enableIncrementalVacuum(db, { convert: true, dbPath });
+
+    // Assert
+    expect(enabled).toBe(true);
+    expect(db.pragma("auto_vacuum", { simple: true })).toBe(2);
+    expect(console.log).toHaveBeenCalledTimes(2);
+  });
+
+  it("should skip the conversion when the disk has no room for it", () => {
+    // Arrange
+    createExistingDatabase();
+    jest.spyOn(fs, "statfsSync").mockReturnValue({ bavail: 1, bsize: 4096 });
+
+    // Act
+    const enabled = enableIncrementalVacuum(db, { convert: true, dbPath });
+
+    // Assert
+    expect(enabled).toBe(false);
+    expect(db.pragma("auto_vacuum", { simple: true })).toBe(0);
+    expect(console.warn).toHaveBeenCalledWith(expect.stringContaining("Skipping auto-vacuum conversion"));
+  });
+});
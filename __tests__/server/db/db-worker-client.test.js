@@ -0,0 +1,127 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * DB Worker Client Tests
+ * Async DB methods against the real worker, plus timeouts and crashes
+ * against a stub worker
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { pathToFileURL } from "url";
+import { DB } from "../../../server/db/index.js";
+import { DBWorkerClient, WORKER_METHODS } from "../../../server/db/db-worker-client.js";
+
+// Stub worker: answers "call" with the method name, never answers "hang", crashes on "crash"
+const STUB_WORKER = `
+import { workerData } from "worker_threads";
+const { port } = workerData;
+port.on("message", (message) => {
+  if (message.method === "crash") throw new Error("boom");
+  if (message.method === "hang") return;
+  port.postMessage({ id: message.id, result: message.method });
+});
+`;
+
+describe("DBWorkerClient", () => {
+  let dir;
+  let db;
+  let client;
+
+  beforeAll(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "db-worker-"));
+    fs.writeFileSync(path.join(dir, "stub-worker.mjs"), STUB_WORKER);
+  });
+
+  afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  beforeEach(() => {
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "error").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    db?.close();
+    db = null;
+    client?.stop();
+    client = null;
+    jest.restoreAllMocks();
+  });
+
+  /**
+   * Create a client backed by the stub worker.
+   * @param {Object} [options] - Client options
+   */
+  function createClient(options = {}) {
+    const workerUrl = pathToFileURL(path.join(dir, "stub-worker.mjs"));
+    client = new DBWorkerClient({ dbPath: path.join(dir, "unused.db"), workerUrl, ...options });
+    return client;
+  }
+
+  it("should run the heavy methods on the worker and return promises", async () => {
+    // Arrange
+    db = new DB(path.join(dir, "models.db"), { worker: true });
+
+    // Act
+    const pending = db.saveModel({ name: "llama", model_path: "/models/llama.gguf" });
+    const saved = await pending;
+    const models = await db.getModels();
+
+    // Assert
+    expect(pending).toBeInstanceOf(Promise);
+    expect(WORKER_METHODS.every((method) => Object.hasOwn(db, method))).toBe(true);
+    expect(saved.name).toBe("llama");
+    expect(models.map((m) => m.name)).toEqual(["llama"]);
+    // Written through the worker's connection, visible on the main one
+    expect(db.models.getAll()).toHaveLength(1);
+  });
+
+  it("should see log lines still waiting in the write-behind queue", async () => {
+    // Arrange
+    db = new DB(path.join(dir, "logs.db"), { worker: true });
+    db.addLog("info", "queued line", "test");
+
+    // Act
+    const logs = await db.getLogs(10);
+
+    // Assert
+    expect(logs.map((l) => l.message)).toContain("queued line");
+    expect(db.writes.pending).toBe(0);
+  });
+
+  it("should reject with the worker's error message", async () => {
+    // Arrange
+    db = new DB(path.join(dir, "errors.db"), { worker: true });
+
+    // Act & Assert
+    await expect(db.worker.call("noSuchMethod")).rejects.toThrow("is not a function");
+  });
+
+  it("should reject calls the worker never answers", async () => {
+    // Arrange
+    createClient({ timeout: 100 });
+
+    // Act & Assert
+    await expect(client.call("hang")).rejects.toThrow("did not answer hang");
+    expect(client.pending.size).toBe(0);
+  });
+
+  it("should fail pending calls when the worker dies and restart on the next one", async () => {
+    // Arrange
+    createClient();
+    const pending = client.call("hang");
+
+    // Act
+    client.call("crash").catch(() => {});
+
+    // Assert
+    await expect(pending).rejects.toThrow("boom");
+    await expect(client.call("getLogs")).resolves.toBe("getLogs");
+  });
+});
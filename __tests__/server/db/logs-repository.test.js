@@ -415,6 +415,79 @@ describe("LogsRepository", () => {
     });
   });
 
+  describe("pruneChunk", () => {
+    const NOW = 1800000000;
+
+    /**
+     * Insert count logs, one per hour, the last one at NOW
+     */
+    function insertLogs(count) {
+      const insert = mockDb.db.prepare(
+        "INSERT INTO logs (level, message, source, timestamp) VALUES (?, ?, ?, ?)"
+      );
+      for (let i = 0; i < count; i++) {
+        insert.run("info", `Log ${i}`, "test", NOW - (count - 1 - i) * 3600);
+      }
+    }
+
+    // Positive test: row limit keeps the newest rows
+    it("should delete the oldest rows beyond maxRows", () => {
+      // Arrange
+      insertLogs(10);
+
+      // Act
+      const deleted = repository.pruneChunk({ maxRows: 4 }, NOW);
+
+      // Assert
+      expect(deleted).toBe(6);
+      const messages = repository.getAll(100).map((l) => l.message);
+      expect(messages).toHaveLength(4);
+      expect(messages).toContain("Log 9");
+      expect(messages).not.toContain("Log 5");
+    });
+
+    // Positive test: age limit removes expired rows only
+    it("should delete rows older than maxAgeDays", () => {
+      // Arrange - 72 hourly logs span three days
+      insertLogs(72);
+
+      // Act
+      const deleted = repository.pruneChunk({ maxAgeDays: 1 }, NOW);
+
+      // Assert - rows from the last 24 hours (plus the boundary second) stay
+      expect(deleted).toBe(47);
+      expect(repository.getAll(100)).toHaveLength(25);
+    });
+
+    // Positive test: one call never deletes more than a chunk
+    it("should delete at most chunkSize rows per call", () => {
+      // Arrange
+      insertLogs(25);
+
+      // Act
+      const first = repository.pruneChunk({ maxRows: 5, chunkSize: 8 }, NOW);
+      const second = repository.pruneChunk({ maxRows: 5, chunkSize: 8 }, NOW);
+      const third = repository.pruneChunk({ maxRows: 5, chunkSize: 8 }, NOW);
+      const done = repository.pruneChunk({ maxRows: 5, chunkSize: 8 }, NOW);
+
+      // Assert
+      expect([first, second, third, done]).toEqual([8, 8, 4, 0]);
+      expect(repository.getAll(100)).toHaveLength(5);
+    });
+
+    // Negative test: nothing to do without limits or rows
+    it("should return 0 when no limit applies", () => {
+      // Arrange
+      insertLogs(3);
+
+      // Act & Assert
+      expect(repository.pruneChunk({}, NOW)).toBe(0);
+      expect(repository.pruneChunk({ maxRows: 10, maxAgeDays: 30 }, NOW)).toBe(0);
+      repository.clear();
+      expect(repository.pruneChunk({ maxRows: 1 }, NOW)).toBe(0);
+    });
+  });
+
   describe("Integration tests", () => {
     beforeEach(() => {
       repository.clear();
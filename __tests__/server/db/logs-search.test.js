@@ -0,0 +1,168 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Log Search Tests
+ * FTS5 index, triggers, backfill and LogsRepository.search()
+ */
+
+import { jest } from "@jest/globals";
+import Database from "better-sqlite3";
+import { LogsRepository, toFtsQuery, SNIPPET_MARKS } from "../../../server/db/logs-repository.js";
+import {
+  getSchemaDefinition,
+  getLogsSearchDefinition,
+  backfillLogsSearch,
+} from "../../../server/db/schema.js";
+
+const NOW = 1800000000;
+
+describe("toFtsQuery", () => {
+  it("should quote every term so log punctuation is not FTS syntax", () => {
+    // Act & Assert
+    expect(toFtsQuery("[ERROR] -ngl AND")).toBe('"[ERROR]" "-ngl" "AND"');
+    expect(toFtsQuery('say "hi"')).toBe('"say" """hi"""');
+  });
+
+  it("should keep a trailing * as a prefix search", () => {
+    // Act & Assert
+    expect(toFtsQuery("cuda* out")).toBe('"cuda"* "out"');
+    expect(toFtsQuery("*")).toBe("");
+  });
+
+  it("should return an empty query for blank input", () => {
+    // Act & Assert
+    expect(toFtsQuery("   ")).toBe("");
+    expect(toFtsQuery(undefined)).toBe("");
+  });
+});
+
+describe("LogsRepository.search", () => {
+  let db;
+  let repository;
+
+  /**
+   * Insert a log row with an explicit timestamp
+   */
+  function insert(level, message, source, timestamp = NOW) {
+    db.prepare("INSERT INTO logs (level, message, source, timestamp) VALUES (?, ?, ?, ?)").run(
+      level,
+      message,
+      source,
+      timestamp
+    );
+  }
+
+  beforeEach(() => {
+    db = new Database(":memory:");
+    db.exec(getSchemaDefinition());
+    db.exec(getLogsSearchDefinition());
+    repository = new LogsRepository(db);
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "warn").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+    db.close();
+  });
+
+  it("should return ranked hits with marked snippets", () => {
+    // Arrange
+    insert("info", "loading model weights", "llama-server");
+    insert("error", "CUDA error: out of memory while loading model", "llama-server");
+    insert("info", "request finished", "server");
+
+    // Act
+    const { hits, hasMore } = repository.search({ query: "memory model" });
+
+    // Assert
+    expect(hasMore).toBe(false);
+    expect(hits).toHaveLength(1);
+    expect(hits[0].level).toBe("error");
+    expect(hits[0].snippet).toContain(`${SNIPPET_MARKS[0]}memory${SNIPPET_MARKS[1]}`);
+    expect(typeof hits[0].rank).toBe("number");
+  });
+
+  it("should filter by level, source and time range", () => {
+    // Arrange
+    insert("error", "slot 0 failed", "llama-server", NOW - 7200);
+    insert("error", "slot 1 failed", "llama-server", NOW - 60);
+    insert("info", "slot 2 failed", "llama-server", NOW - 60);
+    insert("error", "slot 3 failed", "server", NOW - 60);
+
+    // Act
+    const { hits } = repository.search({
+      query: "slot",
+      level: "error",
+      source: "llama-server",
+      from: NOW - 3600,
+      to: NOW,
+    });
+
+    // Assert
+    expect(hits.map((h) => h.message)).toEqual(["slot 1 failed"]);
+  });
+
+  it("should page through hits with limit and offset", () => {
+    // Arrange
+    for (let i = 0; i < 5; i++) insert("info", `token batch ${i}`, "llama-server");
+
+    // Act
+    const first = repository.search({ query: "token", limit: 2 });
+    const last = repository.search({ query: "token", limit: 2, offset: 4 });
+
+    // Assert
+    expect(first.hits).toHaveLength(2);
+    expect(first.hasMore).toBe(true);
+    expect(last.hits).toHaveLength(1);
+    expect(last.hasMore).toBe(false);
+  });
+
+  it("should return the newest filtered logs without a query", () => {
+    // Arrange
+    insert("warn", "first", "server");
+    insert("info", "second", "server");
+    insert("warn", "third", "server");
+
+    // Act
+    const { hits } = repository.search({ level: "warn" });
+
+    // Assert
+    expect(hits.map((h) => h.snippet)).toEqual(["third", "first"]);
+    expect(hits[0].rank).toBeNull();
+  });
+
+  it("should keep the index in step with deletes and updates", () => {
+    // Arrange
+    insert("info", "old checkpoint saved", "server");
+    insert("info", "another checkpoint saved", "server");
+
+    // Act
+    db.prepare("DELETE FROM logs WHERE message LIKE 'old%'").run();
+    db.prepare("UPDATE logs SET message = 'renamed entry'").run();
+
+    // Assert
+    expect(repository.search({ query: "checkpoint" }).hits).toHaveLength(0);
+    expect(repository.search({ query: "renamed" }).hits).toHaveLength(1);
+  });
+
+  it("should backfill rows written before the index existed", () => {
+    // Arrange: a database from before log search
+    const legacy = new Database(":memory:");
+    legacy.exec(getSchemaDefinition());
+    legacy.prepare("INSERT INTO logs (level, message, source) VALUES (?, ?, ?)").run("info", "legacy line", "server");
+    legacy.exec(getLogsSearchDefinition());
+    const legacyRepository = new LogsRepository(legacy);
+    expect(legacyRepository.search({ query: "legacy" }).hits).toHaveLength(0);
+
+    // Act
+    backfillLogsSearch(legacy);
+    backfillLogsSearch(legacy);
+
+    // Assert
+    expect(legacyRepository.search({ query: "legacy" }).hits).toHaveLength(1);
+    legacy.close();
+  });
+});
@@ -5,7 +5,12 @@
 
 import { jest } from "@jest/globals";
 import Database from "better-sqlite3";
-import MetricsRepository from "../../../server/db/metrics-repository.js";
+import MetricsRepository, {
+  METRICS_RETENTION,
+  MAX_RANGE_BUCKETS,
+  toGpuMetricsRows,
+} from "../../../server/db/metrics-repository.js";
+import { getMetricsRollupDefinition, getGpuMetricsDefinition } from "../../../server/db/schema.js";
 
 describe("MetricsRepository", () => {
   let db;
@@ -30,9 +35,22 @@ describe("MetricsRepository", () => {
         gpu_memory_used REAL DEFAULT 0,
         gpu_memory_total REAL DEFAULT 0,
         swap_usage REAL DEFAULT 0,
+        llama_prompt_tps REAL DEFAULT 0,
+        llama_predicted_tps REAL DEFAULT 0,
+        llama_requests_per_sec REAL DEFAULT 0,
+        llama_busy_ratio REAL DEFAULT 0,
+        disk_read_bps REAL DEFAULT 0,
+        disk_write_bps REAL DEFAULT 0,
+        disk_read_iops REAL DEFAULT 0,
+        disk_write_iops REAL DEFAULT 0,
+        disk_io_utilization REAL DEFAULT 0,
+        net_rx_bps REAL DEFAULT 0,
+        net_tx_bps REAL DEFAULT 0,
         timestamp INTEGER DEFAULT (strftime('%s', 'now'))
       )
     `);
+    database.exec(getMetricsRollupDefinition());
+    database.exec(getGpuMetricsDefinition());
 
     return database;
   }
@@ -539,6 +557,102 @@ describe("MetricsRepository", () => {
     });
   });
 
+  describe("watermark pruning", () => {
+    it("should place the watermark keep rows below the newest id", () => {
+      // Arrange
+      for (let i = 0; i < 10; i++) {
+        repository.save({ cpu_usage: i });
+      }
+
+      // Act & Assert
+      expect(repository.getPruneWatermark(4)).toBe(7);
+      expect(repository.getPruneWatermark(20)).toBeLessThan(1);
+    });
+
+    it("should return a watermark of 0 for an empty table", () => {
+      // Act & Assert
+      expect(repository.getPruneWatermark(10)).toBe(0);
+      expect(repository.pruneChunk(0)).toBe(0);
+    });
+
+    it("should delete at most chunkSize rows below the watermark per call", () => {
+      // Arrange
+      for (let i = 0; i < 20; i++) {
+        repository.save({ cpu_usage: i });
+      }
+      const watermark = repository.getPruneWatermark(5);
+
+      // Act
+      const chunks = [];
+      for (let n; (n = repository.pruneChunk(watermark, 6)) > 0; ) {
+        chunks.push(n);
+      }
+
+      // Assert
+      expect(chunks).toEqual([6, 6, 3]);
+      const remaining = db.prepare("SELECT cpu_usage FROM metrics ORDER BY id").all();
+      expect(remaining.map((r) => r.cpu_usage)).toEqual([15, 16, 17, 18, 19]);
+    });
+
+    it("should leave rows written after the watermark was taken", () => {
+      // Arrange
+      for (let i = 0; i < 6; i++) {
+        repository.save({ cpu_usage: i });
+      }
+      const watermark = repository.getPruneWatermark(2);
+      for (let i = 6; i < 10; i++) {
+        repository.save({ cpu_usage: i });
+      }
+
+      // Act
+      const deleted = repository.pruneChunk(watermark);
+
+      // Assert
+      expect(deleted).toBe(4);
+      expect(db.prepare("SELECT COUNT(*) AS c FROM metrics").get().c).toBe(6);
+    });
+
+    it("should drop per-GPU rows older than the oldest raw row kept", () => {
+      // Arrange
+      const base = Math.floor(Date.now() / 1000) - 100;
+      for (let i = 0; i < 4; i++) {
+        repository.save({ timestamp: base + i * 10 }, [{ gpu_index: 0, usage: i }]);
+      }
+
+      // Act
+      repository.pruneChunk(repository.getPruneWatermark(1));
+
+      // Assert
+      const gpuRows = db.prepare("SELECT timestamp FROM gpu_metrics").all();
+      expect(gpuRows).toEqual([{ timestamp: base + 30 }]);
+    });
+  });
+
+  describe("toGpuMetricsRows", () => {
+    it("should keep every GPU of a mixed NVIDIA and AMD host", () => {
+      // Arrange - both vendors number their first card 0
+      const list = [
+        { index: 0, vendor: "NVIDIA", usage: 80, memoryUsed: 1024, memoryTotal: 4096, temperature: 60, power: 250 },
+        { index: 1, vendor: "NVIDIA", usage: 70, memoryUsed: 512, memoryTotal: 4096, temperature: 58, power: 240 },
+        { index: 0, vendor: "AMD", usage: 10, memoryUsed: 256, memoryTotal: 2048, temperature: null, power: null },
+      ];
+      const timestamp = Math.floor(Date.now() / 1000);
+
+      // Act
+      const rows = toGpuMetricsRows(list);
+      repository.save({ timestamp }, rows);
+
+      // Assert
+      expect(rows.map((r) => r.gpu_index)).toEqual([0, 1, 2]);
+      const saved = db.prepare("SELECT gpu_index, usage FROM gpu_metrics ORDER BY gpu_index").all();
+      expect(saved).toEqual([
+        { gpu_index: 0, usage: 80 },
+        { gpu_index: 1, usage: 70 },
+        { gpu_index: 2, usage: 10 },
+      ]);
+    });
+  });
+
   describe("integration tests", () => {
     it("should perform full CRUD lifecycle", () => {
       // Arrange & Act & Assert: Full lifecycle test
@@ -692,4 +806,250 @@ describe("MetricsRepository", () => {
       expect(history[0].cpu_usage).toBe(50);
     });
   });
+
+  describe("rollup tiers", () => {
+    it("should maintain min/avg/max per minute and per hour as samples arrive", () => {
+      // Arrange: three samples in the same minute, one in the next minute
+      const base = 1700000040; // aligned to a minute, inside one hour
+      repository.save({ cpu_usage: 10, memory_usage: 50, timestamp: base });
+      repository.save({ cpu_usage: 30, memory_usage: 50, timestamp: base + 10 });
+      repository.save({ cpu_usage: 20, memory_usage: 50, timestamp: base + 20 });
+      repository.save({ cpu_usage: 80, memory_usage: 50, timestamp: base + 60 });
+
+      // Act
+      const minutes = db.prepare("SELECT * FROM metrics_1m ORDER BY bucket").all();
+      const hours = db.prepare("SELECT * FROM metrics_1h").all();
+
+      // Assert
+      expect(minutes).toHaveLength(2);
+      expect(minutes[0]).toMatchObject({
+        bucket: base,
+        samples: 3,
+        cpu_usage_min: 10,
+        cpu_usage_max: 30,
+      });
+      expect(minutes[0].cpu_usage_avg).toBeCloseTo(20);
+      expect(hours).toHaveLength(1);
+      expect(hours[0].samples).toBe(4);
+      expect(hours[0].cpu_usage_avg).toBeCloseTo(35);
+      expect(hours[0].cpu_usage_max).toBe(80);
+    });
+
+    it("should pick raw for short ranges and the hourly tier for 30 days", () => {
+      const now = 1700000000;
+
+      expect(repository.selectTier(now - 300, now, 60, now).name).toBe("raw");
+      expect(repository.selectTier(now - 3600, now, 60, now).name).toBe("1m");
+      expect(repository.selectTier(now - 30 * 86400, now, 300, now).name).toBe("1h");
+    });
+
+    it("should fall back to a tier that still retains the requested start", () => {
+      const now = 1700000000;
+
+      // Two days back with many points: raw would fit but no longer holds the data
+      expect(repository.selectTier(now - 2 * 86400, now, 10000, now).name).toBe("1m");
+    });
+
+    it("should return rollup rows with the average under the raw column name", () => {
+      // Arrange
+      const now = Math.floor(Date.now() / 1000);
+      const start = now - (now % 3600) - 3 * 3600;
+      for (let i = 0; i < 4; i++) {
+        repository.save({ cpu_usage: i * 10, timestamp: start + i * 3600 });
+      }
+
+      // Act: 20 days, at least 100 points -> hourly tier
+      const { tier, rows } = repository.getHistoryRange(now - 20 * 86400, now, 100);
+
+      // Assert
+      expect(tier).toBe("1h");
+      expect(rows).toHaveLength(4);
+      expect(rows[0].cpu_usage).toBe(30);
+      expect(rows[0].cpu_usage_max).toBe(30);
+      expect(rows[0].timestamp).toBe(start + 3 * 3600);
+    });
+
+    it("should prune each tier by its own retention", () => {
+      // Arrange
+      const now = 1800000000;
+      repository.save({ cpu_usage: 1, timestamp: now - METRICS_RETENTION.raw - 60 });
+      repository.save({ cpu_usage: 2, timestamp: now - 60 });
+
+      // Act
+      const deleted = repository.pruneTiers(now);
+
+      // Assert: the old raw row is gone but its rollups are still retained
+      expect(deleted.raw).toBe(1);
+      expect(deleted["1m"]).toBe(0);
+      expect(db.prepare("SELECT COUNT(*) AS c FROM metrics").get().c).toBe(1);
+      expect(db.prepare("SELECT COUNT(*) AS c FROM metrics_1m").get().c).toBe(2);
+    });
+
+    it("should prune expired tier rows at most one chunk per call, oldest first", () => {
+      // Arrange: five expired raw rows and one that is kept
+      const now = 1800000000;
+      const expired = now - METRICS_RETENTION.raw - 3600;
+      for (let i = 0; i < 5; i++) repository.save({ cpu_usage: i, timestamp: expired + i * 60 });
+      repository.save({ cpu_usage: 9, timestamp: now - 60 });
+
+      // Act
+      const chunks = [];
+      for (let chunk; (chunk = repository.pruneTiersChunk(now, 2)) > 0; ) chunks.push(chunk);
+
+      // Assert
+      expect(chunks).toEqual([2, 2, 1]);
+      expect(db.prepare("SELECT cpu_usage FROM metrics").all()).toEqual([{ cpu_usage: 9 }]);
+    });
+  });
+  describe("getRange(from, to, step)", () => {
+    it("should aggregate raw samples into step-wide buckets with min/avg/max", () => {
+      // Arrange: six samples 10s apart, two 30s buckets
+      const now = 1700000100;
+      const base = 1700000040;
+      [10, 20, 60, 40, 50, 30].forEach((cpu, i) => {
+        repository.save({ cpu_usage: cpu, uptime: i, timestamp: base + i * 10 });
+      });
+
+      // Act
+      const { tier, step, rows } = repository.getRange(base, base + 59, 30, now);
+
+      // Assert
+      expect(tier).toBe("raw");
+      expect(step).toBe(30);
+      expect(rows).toHaveLength(2);
+      expect(rows[0]).toMatchObject({
+        timestamp: base - (base % 30),
+        samples: 3,
+        cpu_usage: 30,
+        cpu_usage_min: 10,
+        cpu_usage_max: 60,
+        uptime: 2,
+      });
+      expect(rows[1]).toMatchObject({ samples: 3, cpu_usage: 40, cpu_usage_min: 30 });
+      expect(rows[1].timestamp).toBeGreaterThan(rows[0].timestamp);
+    });
+
+    it("should omit buckets without samples", () => {
+      // Arrange
+      const now = 1700003600;
+      repository.save({ cpu_usage: 1, timestamp: now - 600 });
+      repository.save({ cpu_usage: 2, timestamp: now - 60 });
+
+      // Act
+      const { rows } = repository.getRange(now - 600, now, 10, now);
+
+      // Assert
+      expect(rows.map((r) => r.cpu_usage)).toEqual([1, 2]);
+    });
+
+    it("should re-bucket rollups with sample-weighted averages once raw rows are gone", () => {
+      // Arrange: three samples in one minute, one in the next, two days ago
+      const now = 1700000000;
+      const base = now - 2 * 86400 - (now % 120);
+      repository.save({ cpu_usage: 10, timestamp: base });
+      repository.save({ cpu_usage: 20, timestamp: base + 10 });
+      repository.save({ cpu_usage: 30, timestamp: base + 20 });
+      repository.save({ cpu_usage: 90, timestamp: base + 60 });
+
+      // Act: one bucket covering both minutes
+      const { tier, rows } = repository.getRange(base, base + 119, 120, now);
+
+      // Assert
+      expect(tier).toBe("1m");
+      expect(rows).toHaveLength(1);
+      expect(rows[0].samples).toBe(4);
+      expect(rows[0].cpu_usage).toBeCloseTo(37.5);
+      expect(rows[0].cpu_usage_min).toBe(10);
+      expect(rows[0].cpu_usage_max).toBe(90);
+    });
+
+    it("should use the coarsest tier no wider than the step", () => {
+      // Arrange
+      const now = 1700000000;
+      const hour = now - (now % 3600) - 3600;
+      repository.save({ cpu_usage: 5, timestamp: hour });
+
+      // Act & Assert
+      expect(repository.getRange(now - 7200, now, 1, now).tier).toBe("raw");
+      expect(repository.getRange(now - 7200, now, 120, now).tier).toBe("1m");
+      expect(repository.getRange(now - 7200, now, 3600, now).tier).toBe("1h");
+    });
+
+    it("should widen the step to bound the number of buckets", () => {
+      // Arrange
+      const now = 1700000000;
+      const from = now - 86400;
+
+      // Act
+      const { step } = repository.getRange(from, now, 1, now);
+
+      // Assert
+      expect(step).toBe(Math.ceil(86400 / MAX_RANGE_BUCKETS));
+    });
+  });
+
+  describe("per-GPU metrics", () => {
+    const gpus = [
+      { gpu_index: 0, usage: 20, memory_used: 1000, memory_total: 8000, temperature: 60, power: 150 },
+      { gpu_index: 1, usage: 100, memory_used: 7900, memory_total: 8000 },
+    ];
+
+    it("should write one row per GPU with the system row", () => {
+      // Act
+      repository.save({ gpu_usage: 60, timestamp: 1700000000 }, gpus);
+
+      // Assert
+      const rows = db.prepare("SELECT * FROM gpu_metrics ORDER BY gpu_index").all();
+      expect(rows).toHaveLength(2);
+      expect(rows[0]).toMatchObject({ timestamp: 1700000000, usage: 20, temperature: 60, power: 150 });
+      expect(rows[1]).toMatchObject({ gpu_index: 1, usage: 100, temperature: null, power: null });
+    });
+
+    it("should roll back the GPU rows when the system row fails", () => {
+      // Arrange
+      db.exec("DROP TABLE metrics_1h");
+
+      // Act & Assert
+      expect(() => repository.save({ timestamp: 1700000000 }, gpus)).toThrow();
+      expect(db.prepare("SELECT COUNT(*) AS c FROM gpu_metrics").get().c).toBe(0);
+      expect(db.prepare("SELECT COUNT(*) AS c FROM metrics").get().c).toBe(0);
+    });
+
+    it("should bucket one GPU's history with averages and maxima", () => {
+      // Arrange: four samples 10s apart, two 20s buckets
+      const base = 1700000000;
+      for (let i = 0; i < 4; i++) {
+        repository.save({ timestamp: base + i * 10 }, [
+          { gpu_index: 0, usage: i * 10, memory_used: 100, memory_total: 200 },
+          { gpu_index: 1, usage: 99, memory_used: 100, memory_total: 200, temperature: 70 + i },
+        ]);
+      }
+
+      // Act
+      const gpu0 = repository.getGpuHistory(0, base, base + 40, 20);
+      const gpu1 = repository.getGpuHistory(1, base, base + 40, 20);
+
+      // Assert
+      expect(gpu0.step).toBe(20);
+      expect(gpu0.rows).toHaveLength(2);
+      expect(gpu0.rows[1]).toMatchObject({ timestamp: base + 20, samples: 2, usage: 25, usage_max: 30 });
+      expect(gpu0.rows[0].temperature).toBeNull();
+      expect(gpu1.rows[1]).toMatchObject({ usage: 99, temperature: 72.5, temperature_max: 73 });
+    });
+
+    it("should prune GPU rows with the raw tier's retention", () => {
+      // Arrange
+      const now = 1800000000;
+      repository.save({ timestamp: now - METRICS_RETENTION.raw - 60 }, gpus);
+      repository.save({ timestamp: now - 60 }, gpus);
+
+      // Act
+      const deleted = repository.pruneTiers(now);
+
+      // Assert
+      expect(deleted.gpu).toBe(2);
+      expect(db.prepare("SELECT COUNT(*) AS c FROM gpu_metrics").get().c).toBe(2);
+    });
+  });
+
 });
@@ -0,0 +1,114 @@
+/**
+ * Retention Scheduler Tests
+ * Chunked jobs, reporting and maintenance tasks
+ */
+
+import { jest } from "@jest/globals";
+import { RetentionScheduler } from "../../../server/db/retention.js";
+
+describe("RetentionScheduler", () => {
+  let scheduler;
+  let log;
+
+  beforeEach(() => {
+    scheduler = new RetentionScheduler({ interval: 1000, maxChunks: 5 });
+    log = jest.spyOn(console, "log").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    scheduler.stop();
+    log.mockRestore();
+  });
+
+  it("should run a job chunk by chunk until it is done", async () => {
+    // Arrange - 25 rows left, 10 per chunk
+    let remaining = 25;
+    const step = jest.fn(() => {
+      const deleted = Math.min(remaining, 10);
+      remaining -= deleted;
+      return deleted;
+    });
+    scheduler.addJob("logs", () => step);
+
+    // Act
+    const report = await scheduler.run();
+
+    // Assert
+    expect(step).toHaveBeenCalledTimes(4);
+    expect(report.logs).toMatchObject({ deleted: 25, chunks: 4 });
+    expect(report.logs.ms).toBeGreaterThanOrEqual(report.logs.maxChunkMs);
+  });
+
+  it("should stop after maxChunks and leave the rest for the next run", async () => {
+    // Arrange
+    const step = jest.fn(() => 100);
+    scheduler.addJob("metrics", () => step);
+
+    // Act
+    const report = await scheduler.run();
+
+    // Assert
+    expect(step).toHaveBeenCalledTimes(5);
+    expect(report.metrics.deleted).toBe(500);
+  });
+
+  it("should yield to the event loop between chunks", async () => {
+    // Arrange
+    const order = [];
+    scheduler.addJob("logs", () => () => {
+      order.push("chunk");
+      return order.length < 3 ? 1 : 0;
+    });
+
+    // Act
+    const run = scheduler.run();
+    setImmediate(() => order.push("io"));
+    await run;
+
+    // Assert
+    expect(order.indexOf("io")).toBeGreaterThan(0);
+    expect(order.indexOf("io")).toBeLessThan(order.length - 1);
+  });
+
+  it("should skip jobs without a step and run maintenance tasks", async () => {
+    // Arrange
+    scheduler.addJob("logs", () => null);
+    scheduler.addMaintenance("vacuum", () => 42);
+
+    // Act
+    const report = await scheduler.run();
+
+    // Assert
+    expect(report.logs).toMatchObject({ deleted: 0, chunks: 0 });
+    expect(report.vacuum.result).toBe(42);
+  });
+
+  it("should record failing jobs and keep going", async () => {
+    // Arrange
+    const error = jest.spyOn(console, "error").mockImplementation(() => {});
+    scheduler.addJob("broken", () => () => {
+      throw new Error("database is locked");
+    });
+    scheduler.addJob("logs", () => () => 0);
+
+    // Act
+    const report = await scheduler.run();
+
+    // Assert
+    expect(report.broken.error).toBe("database is locked");
+    expect(report.logs.chunks).toBe(1);
+    error.mockRestore();
+  });
+
+  it("should share a run in progress", async () => {
+    // Arrange
+    const createStep = jest.fn(() => () => 0);
+    scheduler.addJob("logs", createStep);
+
+    // Act
+    await Promise.all([scheduler.run(), scheduler.run()]);
+
+    // Assert
+    expect(createStep).toHaveBeenCalledTimes(1);
+  });
+});
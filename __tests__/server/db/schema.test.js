@@ -21,6 +21,7 @@ import {
   createIndexes,
   runModelsMigrations,
   runMetricsMigrations,
+  runMetricsRollupMigrations,
   runAllMigrations,
 } from "../../../server/db/schema.js";
 
@@ -60,6 +61,7 @@ describe("Schema Module", () => {
       expect(schema).toContain("CREATE TABLE IF NOT EXISTS logs");
       expect(schema).toContain("CREATE TABLE IF NOT EXISTS server_config");
       expect(schema).toContain("CREATE TABLE IF NOT EXISTS metadata");
+      expect(schema).toContain("CREATE TABLE IF NOT EXISTS alert_rules");
     });
 
     it("should define all models table columns with correct types and defaults", () => {
@@ -154,10 +156,10 @@ describe("Schema Module", () => {
       );
     });
 
-    it("should have 8 total indexes", () => {
+    it("should have 9 total indexes", () => {
       // Positive test: verify correct number of indexes
       const indexes = getIndexesDefinition();
-      expect(indexes.length).toBe(8);
+      expect(indexes.length).toBe(9);
     });
   });
 
@@ -243,12 +245,23 @@ describe("Schema Module", () => {
       expect(migrationNames).toContain("gpu_usage");
       expect(migrationNames).toContain("gpu_memory_used");
       expect(migrationNames).toContain("gpu_memory_total");
-    });
-
-    it("should have 3 total metrics migrations", () => {
+      expect(migrationNames).toContain("llama_prompt_tps");
+      expect(migrationNames).toContain("llama_predicted_tps");
+      expect(migrationNames).toContain("llama_requests_per_sec");
+      expect(migrationNames).toContain("llama_busy_ratio");
+      expect(migrationNames).toContain("disk_read_bps");
+      expect(migrationNames).toContain("disk_write_bps");
+      expect(migrationNames).toContain("disk_read_iops");
+      expect(migrationNames).toContain("disk_write_iops");
+      expect(migrationNames).toContain("disk_io_utilization");
+      expect(migrationNames).toContain("net_rx_bps");
+      expect(migrationNames).toContain("net_tx_bps");
+    });
+
+    it("should have 14 total metrics migrations", () => {
       // Positive test: verify correct number of migrations
       const migrations = getMetricsMigrations();
-      expect(migrations.length).toBe(3);
+      expect(migrations.length).toBe(14);
     });
 
     it("should define correct column types for each migration", () => {
@@ -280,6 +293,11 @@ describe("Schema Module", () => {
       expect(tables).toContain("logs");
       expect(tables).toContain("server_config");
       expect(tables).toContain("metadata");
+      expect(tables).toContain("metrics_1m");
+      expect(tables).toContain("metrics_1h");
+      expect(tables).toContain("gpu_metrics");
+      expect(tables).toContain("alert_rules");
+      expect(tables).toContain("logs_fts");
     });
 
     it("should create indexes after table creation", () => {
@@ -312,8 +330,8 @@ describe("Schema Module", () => {
 
       const tables = db.prepare("SELECT name FROM sqlite_master WHERE type='table'").all();
 
-      // Should have exactly 6 tables (not duplicates)
-      expect(tables.length).toBe(6);
+      // Should have exactly 10 tables plus logs_fts and its 4 shadow tables (not duplicates)
+      expect(tables.length).toBe(15);
     });
   });
 
@@ -533,6 +551,29 @@ describe("Schema Module", () => {
     });
   });
 
+  describe("runMetricsRollupMigrations()", () => {
+    it("should add min/avg/max columns for new rollup fields", () => {
+      // Arrange - rollup table from before the llama rate fields existed
+      db.exec(`
+        CREATE TABLE metrics_1m (bucket INTEGER PRIMARY KEY, samples INTEGER NOT NULL DEFAULT 0,
+          cpu_usage_min REAL DEFAULT 0, cpu_usage_avg REAL DEFAULT 0, cpu_usage_max REAL DEFAULT 0);
+        CREATE TABLE metrics_1h (bucket INTEGER PRIMARY KEY, samples INTEGER NOT NULL DEFAULT 0);
+      `);
+
+      // Act
+      runMetricsRollupMigrations(db);
+      runMetricsRollupMigrations(db);
+
+      // Assert
+      for (const table of ["metrics_1m", "metrics_1h"]) {
+        const columns = db.prepare(`PRAGMA table_info(${table})`).all().map((c) => c.name);
+        expect(columns).toContain("cpu_usage_avg");
+        expect(columns).toContain("llama_prompt_tps_min");
+        expect(columns).toContain("llama_busy_ratio_max");
+      }
+    });
+  });
+
   describe("runAllMigrations()", () => {
     it("should run both models and metrics migrations", () => {
       // Positive test: verify runAllMigrations executes both migrations
@@ -745,7 +786,7 @@ describe("Schema Module", () => {
       // Positive test: verify pure function works with read-only access
       const indexes = getIndexesDefinition();
       expect(Array.isArray(indexes)).toBe(true);
-      expect(indexes.length).toBe(8);
+      expect(indexes.length).toBe(9);
     });
 
     it("should handle database with read-only access in getModelsMigrations", () => {
@@ -759,7 +800,7 @@ describe("Schema Module", () => {
       // Positive test: verify pure function works with read-only access
       const migrations = getMetricsMigrations();
       expect(Array.isArray(migrations)).toBe(true);
-      expect(migrations.length).toBe(3);
+      expect(migrations.length).toBe(14);
     });
 
     it("should properly handle closed database in migration functions", () => {
@@ -0,0 +1,73 @@
+/**
+ * Statement Cache Tests
+ * Shared prepared statements and LRU eviction
+ */
+
+import { jest } from "@jest/globals";
+import Database from "better-sqlite3";
+import { StatementCache, installStatementCache } from "../../../server/db/statement-cache.js";
+
+describe("StatementCache", () => {
+  it("should prepare each SQL string once", () => {
+    // Arrange
+    const prepare = jest.fn((sql) => ({ sql }));
+    const cache = new StatementCache(prepare);
+
+    // Act
+    const first = cache.prepare("SELECT 1");
+    const second = cache.prepare("SELECT 1");
+    cache.prepare("SELECT 2");
+
+    // Assert
+    expect(second).toBe(first);
+    expect(prepare).toHaveBeenCalledTimes(2);
+    expect(cache.stats()).toEqual({ size: 2, hits: 1, misses: 2 });
+  });
+
+  it("should evict the least recently used statement", () => {
+    // Arrange
+    const prepare = jest.fn((sql) => ({ sql }));
+    const cache = new StatementCache(prepare, 2);
+    cache.prepare("A");
+    cache.prepare("B");
+    cache.prepare("A"); // A is now the most recently used
+
+    // Act
+    cache.prepare("C");
+    cache.prepare("A");
+    cache.prepare("B");
+
+    // Assert - B was evicted by C, A stayed cached
+    expect(prepare.mock.calls.map(([sql]) => sql)).toEqual(["A", "B", "C", "B"]);
+  });
+
+  it("should not cache statements that fail to prepare", () => {
+    // Arrange
+    const prepare = jest.fn(() => {
+      throw new Error("no such table: missing");
+    });
+    const cache = new StatementCache(prepare);
+
+    // Act & Assert
+    expect(() => cache.prepare("SELECT * FROM missing")).toThrow("no such table");
+    expect(cache.stats().size).toBe(0);
+  });
+});
+
+describe("installStatementCache", () => {
+  it("should route db.prepare through the cache", () => {
+    // Arrange
+    const db = new Database(":memory:");
+    db.exec("CREATE TABLE t (v INTEGER)");
+
+    // Act
+    const cache = installStatementCache(db);
+    db.prepare("INSERT INTO t (v) VALUES (?)").run(1);
+    db.prepare("INSERT INTO t (v) VALUES (?)").run(2);
+
+    // Assert
+    expect(db.prepare("SELECT COUNT(*) AS c FROM t").get().c).toBe(2);
+    expect(cache.stats()).toEqual({ size: 2, hits: 1, misses: 2 });
+    db.close();
+  });
+});
@@ -0,0 +1,173 @@
+/**
+ * Write Queue Tests
+ * Batched commits, size-triggered flushes, failure handling and close
+ */
+
+import { jest } from "@jest/globals";
+import Database from "better-sqlite3";
+import { WriteQueue } from "../../../server/db/write-queue.js";
+
+describe("WriteQueue", () => {
+  let db;
+  let handlers;
+  let queue;
+
+  beforeEach(() => {
+    db = { transaction: jest.fn((fn) => () => fn()) };
+    handlers = { log: jest.fn() };
+  });
+
+  afterEach(() => {
+    queue?.close();
+  });
+
+  it("should commit queued rows together in one transaction", () => {
+    // Arrange
+    queue = new WriteQueue({ db, handlers, flushInterval: 1000, flushRows: 100 });
+    queue.push("log", "info", "a");
+    queue.push("log", "info", "b");
+
+    // Act
+    const written = queue.flush();
+
+    // Assert
+    expect(written).toBe(2);
+    expect(db.transaction).toHaveBeenCalledTimes(1);
+    expect(handlers.log.mock.calls).toEqual([
+      ["info", "a"],
+      ["info", "b"],
+    ]);
+    expect(queue.stats.commits).toBe(1);
+  });
+
+  it("should flush on the interval", async () => {
+    // Arrange
+    queue = new WriteQueue({ db, handlers, flushInterval: 10, flushRows: 100 });
+
+    // Act
+    queue.push("log", "info", "a");
+    await new Promise((resolve) => setTimeout(resolve, 50));
+
+    // Assert
+    expect(handlers.log).toHaveBeenCalledTimes(1);
+    expect(queue.pending).toBe(0);
+  });
+
+  it("should flush synchronously once a batch is full", () => {
+    // Arrange
+    queue = new WriteQueue({ db, handlers, flushInterval: 1000, flushRows: 3 });
+
+    // Act - a burst of 7 rows
+    for (let i = 0; i < 7; i++) queue.push("log", "info", `line ${i}`);
+
+    // Assert
+    expect(db.transaction).toHaveBeenCalledTimes(2);
+    expect(handlers.log).toHaveBeenCalledTimes(6);
+    expect(queue.pending).toBe(1);
+  });
+
+  it("should keep rows after a failed commit, bounded by maxQueue", () => {
+    // Arrange
+    const error = jest.spyOn(console, "error").mockImplementation(() => {});
+    db.transaction = jest.fn(() => () => {
+      throw new Error("database or disk is full");
+    });
+    queue = new WriteQueue({ db, handlers, flushInterval: 1000, flushRows: 4, maxQueue: 6 });
+
+    // Act
+    for (let i = 0; i < 10; i++) queue.push("log", "info", `line ${i}`);
+
+    // Assert - one failed commit, then rows wait for the retry timer
+    expect(queue.pending).toBe(6);
+    expect(queue.stats.dropped).toBe(4);
+    expect(queue.stats.failures).toBe(1);
+    error.mockRestore();
+  });
+
+  it("should drop only the rows that cannot be written", () => {
+    // Arrange
+    const error = jest.spyOn(console, "error").mockImplementation(() => {});
+    const sqlite = new Database(":memory:");
+    sqlite.exec("CREATE TABLE logs (message TEXT NOT NULL)");
+    const insert = sqlite.prepare("INSERT INTO logs (message) VALUES (?)");
+    queue = new WriteQueue({
+      db: sqlite,
+      handlers: { log: (msg) => insert.run(msg) },
+      flushInterval: 1000,
+      flushRows: 1000,
+    });
+    queue.push("log", null);
+    queue.push("log", "b");
+    queue.push("log", "c");
+
+    // Act
+    const written = queue.flush();
+
+    // Assert
+    expect(written).toBe(2);
+    expect(sqlite.prepare("SELECT message FROM logs").all().map((r) => r.message)).toEqual(["b", "c"]);
+    expect(queue.pending).toBe(0);
+    expect(queue.stats.rejected).toBe(1);
+    expect(queue.failing).toBe(false);
+    expect(error).toHaveBeenCalledTimes(1);
+    sqlite.close();
+  });
+
+  it("should keep the whole batch when a row fails for a transient reason", () => {
+    // Arrange
+    const error = jest.spyOn(console, "error").mockImplementation(() => {});
+    handlers.log = jest.fn(() => {
+      throw Object.assign(new Error("disk I/O error"), { code: "SQLITE_IOERR_WRITE" });
+    });
+    queue = new WriteQueue({ db, handlers, flushInterval: 1000, flushRows: 100 });
+    queue.push("log", "info", "a");
+    queue.push("log", "info", "b");
+
+    // Act
+    const written = queue.flush();
+
+    // Assert
+    expect(written).toBe(0);
+    expect(queue.pending).toBe(2);
+    expect(queue.stats.rejected).toBe(0);
+    expect(queue.stats.failures).toBe(1);
+    error.mockRestore();
+  });
+
+  it("should flush on close and write directly afterwards", () => {
+    // Arrange
+    queue = new WriteQueue({ db, handlers, flushInterval: 1000, flushRows: 100 });
+    queue.push("log", "info", "queued");
+
+    // Act
+    queue.close();
+    queue.push("log", "info", "direct");
+
+    // Assert
+    expect(handlers.log.mock.calls.map((c) => c[1])).toEqual(["queued", "direct"]);
+    expect(queue.pending).toBe(0);
+  });
+
+  it("should batch real inserts", () => {
+    // Arrange
+    const sqlite = new Database(":memory:");
+    sqlite.exec("CREATE TABLE logs (message TEXT)");
+    const insert = sqlite.prepare("INSERT INTO logs (message) VALUES (?)");
+    queue = new WriteQueue({
+      db: sqlite,
+      handlers: { log: (msg) => insert.run(msg) },
+      flushInterval: 1000,
+      flushRows: 1000,
+    });
+
+    // Act
+    for (let i = 0; i < 50; i++) queue.push("log", `line ${i}`);
+    const before = sqlite.prepare("SELECT COUNT(*) AS c FROM logs").get().c;
+    queue.flush();
+
+    // Assert
+    expect(before).toBe(0);
+    expect(sqlite.prepare("SELECT COUNT(*) AS c FROM logs").get().c).toBe(50);
+    sqlite.close();
+  });
+});
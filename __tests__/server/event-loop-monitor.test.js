@@ -0,0 +1,170 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Event Loop Monitor Tests
+ * Loop delay windows, GC accounting, handler timing and slow-handler logging
+ */
+
+import { jest } from "@jest/globals";
+import { EventLoopMonitor, instrumentSocket } from "../../server/event-loop-monitor.js";
+
+/**
+ * Block the thread for a while.
+ * @param {number} ms - Milliseconds to spin.
+ */
+function busyWait(ms) {
+  const end = Date.now() + ms;
+  while (Date.now() < end) {
+    // Spin
+  }
+}
+
+const tick = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+describe("EventLoopMonitor", () => {
+  let monitor;
+
+  beforeEach(() => {
+    // Long window so only explicit _rollWindow() calls close it
+    monitor = new EventLoopMonitor({ resolution: 10, window: 60000, lagThreshold: 50 });
+    jest.spyOn(console, "warn").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    monitor.stop();
+    jest.restoreAllMocks();
+  });
+
+  it("should time wrapped functions and keep their return value and this", () => {
+    // Arrange
+    const target = {
+      factor: 2,
+      run: monitor.wrap("double", function (x) {
+        busyWait(5);
+        return x * this.factor;
+      }),
+    };
+
+    // Act
+    const result = target.run(21);
+    target.run(1);
+
+    // Assert
+    expect(result).toBe(42);
+    const [stats] = monitor.slowestHandlers();
+    expect(stats.name).toBe("double");
+    expect(stats.count).toBe(2);
+    expect(stats.maxMs).toBeGreaterThanOrEqual(4);
+  });
+
+  it("should record time even when the wrapped function throws", () => {
+    // Arrange
+    const failing = monitor.wrap("failing", () => {
+      throw new Error("boom");
+    });
+
+    // Act & Assert
+    expect(() => failing()).toThrow("boom");
+    expect(monitor.slowestHandlers()[0].name).toBe("failing");
+  });
+
+  it("should order slowest handlers by their longest run", () => {
+    // Arrange
+    monitor.recordHandler("a", 5);
+    monitor.recordHandler("b", 40);
+    monitor.recordHandler("a", 10);
+
+    // Act
+    const slowest = monitor.slowestHandlers();
+
+    // Assert
+    expect(slowest.map((s) => s.name)).toEqual(["b", "a"]);
+    expect(slowest[1]).toEqual({ name: "a", count: 2, totalMs: 15, maxMs: 10 });
+  });
+
+  it("should total GC pauses by kind", () => {
+    // Act
+    monitor._recordGc({ duration: 2, detail: { kind: 1 } }); // minor
+    monitor._recordGc({ duration: 8, detail: { kind: 4 } }); // major
+    monitor._recordGc({ duration: 1, detail: { kind: 1 } });
+
+    // Assert
+    const { gc } = monitor.snapshot();
+    expect(gc.count).toBe(3);
+    expect(gc.pauseMs).toBe(11);
+    expect(gc.maxPauseMs).toBe(8);
+    expect(gc.byKind).toEqual({
+      minor: { count: 2, pauseMs: 3 },
+      major: { count: 1, pauseMs: 8 },
+    });
+  });
+
+  it("should report heap statistics", () => {
+    // Act
+    const { heap } = monitor.snapshot();
+
+    // Assert
+    expect(heap.used).toBeGreaterThan(0);
+    expect(heap.limit).toBeGreaterThan(heap.used);
+  });
+
+  it("should publish loop delay and log the slowest handlers when lag crosses the threshold", async () => {
+    // Arrange
+    monitor.start();
+    await tick(30);
+    monitor.wrap("socket:models:scan", () => busyWait(120))();
+    await tick(30);
+
+    // Act
+    monitor._rollWindow();
+
+    // Assert
+    const { loop } = monitor.snapshot();
+    expect(loop.max).toBeGreaterThan(50);
+    expect(loop.p99).toBeGreaterThanOrEqual(loop.p50);
+    expect(console.warn).toHaveBeenCalledTimes(1);
+    expect(console.warn.mock.calls[0][0]).toContain("[LOOP]");
+    expect(console.warn.mock.calls[0][0]).toContain("socket:models:scan");
+    expect(monitor.slowestHandlers()).toEqual([]);
+  });
+
+  it("should stay quiet while the loop is responsive", async () => {
+    // Arrange
+    monitor.start();
+    await tick(30);
+
+    // Act
+    monitor._rollWindow();
+
+    // Assert
+    expect(console.warn).not.toHaveBeenCalled();
+  });
+});
+
+describe("instrumentSocket", () => {
+  it("should wrap handlers registered afterwards", () => {
+    // Arrange
+    const monitor = new EventLoopMonitor();
+    const handlers = {};
+    const socket = {
+      on(event, handler) {
+        handlers[event] = handler;
+        return this;
+      },
+    };
+    const handler = jest.fn(() => "done");
+
+    // Act
+    instrumentSocket(socket, monitor);
+    const returned = socket.on("logs:get", handler);
+    const result = handlers["logs:get"]({ limit: 10 });
+
+    // Assert
+    expect(returned).toBe(socket);
+    expect(result).toBe("done");
+    expect(handler).toHaveBeenCalledWith({ limit: 10 });
+    expect(monitor.slowestHandlers()[0].name).toBe("socket:logs:get");
+  });
+});
@@ -0,0 +1,104 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Alert Rule Handlers Tests
+ * alerts:rules:get/save/delete against a real alert_rules table
+ */
+
+import { jest } from "@jest/globals";
+import Database from "better-sqlite3";
+import { registerConfigHandlers } from "../../../server/handlers/config.js";
+import { metricsAlerts } from "../../../server/metrics-alerts.js";
+
+const VRAM_RULE = {
+  id: "vram-high",
+  metric: "gpu_memory_percent",
+  type: "threshold",
+  above: 95,
+};
+
+describe("Alert Rule Handlers", () => {
+  let db;
+  let socket;
+
+  /**
+   * Call a registered handler and wait for its ack.
+   * @param {string} event - Event name.
+   * @param {Object} req - Request payload.
+   * @returns {Promise<Object>} Ack payload
+   */
+  function call(event, req) {
+    return new Promise((resolve) => socket.handlers[event](req, resolve));
+  }
+
+  beforeEach(() => {
+    db = new Database(":memory:");
+    db.exec("CREATE TABLE alert_rules (id TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at INTEGER)");
+    const handlers = {};
+    socket = {
+      on: (event, handler) => {
+        handlers[event] = handler;
+      },
+      broadcast: { emit: jest.fn() },
+      handlers,
+    };
+    registerConfigHandlers(socket, db);
+    jest.spyOn(console, "log").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    metricsAlerts.reset();
+    jest.restoreAllMocks();
+    db.close();
+  });
+
+  it("should save a rule, apply it and broadcast the new rule list", async () => {
+    // Act
+    const result = await call("alerts:rules:save", { rule: VRAM_RULE });
+
+    // Assert
+    expect(result.success).toBe(true);
+    expect(result.data.rule).toEqual(VRAM_RULE);
+    expect((await call("alerts:rules:get", {})).data.rules).toEqual([VRAM_RULE]);
+    expect(metricsAlerts.states.has("vram-high")).toBe(true);
+    expect(socket.broadcast.emit).toHaveBeenCalledWith("alerts:rules:updated", {
+      rules: [VRAM_RULE],
+      timestamp: expect.any(String),
+    });
+  });
+
+  it("should reject a rule the alert engine cannot evaluate", async () => {
+    // Act
+    const result = await call("alerts:rules:save", { rule: { ...VRAM_RULE, above: undefined } });
+
+    // Assert
+    expect(result.success).toBe(false);
+    expect(result.error).toContain("needs \"above\" or \"below\"");
+    expect((await call("alerts:rules:get", {})).data.rules).toEqual([]);
+    expect(socket.broadcast.emit).not.toHaveBeenCalled();
+  });
+
+  it("should delete a rule and stop evaluating it", async () => {
+    // Arrange
+    await call("alerts:rules:save", { rule: VRAM_RULE });
+
+    // Act
+    const result = await call("alerts:rules:delete", { id: "vram-high" });
+
+    // Assert
+    expect(result).toMatchObject({ success: true, data: { id: "vram-high" } });
+    expect((await call("alerts:rules:get", {})).data.rules).toEqual([]);
+    expect(metricsAlerts.states.size).toBe(0);
+  });
+
+  it("should fail to delete a rule that does not exist", async () => {
+    // Act
+    const result = await call("alerts:rules:delete", { id: "missing" });
+
+    // Assert
+    expect(result.success).toBe(false);
+    expect(result.error).toBe("Alert rule not found: missing");
+  });
+});
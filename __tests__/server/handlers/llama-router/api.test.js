@@ -34,6 +34,7 @@ describe("Llama Router API - llamaApiRequest", () => {
     jest.unstable_mockModule("http", () => ({
       default: {
         request: mockRequest,
+        Agent: class {},
       },
     }));
 
@@ -371,6 +372,7 @@ describe("Llama Router API - llamaApiRequest", () => {
       jest.unstable_mockModule("http", () => ({
         default: {
           request: mockRequest,
+          Agent: class {},
         },
       }));
 
@@ -415,6 +417,7 @@ describe("Llama Router API - llamaApiRequest", () => {
       jest.unstable_mockModule("http", () => ({
         default: {
           request: mockRequest,
+          Agent: class {},
         },
       }));
 
@@ -592,6 +595,7 @@ describe("Llama Router API - llamaApiRequest", () => {
       jest.unstable_mockModule("http", () => ({
         default: {
           request: mockRequest,
+          Agent: class {},
         },
       }));
 
@@ -0,0 +1,143 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Scraper Endpoint Tests
+ * getMetrics() against a local llama-server stub: /metrics is scraped even
+ * when /health answers, and /health is only the liveness fallback; requests
+ * that stall or hit a closed keep-alive socket still settle
+ */
+
+import { jest } from "@jest/globals";
+import http from "http";
+import { LlamaServerMetricsScraper } from "../../../../server/handlers/llama-router/metrics-scraper.js";
+
+const METRICS_TEXT = [
+  "# TYPE llamacpp:prompt_tokens_total counter",
+  "llamacpp:prompt_tokens_total 1234",
+  "# TYPE llamacpp:tokens_predicted_total counter",
+  "llamacpp:tokens_predicted_total 567",
+  "# TYPE llamacpp:predicted_tokens_seconds gauge",
+  "llamacpp:predicted_tokens_seconds 42.5",
+  "",
+].join("\n");
+
+describe("LlamaServerMetricsScraper.getMetrics", () => {
+  let server;
+  let port;
+  let requests;
+  let metricsStatus;
+  let resetReusedSockets;
+
+  beforeEach(async () => {
+    requests = [];
+    metricsStatus = 200;
+    resetReusedSockets = false;
+    const sockets = new Set();
+    server = http.createServer((req, res) => {
+      requests.push(req.url);
+      const reused = sockets.has(req.socket);
+      sockets.add(req.socket);
+      if (resetReusedSockets && reused) {
+        // As if the server had closed the idle keep-alive connection
+        req.socket.destroy();
+      } else if (req.url === "/stall") {
+        // Headers and part of the body, then nothing
+        res.writeHead(200, { "Content-Type": "text/plain" });
+        res.write("llamacpp:prompt_tokens_total 1");
+      } else if (req.url === "/health") {
+        res.writeHead(200, { "Content-Type": "application/json" });
+        res.end(JSON.stringify({ status: "ok" }));
+      } else if (req.url.startsWith("/metrics") && metricsStatus === 200) {
+        res.writeHead(200, { "Content-Type": "text/plain" });
+        res.end(METRICS_TEXT);
+      } else {
+        res.writeHead(metricsStatus === 200 ? 404 : metricsStatus);
+        res.end("not available");
+      }
+    });
+    await new Promise((resolve) => server.listen(0, "127.0.0.1", resolve));
+    port = server.address().port;
+    jest.spyOn(console, "debug").mockImplementation(() => {});
+    jest.spyOn(console, "error").mockImplementation(() => {});
+  });
+
+  afterEach(async () => {
+    jest.restoreAllMocks();
+    server.closeAllConnections();
+    await new Promise((resolve) => server.close(resolve));
+  });
+
+  it("should scrape /metrics even though /health returns JSON", async () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port });
+
+    // Act
+    const metrics = await scraper.getMetrics();
+
+    // Assert
+    expect(requests).toEqual(["/metrics"]);
+    expect(metrics.promptTokensTotal).toBe(1234);
+    expect(metrics.predictedTokensTotal).toBe(567);
+    expect(metrics.models).toEqual({});
+    expect(metrics.source).toBe("metrics");
+  });
+
+  it("should ask for the tracked model's metrics in router mode", async () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port });
+    scraper.updateModel("qwen/7b");
+
+    // Act
+    const metrics = await scraper.getMetrics();
+
+    // Assert
+    expect(requests).toEqual(["/metrics?model=qwen%2F7b"]);
+    expect(metrics.promptTokensTotal).toBe(1234);
+  });
+
+  it("should fall back to /health for liveness when /metrics is disabled", async () => {
+    // Arrange
+    metricsStatus = 501;
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port });
+
+    // Act
+    const metrics = await scraper.getMetrics();
+
+    // Assert
+    expect(requests).toEqual(["/metrics", "/health"]);
+    expect(metrics.hasData).toBe(true);
+    expect(metrics.source).toBe("health");
+    expect(metrics.promptTokensTotal).toBe(0);
+  });
+
+  it("should reject a response that stalls after its headers and release the shared request", async () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port });
+
+    // Act
+    const first = scraper._fetchEndpoint("/stall", 100);
+    await expect(first).rejects.toThrow("timeout");
+    const second = scraper._fetchEndpoint("/stall", 100);
+
+    // Assert - a new request, not the settled one handed out again
+    expect(second).not.toBe(first);
+    await expect(second).rejects.toThrow("timeout");
+    expect(requests).toEqual(["/stall", "/stall"]);
+  });
+
+  it("should retry once when a reused keep-alive socket was reset", async () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port });
+    await scraper._fetchEndpoint("/metrics", 1000);
+    resetReusedSockets = true;
+
+    // Act
+    const metrics = await scraper._fetchEndpoint("/metrics", 1000);
+
+    // Assert
+    expect(metrics.promptTokensTotal).toBe(1234);
+    expect(requests).toEqual(["/metrics", "/metrics", "/metrics"]);
+  });
+});
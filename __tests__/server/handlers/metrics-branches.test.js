@@ -102,7 +102,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 1 });
+      await handler({ requestId: 1 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual(gpuArray);
     });
@@ -118,7 +118,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 2 });
+      await handler({ requestId: 2 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -134,7 +134,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 3 });
+      await handler({ requestId: 3 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -150,7 +150,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 4 });
+      await handler({ requestId: 4 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -166,7 +166,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 5 });
+      await handler({ requestId: 5 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -182,7 +182,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 6 });
+      await handler({ requestId: 6 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -205,7 +205,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 7 });
+      await handler({ requestId: 7 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual(gpuArray2);
     });
@@ -221,7 +221,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 8 });
+      await handler({ requestId: 8 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -238,7 +238,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:get");
       const beforeTime = Date.now();
-      handler({ requestId: 0 });
+      await handler({ requestId: 0 });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -257,7 +257,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:get");
       const beforeTime = Date.now();
-      handler({ requestId: "" });
+      await handler({ requestId: "" });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -276,7 +276,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:get");
       const beforeTime = Date.now();
-      handler({ requestId: false });
+      await handler({ requestId: false });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -295,7 +295,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:get");
       const beforeTime = Date.now();
-      handler({ requestId: NaN });
+      await handler({ requestId: NaN });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -315,7 +315,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([{ cpu_usage: 50 }]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 1, limit: 0 });
+      await handler({ requestId: 1, limit: 0 });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
       expect(mockDb._getMetricsHistoryCalls()).toBe(1);
@@ -330,7 +330,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 2, limit: "" });
+      await handler({ requestId: 2, limit: "" });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
       expect(mockDb._getMetricsHistoryCalls()).toBe(1);
@@ -345,7 +345,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 3, limit: false });
+      await handler({ requestId: 3, limit: false });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
       expect(mockDb._getMetricsHistoryCalls()).toBe(1);
@@ -360,7 +360,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 4, limit: null });
+      await handler({ requestId: 4, limit: null });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
       expect(mockDb._getMetricsHistoryCalls()).toBe(1);
@@ -375,7 +375,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([{ cpu_usage: 10 }, { cpu_usage: 20 }, { cpu_usage: 30 }]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 5, limit: 5 });
+      await handler({ requestId: 5, limit: 5 });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
       expect(mockSocket.emitCalls[0].data.data.history).toHaveLength(3);
@@ -393,7 +393,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:history");
       const beforeTime = Date.now();
-      handler({ requestId: 0 });
+      await handler({ requestId: 0 });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -412,7 +412,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
 
       const handler = mockSocket._getHandler("metrics:history");
       const beforeTime = Date.now();
-      handler({ requestId: "" });
+      await handler({ requestId: "" });
       const afterTime = Date.now();
 
       const requestId = mockSocket.emitCalls[0].data.requestId;
@@ -432,7 +432,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics(0);
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 1 });
+      await handler({ requestId: 1 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics).toEqual({
         cpu: { usage: 0 },
@@ -458,7 +458,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics("");
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 2 });
+      await handler({ requestId: 2 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics).toEqual({
         cpu: { usage: 0 },
@@ -484,7 +484,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics(false);
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 3 });
+      await handler({ requestId: 3 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics).toEqual({
         cpu: { usage: 0 },
@@ -512,7 +512,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 1 });
+      await handler({ requestId: 1 });
 
       expect(mockSocket.emitCalls[0].data.data.history).toEqual([]);
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
@@ -540,7 +540,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       ]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 2 });
+      await handler({ requestId: 2 });
 
       const history = mockSocket.emitCalls[0].data.data.history;
       expect(history).toHaveLength(1);
@@ -574,7 +574,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50, gpu_usage: 75 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 1 });
+      await handler({ requestId: 1 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual(gpuList);
     });
@@ -591,7 +591,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([{ cpu_usage: 50, timestamp: Date.now() }]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 2 });
+      await handler({ requestId: 2 });
 
       expect(mockSocket.emitCalls[0].data.data.history[0].gpu.list).toEqual(gpuList);
     });
@@ -607,7 +607,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 3 });
+      await handler({ requestId: 3 });
 
       expect(mockSocket.emitCalls[0].data.data.metrics.gpu.list).toEqual([]);
     });
@@ -626,7 +626,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       };
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 999 });
+      await handler({ requestId: 999 });
 
       const response = mockSocket.emitCalls[0].data;
       expect(response.success).toBe(false);
@@ -648,7 +648,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       };
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 888 });
+      await handler({ requestId: 888 });
 
       const response = mockSocket.emitCalls[0].data;
       expect(response.success).toBe(false);
@@ -714,7 +714,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setLatestMetrics({ cpu_usage: 50 });
 
       const handler = mockSocket._getHandler("metrics:get");
-      handler({ requestId: 123 });
+      await handler({ requestId: 123 });
 
       const response = mockSocket.emitCalls[0].data;
       expect(response).toHaveProperty("success", true);
@@ -734,7 +734,7 @@ describe("Metrics Handlers - Branch Coverage", () => {
       mockDb._setHistory([{ cpu_usage: 50, timestamp: Date.now() }]);
 
       const handler = mockSocket._getHandler("metrics:history");
-      handler({ requestId: 456 });
+      await handler({ requestId: 456 });
 
       const response = mockSocket.emitCalls[0].data;
       expect(response).toHaveProperty("success", true);
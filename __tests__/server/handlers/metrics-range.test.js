@@ -0,0 +1,171 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Range Handler Tests
+ * metrics:range and metrics:gpu-history validation and bucket mapping
+ */
+
+import { jest } from "@jest/globals";
+import { registerMetricsHandlers } from "../../../server/handlers/metrics.js";
+
+describe("metrics:range", () => {
+  let handlers;
+  let db;
+
+  beforeEach(() => {
+    handlers = {};
+    const socket = {
+      on(event, handler) {
+        handlers[event] = handler;
+      },
+      emit: jest.fn(),
+    };
+    db = {
+      getMetricsRange: jest.fn(() => ({
+        tier: "1m",
+        step: 300,
+        rows: [
+          {
+            timestamp: 1700000100,
+            samples: 150,
+            cpu_usage: 42,
+            cpu_usage_min: 10,
+            cpu_usage_max: 95,
+          },
+        ],
+      })),
+    };
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "error").mockImplementation(() => {});
+    registerMetricsHandlers(socket, db);
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it("should return bucketed history with min/max per entry", async () => {
+    // Arrange
+    const ack = jest.fn();
+
+    // Act
+    await handlers["metrics:range"]({ from: 1700000000, to: 1700086400, step: 300 }, ack);
+
+    // Assert
+    expect(db.getMetricsRange).toHaveBeenCalledWith(1700000000, 1700086400, 300);
+    const response = ack.mock.calls[0][0];
+    expect(response.success).toBe(true);
+    expect(response.data.tier).toBe("1m");
+    expect(response.data.step).toBe(300);
+    expect(response.data.history[0].cpu).toEqual({ usage: 42, min: 10, max: 95 });
+    expect(response.data.history[0].samples).toBe(150);
+    expect(response.data.history[0].timestamp).toBe(1700000100);
+  });
+
+  it("should reject a range that does not start before its end", async () => {
+    // Arrange
+    const ack = jest.fn();
+
+    // Act
+    await handlers["metrics:range"]({ from: 1700000000, to: 1600000000, step: 60 }, ack);
+
+    // Assert
+    expect(db.getMetricsRange).not.toHaveBeenCalled();
+    expect(ack.mock.calls[0][0].success).toBe(false);
+  });
+
+  it("should report database errors", async () => {
+    // Arrange
+    const ack = jest.fn();
+    db.getMetricsRange.mockImplementation(() => {
+      throw new Error("database is locked");
+    });
+
+    // Act
+    await handlers["metrics:range"]({ from: 1700000000, step: 60 }, ack);
+
+    // Assert
+    expect(ack.mock.calls[0][0]).toMatchObject({
+      success: false,
+      error: { message: "database is locked" },
+    });
+  });
+});
+
+describe("metrics:gpu-history", () => {
+  let handlers;
+  let db;
+
+  beforeEach(() => {
+    handlers = {};
+    const socket = {
+      on(event, handler) {
+        handlers[event] = handler;
+      },
+      emit: jest.fn(),
+    };
+    db = {
+      getGpuMetricsHistory: jest.fn(() => ({
+        step: 60,
+        rows: [
+          {
+            timestamp: 1700000040,
+            samples: 30,
+            usage: 80,
+            usage_max: 100,
+            memory_used: 4000,
+            memory_used_max: 4096,
+            memory_total: 8192,
+            temperature: null,
+            temperature_max: null,
+            power: 200,
+            power_max: 250,
+          },
+        ],
+      })),
+    };
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "error").mockImplementation(() => {});
+    registerMetricsHandlers(socket, db);
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it("should return one GPU's bucketed history", async () => {
+    // Arrange
+    const ack = jest.fn();
+
+    // Act
+    await handlers["metrics:gpu-history"]({ gpu: 1, from: 1700000000, to: 1700003600, step: 60 }, ack);
+
+    // Assert
+    expect(db.getGpuMetricsHistory).toHaveBeenCalledWith(1, 1700000000, 1700003600, 60);
+    const response = ack.mock.calls[0][0];
+    expect(response.success).toBe(true);
+    expect(response.data.gpu).toBe(1);
+    expect(response.data.history[0]).toMatchObject({
+      usage: 80,
+      usageMax: 100,
+      memoryTotal: 8192,
+      temperature: null,
+      power: 200,
+      timestamp: 1700000040,
+    });
+  });
+
+  it("should reject a missing GPU index", async () => {
+    // Arrange
+    const ack = jest.fn();
+
+    // Act
+    await handlers["metrics:gpu-history"]({ from: 1700000000 }, ack);
+
+    // Assert
+    expect(db.getGpuMetricsHistory).not.toHaveBeenCalled();
+    expect(ack.mock.calls[0][0].success).toBe(false);
+  });
+});
@@ -105,7 +105,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:get handler
-      mockSocket.handlers["metrics:get"]({ requestId: 123 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 123 });
 
       // Assert: Verify emit was called with correct data
       expect(mockSocket.emitCalls.length).toBe(1);
@@ -135,7 +135,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:get handler
-      mockSocket.handlers["metrics:get"]({ requestId: 456 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 456 });
 
       // Assert: Verify default values are used
       expect(mockSocket.emitCalls[0].data.data.metrics).toEqual({
@@ -165,7 +165,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:get handler
-      mockSocket.handlers["metrics:get"]({ requestId: 789 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 789 });
 
       // Assert: Verify missing fields use defaults
       expect(mockSocket.emitCalls[0].data.data.metrics).toEqual({
@@ -191,7 +191,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with null request
-      mockSocket.handlers["metrics:get"](null);
+      await mockSocket.handlers["metrics:get"](null);
 
       // Assert: Verify requestId is a number (timestamp)
       expect(mockSocket.emitCalls[0].data.requestId).toBeDefined();
@@ -206,7 +206,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with request object without requestId
-      mockSocket.handlers["metrics:get"]({});
+      await mockSocket.handlers["metrics:get"]({});
 
       // Assert: Verify requestId is a number (timestamp)
       expect(mockSocket.emitCalls[0].data.requestId).toBeDefined();
@@ -224,7 +224,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:get handler
-      mockSocket.handlers["metrics:get"]({ requestId: 999 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 999 });
 
       // Assert: Verify error response
       expect(mockSocket.emitCalls[0].data.success).toBe(false);
@@ -239,7 +239,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:get"]({ requestId: 100 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 100 });
 
       // Assert
       expect(mockDb._getLatestMetricsCalls()).toBe(1);
@@ -276,7 +276,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:history handler
-      mockSocket.handlers["metrics:history"]({ requestId: 111, limit: 50 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 111, limit: 50 });
 
       // Assert: Verify emit was called with correct data
       expect(mockSocket.emitCalls.length).toBe(1);
@@ -308,7 +308,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger without limit
-      mockSocket.handlers["metrics:history"]({ requestId: 222 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 222 });
 
       // Assert: Verify default limit of 100 is passed to getMetricsHistory
       // We need to check this by testing behavior since we can't directly verify the argument
@@ -328,7 +328,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with limit of 2
-      mockSocket.handlers["metrics:history"]({ requestId: 333, limit: 2 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 333, limit: 2 });
 
       // Assert: Verify handler executed successfully
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
@@ -345,7 +345,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:history handler
-      mockSocket.handlers["metrics:history"]({ requestId: 444 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 444 });
 
       // Assert: Verify default values for missing fields
       const history = mockSocket.emitCalls[0].data.data.history;
@@ -388,7 +388,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:history handler
-      mockSocket.handlers["metrics:history"]({ requestId: 555 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 555 });
 
       // Assert: Verify empty array returned
       expect(mockSocket.emitCalls[0].data.data.history).toEqual([]);
@@ -402,7 +402,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with null request
-      mockSocket.handlers["metrics:history"](null);
+      await mockSocket.handlers["metrics:history"](null);
 
       // Assert: Verify requestId is a number (timestamp)
       expect(mockSocket.emitCalls[0].data.requestId).toBeDefined();
@@ -417,7 +417,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with request object without requestId
-      mockSocket.handlers["metrics:history"]({});
+      await mockSocket.handlers["metrics:history"]({});
 
       // Assert: Verify requestId is a number (timestamp)
       expect(mockSocket.emitCalls[0].data.requestId).toBeDefined();
@@ -432,7 +432,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger with request without limit
-      mockSocket.handlers["metrics:history"]({ requestId: 666 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 666 });
 
       // Assert: Verify handler executed successfully
       expect(mockSocket.emitCalls[0].data.success).toBe(true);
@@ -449,7 +449,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Trigger the metrics:history handler
-      mockSocket.handlers["metrics:history"]({ requestId: 777 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 777 });
 
       // Assert: Verify error response
       expect(mockSocket.emitCalls[0].data.success).toBe(false);
@@ -464,7 +464,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:history"]({ requestId: 888 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 888 });
 
       // Assert
       expect(mockDb._getMetricsHistoryCalls()).toBe(1);
@@ -490,7 +490,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:history"]({ requestId: 999 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 999 });
 
       // Assert: Verify all fields are properly mapped
       const history = mockSocket.emitCalls[0].data.data.history;
@@ -519,7 +519,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:get"]({ requestId: 1000 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 1000 });
 
       // Assert
       expect(mockSocket.emitCalls[0].data.timestamp).toBeDefined();
@@ -537,7 +537,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:get"]({ requestId: 1001 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 1001 });
 
       // Assert
       expect(mockSocket.emitCalls[0].data.timestamp).toBeDefined();
@@ -552,7 +552,7 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:get"]({ requestId: 1002 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 1002 });
 
       // Assert: Verify structure matches expected API format
       expect(mockSocket.emitCalls[0].data.data).toBeDefined();
@@ -570,9 +570,9 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act: Multiple requests
-      mockSocket.handlers["metrics:get"]({ requestId: 1 });
-      mockSocket.handlers["metrics:history"]({ requestId: 2 });
-      mockSocket.handlers["metrics:get"]({ requestId: 3 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 1 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 2 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 3 });
 
       // Assert: Verify all emit calls
       expect(mockSocket.emitCalls.length).toBe(3);
@@ -590,8 +590,8 @@ describe("Metrics Handlers", () => {
       registerMetricsHandlers(mockSocket, mockDb);
 
       // Act
-      mockSocket.handlers["metrics:get"]({ requestId: 100 });
-      mockSocket.handlers["metrics:history"]({ requestId: 200 });
+      await mockSocket.handlers["metrics:get"]({ requestId: 100 });
+      await mockSocket.handlers["metrics:history"]({ requestId: 200 });
 
       // Assert: Verify emit calls are tracked separately
       expect(mockSocket.emitCalls).toHaveLength(2);
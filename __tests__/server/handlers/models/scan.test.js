@@ -593,7 +593,7 @@ describe("Models Scan Handlers Integration", () => {
       const mockGgufParser = createMockGgufParser();
 
       registerModelsScanHandlers(mockSocket, mockIo, mockDb, mockGgufParser);
-      mockSocket.handlers["models:cleanup"]({ requestId: 200 });
+      await mockSocket.handlers["models:cleanup"]({ requestId: 200 });
 
       expect(mockDb.cleanupCalls).toBe(1);
       expect(mockSocket.emitCalls[0].event).toBe("models:cleanup:result");
@@ -615,7 +615,7 @@ describe("Models Scan Handlers Integration", () => {
       const mockGgufParser = createMockGgufParser();
 
       registerModelsScanHandlers(mockSocket, mockIo, mockDb, mockGgufParser);
-      mockSocket.handlers["models:cleanup"]({ requestId: 201 });
+      await mockSocket.handlers["models:cleanup"]({ requestId: 201 });
 
       expect(mockSocket.emitCalls[0].data.success).toBe(false);
       expect(mockSocket.emitCalls[0].data.error.message).toBe("Cleanup failed");
@@ -634,7 +634,7 @@ describe("Models Scan Handlers Integration", () => {
       const mockGgufParser = createMockGgufParser();
 
       registerModelsScanHandlers(mockSocket, mockIo, mockDb, mockGgufParser);
-      mockSocket.handlers["models:cleanup"]();
+      await mockSocket.handlers["models:cleanup"]();
 
       expect(mockSocket.emitCalls[0].data.requestId).toBeDefined();
     });
@@ -0,0 +1,60 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * IO Collector Tests
+ * Device number decoding and delta-based throughput readings
+ */
+
+import { collectIoMetrics, resetIoMetrics, splitDevice } from "../../server/io-collector.js";
+
+describe("io-collector", () => {
+  afterEach(() => {
+    resetIoMetrics();
+  });
+
+  describe("splitDevice", () => {
+    it("should decode small and large dev_t values", () => {
+      // 259:1 (nvme0n1p1) and 8:17 (sdb1) use the legacy 16-bit encoding
+      expect(splitDevice(259 * 256 + 1)).toEqual({ major: 259, minor: 1 });
+      expect(splitDevice(8 * 256 + 17)).toEqual({ major: 8, minor: 17 });
+      // Minor numbers above 255 spill into bits 20+
+      expect(splitDevice((300 >> 8) * 2 ** 20 + 8 * 256 + (300 & 0xff))).toEqual({
+        major: 8,
+        minor: 300,
+      });
+    });
+  });
+
+  describe("collectIoMetrics", () => {
+    it("should report zero rates on the first reading", async () => {
+      // Act
+      const { io, network } = await collectIoMetrics("/");
+
+      // Assert
+      expect(io.readBytesPerSec).toBe(0);
+      expect(io.writeBytesPerSec).toBe(0);
+      expect(io.utilization).toBe(0);
+      expect(network.rxBytesPerSec).toBe(0);
+      expect(Array.isArray(io.devices)).toBe(true);
+      expect(network.interfaces.some((i) => i.name === "lo")).toBe(false);
+    });
+
+    it("should return non-negative rates between readings", async () => {
+      // Arrange
+      await collectIoMetrics("/");
+      await new Promise((resolve) => setTimeout(resolve, 20));
+
+      // Act
+      const { io, network } = await collectIoMetrics("/");
+
+      // Assert
+      for (const device of io.devices) {
+        expect(device.readBytesPerSec).toBeGreaterThanOrEqual(0);
+        expect(device.utilization).toBeLessThanOrEqual(100);
+      }
+      expect(network.txBytesPerSec).toBeGreaterThanOrEqual(0);
+    });
+  });
+});
@@ -0,0 +1,237 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * llama-server Counter Rates Tests
+ * Windowed rates, counter resets and bounded history, plus scrape-to-rate
+ * against a llama-server stub
+ */
+
+import { jest } from "@jest/globals";
+import http from "http";
+import {
+  CounterRateTracker,
+  computeLlamaRates,
+  updateLlamaRates,
+  llamaCounterRates,
+  LLAMA_COUNTERS,
+} from "../../server/llama-rates.js";
+import { LlamaServerMetricsScraper } from "../../server/handlers/llama-router/metrics-scraper.js";
+import { FAMILY_INTERVALS } from "../../server/system-metrics.js";
+
+describe("CounterRateTracker", () => {
+  let tracker;
+
+  beforeEach(() => {
+    tracker = new CounterRateTracker({ counters: ["tokens"], maxAge: 300 });
+  });
+
+  it("should return null until two samples exist", () => {
+    // Arrange
+    tracker.observe(0, { tokens: 100 });
+
+    // Act & Assert
+    expect(tracker.rate("tokens", 10)).toBeNull();
+  });
+
+  it("should compute the rate over each window", () => {
+    // Arrange - 10 tokens/s for a minute, then 100 tokens/s for 10 seconds
+    for (let t = 0; t <= 60; t += 5) {
+      tracker.observe(t * 1000, { tokens: t * 10 });
+    }
+    tracker.observe(70000, { tokens: 600 + 1000 });
+
+    // Act & Assert
+    expect(tracker.rate("tokens", 10)).toBe(100);
+    expect(tracker.rate("tokens", 60)).toBeCloseTo((1600 - 100) / 60);
+  });
+
+  it("should use all history while it is shorter than the window", () => {
+    // Arrange
+    tracker.observe(0, { tokens: 0 });
+    tracker.observe(20000, { tokens: 200 });
+
+    // Act & Assert
+    expect(tracker.rate("tokens", 300)).toBe(10);
+  });
+
+  it("should treat a decreasing counter as a reset", () => {
+    // Arrange - server restarts between 10s and 20s
+    tracker.observe(0, { tokens: 500 });
+    tracker.observe(10000, { tokens: 600 });
+    tracker.observe(20000, { tokens: 50 });
+
+    // Act
+    const rate = tracker.rate("tokens", 60);
+
+    // Assert - 100 before the restart plus 50 after it
+    expect(rate).toBe(150 / 20);
+  });
+
+  it("should ignore scrapes that are not newer than the last one", () => {
+    // Arrange
+    tracker.observe(1000, { tokens: 10 });
+
+    // Act
+    const accepted = tracker.observe(1000, { tokens: 10 });
+
+    // Assert
+    expect(accepted).toBe(false);
+    expect(tracker.samples).toHaveLength(1);
+  });
+
+  it("should drop samples older than the longest window", () => {
+    // Arrange & Act
+    for (let t = 0; t <= 1000; t += 10) {
+      tracker.observe(t * 1000, { tokens: t });
+    }
+
+    // Assert - one sample at or before the window start is kept
+    expect(tracker.samples[0].timestamp).toBe(700000);
+    expect(tracker.rate("tokens", 300)).toBe(1);
+  });
+});
+
+describe("computeLlamaRates", () => {
+  it("should derive tokens/s, requests/s and busy-slot ratio per window", () => {
+    // Arrange
+    const tracker = new CounterRateTracker({ counters: LLAMA_COUNTERS });
+    tracker.observe(0, {
+      promptTokensTotal: 0,
+      predictedTokensTotal: 0,
+      nDecodeTotal: 0,
+      promptSecondsTotal: 0,
+      predictedSecondsTotal: 0,
+    });
+    tracker.observe(10000, {
+      promptTokensTotal: 2000,
+      predictedTokensTotal: 500,
+      nDecodeTotal: 30,
+      promptSecondsTotal: 4,
+      predictedSecondsTotal: 12,
+    });
+
+    // Act
+    const rates = computeLlamaRates(tracker, 4);
+
+    // Assert
+    expect(Object.keys(rates)).toEqual(["10s", "1m", "5m"]);
+    expect(rates["10s"]).toMatchObject({
+      promptTokensPerSecond: 200,
+      predictedTokensPerSecond: 50,
+      requestsPerSecond: 3,
+      busySlotRatio: 0.4,
+    });
+    // 500 tokens over 12 seconds of generation
+    expect(rates["10s"].generationTokensPerSecond).toBeCloseTo(500 / 12);
+  });
+
+  it("should report no generation speed for a window without generation", () => {
+    // Arrange
+    const tracker = new CounterRateTracker({ counters: LLAMA_COUNTERS });
+    tracker.observe(0, { predictedTokensTotal: 100, predictedSecondsTotal: 2 });
+    tracker.observe(10000, { predictedTokensTotal: 100, predictedSecondsTotal: 2 });
+
+    // Act & Assert
+    expect(computeLlamaRates(tracker, 1)["10s"].generationTokensPerSecond).toBeNull();
+  });
+
+  it("should return null without history", () => {
+    // Arrange
+    const tracker = new CounterRateTracker({ counters: LLAMA_COUNTERS });
+
+    // Act & Assert
+    expect(computeLlamaRates(tracker, 1)).toBeNull();
+  });
+});
+
+describe("updateLlamaRates", () => {
+  let server;
+  let scrapes;
+  let now;
+
+  beforeEach(async () => {
+    scrapes = 0;
+    now = 1800000000000;
+    llamaCounterRates.reset();
+    // Each scrape reports 10s more work: 1000 prompt and 250 predicted tokens, 20 decodes
+    server = http.createServer((req, res) => {
+      if (req.url === "/health") {
+        res.writeHead(200, { "Content-Type": "application/json" });
+        res.end(JSON.stringify({ status: "ok" }));
+        return;
+      }
+      scrapes++;
+      res.writeHead(200, { "Content-Type": "text/plain" });
+      res.end(
+        [
+          `llamacpp:prompt_tokens_total ${scrapes * 1000}`,
+          `llamacpp:tokens_predicted_total ${scrapes * 250}`,
+          `llamacpp:n_decode_total ${scrapes * 20}`,
+          `llamacpp:prompt_seconds_total ${scrapes * 2}`,
+          `llamacpp:tokens_predicted_seconds_total ${scrapes * 5}`,
+          "llamacpp:llm_server_n_parallel 2",
+          "",
+        ].join("\n")
+      );
+    });
+    await new Promise((resolve) => server.listen(0, "127.0.0.1", resolve));
+    jest.spyOn(Date, "now").mockImplementation(() => now);
+    jest.spyOn(console, "debug").mockImplementation(() => {});
+  });
+
+  afterEach(async () => {
+    jest.restoreAllMocks();
+    llamaCounterRates.reset();
+    await new Promise((resolve) => server.close(resolve));
+  });
+
+  /**
+   * Scrape like collectLlamaStatus() and feed the result to the rate tracker.
+   */
+  async function sample(scraper) {
+    const metrics = await scraper.getMetrics();
+    return updateLlamaRates({
+      status: "running",
+      sampledAt: scraper.getMetricsTimestamp(),
+      metrics: { nParallel: metrics.nParallel },
+      rawMetrics: metrics,
+    });
+  }
+
+  it("should turn scraped counters into rates at the sampler's llama interval", async () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port: server.address().port });
+    await sample(scraper);
+
+    // Act - the next scheduled tick must not be served from the scrape cache
+    now += FAMILY_INTERVALS.llama;
+    const rates = await sample(scraper);
+
+    // Assert
+    const seconds = FAMILY_INTERVALS.llama / 1000;
+    expect(scraper.cacheTTL).toBeLessThan(FAMILY_INTERVALS.llama);
+    expect(scrapes).toBe(2);
+    expect(rates["10s"].promptTokensPerSecond).toBeCloseTo(1000 / seconds);
+    expect(rates["10s"].predictedTokensPerSecond).toBeCloseTo(250 / seconds);
+    expect(rates["10s"].requestsPerSecond).toBeCloseTo(20 / seconds);
+    expect(rates["10s"].busySlotRatio).toBeCloseTo(7 / seconds / 2);
+  });
+
+  it("should not record /health fallbacks as counter readings", () => {
+    // Arrange
+    const status = {
+      status: "running",
+      sampledAt: now,
+      rawMetrics: { promptTokensTotal: 0, hasData: true, source: "health" },
+    };
+
+    // Act
+    const rates = updateLlamaRates(status);
+
+    // Assert
+    expect(rates).toBeNull();
+    expect(llamaCounterRates.samples).toHaveLength(0);
+  });
+});
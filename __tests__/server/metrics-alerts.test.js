@@ -0,0 +1,256 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Alerts Tests
+ * Streaming rule evaluation: thresholds with hysteresis, rising windows,
+ * EWMA baseline drops, anomalies and rule reloads
+ */
+
+import {
+  AlertEngine,
+  normalizeAlertRule,
+  getAlertValues,
+} from "../../server/metrics-alerts.js";
+
+describe("normalizeAlertRule", () => {
+  it("should fill in defaults", () => {
+    // Act
+    const rule = normalizeAlertRule({ id: "cpu", metric: "cpu_usage", type: "threshold", above: 90 });
+
+    // Assert
+    expect(rule.name).toBe("cpu");
+    expect(rule.severity).toBe("warning");
+    expect(rule.enabled).toBe(true);
+    expect(rule.for).toBe(1);
+    expect(rule.clearAfter).toBe(1);
+  });
+
+  it("should reject rules that cannot be evaluated", () => {
+    // Act & Assert
+    expect(() => normalizeAlertRule({ metric: "cpu_usage", type: "threshold", above: 1 })).toThrow();
+    expect(() => normalizeAlertRule({ id: "a", metric: "cpu_usage", type: "median" })).toThrow();
+    expect(() => normalizeAlertRule({ id: "a", metric: "cpu_usage", type: "threshold" })).toThrow();
+    expect(() => normalizeAlertRule({ id: "a", metric: "x", type: "drop", ratio: 2 })).toThrow();
+  });
+});
+
+describe("AlertEngine", () => {
+  let engine;
+  let now;
+
+  /**
+   * Feed values for one metric, one sample per second.
+   * @returns {Array<Object>} All events emitted
+   */
+  function feed(metric, values, extra = {}) {
+    const events = [];
+    for (const value of values) {
+      now += 1000;
+      events.push(...engine.evaluate(now, { [metric]: value, ...extra }));
+    }
+    return events;
+  }
+
+  beforeEach(() => {
+    engine = new AlertEngine();
+    now = 0;
+  });
+
+  describe("threshold rules", () => {
+    beforeEach(() => {
+      engine.setRules([
+        { id: "vram", metric: "gpu_memory_percent", type: "threshold", above: 95, clear: 90, for: 2 },
+      ]);
+    });
+
+    it("should raise after consecutive breaches only", () => {
+      // Act
+      const single = feed("gpu_memory_percent", [96, 80]);
+      const sustained = feed("gpu_memory_percent", [96, 97]);
+
+      // Assert
+      expect(single).toEqual([]);
+      expect(sustained).toHaveLength(1);
+      expect(sustained[0]).toMatchObject({ state: "raised", ruleId: "vram", value: 97, reference: 95 });
+      expect(engine.getActive()).toHaveLength(1);
+    });
+
+    it("should hold the alert until the value is back below the clear level", () => {
+      // Arrange
+      feed("gpu_memory_percent", [96, 96]);
+
+      // Act
+      const hysteresis = feed("gpu_memory_percent", [93, 93]);
+      const cleared = feed("gpu_memory_percent", [85, 85]);
+
+      // Assert
+      expect(hysteresis).toEqual([]);
+      expect(cleared).toHaveLength(1);
+      expect(cleared[0]).toMatchObject({ state: "cleared", ruleId: "vram", value: 85 });
+      expect(engine.getActive()).toEqual([]);
+    });
+
+    it("should ignore samples without the metric", () => {
+      // Act
+      const events = feed("cpu_usage", [100, 100, 100]);
+
+      // Assert
+      expect(events).toEqual([]);
+    });
+  });
+
+  describe("rising rules", () => {
+    it("should compare against the value a window ago", () => {
+      // Arrange
+      engine.setRules([{ id: "swap", metric: "swap_usage", type: "rising", window: 5, minDelta: 5 }]);
+
+      // Act - flat while the window fills, then +1 per sample
+      const flat = feed("swap_usage", [10, 10, 10, 10, 10, 10]);
+      const growing = feed("swap_usage", [11, 12, 13, 14, 15]);
+      const settled = feed("swap_usage", [15, 15, 15, 15, 15]);
+
+      // Assert
+      expect(flat).toEqual([]);
+      expect(growing).toHaveLength(1);
+      expect(growing[0]).toMatchObject({ state: "raised", value: 15, reference: 10 });
+      expect(settled.map((e) => e.state)).toEqual(["cleared"]);
+    });
+  });
+
+  describe("drop rules", () => {
+    beforeEach(() => {
+      engine.setRules([
+        {
+          id: "tps",
+          metric: "llama_predicted_tps",
+          type: "drop",
+          ratio: 0.5,
+          warmup: 5,
+          for: 2,
+          activeWhen: { metric: "llama_busy_ratio", above: 0 },
+        },
+      ]);
+    });
+
+    it("should raise when the value halves against its baseline", () => {
+      // Act
+      const steady = feed("llama_predicted_tps", [50, 50, 50, 50, 50, 50], { llama_busy_ratio: 1 });
+      const dropped = feed("llama_predicted_tps", [20, 20, 20], { llama_busy_ratio: 1 });
+
+      // Assert
+      expect(steady).toEqual([]);
+      expect(dropped).toHaveLength(1);
+      expect(dropped[0]).toMatchObject({ state: "raised", value: 20, reference: 50 });
+    });
+
+    it("should not learn the dropped rate as the new baseline", () => {
+      // Arrange
+      feed("llama_predicted_tps", [50, 50, 50, 50, 50, 50], { llama_busy_ratio: 1 });
+
+      // Act
+      const events = feed("llama_predicted_tps", new Array(100).fill(20), { llama_busy_ratio: 1 });
+
+      // Assert
+      expect(events.map((e) => e.state)).toEqual(["raised"]);
+      expect(engine.getActive()[0].reference).toBe(50);
+    });
+
+    it("should not evaluate while the guard metric is idle", () => {
+      // Arrange
+      feed("llama_predicted_tps", [50, 50, 50, 50, 50, 50], { llama_busy_ratio: 1 });
+
+      // Act - no traffic: tokens/sec falls to 0 but the server is idle
+      const events = feed("llama_predicted_tps", [0, 0, 0, 0], { llama_busy_ratio: 0 });
+
+      // Assert
+      expect(events).toEqual([]);
+    });
+  });
+
+  describe("anomaly rules", () => {
+    it("should raise on values far outside the EWMA spread", () => {
+      // Arrange
+      engine.setRules([{ id: "loop", metric: "cpu_usage", type: "anomaly", zScore: 4, warmup: 10, alpha: 0.2 }]);
+      const noisy = Array.from({ length: 50 }, (_, i) => 40 + (i % 2 ? 2 : -2));
+
+      // Act
+      const normal = feed("cpu_usage", noisy);
+      const spike = feed("cpu_usage", [95]);
+
+      // Assert
+      expect(normal).toEqual([]);
+      expect(spike).toHaveLength(1);
+      expect(spike[0].state).toBe("raised");
+      expect(spike[0].reference).toBeCloseTo(40, 0);
+    });
+  });
+
+  describe("setRules", () => {
+    const rule = { id: "cpu", metric: "cpu_usage", type: "threshold", above: 90 };
+
+    it("should keep the state of unchanged rules", () => {
+      // Arrange
+      engine.setRules([rule]);
+      feed("cpu_usage", [95]);
+
+      // Act
+      engine.setRules([{ ...rule }]);
+
+      // Assert
+      expect(engine.getActive()).toHaveLength(1);
+    });
+
+    it("should reset edited rules and skip disabled or invalid ones", () => {
+      // Arrange
+      engine.setRules([rule]);
+      feed("cpu_usage", [95]);
+
+      // Act
+      const count = engine.setRules([
+        { ...rule, above: 99 },
+        { id: "off", metric: "cpu_usage", type: "threshold", above: 1, enabled: false },
+        { id: "bad", type: "threshold" },
+      ]);
+
+      // Assert
+      expect(count).toBe(1);
+      expect(engine.getActive()).toEqual([]);
+    });
+  });
+});
+
+describe("getAlertValues", () => {
+  it("should report the VRAM use of the fullest GPU", () => {
+    // Arrange
+    const row = { gpu_memory_used: 24, gpu_memory_total: 48 };
+    const gpus = [
+      { memoryUsed: 23, memoryTotal: 24 },
+      { memoryUsed: 1, memoryTotal: 24 },
+    ];
+
+    // Act
+    const values = getAlertValues(row, gpus);
+
+    // Assert
+    expect(values.gpu_memory_percent).toBeCloseTo((23 / 24) * 100);
+    expect(values.gpu_memory_used).toBe(24);
+  });
+
+  it("should leave gpu_memory_percent null without GPUs", () => {
+    // Act & Assert
+    expect(getAlertValues({ gpu_memory_total: 0 }).gpu_memory_percent).toBeNull();
+  });
+
+  it("should add llama-server's generation speed from the given rates", () => {
+    // Act
+    const generating = getAlertValues({}, [], { generationTokensPerSecond: 42 });
+    const idle = getAlertValues({}, [], { generationTokensPerSecond: null });
+
+    // Assert
+    expect(generating.llama_generation_tps).toBe(42);
+    expect(idle.llama_generation_tps).toBeNull();
+    expect(getAlertValues({}).llama_generation_tps).toBeNull();
+  });
+});
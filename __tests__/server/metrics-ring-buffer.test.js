@@ -0,0 +1,85 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Ring Buffer Tests
+ * Fixed-size in-memory history backed by parallel Float64Arrays
+ */
+
+import { MetricsRingBuffer } from "../../server/metrics-ring-buffer.js";
+
+describe("MetricsRingBuffer", () => {
+  /**
+   * Push `count` samples one second apart starting at `start`.
+   */
+  function fill(buffer, start, count) {
+    for (let i = 0; i < count; i++) {
+      buffer.push(start + i, { cpu_usage: i, memory_usage: 50 });
+    }
+  }
+
+  it("should return the newest samples first in metrics table shape", () => {
+    // Arrange
+    const buffer = new MetricsRingBuffer({ capacity: 10 });
+    fill(buffer, 1000, 3);
+
+    // Act
+    const rows = buffer.latest(2);
+
+    // Assert
+    expect(rows).toHaveLength(2);
+    expect(rows[0]).toMatchObject({ timestamp: 1002, cpu_usage: 2, memory_usage: 50, gpu_usage: 0 });
+    expect(rows[1].timestamp).toBe(1001);
+  });
+
+  it("should overwrite the oldest samples once full", () => {
+    // Arrange
+    const buffer = new MetricsRingBuffer({ capacity: 5 });
+
+    // Act
+    fill(buffer, 1000, 8);
+
+    // Assert
+    expect(buffer.size).toBe(5);
+    expect(buffer.oldestTimestamp()).toBe(1003);
+    expect(buffer.latest(10).map((r) => r.timestamp)).toEqual([1007, 1006, 1005, 1004, 1003]);
+  });
+
+  it("should return only samples inside a time range", () => {
+    // Arrange
+    const buffer = new MetricsRingBuffer({ capacity: 100 });
+    fill(buffer, 1000, 20);
+
+    // Act
+    const rows = buffer.range(1005, 1008);
+
+    // Assert
+    expect(rows.map((r) => r.timestamp)).toEqual([1008, 1007, 1006, 1005]);
+  });
+
+  it("should only cover ranges starting at or after its oldest sample", () => {
+    // Arrange
+    const buffer = new MetricsRingBuffer({ capacity: 5 });
+
+    // Assert
+    expect(buffer.covers(0)).toBe(false);
+    fill(buffer, 1000, 8);
+    expect(buffer.covers(1003)).toBe(true);
+    expect(buffer.covers(1002)).toBe(false);
+  });
+
+  it("should be empty after clear", () => {
+    // Arrange
+    const buffer = new MetricsRingBuffer({ capacity: 5 });
+    fill(buffer, 1000, 3);
+
+    // Act
+    buffer.clear();
+
+    // Assert
+    expect(buffer.size).toBe(0);
+    expect(buffer.latest(5)).toEqual([]);
+    expect(buffer.oldestTimestamp()).toBeNull();
+  });
+});
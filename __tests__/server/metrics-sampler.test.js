@@ -0,0 +1,196 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Sampler Tests
+ * Verifies one collection per tick fanned out to subscribers at their own cadence
+ */
+
+import { jest } from "@jest/globals";
+import { MetricsSampler } from "../../server/metrics-sampler.js";
+
+describe("MetricsSampler", () => {
+  let collectCalls;
+  let sampler;
+
+  function createSampler(onSample = null) {
+    collectCalls = 0;
+    return new MetricsSampler({
+      collect: async () => ({ seq: ++collectCalls }),
+      onSample,
+    });
+  }
+
+  beforeEach(() => {
+    jest.useFakeTimers();
+    jest.spyOn(console, "error").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    sampler?.stop();
+    jest.useRealTimers();
+    jest.restoreAllMocks();
+  });
+
+  it("should run at the fastest subscriber interval", () => {
+    // Arrange
+    sampler = createSampler();
+
+    // Act
+    sampler.subscribe("a", 5000, () => {});
+    sampler.subscribe("b", 2000, () => {});
+
+    // Assert
+    expect(sampler.getInterval()).toBe(2000);
+  });
+
+  it("should collect and persist once per tick regardless of subscriber count", async () => {
+    // Arrange
+    const onSample = jest.fn();
+    sampler = createSampler(onSample);
+    for (let i = 0; i < 20; i++) {
+      sampler.subscribe(`s${i}`, 1000, () => {});
+    }
+
+    // Act
+    await jest.advanceTimersByTimeAsync(3000);
+
+    // Assert: initial tick + 3 interval ticks
+    expect(collectCalls).toBe(4);
+    expect(onSample).toHaveBeenCalledTimes(4);
+  });
+
+  it("should deliver to each subscriber at its own cadence", async () => {
+    // Arrange
+    const fast = jest.fn();
+    const slow = jest.fn();
+    sampler = createSampler();
+    sampler.subscribe("fast", 1000, fast);
+    sampler.subscribe("slow", 3000, slow);
+
+    // Act
+    await jest.advanceTimersByTimeAsync(6000);
+
+    // Assert
+    expect(fast).toHaveBeenCalledTimes(7);
+    expect(slow).toHaveBeenCalledTimes(3);
+  });
+
+  it("should slow down and stop as subscribers leave", () => {
+    // Arrange
+    sampler = createSampler();
+    sampler.subscribe("a", 1000, () => {});
+    sampler.subscribe("b", 4000, () => {});
+
+    // Act & Assert
+    expect(sampler.unsubscribe("a")).toBe(true);
+    expect(sampler.getInterval()).toBe(4000);
+    expect(sampler.unsubscribe("b")).toBe(true);
+    expect(sampler.getInterval()).toBeNull();
+    expect(sampler.unsubscribe("b")).toBe(false);
+  });
+
+  it("should hand the latest sample to a late subscriber immediately", async () => {
+    // Arrange
+    sampler = createSampler();
+    sampler.subscribe("a", 1000, () => {});
+    await jest.advanceTimersByTimeAsync(0);
+    const late = jest.fn();
+
+    // Act
+    sampler.subscribe("late", 1000, late);
+
+    // Assert
+    expect(late).toHaveBeenCalledWith({ seq: 1 });
+    expect(collectCalls).toBe(1);
+  });
+
+  it("should isolate a failing subscriber from the others", async () => {
+    // Arrange
+    const healthy = jest.fn();
+    sampler = createSampler();
+    sampler.subscribe("broken", 1000, () => {
+      throw new Error("socket closed");
+    });
+    sampler.subscribe("healthy", 1000, healthy);
+
+    // Act
+    await jest.advanceTimersByTimeAsync(0);
+
+    // Assert
+    expect(healthy).toHaveBeenCalledTimes(1);
+  });
+
+  it("should fall back to the idle interval when no subscriber is visible", () => {
+    // Arrange
+    const onRateChange = jest.fn();
+    sampler = new MetricsSampler({ collect: async () => ({}), onRateChange, idleInterval: 30000 });
+    sampler.subscribe("a", 2000, () => {});
+    sampler.subscribe("b", 5000, () => {});
+
+    // Act
+    sampler.setActive("a", false);
+    sampler.setActive("b", false);
+
+    // Assert
+    expect(sampler.getInterval()).toBe(30000);
+    expect(sampler.isIdle()).toBe(true);
+    expect(onRateChange).toHaveBeenLastCalledWith(30000, true);
+  });
+
+  it("should speed up again when a subscriber becomes visible", () => {
+    // Arrange
+    sampler = createSampler();
+    sampler.subscribe("a", 2000, () => {});
+    sampler.setActive("a", false);
+
+    // Act
+    sampler.setActive("a", true);
+
+    // Assert
+    expect(sampler.getInterval()).toBe(2000);
+    expect(sampler.isIdle()).toBe(false);
+  });
+
+  it("should keep visibility across an interval change", () => {
+    // Arrange
+    sampler = createSampler();
+    sampler.subscribe("a", 2000, () => {});
+    sampler.setActive("a", false);
+
+    // Act
+    sampler.subscribe("a", 1000, () => {});
+
+    // Assert
+    expect(sampler.isIdle()).toBe(true);
+    expect(sampler.setActive("missing", true)).toBe(false);
+  });
+
+  it("should report a stop when the last subscriber leaves", () => {
+    // Arrange
+    const onRateChange = jest.fn();
+    sampler = new MetricsSampler({ collect: async () => ({}), onRateChange });
+    sampler.subscribe("a", 2000, () => {});
+
+    // Act
+    sampler.unsubscribe("a");
+
+    // Assert
+    expect(onRateChange).toHaveBeenLastCalledWith(null, true);
+  });
+
+  it("should forget the latest sample when the last subscriber leaves", async () => {
+    // Arrange
+    sampler = createSampler();
+    sampler.subscribe("a", 1000, () => {});
+    await jest.advanceTimersByTimeAsync(0);
+    expect(sampler.getLatest()).toEqual({ seq: 1 });
+
+    // Act
+    sampler.unsubscribe("a");
+
+    // Assert
+    expect(sampler.getLatest()).toBeNull();
+  });
+});
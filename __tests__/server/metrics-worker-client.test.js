@@ -0,0 +1,244 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Metrics Worker Client Tests
+ * Sample codec round trips and request/reply handling against a stub worker
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { pathToFileURL } from "url";
+import { MetricsWorkerClient } from "../../server/metrics-worker-client.js";
+import { encodeSystemSample, decodeSystemSample } from "../../server/metrics-sample-codec.js";
+
+const SAMPLE = {
+  cpu: { usage: 12.5 },
+  memory: { used: 40.1 },
+  swap: { used: 0 },
+  disk: { used: 71.3 },
+  io: {
+    device: "nvme0n1",
+    readBytesPerSec: 1048576,
+    writeBytesPerSec: 0,
+    readIops: 12,
+    writeIops: 0,
+    utilization: 3.5,
+    devices: [
+      {
+        name: "nvme0n1",
+        readBytesPerSec: 1048576,
+        writeBytesPerSec: 0,
+        readIops: 12,
+        writeIops: 0,
+        utilization: 3.5,
+      },
+    ],
+  },
+  network: {
+    rxBytesPerSec: 2048,
+    txBytesPerSec: 512,
+    interfaces: [{ name: "eth0", rxBytesPerSec: 2048, txBytesPerSec: 512 }],
+  },
+  gpu: {
+    usage: 55,
+    memoryUsed: 4 * 1024 ** 3,
+    memoryTotal: 8 * 1024 ** 3,
+    list: [
+      {
+        index: 0,
+        name: "RTX 4090",
+        vendor: "NVIDIA",
+        usage: 55,
+        memoryUsed: 4 * 1024 ** 3,
+        memoryTotal: 8 * 1024 ** 3,
+        temperature: 61,
+        power: null,
+        hasUtilizationData: true,
+      },
+    ],
+  },
+};
+
+const CODEC_URL = new URL("../../server/metrics-sample-codec.js", import.meta.url).href;
+
+// Stub worker: answers "sample" after `delay` ms, crashes on "crash".
+// Like the real worker, meta goes out once and then only on needMeta.
+const STUB_WORKER = `
+import { workerData } from "worker_threads";
+import { encodeSystemSample } from "${CODEC_URL}";
+const { port } = workerData;
+let metaSent = false;
+port.on("message", (message) => {
+  if (message.type === "crash") throw new Error("boom");
+  if (message.type === "hang") return;
+  if (message.type === "sample") {
+    setTimeout(() => {
+      const { values, meta } = encodeSystemSample({
+        cpu: { usage: 1 },
+        memory: { used: 2 },
+        swap: { used: 3 },
+        disk: { used: 4 },
+        io: { device: message.ioPath },
+        gpu: { usage: 5, memoryUsed: 6, memoryTotal: 7, list: [{ index: 0, name: "RTX 4090", usage: 5 }] },
+      });
+      const reply = { id: message.id, values };
+      if (!metaSent || message.needMeta) reply.meta = meta;
+      metaSent = true;
+      port.postMessage(reply, [values.buffer]);
+    }, message.delay ?? workerData.delay);
+  }
+});
+`;
+
+describe("metrics sample codec", () => {
+  it("should round-trip a sample through one Float64Array", () => {
+    // Act
+    const { values, meta } = encodeSystemSample(SAMPLE);
+    const decoded = decodeSystemSample(values, meta);
+
+    // Assert
+    expect(values).toBeInstanceOf(Float64Array);
+    expect(meta).toEqual({
+      device: "nvme0n1",
+      gpus: [{ name: "RTX 4090", vendor: "NVIDIA" }],
+      devices: [{ name: "nvme0n1" }],
+      interfaces: [{ name: "eth0" }],
+    });
+    expect(decoded).toEqual(SAMPLE);
+  });
+
+  it("should decode numbers without meta", () => {
+    // Arrange
+    const { values } = encodeSystemSample(SAMPLE);
+
+    // Act
+    const decoded = decodeSystemSample(values);
+
+    // Assert
+    expect(decoded.gpu.list[0].usage).toBe(55);
+    expect(decoded.gpu.list[0].name).toBeUndefined();
+    expect(decoded.io.devices[0].readIops).toBe(12);
+    expect(decoded.io.device).toBeNull();
+  });
+
+  it("should decode missing scalars as null, not 0", () => {
+    // Arrange
+    const { values, meta } = encodeSystemSample({ ...SAMPLE, swap: { used: null }, disk: {} });
+
+    // Act
+    const decoded = decodeSystemSample(values, meta);
+
+    // Assert
+    expect(decoded.swap.used).toBeNull();
+    expect(decoded.disk.used).toBeNull();
+    expect(decoded.cpu.usage).toBe(12.5);
+  });
+});
+
+describe("MetricsWorkerClient", () => {
+  let dir;
+  let client;
+
+  beforeAll(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "metrics-worker-"));
+    fs.writeFileSync(path.join(dir, "stub-worker.mjs"), STUB_WORKER);
+  });
+
+  afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  beforeEach(() => {
+    jest.spyOn(console, "log").mockImplementation(() => {});
+    jest.spyOn(console, "error").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    client?.stop();
+    jest.restoreAllMocks();
+  });
+
+  /**
+   * Create a client backed by the stub worker.
+   * @param {Object} [options] - Client options.
+   */
+  function createClient(options = {}) {
+    const workerUrl = pathToFileURL(path.join(dir, "stub-worker.mjs"));
+    client = new MetricsWorkerClient({ enabled: true, workerUrl, ...options });
+    return client;
+  }
+
+  it("should decode the transferred sample", async () => {
+    // Arrange
+    createClient();
+
+    // Act
+    const sample = await client.collect({ ioPath: "/models" });
+
+    // Assert
+    expect(sample.cpu.usage).toBe(1);
+    expect(sample.disk.used).toBe(4);
+    expect(sample.gpu).toMatchObject({ usage: 5, memoryUsed: 6, memoryTotal: 7 });
+    expect(sample.gpu.list[0].name).toBe("RTX 4090");
+    expect(sample.io.device).toBe("/models");
+    expect(sample.network.interfaces).toEqual([]);
+  });
+
+  it("should ask for meta again after a sample reply was dropped", async () => {
+    // Arrange - the first reply (the only one carrying meta) arrives too late
+    createClient({ timeout: 100 });
+    await expect(client._request({ type: "sample", delay: 300 })).rejects.toThrow("did not answer");
+    await new Promise((resolve) => setTimeout(resolve, 300));
+
+    // Act
+    client.timeout = 5000;
+    const sample = await client.collect();
+
+    // Assert
+    expect(sample.gpu.list[0].name).toBe("RTX 4090");
+    expect(client.needMeta).toBe(false);
+  });
+
+  it("should keep the main event loop free while a collection is slow", async () => {
+    // Arrange
+    createClient();
+    await client.collect(); // worker started
+
+    // Act: count timer turns while the worker takes 300ms to answer
+    let turns = 0;
+    const timer = setInterval(() => turns++, 10);
+    await client._request({ type: "sample", delay: 300 });
+    clearInterval(timer);
+
+    // Assert
+    expect(turns).toBeGreaterThan(10);
+  });
+
+  it("should reject requests the worker never answers", async () => {
+    // Arrange
+    createClient({ timeout: 100 });
+
+    // Act & Assert
+    await expect(client._request({ type: "hang" })).rejects.toThrow("did not answer hang");
+    expect(client.pending.size).toBe(0);
+  });
+
+  it("should fail pending requests when the worker dies and restart on the next one", async () => {
+    // Arrange
+    createClient();
+    const pending = client._request({ type: "hang" });
+
+    // Act
+    client.port.postMessage({ type: "crash" });
+
+    // Assert
+    await expect(pending).rejects.toThrow();
+    expect(client.worker).toBeNull();
+    const sample = await client.collect();
+    expect(sample.cpu.usage).toBe(1);
+  });
+});
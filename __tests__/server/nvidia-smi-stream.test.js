@@ -0,0 +1,136 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * NVIDIA SMI Stream Tests
+ * Drives the collector with a fake nvidia-smi script that writes CSV on a timer
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { NvidiaSmiStream, parseNvidiaSmiLine } from "../../server/nvidia-smi-stream.js";
+
+describe("NvidiaSmiStream", () => {
+  let tmpDir;
+  let stream;
+
+  /**
+   * Write a fake nvidia-smi that prints two GPUs every 20ms,
+   * splitting lines across writes, and exits after `exitAfter` loops.
+   */
+  function writeFakeSmi(exitAfter = 0) {
+    const script = path.join(tmpDir, `fake-nvidia-smi-${exitAfter}.mjs`);
+    fs.writeFileSync(
+      script,
+      `let n = 0;
+setInterval(() => {
+  n++;
+  process.stdout.write("0, Fake GPU A, " + n + ", 1024, 8192, 45, [N/A]\\n1, Fake");
+  process.stdout.write(" GPU B, 7, 2048, 16384, 60, 150.5\\n");
+  if (${exitAfter} > 0 && n >= ${exitAfter}) process.exit(1);
+}, 20);
+`
+    );
+    return script;
+  }
+
+  beforeAll(() => {
+    tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), "nvidia-smi-stream-"));
+  });
+
+  afterAll(() => {
+    fs.rmSync(tmpDir, { recursive: true, force: true });
+  });
+
+  beforeEach(() => {
+    jest.spyOn(console, "debug").mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    stream?.stop();
+    stream = null;
+    jest.restoreAllMocks();
+  });
+
+  describe("parseNvidiaSmiLine", () => {
+    it("should parse a full CSV line and convert MB to bytes", () => {
+      const gpu = parseNvidiaSmiLine("0, RTX 4090, 87, 1024, 24564, 71, 320.45");
+
+      expect(gpu).toMatchObject({
+        index: 0,
+        name: "RTX 4090",
+        vendor: "NVIDIA",
+        usage: 87,
+        memoryUsed: 1024 * 1024 * 1024,
+        memoryTotal: 24564 * 1024 * 1024,
+        temperature: 71,
+        power: 320.45,
+      });
+    });
+
+    it("should map unsupported fields to null", () => {
+      const gpu = parseNvidiaSmiLine("1, Tesla T4, 0, 0, 15360, [N/A], [Not Supported]");
+
+      expect(gpu.temperature).toBeNull();
+      expect(gpu.power).toBeNull();
+    });
+
+    it("should reject malformed lines", () => {
+      expect(parseNvidiaSmiLine("")).toBeNull();
+      expect(parseNvidiaSmiLine("garbage")).toBeNull();
+      expect(parseNvidiaSmiLine("x, name, 1, 2, 3")).toBeNull();
+    });
+  });
+
+  it("should serve the latest per-GPU sample from memory", async () => {
+    // Arrange
+    stream = new NvidiaSmiStream({ command: process.execPath, args: [writeFakeSmi()] });
+
+    // Act
+    stream.start();
+    await stream.waitForData(5000);
+    await new Promise((r) => setTimeout(r, 100));
+    const gpus = stream.getGpus();
+
+    // Assert
+    expect(gpus).toHaveLength(2);
+    expect(gpus[0].name).toBe("Fake GPU A");
+    expect(gpus[0].usage).toBeGreaterThan(1);
+    expect(gpus[1].power).toBe(150.5);
+  });
+
+  it("should restart the child when it dies", async () => {
+    // Arrange
+    stream = new NvidiaSmiStream({
+      command: process.execPath,
+      args: [writeFakeSmi(2)],
+      restartDelay: 20,
+    });
+
+    // Act
+    stream.start();
+    await new Promise((r) => setTimeout(r, 1500));
+
+    // Assert
+    expect(stream.restarts).toBeGreaterThan(0);
+    expect(stream.isAvailable()).toBe(true);
+    expect(stream.hasData()).toBe(true);
+  });
+
+  it("should mark itself unavailable when nvidia-smi is missing", async () => {
+    // Arrange
+    stream = new NvidiaSmiStream({ command: path.join(tmpDir, "does-not-exist") });
+
+    // Act
+    stream.start();
+    const hasData = await stream.waitForData(2000);
+
+    // Assert
+    expect(hasData).toBe(false);
+    expect(stream.isAvailable()).toBe(false);
+    expect(stream.start()).toBe(false);
+  });
+});
@@ -0,0 +1,161 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Proc Collector Tests
+ * Parsers for /proc/meminfo, /proc/stat, /proc/diskstats and /proc/net/dev,
+ * statfs disk usage and the reusable file reader
+ */
+
+import { jest } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import {
+  ProcFileReader,
+  parseMeminfo,
+  parseProcStat,
+  parseDiskstats,
+  parseNetDev,
+  readDiskUsage,
+} from "../../server/proc-collector.js";
+
+describe("proc-collector", () => {
+  describe("parseMeminfo", () => {
+    it("should convert kB values to bytes and derive swap used", () => {
+      const text = [
+        "MemTotal:       16000000 kB",
+        "MemFree:         2000000 kB",
+        "MemAvailable:    8000000 kB",
+        "SwapTotal:       4000000 kB",
+        "SwapFree:        3000000 kB",
+      ].join("\n");
+
+      expect(parseMeminfo(text)).toEqual({
+        total: 16000000 * 1024,
+        available: 8000000 * 1024,
+        swapTotal: 4000000 * 1024,
+        swapUsed: 1000000 * 1024,
+      });
+    });
+
+    it("should approximate MemAvailable on old kernels", () => {
+      const text = "MemTotal: 1000 kB\nMemFree: 100 kB\nBuffers: 50 kB\nCached: 250 kB\n";
+
+      expect(parseMeminfo(text).available).toBe(400 * 1024);
+    });
+  });
+
+  describe("parseProcStat", () => {
+    it("should sum busy and idle ticks from the aggregate cpu line", () => {
+      const text = "cpu  100 10 50 800 40 5 5 0 20 0\ncpu0 50 5 25 400 20 2 3 0 10 0\n";
+
+      // idle = idle + iowait; total excludes guest fields
+      expect(parseProcStat(text)).toEqual({ idle: 840, total: 1010 });
+    });
+
+    it("should return null when the cpu line is missing", () => {
+      expect(parseProcStat("intr 12345\n")).toBeNull();
+    });
+  });
+
+  describe("parseDiskstats", () => {
+    it("should convert sectors to bytes and keep device numbers", () => {
+      const text = [
+        " 259       0 nvme0n1 1000 20 80000 500 2000 30 160000 900 0 1200 1400 0 0 0 0",
+        " 259       1 nvme0n1p1 10 0 800 5 0 0 0 0 0 4 5",
+        "   7       0 loop0 0 0 0 0 0 0 0 0 0 0 0",
+        "",
+      ].join("\n");
+
+      const devices = parseDiskstats(text);
+
+      expect(devices.nvme0n1).toEqual({
+        major: 259,
+        minor: 0,
+        reads: 1000,
+        readBytes: 80000 * 512,
+        writes: 2000,
+        writeBytes: 160000 * 512,
+        ioMs: 1200,
+      });
+      expect(Object.keys(devices)).toEqual(["nvme0n1", "nvme0n1p1", "loop0"]);
+    });
+  });
+
+  describe("parseNetDev", () => {
+    it("should read rx and tx bytes and skip the header lines", () => {
+      const text = [
+        "Inter-|   Receive                                                |  Transmit",
+        " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed",
+        "    lo:    5000      50    0    0    0     0          0         0     5000      50    0    0    0     0       0          0",
+        "  eth0:12345678   9000    0    0    0     0          0         0  7654321    8000    0    0    0     0       0          0",
+      ].join("\n");
+
+      expect(parseNetDev(text)).toEqual({
+        lo: { rxBytes: 5000, txBytes: 5000 },
+        eth0: { rxBytes: 12345678, txBytes: 7654321 },
+      });
+    });
+  });
+
+  describe("readDiskUsage", () => {
+    afterEach(() => {
+      jest.restoreAllMocks();
+    });
+
+    it("should report available space without the blocks reserved for root", async () => {
+      // 1000 blocks, 400 free of which 350 are available to unprivileged users
+      jest.spyOn(fs.promises, "statfs").mockResolvedValue({ bsize: 4096, blocks: 1000, bfree: 400, bavail: 350 });
+
+      const usage = await readDiskUsage("/");
+
+      expect(usage).toEqual({ size: 1000 * 4096, used: 600 * 4096, available: 350 * 4096 });
+    });
+  });
+
+  describe("ProcFileReader", () => {
+    let tmpDir;
+
+    beforeEach(() => {
+      tmpDir = fs.mkdtempSync(path.join(os.tmpdir(), "proc-reader-"));
+    });
+
+    afterEach(() => {
+      fs.rmSync(tmpDir, { recursive: true, force: true });
+    });
+
+    it("should re-read updated content through the same descriptor", () => {
+      const file = path.join(tmpDir, "meminfo");
+      fs.writeFileSync(file, "first");
+      const reader = new ProcFileReader(file);
+
+      expect(reader.read()).toBe("first");
+      const fd = reader.fd;
+      fs.writeFileSync(file, "second");
+      expect(reader.read()).toBe("second");
+      expect(reader.fd).toBe(fd);
+
+      reader.close();
+      expect(reader.fd).toBeNull();
+    });
+
+    it("should grow its buffer for large files", () => {
+      const file = path.join(tmpDir, "stat");
+      const content = "x".repeat(50000);
+      fs.writeFileSync(file, content);
+      const reader = new ProcFileReader(file);
+
+      expect(reader.read()).toBe(content);
+      reader.close();
+    });
+
+    it("should throw and reset when the file is missing", () => {
+      const reader = new ProcFileReader(path.join(tmpDir, "missing"));
+
+      expect(() => reader.read()).toThrow();
+      expect(reader.fd).toBeNull();
+    });
+  });
+});
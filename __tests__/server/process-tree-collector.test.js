@@ -0,0 +1,154 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Process Tree Collector Tests
+ * Walks a fake /proc tree in a temp directory
+ */
+
+import fs from "fs";
+import os from "os";
+import path from "path";
+import {
+  ProcessTreeCollector,
+  parsePidStat,
+  modelFromArgs,
+} from "../../server/process-tree-collector.js";
+
+describe("process-tree-collector", () => {
+  describe("parsePidStat", () => {
+    it("should parse fields after a command name containing spaces and parens", () => {
+      const text = "4242 (llama (server)) S 1 4242 4242 0 -1 4194560 100 0 0 0 250 50 0 0 20 0 12 0 9000 0 0\n";
+
+      expect(parsePidStat(text)).toMatchObject({
+        pid: 4242,
+        name: "llama (server)",
+        state: "S",
+        ppid: 1,
+        utime: 250,
+        stime: 50,
+        threads: 12,
+        startTime: 9000,
+      });
+    });
+  });
+
+  describe("modelFromArgs", () => {
+    it("should prefer the alias over the model path", () => {
+      expect(modelFromArgs(["--model", "/m/qwen.gguf", "--alias", "qwen-chat"])).toBe("qwen-chat");
+    });
+
+    it("should fall back to the GGUF file name", () => {
+      expect(modelFromArgs(["-m", "/models/llama-7b-q4_0.gguf", "--port", "5001"])).toBe("llama-7b-q4_0");
+    });
+
+    it("should return null for a router process", () => {
+      expect(modelFromArgs(["--models-dir", "/models", "--port", "8080"])).toBeNull();
+    });
+  });
+
+  describe("ProcessTreeCollector", () => {
+    let procPath;
+
+    /**
+     * Create a fake /proc/<pid> entry.
+     */
+    function writeProcess(pid, { ppid, name, ticks, rssKb, threads, args, children = [], io = true }) {
+      const dir = path.join(procPath, String(pid));
+      fs.mkdirSync(path.join(dir, "task", String(pid)), { recursive: true });
+      fs.writeFileSync(
+        path.join(dir, "stat"),
+        `${pid} (${name}) S ${ppid} ${pid} ${pid} 0 -1 0 0 0 0 0 ${ticks} 0 0 0 20 0 ${threads} 0 100 0 0\n`
+      );
+      fs.writeFileSync(path.join(dir, "status"), `Name:\t${name}\nVmRSS:\t${rssKb} kB\nThreads:\t${threads}\n`);
+      if (io) {
+        fs.writeFileSync(path.join(dir, "io"), "rchar: 10\nwchar: 10\nread_bytes: 4096\nwrite_bytes: 512\n");
+      }
+      fs.writeFileSync(path.join(dir, "cmdline"), [name, ...args].join("\0") + "\0");
+      fs.writeFileSync(path.join(dir, "task", String(pid), "children"), children.join(" "));
+    }
+
+    beforeEach(() => {
+      procPath = fs.mkdtempSync(path.join(os.tmpdir(), "fake-proc-"));
+      writeProcess(100, {
+        ppid: 1, name: "llama-server", ticks: 100, rssKb: 1000, threads: 4,
+        args: ["--models-dir", "/models"], children: [200, 300],
+      });
+      writeProcess(200, {
+        ppid: 100, name: "llama-server", ticks: 500, rssKb: 4000000, threads: 16,
+        args: ["-m", "/models/qwen.gguf", "--alias", "qwen"], children: [201],
+      });
+      writeProcess(201, { ppid: 200, name: "helper", ticks: 10, rssKb: 100, threads: 1, args: [], io: false });
+      writeProcess(300, {
+        ppid: 100, name: "llama-server", ticks: 50, rssKb: 2000000, threads: 8,
+        args: ["-m", "/models/phi-3.gguf"],
+      });
+    });
+
+    afterEach(() => {
+      fs.rmSync(procPath, { recursive: true, force: true });
+    });
+
+    it("should walk every descendant of the root", async () => {
+      // Arrange
+      const collector = new ProcessTreeCollector({ procPath });
+
+      // Act
+      const result = await collector.collect(100);
+
+      // Assert
+      expect(result.processes.map((p) => p.pid)).toEqual([100, 200, 300, 201]);
+      expect(result.totals).toMatchObject({ processes: 4, threads: 29, rss: 6001100 * 1024 });
+    });
+
+    it("should attribute router children and their helpers to models", async () => {
+      // Arrange
+      const collector = new ProcessTreeCollector({ procPath });
+
+      // Act
+      const { models } = await collector.collect(100);
+
+      // Assert
+      expect(Object.keys(models).sort()).toEqual(["phi-3", "qwen"]);
+      expect(models.qwen).toMatchObject({ processes: 2, rss: 4000100 * 1024, cpuSeconds: 5.1 });
+      expect(models["phi-3"]).toMatchObject({ processes: 1, readBytes: 4096, writeBytes: 512 });
+    });
+
+    it("should report null I/O when /proc/<pid>/io is unreadable", async () => {
+      // Arrange
+      const collector = new ProcessTreeCollector({ procPath });
+
+      // Act
+      const result = await collector.collect(100);
+      const helper = result.processes.find((p) => p.pid === 201);
+
+      // Assert
+      expect(helper.readBytes).toBeNull();
+    });
+
+    it("should derive CPU percent from tick deltas between calls", async () => {
+      // Arrange
+      const collector = new ProcessTreeCollector({ procPath });
+      await collector.collect(100);
+      collector.lastTicks.set(200, { ticks: 400, at: Date.now() - 2000 });
+
+      // Act
+      const result = await collector.collect(100);
+      const child = result.processes.find((p) => p.pid === 200);
+
+      // Assert: 100 ticks = 1s of CPU over ~2s
+      expect(child.cpuPercent).toBeGreaterThan(45);
+      expect(child.cpuPercent).toBeLessThan(55);
+    });
+
+    it("should return null when the root process is gone", async () => {
+      // Arrange
+      const collector = new ProcessTreeCollector({ procPath });
+
+      // Act & Assert
+      expect(await collector.collect(999)).toBeNull();
+      expect(await collector.collect(null)).toBeNull();
+    });
+  });
+});
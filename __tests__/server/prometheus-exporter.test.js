@@ -0,0 +1,165 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Prometheus Exporter Tests
+ * Text exposition rendering from the cached metrics snapshot
+ */
+
+import { jest } from "@jest/globals";
+import {
+  renderPrometheusMetrics,
+  createPrometheusHandler,
+} from "../../server/prometheus-exporter.js";
+
+describe("prometheus-exporter", () => {
+  const processStats = { cpuSeconds: 1.5, rss: 1000, heapUsed: 200, heapTotal: 400, uptime: 60 };
+
+  const sample = {
+    timestamp: 1700000000000,
+    metrics: {
+      cpu: { usage: 12.5 },
+      memory: { used: 40 },
+      swap: { used: 0 },
+      disk: { used: 55 },
+      gpu: {
+        list: [
+          { index: 0, name: "RTX 4090", vendor: "NVIDIA", usage: 30, memoryUsed: 1024, memoryTotal: 4096, temperature: 55, power: 200 },
+          { index: 1, name: 'Radeon "XT"', vendor: "AMD", usage: 5, memoryUsed: 0, memoryTotal: 2048, temperature: null, power: null },
+        ],
+      },
+    },
+  };
+
+  it("should render system gauges and the sample timestamp", () => {
+    // Act
+    const text = renderPrometheusMetrics({ sample, llama: null, process: processStats });
+
+    // Assert
+    expect(text).toContain("# TYPE llama_proxy_cpu_usage_percent gauge\nllama_proxy_cpu_usage_percent 12.5");
+    expect(text).toContain("llama_proxy_disk_usage_percent 55");
+    expect(text).toContain("llama_proxy_sample_timestamp_seconds 1700000000");
+  });
+
+  it("should label GPU gauges per device and skip missing values", () => {
+    // Act
+    const text = renderPrometheusMetrics({ sample, llama: null, process: processStats });
+
+    // Assert
+    expect(text).toContain('llama_proxy_gpu_utilization_percent{gpu="0",name="RTX 4090",vendor="NVIDIA"} 30');
+    expect(text).toContain('llama_proxy_gpu_memory_total_bytes{gpu="1",name="Radeon \\"XT\\"",vendor="AMD"} 2048');
+    expect(text).toContain('llama_proxy_gpu_power_watts{gpu="0",name="RTX 4090",vendor="NVIDIA"} 200');
+    expect(text).not.toContain('llama_proxy_gpu_power_watts{gpu="1"');
+  });
+
+  it("should give every GPU of a mixed-vendor host its own series", () => {
+    // Arrange - nvidia-smi and the AMD sysfs reader both start at index 0
+    const mixed = {
+      ...sample,
+      metrics: {
+        ...sample.metrics,
+        gpu: {
+          list: [
+            { index: 0, name: "RTX 4090", vendor: "NVIDIA", usage: 30 },
+            { index: 0, name: "RX 7900", vendor: "AMD", usage: 5 },
+          ],
+        },
+      },
+    };
+
+    // Act
+    const text = renderPrometheusMetrics({ sample: mixed, llama: null, process: processStats });
+
+    // Assert
+    expect(text).toContain('llama_proxy_gpu_utilization_percent{gpu="0",name="RTX 4090",vendor="NVIDIA"} 30');
+    expect(text).toContain('llama_proxy_gpu_utilization_percent{gpu="1",name="RX 7900",vendor="AMD"} 5');
+  });
+
+  it("should render event loop, GC and heap metrics from the sample", () => {
+    // Arrange
+    const withHealth = {
+      ...sample,
+      metrics: {
+        ...sample.metrics,
+        process: {
+          loop: { p50: 1.5, p99: 40, max: 120, mean: 2, utilization: 0.25 },
+          gc: { count: 3, pauseMs: 12, maxPauseMs: 8, byKind: { minor: { count: 2, pauseMs: 4 }, major: { count: 1, pauseMs: 8 } } },
+          heap: { used: 100, total: 200, limit: 4096, external: 0, rss: 1000 },
+        },
+      },
+    };
+
+    // Act
+    const text = renderPrometheusMetrics({ sample: withHealth, llama: null, process: processStats });
+
+    // Assert
+    expect(text).toContain("llama_proxy_event_loop_delay_p99_seconds 0.04");
+    expect(text).toContain("llama_proxy_event_loop_delay_max_seconds 0.12");
+    expect(text).toContain("llama_proxy_event_loop_utilization_ratio 0.25");
+    expect(text).toContain('llama_proxy_gc_pause_seconds_total{kind="major"} 0.008');
+    expect(text).toContain('llama_proxy_gc_collections_total{kind="minor"} 2');
+    expect(text).toContain("llama_proxy_process_heap_limit_bytes 4096");
+  });
+
+  it("should render llama-server counters with the model label", () => {
+    // Arrange
+    const llama = {
+      status: "running",
+      model: "qwen2.5-7b",
+      metrics: { promptTokensTotal: 1200, predictedTokensTotal: 300, queueSize: 2 },
+    };
+
+    // Act
+    const text = renderPrometheusMetrics({ sample: null, llama, process: processStats });
+
+    // Assert
+    expect(text).toContain("llama_proxy_llama_server_up 1");
+    expect(text).toContain("# TYPE llama_proxy_llama_prompt_tokens_total counter");
+    expect(text).toContain('llama_proxy_llama_prompt_tokens_total{model="qwen2.5-7b"} 1200');
+    expect(text).toContain('llama_proxy_llama_queue_size{model="qwen2.5-7b"} 2');
+  });
+
+  it("should render llama-server process usage per model", () => {
+    // Arrange
+    const usage = (rss) => ({ rss, cpuSeconds: 2, threads: 4, readBytes: 0, writeBytes: 0 });
+    const llama = {
+      status: "running",
+      metrics: {},
+      resources: { totals: usage(3000), models: { qwen: usage(2000) } },
+    };
+
+    // Act
+    const text = renderPrometheusMetrics({ sample: null, llama, process: processStats });
+
+    // Assert
+    expect(text).toContain('llama_proxy_llama_process_resident_memory_bytes{model="all"} 3000');
+    expect(text).toContain('llama_proxy_llama_process_resident_memory_bytes{model="qwen"} 2000');
+    expect(text).toContain("# TYPE llama_proxy_llama_process_cpu_seconds_total counter");
+  });
+
+  it("should always include process stats", () => {
+    // Act
+    const text = renderPrometheusMetrics({ sample: null, llama: null, process: processStats });
+
+    // Assert
+    expect(text).toContain("llama_proxy_process_cpu_seconds_total 1.5");
+    expect(text).toContain("llama_proxy_process_resident_memory_bytes 1000");
+    expect(text).not.toContain("cpu_usage_percent");
+  });
+
+  it("should serve the snapshot without collecting", () => {
+    // Arrange
+    const getSnapshot = jest.fn(() => ({ sample, llama: null }));
+    const handler = createPrometheusHandler(getSnapshot);
+    const res = { set: jest.fn(), send: jest.fn() };
+
+    // Act
+    handler({}, res);
+
+    // Assert
+    expect(getSnapshot).toHaveBeenCalledTimes(1);
+    expect(res.set).toHaveBeenCalledWith("Content-Type", "text/plain; version=0.0.4; charset=utf-8");
+    expect(res.send.mock.calls[0][0]).toContain("llama_proxy_cpu_usage_percent 12.5");
+  });
+});
@@ -0,0 +1,178 @@
+/**
+ * @jest-environment node
+ */
+
+/**
+ * Prometheus Parser Tests
+ * Streaming, label-aware exposition parsing
+ */
+
+import {
+  PrometheusStreamParser,
+  parsePrometheusText,
+  getSampleValue,
+} from "../../server/prometheus-parser.js";
+import { LlamaServerMetricsScraper } from "../../server/handlers/llama-router/metrics-scraper.js";
+
+const EXPOSITION = [
+  "# HELP llamacpp:prompt_tokens_total Number of prompt tokens processed.",
+  "# TYPE llamacpp:prompt_tokens_total counter",
+  'llamacpp:prompt_tokens_total{model="qwen"} 120',
+  'llamacpp:prompt_tokens_total{model="llama"} 80',
+  "# TYPE llamacpp:requests_processing gauge",
+  'llamacpp:requests_processing{model="qwen"} 2',
+  "# TYPE request_latency_seconds histogram",
+  'request_latency_seconds_bucket{model="qwen",le="0.1"} 3',
+  'request_latency_seconds_bucket{model="qwen",le="1"} 7',
+  'request_latency_seconds_bucket{model="qwen",le="+Inf"} 9',
+  'request_latency_seconds_sum{model="qwen"} 4.5',
+  'request_latency_seconds_count{model="qwen"} 9',
+  "# TYPE token_time_seconds summary",
+  'token_time_seconds{quantile="0.5"} 0.02',
+  'token_time_seconds{quantile="0.99"} 0.09',
+  "token_time_seconds_sum 1.25",
+  "token_time_seconds_count 50",
+  "",
+].join("\n");
+
+describe("PrometheusStreamParser", () => {
+  it("should keep series apart by label", () => {
+    // Act
+    const result = parsePrometheusText(EXPOSITION);
+
+    // Assert
+    const family = result.families["llamacpp:prompt_tokens_total"];
+    expect(family.type).toBe("counter");
+    expect(family.help).toBe("Number of prompt tokens processed.");
+    expect(family.series).toEqual([
+      { labels: { model: "qwen" }, value: 120 },
+      { labels: { model: "llama" }, value: 80 },
+    ]);
+    expect(getSampleValue(result, "llamacpp:prompt_tokens_total", { model: "llama" })).toBe(80);
+  });
+
+  it("should fold histogram buckets, sum and count into one series", () => {
+    // Act
+    const result = parsePrometheusText(EXPOSITION);
+
+    // Assert
+    const family = result.families.request_latency_seconds;
+    expect(family.type).toBe("histogram");
+    expect(family.series).toEqual([
+      {
+        labels: { model: "qwen" },
+        buckets: [
+          { le: 0.1, count: 3 },
+          { le: 1, count: 7 },
+          { le: Infinity, count: 9 },
+        ],
+        sum: 4.5,
+        count: 9,
+      },
+    ]);
+    expect(result.families.request_latency_seconds_bucket).toBeUndefined();
+  });
+
+  it("should fold summary quantiles, sum and count into one series", () => {
+    // Act
+    const result = parsePrometheusText(EXPOSITION);
+
+    // Assert
+    expect(result.families.token_time_seconds.series).toEqual([
+      {
+        labels: {},
+        quantiles: [
+          { quantile: 0.5, value: 0.02 },
+          { quantile: 0.99, value: 0.09 },
+        ],
+        sum: 1.25,
+        count: 50,
+      },
+    ]);
+  });
+
+  it("should give the same result however the stream is chunked", () => {
+    // Arrange
+    const bytes = Buffer.from(EXPOSITION);
+    const parser = new PrometheusStreamParser();
+
+    // Act - 7-byte chunks split lines, labels and numbers
+    for (let i = 0; i < bytes.length; i += 7) {
+      parser.write(bytes.subarray(i, i + 7));
+    }
+
+    // Assert
+    expect(parser.end()).toEqual(parsePrometheusText(EXPOSITION));
+  });
+
+  it("should decode multi-byte characters split across chunks", () => {
+    // Arrange
+    const bytes = Buffer.from('up{model="modèle"} 1');
+    const split = bytes.indexOf(0xc3) + 1; // Inside the two-byte "è"
+    const parser = new PrometheusStreamParser();
+
+    // Act
+    parser.write(bytes.subarray(0, split));
+    parser.write(bytes.subarray(split));
+    const result = parser.end();
+
+    // Assert
+    expect(result.families.up.series[0].labels.model).toBe("modèle");
+  });
+
+  it("should unescape label values and ignore timestamps", () => {
+    // Act
+    const result = parsePrometheusText('info{path="C:\\\\models",note="say \\"hi\\"\\n"} 1 1700000000000');
+
+    // Assert
+    expect(result.families.info.series[0]).toEqual({
+      labels: { path: "C:\\models", note: 'say "hi"\n' },
+      value: 1,
+    });
+  });
+
+  it("should skip malformed lines", () => {
+    // Act
+    const result = parsePrometheusText(
+      ['broken{model="x} 1', "no_value", "bad_value abc", "good 2", "special NaN"].join("\n")
+    );
+
+    // Assert
+    expect(Object.keys(result.families).filter((n) => result.families[n].series.length > 0)).toEqual([
+      "good",
+      "special",
+    ]);
+    expect(result.families.good.series[0].value).toBe(2);
+  });
+});
+
+describe("LlamaServerMetricsScraper Prometheus mapping", () => {
+  it("should keep per-model counters and use the tracked model for flat fields", () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ modelName: "llama" });
+
+    // Act
+    const metrics = scraper._parsePrometheusMetrics(EXPOSITION);
+
+    // Assert
+    expect(metrics.models.qwen.promptTokensTotal).toBe(120);
+    expect(metrics.models.qwen.activeModels).toBe(2);
+    expect(metrics.models.llama.promptTokensTotal).toBe(80);
+    expect(metrics.promptTokensTotal).toBe(80);
+    expect(metrics.families.request_latency_seconds.type).toBe("histogram");
+  });
+
+  it("should prefer unlabelled series for flat fields", () => {
+    // Arrange
+    const scraper = new LlamaServerMetricsScraper({ modelName: "qwen" });
+    const text = 'llamacpp:n_decode_total 10\nllamacpp:n_decode_total{model="qwen"} 4\n';
+
+    // Act
+    const metrics = scraper._parsePrometheusMetrics(text);
+
+    // Assert
+    expect(metrics.nDecodeTotal).toBe(10);
+    expect(metrics.totalRequests).toBe(10);
+    expect(metrics.models.qwen.nDecodeTotal).toBe(4);
+  });
+});
@@ -64,7 +64,15 @@ function showErrorBoundary(error) {
       // Subscribe to metrics updates for real-time data
       socketClient.on("connect", () => {
         console.log("[App] Socket.IO connected, subscribing to metrics...");
-        socketClient.request("metrics:subscribe", { interval: 2000 });
+        socketClient
+          .request("metrics:subscribe", { interval: 2000 })
+          .then(() => socketClient.emit("metrics:visibility", { visible: !document.hidden }))
+          .catch((e) => console.warn("[App] Metrics subscription failed:", e.message));
+      });
+
+      // Let the server slow its sampling down while this tab is hidden
+      document.addEventListener("visibilitychange", () => {
+        socketClient.emit("metrics:visibility", { visible: !document.hidden });
       });
       
     } catch (e) {
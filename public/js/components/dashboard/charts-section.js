@@ -78,10 +78,33 @@ class ChartsSection extends Component {
     }
   }
 
-  _applyZoom(range) {
-    // Apply zoom range to charts if chartManager supports it
-    if (this.chartManager && this.chartsInitialized) {
-      console.log("[CHARTS-SECTION] Applying zoom range:", range);
+  /**
+   * Show the last `range` seconds, one aggregated point per canvas pixel.
+   * @param {number} range - Window length in seconds.
+   */
+  async _applyZoom(range) {
+    if (!this.chartManager || !this.chartsInitialized) return;
+    console.log("[CHARTS-SECTION] Applying zoom range:", range);
+
+    const canvas = this._el?.querySelector(
+      this.getChartType() === "usage" ? "#usageChart" : "#memoryChart"
+    );
+    const width = canvas?.clientWidth || canvas?.width || 600;
+    const to = Math.floor(Date.now() / 1000);
+    const from = to - range;
+
+    try {
+      const res = await socketClient.request("metrics:range", {
+        from,
+        to,
+        step: Math.max(1, Math.ceil(range / width)),
+      });
+      if (res.success && this.chartZoomRange === range) {
+        this.history = res.data?.history || [];
+        this._updateChartsData();
+      }
+    } catch (error) {
+      console.error("[CHARTS-SECTION] Failed to load metrics range:", error);
     }
   }
 
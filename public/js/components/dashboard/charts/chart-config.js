@@ -80,10 +80,17 @@ if (typeof ChartConfigBuilder === "undefined") {
         x: {
           display: true,
           grid: { display: false },
-          ticks: { display: false },
+          ticks: {
+            display: true,
+            autoSkip: true,
+            maxTicksLimit: 6,
+            maxRotation: 0,
+            font: { size: 11 },
+            color: this.colors.tickColor,
+          },
           title: {
             display: true,
-            text: "Time (seconds ago)",
+            text: "Time",
             font: { size: 12, weight: "500" },
             color: this.colors.textColor,
             padding: { top: 10 },
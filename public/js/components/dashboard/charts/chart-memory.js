@@ -1,7 +1,7 @@
 /**
  * Memory Chart Module - Handles system and GPU memory charts
  */
-/* global ChartConfigBuilder ChartColors */
+/* global ChartConfigBuilder ChartColors ChartUtils */
 
 if (typeof MemoryChart === "undefined") {
   class MemoryChart {
@@ -27,7 +27,7 @@ if (typeof MemoryChart === "undefined") {
       }
 
       const ctx = canvas.getContext("2d");
-      const labels = history.map((_, i) => i.toString());
+      const labels = ChartUtils.timeLabels(history);
       // memory.used is percentage (0-100), gpu.memoryUsed is bytes
       const systemMemData = history.map((h) => h.memory?.used || 0);
       // Note: Currently shows primary GPU only. Full multi-GPU support requires database schema changes
@@ -116,7 +116,7 @@ if (typeof MemoryChart === "undefined") {
     update(history) {
       if (!this.chart) return;
 
-      const labels = history.map((_, i) => i.toString());
+      const labels = ChartUtils.timeLabels(history);
       // memory.used is percentage (0-100), gpu.memoryUsed is bytes
       const systemMemData = history.map((h) => h.memory?.used || 0);
       const gpuMemData = history.map((h) => (h.gpu?.memoryUsed || 0) / (1024 * 1024));
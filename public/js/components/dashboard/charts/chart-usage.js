@@ -1,7 +1,7 @@
 /**
  * Usage Chart Module - Handles CPU and GPU usage charts
  */
-/* global ChartConfigBuilder ChartColors */
+/* global ChartConfigBuilder ChartColors ChartUtils */
 
 if (typeof UsageChart === "undefined") {
   class UsageChart {
@@ -29,7 +29,7 @@ if (typeof UsageChart === "undefined") {
       console.log("[USAGE-CHART] Canvas size:", canvas.width, "x", canvas.height);
 
       const ctx = canvas.getContext("2d");
-      const labels = history.map((_, i) => i.toString());
+      const labels = ChartUtils.timeLabels(history);
       const cpuData = history.map((h) => h.cpu?.usage || 0);
       const gpuData = history.map((h) => h.gpu?.usage || 0);
 
@@ -110,7 +110,7 @@ if (typeof UsageChart === "undefined") {
     update(history) {
       if (!this.chart) return;
 
-      const labels = history.map((_, i) => i.toString());
+      const labels = ChartUtils.timeLabels(history);
       const cpuData = history.map((h) => h.cpu?.usage || 0);
       const gpuData = history.map((h) => h.gpu?.usage || 0);
 
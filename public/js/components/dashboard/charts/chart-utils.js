@@ -12,7 +12,8 @@ if (typeof ChartUtils === "undefined") {
     reconstructUsageHistory(data) {
       if (!data || !data.datasets[0]) return [];
 
-      return data.labels.map((_, i) => ({
+      return data.labels.map((label, i) => ({
+        label,
         cpu: { usage: data.datasets[0].data[i] || 0 },
         gpu: { usage: data.datasets[1]?.data[i] || 0 },
       }));
@@ -26,12 +27,35 @@ if (typeof ChartUtils === "undefined") {
     reconstructMemoryHistory(data) {
       if (!data || !data.datasets[0]) return [];
 
-      return data.labels.map((_, i) => ({
+      return data.labels.map((label, i) => ({
+        label,
         memory: { used: (data.datasets[0].data[i] || 0) * 1024 * 1024 },
         gpu: { memoryUsed: data.datasets[1]?.data[i] || 0 },
       }));
     },
 
+    /**
+   * Build x-axis labels from entry timestamps (epoch seconds)
+   * Entries rebuilt from chart data keep their label; entries without a
+   * timestamp fall back to their index
+   * @param {Array} history - Historical metrics data
+   * @returns {Array<string>} One label per entry
+   */
+    timeLabels(history) {
+      const first = history[0]?.timestamp;
+      const last = history[history.length - 1]?.timestamp;
+      const withDate = first && last && Math.abs(last - first) > 86400;
+
+      return history.map((h, i) => {
+        if (h.label !== undefined) return h.label;
+        if (!h.timestamp) return i.toString();
+        const date = new Date(h.timestamp * 1000);
+        return withDate
+          ? date.toLocaleString([], { month: "short", day: "numeric", hour: "2-digit", minute: "2-digit" })
+          : date.toLocaleTimeString([], { hour: "2-digit", minute: "2-digit", second: "2-digit" });
+      });
+    },
+
     /**
    * Recreate chart with existing data
    * @param {HTMLCanvasElement} canvas - Canvas element
@@ -7,7 +7,7 @@ class StatsGrid extends Component {
   /**
    * Creates a StatsGrid component instance.
    * @param {Object} props - Component properties.
-   * @param {Object} props.metrics - System metrics object containing CPU, memory, disk, swap, and uptime.
+   * @param {Object} props.metrics - System metrics object containing CPU, memory, disk, swap, IO, network and uptime.
    * @param {Object} props.gpuMetrics - GPU metrics object containing usage and memory information.
    */
   constructor(props) {
@@ -97,6 +97,12 @@ class StatsGrid extends Component {
           : Math.min(gpu?.usage || 0, 100)
       },
       { value: `${(m.disk?.used || 0).toFixed(1)}%`, percent: Math.min(m.disk?.used || 0, 100) },
+      {
+        label: this._diskIoLabel(m.io),
+        value: this._fmtIo(m.io),
+        percent: Math.min(m.io?.utilization || 0, 100),
+      },
+      { value: this._fmtNetwork(m.network), percent: 0 },
       { value: this._fmtUptime(m.uptime || 0), percent: 0 },
     ];
 
@@ -106,14 +112,54 @@ class StatsGrid extends Component {
         const valueEl = card.querySelector(".stat-value");
         const barFill = card.querySelector(".stat-bar-fill");
         if (valueEl) valueEl.textContent = stat.value;
+        if (stat.label) {
+          const labelEl = card.querySelector(".stat-label");
+          if (labelEl) labelEl.textContent = stat.label;
+        }
         if (barFill && stat.percent > 0) barFill.style.width = `${stat.percent}%`;
       }
     });
   }
 
+  /**
+   * Format a byte rate.
+   * @param {number} bytesPerSec - Bytes per second.
+   * @returns {string} Formatted rate, e.g. "12.5 MB/s".
+   */
+  _fmtRate(bytesPerSec) {
+    return `${window.AppUtils?.formatBytes?.(Math.round(bytesPerSec || 0))}/s`;
+  }
+
+  /**
+   * Label of the disk IO card, naming the device that backs the models path.
+   * @param {Object} io - IO metrics ({ device, ... }).
+   * @returns {string} Card label.
+   */
+  _diskIoLabel(io) {
+    return io?.device ? `Disk IO (${io.device})` : "Disk IO";
+  }
+
+  /**
+   * Format disk read/write throughput.
+   * @param {Object} io - IO metrics.
+   * @returns {string} e.g. "R 1.2 MB/s · W 0 B/s".
+   */
+  _fmtIo(io) {
+    return `R ${this._fmtRate(io?.readBytesPerSec)} · W ${this._fmtRate(io?.writeBytesPerSec)}`;
+  }
+
+  /**
+   * Format network receive/transmit throughput.
+   * @param {Object} network - Network metrics.
+   * @returns {string} e.g. "↓ 3.4 KB/s · ↑ 512 B/s".
+   */
+  _fmtNetwork(network) {
+    return `↓ ${this._fmtRate(network?.rxBytesPerSec)} · ↑ ${this._fmtRate(network?.txBytesPerSec)}`;
+  }
+
   /**
    * Renders the stats grid component with all metric cards.
-   * @returns {string} HTML string containing the stats grid with CPU, memory, swap, GPU, disk, and uptime cards.
+   * @returns {string} HTML string containing the stats grid with CPU, memory, swap, GPU, disk, disk IO, network and uptime cards.
    */
   render() {
     const m = this.metrics;
@@ -187,6 +233,23 @@ class StatsGrid extends Component {
             </div>
           </div>
         </div>
+        <div class="stat-card ${m.io?.utilization > 90 ? "warning" : ""}">
+          <div class="stat-icon">📀</div>
+          <div class="stat-content">
+            <span class="stat-label">${this._diskIoLabel(m.io)}</span>
+            <span class="stat-value">${this._fmtIo(m.io)}</span>
+            <div class="stat-bar">
+              <div class="stat-bar-fill" style="width: ${Math.min(m.io?.utilization || 0, 100)}%"></div>
+            </div>
+          </div>
+        </div>
+        <div class="stat-card">
+          <div class="stat-icon">🌐</div>
+          <div class="stat-content">
+            <span class="stat-label">Network</span>
+            <span class="stat-value">${this._fmtNetwork(m.network)}</span>
+          </div>
+        </div>
         <div class="stat-card">
           <div class="stat-icon">⏱️</div>
           <div class="stat-content">
@@ -45,12 +45,11 @@ class LlamaRouterCard extends Component {
         this.props.presets = this.presets;
         this._updatePresetSelect();
       }),
+      // llama-server metrics are scraped and parsed on the server
+      socketClient.on("llama-server:status", (payload) => {
+        this._applyServerMetrics(payload?.data?.metrics);
+      }),
     ];
-
-    // Only set up scraper once (not on every mount/re-render)
-    if (window.MetricsScraper && !this._scraper) {
-      this._setupScraper();
-    }
   }
 
   destroy() {
@@ -58,50 +57,38 @@ class LlamaRouterCard extends Component {
       this.unsubscribers.forEach(u => u());
       this.unsubscribers = [];
     }
-    if (this._scraper) this._scraper.stop();
   }
 
-  _setupScraper() {
-    // Get URL from routerStatus (set by router:status events)
-    const url = this.routerStatus?.url;
+  _applyServerMetrics(metrics) {
+    if (!metrics) return;
 
-    // Only set up scraper if server is running (has URL)
-    // This is expected to be null when llama-server is not running
-    if (!url) {
-      return; // Silent - no warning needed for expected state
-    }
+    // Update local state only when metrics actually change
+    const currentMetrics = this.metrics || {};
+
+    // Check if meaningful changes (> 0.1% change for token rates)
+    let hasChange = false;
+    for (const key in metrics) {
+      const oldVal = currentMetrics[key] || 0;
+      const newVal = metrics[key] || 0;
 
-    // Use shorter interval (2s) for immediate feedback, but with smart dedup
-    this._scraper = new window.MetricsScraper(url, 2000);
-    this._scraper.start((metrics) => {
-      // Update local state only when metrics actually change
-      const currentMetrics = this.metrics || {};
-
-      // Check if meaningful changes (> 0.1% change for token rates)
-      let hasChange = false;
-      for (const key in metrics) {
-        const oldVal = currentMetrics[key] || 0;
-        const newVal = metrics[key] || 0;
-
-        if (key.includes("Seconds")) {
-          const threshold = Math.max(0.05, Math.abs(oldVal) * 0.001);
-          if (Math.abs(newVal - oldVal) > threshold) {
-            hasChange = true;
-            break;
-          }
-        } else if (newVal !== oldVal) {
+      if (key.includes("Seconds")) {
+        const threshold = Math.max(0.05, Math.abs(oldVal) * 0.001);
+        if (Math.abs(newVal - oldVal) > threshold) {
           hasChange = true;
           break;
         }
+      } else if (newVal !== oldVal) {
+        hasChange = true;
+        break;
       }
+    }
 
-      if (hasChange) {
-        this.metrics = metrics;
-        // Update BOTH detailed metrics AND glance grid (for real-time updates)
-        this._updateDetailedMetrics();
-        this._updateUI();
-      }
-    });
+    if (hasChange) {
+      this.metrics = metrics;
+      // Update BOTH detailed metrics AND glance grid (for real-time updates)
+      this._updateDetailedMetrics();
+      this._updateUI();
+    }
   }
 
   _updateUI() {
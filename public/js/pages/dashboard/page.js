@@ -584,9 +584,10 @@ class DashboardPage extends Component {
   _handleChartZoom(range) {
     // Use direct socket call instead of stateManager.emit
     console.log("[DashboardPage] _handleChartZoom - range:", range);
-    // Trigger chart zoom via direct UI update
-    if (this.chartManager) {
-      this.chartManager.setZoomRange(range);
+    // The charts section fetches the aggregated range for its canvas width
+    const chartsSection = this._el?.querySelector(".charts-section")?._component;
+    if (chartsSection) {
+      chartsSection._onZoomChange(range);
     }
   }
 
@@ -0,0 +1,114 @@
+/**
+ * Database Statements Benchmark
+ * Runs the hot repository paths (one metrics row per tick, one log line at a
+ * time, dashboard history reads) against a file database twice: with SQLite's
+ * default pragmas, a fresh prepare() and a commit per row, as before, and with
+ * the shared statement cache, the tuned pragmas from DB_PRAGMA_DEFAULTS and
+ * the write-behind queue. Write timings include the final flush.
+ * Run with: node scripts/bench-db-statements.js [writes] [reads]
+ */
+
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { DB } from "../server/db/index.js";
+
+const writes = parseInt(process.argv[2], 10) || 5000;
+const reads = parseInt(process.argv[3], 10) || 2000;
+
+// SQLite's own defaults, i.e. what DBBase ran with before the pragmas were set
+const LEGACY_PRAGMAS = {
+  journal_mode: "DELETE",
+  synchronous: "FULL",
+  mmap_size: 0,
+  cache_size: -2000,
+  temp_store: "DEFAULT",
+};
+
+const CONFIGS = [
+  {
+    name: "before (defaults, no cache)",
+    options: { pragmas: LEGACY_PRAGMAS, statementCache: false, writeBehind: false },
+  },
+  { name: "after (tuned, cached, batched)", options: {} },
+];
+
+/**
+ * Build a metrics row like server/metrics.js saves every tick.
+ * @param {number} i - Sample number
+ * @param {number} start - First timestamp (epoch seconds)
+ * @returns {Object} Metrics row
+ */
+function buildRow(i, start) {
+  return {
+    timestamp: start + i * 2,
+    cpu_usage: (i * 7) % 100,
+    memory_usage: 40 + (i % 20),
+    swap_usage: 1,
+    disk_usage: 63,
+    uptime: i * 2,
+    gpu_usage: (i * 13) % 100,
+    gpu_memory_used: 8e9,
+    gpu_memory_total: 24e9,
+    llama_predicted_tps: 50,
+    disk_read_bps: 1e6,
+    net_rx_bps: 2e5,
+  };
+}
+
+/**
+ * Time a loop and return operations per second.
+ * @param {number} count - Iterations
+ * @param {Function} fn - Called with the iteration number
+ * @param {Function} [finish] - Called once after the loop, inside the timing
+ * @returns {number} Operations per second
+ */
+function opsPerSec(count, fn, finish = () => {}) {
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < count; i++) fn(i);
+  finish();
+  const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+  return Math.round(count / seconds);
+}
+
+/**
+ * Run every workload against a fresh database file.
+ * @param {Object} options - DB constructor options
+ * @returns {Object} Operations per second per workload
+ */
+function runConfig(options) {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "bench-db-"));
+  const log = console.log;
+  console.log = () => {}; // Schema and migration chatter
+  try {
+    const db = new DB(path.join(dir, "bench.db"), options);
+    const start = Math.floor(Date.now() / 1000) - writes * 2;
+    const flush = () => db.flushWrites();
+
+    const result = {
+      "metrics save/s": opsPerSec(writes, (i) => db.saveMetrics(buildRow(i, start), []), flush),
+      "log add/s": opsPerSec(writes, (i) => db.addLog("info", `bench line ${i}`, "bench"), flush),
+      "logs read/s": opsPerSec(reads, () => db.getLogs(100)),
+      "history read/s": opsPerSec(reads, () => db.getMetricsHistory(300)),
+      "range read/s": opsPerSec(Math.ceil(reads / 10), () => db.getMetricsRange(start, start + writes * 2, 60)),
+    };
+    db.close();
+    return result;
+  } finally {
+    console.log = log;
+    fs.rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+console.log(`Database benchmark: ${writes} writes, ${reads} reads per workload\n`);
+
+const results = {};
+for (const { name, options } of CONFIGS) {
+  results[name] = runConfig(options);
+}
+
+const [before, after] = Object.values(results);
+results.speedup = Object.fromEntries(
+  Object.keys(before).map((key) => [key, `${(after[key] / before[key]).toFixed(1)}x`])
+);
+console.table(results);
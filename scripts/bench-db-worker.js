@@ -0,0 +1,101 @@
+/**
+ * Database Worker Benchmark
+ * Measures how much a large logs:get query delays everything else on the
+ * main thread, with the database on the main thread and with DB_WORKER mode.
+ * A simulated metrics tick fires every 50ms while the query runs back to back;
+ * the report shows event-loop delay percentiles, how late the ticks were and
+ * how long each query took from the caller's side.
+ * Run with: node scripts/bench-db-worker.js [rows] [limit] [rounds]
+ */
+
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { monitorEventLoopDelay } from "perf_hooks";
+import { DB } from "../server/db/index.js";
+
+const rows = parseInt(process.argv[2], 10) || 200000;
+const limit = parseInt(process.argv[3], 10) || 50000;
+const rounds = parseInt(process.argv[4], 10) || 10;
+
+const TICK_MS = 50; // Stand-in for the metrics sampler's emit cadence
+
+const MODES = [
+  { name: "main thread", worker: false },
+  { name: "worker (DB_WORKER=true)", worker: true },
+];
+
+/**
+ * Fill the logs table, committed in write-behind batches.
+ * @param {string} dbPath - Database file
+ */
+function seed(dbPath) {
+  const db = new DB(dbPath, { worker: false });
+  for (let i = 0; i < rows; i++) {
+    db.addLog(i % 10 === 0 ? "error" : "info", `bench line ${i} ${"x".repeat(80)}`, "bench");
+  }
+  db.close();
+}
+
+/**
+ * Run the query `rounds` times while a ticker measures main-thread latency.
+ * @param {string} dbPath - Database file
+ * @param {boolean} worker - Run the query on the DB worker
+ * @returns {Promise<Object>} Latency figures in ms
+ */
+async function runMode(dbPath, worker) {
+  const db = new DB(dbPath, { worker });
+  await db.getLogs(1); // Start the worker and warm the page cache outside the timing
+
+  const histogram = monitorEventLoopDelay({ resolution: 1 });
+  const lateness = [];
+  let expected = performance.now() + TICK_MS;
+  const ticker = setInterval(() => {
+    const now = performance.now();
+    lateness.push(Math.max(0, now - expected));
+    expected = now + TICK_MS;
+  }, TICK_MS);
+
+  histogram.enable();
+  const queryMs = [];
+  for (let i = 0; i < rounds; i++) {
+    const start = performance.now();
+    const logs = await db.getLogs(limit);
+    queryMs.push(performance.now() - start);
+    if (logs.length === 0) throw new Error("No logs returned");
+    // Let the ticker run between requests, as socket events would
+    await new Promise((resolve) => setTimeout(resolve, 1));
+  }
+  histogram.disable();
+  clearInterval(ticker);
+  db.close();
+
+  lateness.sort((a, b) => a - b);
+  return {
+    "loop p50 ms": +(histogram.percentile(50) / 1e6).toFixed(1),
+    "loop p99 ms": +(histogram.percentile(99) / 1e6).toFixed(1),
+    "loop max ms": +(histogram.max / 1e6).toFixed(1),
+    "tick late p99 ms": +(lateness[Math.floor(lateness.length * 0.99)] ?? 0).toFixed(1),
+    "ticks": lateness.length,
+    "query avg ms": +(queryMs.reduce((a, b) => a + b, 0) / queryMs.length).toFixed(1),
+  };
+}
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), "bench-db-worker-"));
+const dbPath = path.join(dir, "bench.db");
+const log = console.log;
+console.log = () => {}; // Schema and migration chatter
+
+const results = {};
+try {
+  seed(dbPath);
+  for (const { name, worker } of MODES) {
+    results[name] = await runMode(dbPath, worker);
+  }
+} finally {
+  console.log = log;
+  fs.rmSync(dir, { recursive: true, force: true });
+}
+
+console.log(`DB worker benchmark: ${rows} log rows, logs:get limit ${limit}, ${rounds} rounds\n`);
+console.table(results);
@@ -0,0 +1,335 @@
+/**
+ * Metrics Subscribers Benchmark
+ * Starts server.js against a throwaway data directory, connects 1, 10, 50 and
+ * 200 socket.io-client subscribers to metrics:subscribe and records, per level:
+ * server CPU (including the metrics worker), event-loop delay as reported in
+ * the metrics:update payload, and messages/bytes per second received by the
+ * subscribers. GPUs come from a fake nvidia-smi on PATH and llama-server from
+ * a local HTTP stub, so the numbers do not depend on the host's hardware.
+ *
+ * Run with: node scripts/bench-metrics-subscribers.js [seconds per level] [report.json]
+ * Attach the JSON report to changes touching server/metrics.js so regressions
+ * show up in review. Server CPU is read from /proc and needs Linux.
+ */
+
+import { spawn } from "child_process";
+import fs from "fs";
+import http from "http";
+import net from "net";
+import os from "os";
+import path from "path";
+import { fileURLToPath } from "url";
+import { io } from "socket.io-client";
+import { parsePidStat } from "../server/process-tree-collector.js";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const ROOT = path.resolve(__dirname, "..");
+
+const LEVELS = [1, 10, 50, 200];
+const SECONDS = parseInt(process.argv[2], 10) || 15;
+const REPORT_PATH = process.argv[3] || path.join(process.cwd(), "bench-metrics-subscribers.json");
+const SUBSCRIBE_INTERVAL = 1000; // Fastest interval the server accepts
+const WARMUP_MS = 3000;
+const CLOCK_TICKS_PER_SECOND = 100; // USER_HZ, as in process-tree-collector.js
+// Ports llama-metrics.js probes when detecting a running llama-server
+const LLAMA_PORTS = [8080, 8081, 8082, 8083, 8084, 8085];
+
+// Two GPUs; prints one CSV line per GPU every -lms milliseconds (once without it)
+const FAKE_NVIDIA_SMI = `#!/usr/bin/env node
+const args = process.argv.slice(2);
+const loop = args.indexOf("-lms");
+const interval = loop === -1 ? 0 : parseInt(args[loop + 1], 10) || 1000;
+let tick = 0;
+function print() {
+  tick++;
+  const usage = (tick * 7) % 100;
+  process.stdout.write(\`0, Bench GPU, \${usage}, 4096, 24576, 55, 180.5\\n\`);
+  process.stdout.write(\`1, Bench GPU, \${100 - usage}, 20480, 24576, 71, 310.2\\n\`);
+}
+print();
+if (interval) setInterval(print, interval);
+`;
+
+/**
+ * Start a llama-server stand-in answering /health, /models and /metrics.
+ * Counters grow on every /metrics scrape so rate computations have work to
+ * do; the scrape count goes into the report to show the dashboard read them.
+ * @returns {Promise<Object>} { server, port, scrapes() }
+ */
+async function startLlamaStub() {
+  let scrapes = 0;
+  const server = http.createServer((req, res) => {
+    const url = req.url.split("?")[0];
+    if (url === "/health") {
+      res.writeHead(200, { "Content-Type": "application/json" });
+      res.end(JSON.stringify({ status: "ok" }));
+    } else if (url === "/models" || url === "/v1/models") {
+      res.writeHead(200, { "Content-Type": "application/json" });
+      res.end(JSON.stringify({ data: [{ id: "bench-model", status: { value: "loaded" } }] }));
+    } else if (url.startsWith("/metrics")) {
+      scrapes++;
+      res.writeHead(200, { "Content-Type": "text/plain; version=0.0.4" });
+      res.end(
+        [
+          "# TYPE llamacpp:prompt_tokens_total counter",
+          `llamacpp:prompt_tokens_total ${scrapes * 512}`,
+          "# TYPE llamacpp:tokens_predicted_total counter",
+          `llamacpp:tokens_predicted_total ${scrapes * 128}`,
+          `llamacpp:prompt_seconds_total ${scrapes * 0.4}`,
+          `llamacpp:tokens_predicted_seconds_total ${scrapes * 2.5}`,
+          `llamacpp:n_decode_total ${scrapes * 130}`,
+          "llamacpp:n_busy_slots_per_decode 1.5",
+          "llamacpp:prompt_tokens_seconds 1280",
+          "llamacpp:predicted_tokens_seconds 51.2",
+          "llamacpp:requests_processing 1",
+          "llamacpp:requests_deferred 0",
+          "llamacpp:n_tokens_max 8192",
+          "",
+        ].join("\n")
+      );
+    } else {
+      res.writeHead(404);
+      res.end();
+    }
+  });
+
+  // The dashboard finds llama-server by probing these ports
+  for (const port of LLAMA_PORTS) {
+    try {
+      await new Promise((resolve, reject) => {
+        server.once("error", reject);
+        server.listen(port, "127.0.0.1", resolve);
+      });
+      return { server, port, scrapes: () => scrapes };
+    } catch {
+      // Port taken, try the next one
+    }
+  }
+  throw new Error(`Could not start the llama-server stub: ports ${LLAMA_PORTS.join(", ")} are taken`);
+}
+
+/**
+ * Find a free TCP port for the dashboard.
+ * @returns {Promise<number>} Port number
+ */
+function getFreePort() {
+  return new Promise((resolve, reject) => {
+    const probe = net.createServer();
+    probe.once("error", reject);
+    probe.listen(0, "127.0.0.1", () => {
+      const { port } = probe.address();
+      probe.close(() => resolve(port));
+    });
+  });
+}
+
+/**
+ * Create the throwaway working directory. server.js keeps its database in
+ * <cwd>/data, so running it from here gives it an empty temp DB; bin/ holds
+ * the fake nvidia-smi.
+ * @returns {string} Directory path
+ */
+function prepareWorkDir() {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "bench-metrics-"));
+  fs.mkdirSync(path.join(dir, "bin"));
+  fs.writeFileSync(path.join(dir, "bin", "nvidia-smi"), FAKE_NVIDIA_SMI, { mode: 0o755 });
+  return dir;
+}
+
+/**
+ * Start server.js in the work directory and wait until it listens.
+ * @param {string} dir - Work directory (becomes the server's cwd, so data/ lands there)
+ * @param {number} port - Dashboard port
+ * @returns {Promise<ChildProcess>} Server process
+ */
+function startServer(dir, port) {
+  const child = spawn(process.execPath, [path.join(ROOT, "server.js")], {
+    cwd: dir,
+    env: {
+      ...process.env,
+      PORT: String(port),
+      PATH: `${path.join(dir, "bin")}${path.delimiter}${process.env.PATH}`,
+      NODE_ENV: "production",
+      NVIDIA_SMI_MODE: "stream",
+    },
+    stdio: ["ignore", "pipe", "pipe"],
+  });
+
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => reject(new Error("server.js did not start within 30s")), 30000);
+    let output = "";
+    child.stdout.on("data", (chunk) => {
+      output += chunk;
+      if (output.includes(`http://localhost:${port}`)) {
+        clearTimeout(timer);
+        resolve(child);
+      }
+      // Only the startup banner matters; keep memory flat under load
+      if (output.length > 65536) output = output.slice(-1024);
+    });
+    child.stderr.resume();
+    child.once("exit", (code) => {
+      clearTimeout(timer);
+      reject(new Error(`server.js exited during startup (code ${code})`));
+    });
+  });
+}
+
+/**
+ * Total CPU seconds used by a process (all threads, including workers).
+ * @param {number} pid - Process id
+ * @returns {number|null} CPU seconds, or null without /proc
+ */
+function readCpuSeconds(pid) {
+  try {
+    const stat = parsePidStat(fs.readFileSync(`/proc/${pid}/stat`, "utf8"));
+    return stat ? (stat.utime + stat.stime) / CLOCK_TICKS_PER_SECOND : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Connect one subscriber and count what it receives.
+ * @param {string} url - Dashboard URL
+ * @param {Object} totals - Shared counters { messages, bytes, updates, loop: [] }
+ * @returns {Promise<Socket>} Connected, subscribed client
+ */
+function connectSubscriber(url, totals) {
+  const socket = io(url, {
+    path: "/llamaproxws",
+    transports: ["websocket"],
+    reconnection: false,
+    forceNew: true,
+  });
+
+  socket.io.on("open", () => {
+    // Raw Engine.IO frames: what actually crosses the wire per subscriber
+    socket.io.engine.on("packet", (packet) => {
+      if (packet.type !== "message") return;
+      totals.messages++;
+      totals.bytes +=
+        typeof packet.data === "string" ? Buffer.byteLength(packet.data) : packet.data.byteLength;
+    });
+  });
+
+  socket.on("metrics:update", (message) => {
+    totals.updates++;
+    const loop = message?.data?.metrics?.process?.loop;
+    if (loop) totals.loop.push(loop);
+  });
+
+  return new Promise((resolve, reject) => {
+    socket.once("connect_error", reject);
+    socket.once("connect", () => {
+      socket.emit("metrics:subscribe", { interval: SUBSCRIBE_INTERVAL }, () => {
+        socket.emit("metrics:visibility", { visible: true });
+        resolve(socket);
+      });
+    });
+  });
+}
+
+/**
+ * Percentile of a numeric array.
+ * @param {Array<number>} values - Values
+ * @param {number} p - Percentile (0-100)
+ * @returns {number|null} Value, or null for an empty array
+ */
+function percentile(values, p) {
+  if (values.length === 0) return null;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+}
+
+/**
+ * Measure one subscriber level.
+ * @param {string} url - Dashboard URL
+ * @param {number} pid - Server process id
+ * @param {number} count - Number of subscribers
+ * @returns {Promise<Object>} Report row
+ */
+async function measureLevel(url, pid, count) {
+  const totals = { messages: 0, bytes: 0, updates: 0, loop: [] };
+  // Connect in small batches; the per-connection rate limiter is per socket
+  const sockets = [];
+  for (let i = 0; i < count; i += 25) {
+    const batch = Math.min(25, count - i);
+    sockets.push(
+      ...(await Promise.all(Array.from({ length: batch }, () => connectSubscriber(url, totals))))
+    );
+  }
+
+  await new Promise((resolve) => setTimeout(resolve, WARMUP_MS));
+  Object.assign(totals, { messages: 0, bytes: 0, updates: 0, loop: [] });
+
+  const cpuStart = readCpuSeconds(pid);
+  const start = process.hrtime.bigint();
+  await new Promise((resolve) => setTimeout(resolve, SECONDS * 1000));
+  const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+  const cpuEnd = readCpuSeconds(pid);
+
+  for (const socket of sockets) socket.disconnect();
+  // Let the sampler notice the departures before the next level
+  await new Promise((resolve) => setTimeout(resolve, 2000));
+
+  const loops = totals.loop;
+  return {
+    subscribers: count,
+    serverCpuPercent:
+      cpuStart === null || cpuEnd === null
+        ? null
+        : Math.round(((cpuEnd - cpuStart) / seconds) * 1000) / 10,
+    eventLoopDelayMs: {
+      p50: percentile(loops.map((l) => l.p50), 50),
+      p99: percentile(loops.map((l) => l.p99), 99),
+      max: loops.length > 0 ? Math.max(...loops.map((l) => l.max)) : null,
+    },
+    metricsUpdatesPerSec: Math.round((totals.updates / seconds) * 10) / 10,
+    expectedUpdatesPerSec: Math.round((count * 1000) / SUBSCRIBE_INTERVAL),
+    messagesPerSec: Math.round((totals.messages / seconds) * 10) / 10,
+    bytesPerSec: Math.round(totals.bytes / seconds),
+  };
+}
+
+const llama = await startLlamaStub();
+const workDir = prepareWorkDir();
+const port = await getFreePort();
+const url = `http://127.0.0.1:${port}`;
+let server = null;
+
+try {
+  console.log(`Starting server.js on ${url} (llama-server stub on ${llama.port}, data in ${workDir})`);
+  server = await startServer(workDir, port);
+
+  const levels = [];
+  for (const count of LEVELS) {
+    console.log(`Measuring ${count} subscriber(s) for ${SECONDS}s...`);
+    levels.push(await measureLevel(url, server.pid, count));
+  }
+
+  const report = {
+    benchmark: "metrics-subscribers",
+    date: new Date().toISOString(),
+    node: process.version,
+    platform: `${os.platform()} ${os.release()}`,
+    cpus: os.cpus().length,
+    secondsPerLevel: SECONDS,
+    subscribeIntervalMs: SUBSCRIBE_INTERVAL,
+    llamaMetricsScrapes: llama.scrapes(),
+    levels,
+  };
+
+  fs.writeFileSync(REPORT_PATH, `${JSON.stringify(report, null, 2)}\n`);
+  console.table(levels.map(({ eventLoopDelayMs, ...row }) => ({ ...row, loopP99: eventLoopDelayMs.p99 })));
+  console.log(`llama-server /metrics scrapes: ${report.llamaMetricsScrapes}`);
+  console.log(`Report written to ${REPORT_PATH}`);
+} finally {
+  if (server && server.exitCode === null) {
+    const exited = new Promise((resolve) => server.once("exit", resolve));
+    server.kill("SIGTERM");
+    await exited;
+  }
+  llama.server.close();
+  fs.rmSync(workDir, { recursive: true, force: true });
+}
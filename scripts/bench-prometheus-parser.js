@@ -0,0 +1,138 @@
+/**
+ * Prometheus Parser Benchmark
+ * Parses a synthetic multi-model llama-server /metrics payload with the
+ * streaming parser (whole body and in socket-sized chunks) and with the
+ * previous split-and-lastIndexOf approach, which dropped labels.
+ * Run with: node scripts/bench-prometheus-parser.js [models] [iterations]
+ */
+
+import { PrometheusStreamParser, parsePrometheusText } from "../server/prometheus-parser.js";
+
+const modelCount = parseInt(process.argv[2], 10) || 50;
+const iterations = parseInt(process.argv[3], 10) || 200;
+const CHUNK_SIZE = 16 * 1024; // Typical socket read size
+
+const COUNTERS = [
+  "llamacpp:prompt_tokens_total",
+  "llamacpp:prompt_seconds_total",
+  "llamacpp:tokens_predicted_total",
+  "llamacpp:tokens_predicted_seconds_total",
+  "llamacpp:n_decode_total",
+];
+const GAUGES = [
+  "llamacpp:prompt_tokens_seconds",
+  "llamacpp:predicted_tokens_seconds",
+  "llamacpp:n_busy_slots_per_decode",
+  "llamacpp:requests_processing",
+  "llamacpp:requests_deferred",
+  "llamacpp:n_tokens_max",
+];
+const BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, "+Inf"];
+
+/**
+ * Build an exposition with one series per model for every family.
+ * @param {number} models - Number of models
+ * @returns {string} Exposition text
+ */
+function buildPayload(models) {
+  const names = Array.from({ length: models }, (_, i) => `model-${i}-Q4_K_M`);
+  const lines = [];
+
+  const family = (name, type, render) => {
+    lines.push(`# HELP ${name} Synthetic ${type}.`);
+    lines.push(`# TYPE ${name} ${type}`);
+    names.forEach((model, i) => render(model, i));
+  };
+
+  for (const name of COUNTERS) {
+    family(name, "counter", (model, i) => lines.push(`${name}{model="${model}"} ${i * 1000 + 17}`));
+  }
+  for (const name of GAUGES) {
+    family(name, "gauge", (model, i) => lines.push(`${name}{model="${model}"} ${(i * 1.37).toFixed(3)}`));
+  }
+  family("llamacpp:request_duration_seconds", "histogram", (model, i) => {
+    BUCKETS.forEach((le, b) => {
+      lines.push(`llamacpp:request_duration_seconds_bucket{model="${model}",le="${le}"} ${i + b * 3}`);
+    });
+    lines.push(`llamacpp:request_duration_seconds_sum{model="${model}"} ${i * 2.5}`);
+    lines.push(`llamacpp:request_duration_seconds_count{model="${model}"} ${i + 33}`);
+  });
+  family("llamacpp:token_latency_seconds", "summary", (model, i) => {
+    for (const q of [0.5, 0.9, 0.99]) {
+      lines.push(`llamacpp:token_latency_seconds{model="${model}",quantile="${q}"} ${(q * 0.1).toFixed(4)}`);
+    }
+    lines.push(`llamacpp:token_latency_seconds_sum{model="${model}"} ${i * 0.3}`);
+    lines.push(`llamacpp:token_latency_seconds_count{model="${model}"} ${i * 10}`);
+  });
+
+  return `${lines.join("\n")}\n`;
+}
+
+/**
+ * The scraper's previous parser: split the body, keep the text before the
+ * last space as the name (labels included) and the number after it.
+ * @param {string} text - Exposition text
+ * @returns {Object} Name -> value
+ */
+function legacyParse(text) {
+  const values = {};
+  for (const line of text.split("\n")) {
+    const trimmed = line.trim();
+    if (!trimmed || trimmed.startsWith("#")) continue;
+    const spaceIndex = trimmed.lastIndexOf(" ");
+    if (spaceIndex === -1) continue;
+    const value = parseFloat(trimmed.substring(spaceIndex + 1));
+    if (!isNaN(value)) values[trimmed.substring(0, spaceIndex)] = value;
+  }
+  return values;
+}
+
+/**
+ * Time a function over N iterations.
+ * @param {string} name - Label
+ * @param {Function} fn - Function to benchmark
+ * @returns {Object} Result row
+ */
+function bench(name, fn) {
+  for (let i = 0; i < 10; i++) fn();
+
+  const heapBefore = process.memoryUsage().heapUsed;
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < iterations; i++) {
+    fn();
+  }
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+  return {
+    name,
+    "avg ms": (elapsedMs / iterations).toFixed(3),
+    "MB/s": ((payloadBytes.length * iterations) / 1e6 / (elapsedMs / 1000)).toFixed(1),
+    "heap delta MB": ((process.memoryUsage().heapUsed - heapBefore) / 1e6).toFixed(1),
+  };
+}
+
+const payload = buildPayload(modelCount);
+const payloadBytes = Buffer.from(payload);
+const chunks = [];
+for (let i = 0; i < payloadBytes.length; i += CHUNK_SIZE) {
+  chunks.push(payloadBytes.subarray(i, i + CHUNK_SIZE));
+}
+
+const families = parsePrometheusText(payload).families;
+console.log(
+  `Payload: ${modelCount} models, ${(payloadBytes.length / 1024).toFixed(1)} KiB, ` +
+    `${payload.split("\n").length - 1} lines, ${Object.keys(families).length} families, ` +
+    `${chunks.length} chunks of ${CHUNK_SIZE / 1024} KiB; ${iterations} iterations\n`
+);
+
+const results = [
+  bench("legacy split (labels lost)", () => legacyParse(payloadBytes.toString())),
+  bench("stream parser: whole body", () => parsePrometheusText(payloadBytes.toString())),
+  bench("stream parser: chunked", () => {
+    const parser = new PrometheusStreamParser();
+    for (const chunk of chunks) parser.write(chunk);
+    return parser.end();
+  }),
+];
+
+console.table(results);
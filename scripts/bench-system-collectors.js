@@ -0,0 +1,65 @@
+/**
+ * System Collectors Benchmark
+ * Compares the systeminformation-based collectors with the native /proc + statfs
+ * readers used on Linux. Run with: node scripts/bench-system-collectors.js [iterations]
+ */
+
+import os from "os";
+import si from "systeminformation";
+import {
+  isProcAvailable,
+  readMemory,
+  readCpuTimes,
+  readDiskUsage,
+  closeProcReaders,
+} from "../server/proc-collector.js";
+
+const iterations = parseInt(process.argv[2], 10) || 200;
+const mountPath = process.env.METRICS_DISK_PATH || "/";
+
+/**
+ * Time an async function over N iterations.
+ * @param {string} name - Label
+ * @param {Function} fn - Function to benchmark
+ * @returns {Promise<Object>} Result row
+ */
+async function bench(name, fn) {
+  // Warm up caches and lazy initialization
+  for (let i = 0; i < 5; i++) await fn();
+
+  const cpuStart = process.cpuUsage();
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < iterations; i++) {
+    await fn();
+  }
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+  const cpu = process.cpuUsage(cpuStart);
+
+  return {
+    name,
+    "avg ms": (elapsedMs / iterations).toFixed(3),
+    "cpu us/op": ((cpu.user + cpu.system) / iterations).toFixed(1),
+    "ops/s": Math.round((iterations / elapsedMs) * 1000),
+  };
+}
+
+if (!isProcAvailable()) {
+  console.error("Native collectors require Linux /proc; nothing to compare.");
+  process.exit(1);
+}
+
+console.log(`Benchmarking ${iterations} iterations (disk mount: ${mountPath})...\n`);
+
+const results = [
+  await bench("cpu: os.cpus()", () => os.cpus()),
+  await bench("cpu: /proc/stat", () => readCpuTimes()),
+  await bench("memory: si.mem()", () => si.mem()),
+  await bench("memory: /proc/meminfo", () => readMemory()),
+  await bench("disk: si.fsSize()", () => si.fsSize()),
+  await bench("disk: statfs()", () => readDiskUsage(mountPath)),
+  await bench("tick: systeminformation", () => Promise.all([os.cpus(), si.mem(), si.fsSize()])),
+  await bench("tick: native", () => Promise.all([readCpuTimes(), readMemory(), readDiskUsage(mountPath)])),
+];
+
+console.table(results);
+closeProcReaders();
@@ -17,17 +17,24 @@ import {
   initializeLlamaMetricsScraper,
   collectMetrics,
   initializeLlamaMetricsScraper as initializeLlamaMetrics,
+  getMetricsSnapshot,
+  enableMetricsExport,
 } from "./server/metrics.js";
+import { createPrometheusHandler } from "./server/prometheus-exporter.js";
+import { processMonitor, instrumentSocket } from "./server/event-loop-monitor.js";
 import { setupGracefulShutdown } from "./server/shutdown.js";
 import { DB } from "./server/db/index.js";
 import { registerHandlers } from "./server/handlers.js";
-import { parseGgufMetadata } from "./server/gguf/metadata-parser.js";
+import { parseGgufMetadata as readGgufMetadata } from "./server/gguf/metadata-parser.js";
 import { startLlamaServerRouter } from "./server/handlers/llama-router/index.js";
 import { autoStartLlamaServer } from "./server/server-startup.js";
 
+// GGUF headers are read synchronously; time them like socket handlers
+const parseGgufMetadata = processMonitor.wrap("gguf:parse", readGgufMetadata);
+
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
-const PORT = 3000;
+const PORT = parseInt(process.env.PORT, 10) || 3000;
 
 // Rate limiting state
 const rateLimitStore = new Map();
@@ -65,7 +72,10 @@ async function main() {
   const dataDir = path.join(process.cwd(), "data");
   await fs.promises.mkdir(dataDir, { recursive: true });
 
+  processMonitor.start();
+
   const db = new DB();
+  db.startRetention();
   const app = express();
   const server = http.createServer(app);
   const io = new Server(server, {
@@ -106,12 +116,20 @@ async function main() {
   initializeLlamaMetricsScraper(null, db);
   console.log("[SERVER] Initialized Llama Metrics Scraper.");
 
+  // Registered first so every handler added below is timed
+  io.on("connection", (socket) => instrumentSocket(socket));
+
   console.log("[SERVER] Registering Socket.IO handlers...");
   registerHandlers(io, db, parseGgufMetadata, initializeLlamaMetrics);
   console.log("[SERVER] Socket.IO handlers registered.");
   startMetricsCollection(io, db);
   console.log("[SERVER] Started Metrics Collection.");
 
+  if (process.env.METRICS_ENABLED === "true") {
+    enableMetricsExport(db);
+    app.get("/metrics", createPrometheusHandler(getMetricsSnapshot));
+  }
+
   app.use(express.static(path.join(__dirname, "public")));
   // Serve Socket.IO client from a path that doesn't conflict with Socket.IO server
   app.use(
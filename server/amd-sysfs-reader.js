@@ -0,0 +1,202 @@
+/**
+ * AMD Sysfs Reader - Cached AMD GPU discovery + live readings
+ * Discovery scans /sys/class/drm once and caches device paths, name and VRAM total.
+ * Each tick then only reads the dynamic files: gpu_busy_percent, mem_info_vram_used
+ * and hwmon power/temperature where present.
+ */
+
+import fs from "fs";
+import path from "path";
+
+const AMD_VENDOR_ID = "0x1002";
+
+/**
+ * Read and trim a sysfs file, returning null when missing.
+ * @param {string} filePath - Absolute file path
+ * @returns {Promise<string|null>} File contents or null
+ */
+async function readTrimmed(filePath) {
+  try {
+    return (await fs.promises.readFile(filePath, "utf8")).trim();
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Return the path if it exists, null otherwise.
+ * @param {string} filePath - Path to check
+ * @returns {Promise<string|null>}
+ */
+async function existing(filePath) {
+  try {
+    await fs.promises.access(filePath, fs.constants.R_OK);
+    return filePath;
+  } catch {
+    return null;
+  }
+}
+
+export class AmdSysfsReader {
+  /**
+   * Create a new AmdSysfsReader.
+   * @param {Object} [config] - Reader configuration.
+   * @param {string} [config.drmPath="/sys/class/drm"] - DRM class directory (overridable for tests).
+   */
+  constructor(config = {}) {
+    this.drmPath = config.drmPath || "/sys/class/drm";
+    this.devices = null;
+    this._discovering = null;
+  }
+
+  /**
+   * Discover AMD GPUs once and cache their static info and dynamic file paths.
+   * @returns {Promise<Array<Object>>} Cached device descriptors
+   */
+  async discover() {
+    if (this.devices) return this.devices;
+    if (!this._discovering) {
+      this._discovering = this._scan()
+        .then((devices) => {
+          this.devices = devices;
+          return devices;
+        })
+        .finally(() => {
+          this._discovering = null;
+        });
+    }
+    return this._discovering;
+  }
+
+  /**
+   * Drop the cached discovery so the next read rescans sysfs.
+   */
+  invalidate() {
+    this.devices = null;
+  }
+
+  /**
+   * Read live metrics for every cached AMD GPU.
+   * @returns {Promise<Array<Object>>} GPU objects in the gpu-monitor format
+   */
+  async read() {
+    const devices = await this.discover();
+    const gpus = await Promise.all(devices.map((device) => this._readDevice(device)));
+
+    // A device disappeared (driver reload, hot unplug) - rescan on the next tick
+    if (gpus.some((gpu) => gpu === null)) {
+      this.invalidate();
+    }
+    return gpus.filter(Boolean);
+  }
+
+  /**
+   * Scan the DRM directory for AMD cards.
+   * @returns {Promise<Array<Object>>} Device descriptors
+   */
+  async _scan() {
+    let entries;
+    try {
+      entries = await fs.promises.readdir(this.drmPath);
+    } catch {
+      return [];
+    }
+
+    // Numeric order, so card10 comes after card2
+    const cards = entries
+      .filter((e) => /^card\d+$/.test(e))
+      .sort((a, b) => parseInt(a.slice(4), 10) - parseInt(b.slice(4), 10));
+    const devices = [];
+
+    for (const card of cards) {
+      const devicePath = path.join(this.drmPath, card, "device");
+      const vendor = await readTrimmed(path.join(devicePath, "vendor"));
+      if (vendor !== AMD_VENDOR_ID) continue;
+
+      let name = (await readTrimmed(path.join(devicePath, "product_name")))
+        || (await readTrimmed(path.join(devicePath, "name")));
+      if (!name) {
+        const deviceId = await readTrimmed(path.join(devicePath, "device"));
+        name = deviceId ? `AMD GPU (${deviceId})` : "AMD GPU";
+      }
+
+      const memoryTotal = parseInt(
+        (await readTrimmed(path.join(devicePath, "mem_info_vram_total")))
+          || (await readTrimmed(path.join(devicePath, "memory_total")))
+          || "0",
+        10
+      ) || 0;
+
+      const hwmonPath = await this._findHwmon(devicePath);
+
+      devices.push({
+        index: devices.length,
+        card,
+        name,
+        memoryTotal,
+        devicePath,
+        files: {
+          busy: await existing(path.join(devicePath, "gpu_busy_percent")),
+          vramUsed: await existing(path.join(devicePath, "mem_info_vram_used")),
+          power: hwmonPath
+            ? (await existing(path.join(hwmonPath, "power1_average")))
+              || (await existing(path.join(hwmonPath, "power1_input")))
+            : null,
+          temperature: hwmonPath ? await existing(path.join(hwmonPath, "temp1_input")) : null,
+        },
+      });
+    }
+
+    return devices;
+  }
+
+  /**
+   * Locate the first hwmon directory under a device.
+   * @param {string} devicePath - Device sysfs path
+   * @returns {Promise<string|null>} hwmon path or null
+   */
+  async _findHwmon(devicePath) {
+    try {
+      const entries = await fs.promises.readdir(path.join(devicePath, "hwmon"));
+      const hwmon = entries.filter((e) => e.startsWith("hwmon")).sort()[0];
+      return hwmon ? path.join(devicePath, "hwmon", hwmon) : null;
+    } catch {
+      return null;
+    }
+  }
+
+  /**
+   * Read the dynamic files of one device.
+   * @param {Object} device - Cached device descriptor
+   * @returns {Promise<Object|null>} GPU object, or null if the device vanished
+   */
+  async _readDevice(device) {
+    const { files } = device;
+    const [busy, vramUsed, power, temperature] = await Promise.all([
+      files.busy ? readTrimmed(files.busy) : null,
+      files.vramUsed ? readTrimmed(files.vramUsed) : null,
+      files.power ? readTrimmed(files.power) : null,
+      files.temperature ? readTrimmed(files.temperature) : null,
+    ]);
+
+    // Every file we expected is gone - the device itself went away
+    const expected = Object.values(files).filter(Boolean).length;
+    const got = [busy, vramUsed, power, temperature].filter((v) => v !== null).length;
+    if (expected > 0 && got === 0) return null;
+
+    return {
+      index: device.index,
+      name: device.name,
+      vendor: "AMD",
+      usage: parseFloat(busy) || 0,
+      memoryUsed: parseInt(vramUsed, 10) || 0,
+      memoryTotal: device.memoryTotal,
+      temperature: temperature !== null ? parseInt(temperature, 10) / 1000 : null, // millidegrees C
+      power: power !== null ? parseInt(power, 10) / 1000000 : null, // microwatts
+      hasUtilizationData: files.busy !== null || device.memoryTotal > 0,
+      sysfsPath: device.devicePath,
+    };
+  }
+}
+
+export default AmdSysfsReader;
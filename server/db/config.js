@@ -1,6 +1,6 @@
 /**
  * Config Module
- * Database layer for configuration management with router and logging config support
+ * Database layer for configuration management with router, logging and alert rule support
  */
 
 import pkg from "better-sqlite3";
@@ -37,8 +37,48 @@ export const LOGGING_CONFIG_DEFAULTS = {
   enableFileLogging: true,
   enableDatabaseLogging: true,
   enableConsoleLogging: true,
+  dbMaxRows: 100000,
+  dbMaxAgeDays: 30,
 };
 
+/**
+ * Alert rules seeded into the alert_rules table on first start
+ * (see server/metrics-alerts.js for the rule fields)
+ */
+export const ALERT_RULE_DEFAULTS = [
+  {
+    id: "vram-high",
+    name: "VRAM above 95%",
+    metric: "gpu_memory_percent",
+    type: "threshold",
+    above: 95,
+    clear: 90,
+    for: 3,
+    severity: "critical",
+  },
+  {
+    id: "swap-growing",
+    name: "Swap usage growing",
+    metric: "swap_usage",
+    type: "rising",
+    window: 30,
+    minDelta: 5,
+    severity: "warning",
+  },
+  {
+    id: "tps-drop",
+    name: "Generation speed 50% below baseline",
+    metric: "llama_generation_tps",
+    type: "drop",
+    ratio: 0.5,
+    alpha: 0.05,
+    warmup: 30,
+    minBaseline: 1,
+    for: 5,
+    severity: "warning",
+  },
+];
+
 /**
  * Default server configuration (legacy format)
  */
@@ -214,6 +254,32 @@ export function saveLoggingConfig(db, config) {
   }
 }
 
+/**
+ * Get the retention limits for the logs table
+ * LOGS_DB_MAX_ROWS / LOGS_DB_MAX_AGE_DAYS override the logging config; 0 disables a limit.
+ * Read by the retention timer, so it stays quiet when logging_config does not exist.
+ * @param {Object} db - Database instance (raw or wrapper)
+ * @returns {Object} { maxRows, maxAgeDays }
+ */
+export function getLogRetention(db) {
+  let config = LOGGING_CONFIG_DEFAULTS;
+  try {
+    const result = getDb(db).prepare("SELECT value FROM logging_config WHERE key = ?").get("config");
+    if (result) config = { ...LOGGING_CONFIG_DEFAULTS, ...JSON.parse(result.value) };
+  } catch (error) {
+    // No logging_config table yet: defaults apply
+  }
+
+  const fromEnv = (name, fallback) => {
+    const value = parseInt(process.env[name], 10);
+    return Number.isNaN(value) || value < 0 ? fallback : value;
+  };
+  return {
+    maxRows: fromEnv("LOGS_DB_MAX_ROWS", Number(config.dbMaxRows) || 0),
+    maxAgeDays: fromEnv("LOGS_DB_MAX_AGE_DAYS", Number(config.dbMaxAgeDays) || 0),
+  };
+}
+
 /**
  * Reset logging configuration to defaults
  * @param {Object} db - Database instance (raw or wrapper)
@@ -232,6 +298,86 @@ export function resetLoggingConfig(db) {
   }
 }
 
+/**
+ * Get all alert rules
+ * @param {Object} db - Database instance (raw or wrapper)
+ * @returns {Array<Object>} Rules ordered by id; empty on error
+ */
+export function getAlertRules(db) {
+  const database = getDb(db);
+  try {
+    return database
+      .prepare("SELECT id, value FROM alert_rules ORDER BY id")
+      .all()
+      .map((row) => ({ ...JSON.parse(row.value), id: row.id }));
+  } catch (error) {
+    console.error("[DEBUG] Error getting alert rules:", error.message);
+    return [];
+  }
+}
+
+/**
+ * Create or replace an alert rule
+ * @param {Object} db - Database instance (raw or wrapper)
+ * @param {Object} rule - Rule with an id
+ * @returns {Object} Saved rule
+ */
+export function saveAlertRule(db, rule) {
+  const database = getDb(db);
+  if (!rule?.id) {
+    throw new Error("Alert rule needs an id");
+  }
+  const { id, ...value } = rule;
+  database
+    .prepare("INSERT OR REPLACE INTO alert_rules (id, value, updated_at) VALUES (?, ?, ?)")
+    .run(id, JSON.stringify(value), getTimestamp());
+  console.log(`[DEBUG] Alert rule saved: ${id}`);
+  return { ...value, id };
+}
+
+/**
+ * Delete an alert rule
+ * @param {Object} db - Database instance (raw or wrapper)
+ * @param {string} id - Rule id
+ * @returns {boolean} True if the rule existed
+ */
+export function deleteAlertRule(db, id) {
+  const database = getDb(db);
+  return database.prepare("DELETE FROM alert_rules WHERE id = ?").run(id).changes > 0;
+}
+
+/**
+ * Seed the default alert rules once per database
+ * Recorded in metadata so rules the user deleted are not brought back
+ * @param {Object} db - Database instance (raw or wrapper)
+ * @returns {number} Number of rules inserted
+ */
+export function seedAlertRules(db) {
+  const database = getDb(db);
+  try {
+    const seeded = database.prepare("SELECT 1 FROM metadata WHERE key = ?").get("alert_rules_seeded");
+    if (seeded) return 0;
+
+    const insert = database.prepare(
+      "INSERT OR IGNORE INTO alert_rules (id, value, updated_at) VALUES (?, ?, ?)"
+    );
+    const timestamp = getTimestamp();
+    let inserted = 0;
+    database.transaction(() => {
+      for (const { id, ...value } of ALERT_RULE_DEFAULTS) {
+        inserted += insert.run(id, JSON.stringify(value), timestamp).changes;
+      }
+      database
+        .prepare("INSERT OR REPLACE INTO metadata (key, value, updated_at) VALUES (?, ?, ?)")
+        .run("alert_rules_seeded", "1", timestamp);
+    })();
+    return inserted;
+  } catch (error) {
+    console.warn("[DB] Failed to seed alert rules:", error.message);
+    return 0;
+  }
+}
+
 /**
  * Get legacy server configuration (for backward compatibility)
  * @param {Database} db - Better-sqlite3 database instance
@@ -330,6 +476,13 @@ export default {
   getLoggingConfig,
   saveLoggingConfig,
   resetLoggingConfig,
+  getLogRetention,
+
+  // Alert rules
+  getAlertRules,
+  saveAlertRule,
+  deleteAlertRule,
+  seedAlertRules,
 
   // Legacy compatibility functions
   getConfig,
@@ -340,4 +493,5 @@ export default {
   // Constants
   ROUTER_CONFIG_DEFAULTS,
   LOGGING_CONFIG_DEFAULTS,
+  ALERT_RULE_DEFAULTS,
 };
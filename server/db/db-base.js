@@ -3,13 +3,19 @@
  * Handles initialization and composes all repositories
  */
 
+import fs from "fs";
 import path from "path";
 import { fileURLToPath } from "url";
 import DatabasePackage from "better-sqlite3";
 
 import { initSchema, runAllMigrations } from "./schema.js";
+import { seedAlertRules, getLogRetention } from "./config.js";
+import { installStatementCache } from "./statement-cache.js";
+import { WriteQueue } from "./write-queue.js";
+import { RetentionScheduler } from "./retention.js";
+import { installDBWorker } from "./db-worker-client.js";
 import { ModelsRepository } from "./models-repository.js";
-import { MetricsRepository } from "./metrics-repository.js";
+import { MetricsRepository, METRICS_MAX_ROWS } from "./metrics-repository.js";
 import { LogsRepository } from "./logs-repository.js";
 import { ConfigRepository } from "./config-repository.js";
 import { MetadataRepository } from "./metadata-repository.js";
@@ -18,20 +24,221 @@ const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 const Database = DatabasePackage;
 
+/**
+ * Default connection pragmas
+ * WAL lets the dashboard read history while the sampler writes, and with WAL
+ * synchronous=NORMAL only risks the last transactions on power loss (never
+ * corruption). mmap and a 16 MB page cache keep range queries off read().
+ */
+export const DB_PRAGMA_DEFAULTS = {
+  journal_mode: "WAL",
+  synchronous: "NORMAL",
+  mmap_size: 268435456, // 256 MB
+  cache_size: -16000, // Negative: KiB, i.e. ~16 MB
+  temp_store: "MEMORY",
+};
+
+// Environment variable per pragma
+const PRAGMA_ENV = {
+  journal_mode: "DB_JOURNAL_MODE",
+  synchronous: "DB_SYNCHRONOUS",
+  mmap_size: "DB_MMAP_SIZE",
+  cache_size: "DB_CACHE_SIZE",
+  temp_store: "DB_TEMP_STORE",
+};
+
+// Accepted values; numeric pragmas take any integer
+const PRAGMA_VALUES = {
+  journal_mode: ["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"],
+  synchronous: ["OFF", "NORMAL", "FULL", "EXTRA"],
+  temp_store: ["DEFAULT", "FILE", "MEMORY"],
+};
+
+/**
+ * Resolve connection pragmas: defaults, then DB_* environment variables, then
+ * explicit options. Invalid values are ignored with a warning.
+ * @param {Object} [overrides] - Pragma values keyed by pragma name
+ * @returns {Object} Pragma values keyed by pragma name
+ */
+export function resolvePragmas(overrides = {}) {
+  const pragmas = { ...DB_PRAGMA_DEFAULTS };
+  const candidates = [];
+  for (const [name, envVar] of Object.entries(PRAGMA_ENV)) {
+    if (process.env[envVar] !== undefined && process.env[envVar] !== "") {
+      candidates.push([name, process.env[envVar], envVar]);
+    }
+  }
+  for (const [name, value] of Object.entries(overrides)) {
+    candidates.push([name, value, name]);
+  }
+
+  for (const [name, value, origin] of candidates) {
+    if (!(name in DB_PRAGMA_DEFAULTS)) {
+      console.warn(`[DB] Ignoring unknown pragma ${name}`);
+      continue;
+    }
+    if (PRAGMA_VALUES[name]) {
+      const upper = String(value).toUpperCase();
+      if (PRAGMA_VALUES[name].includes(upper)) {
+        pragmas[name] = upper;
+        continue;
+      }
+    } else if (/^-?\d+$/.test(String(value).trim())) {
+      pragmas[name] = parseInt(value, 10);
+      continue;
+    }
+    console.warn(`[DB] Ignoring invalid ${origin}=${value}`);
+  }
+  return pragmas;
+}
+
+/**
+ * Apply connection pragmas
+ * @param {Object} db - Better-sqlite3 database instance
+ * @param {Object} pragmas - Pragma values from resolvePragmas()
+ */
+export function applyPragmas(db, pragmas) {
+  for (const [name, value] of Object.entries(pragmas)) {
+    try {
+      db.pragma(`${name} = ${value}`);
+    } catch (e) {
+      console.warn(`[DB] Failed to set ${name}:`, e.message);
+    }
+  }
+}
+
+// Rows deleted per retention chunk, and free pages returned per incremental vacuum
+const RETENTION_CHUNK_ROWS = 1000;
+const VACUUM_PAGES = 2048; // 8 MB at the default 4 KB page size
+
+/**
+ * Raw metrics rows kept by the retention scheduler
+ * @returns {number} METRICS_DB_MAX_ROWS, or METRICS_MAX_ROWS when unset (0 = no cap)
+ */
+function resolveMetricsMaxRows() {
+  const value = parseInt(process.env.METRICS_DB_MAX_ROWS, 10);
+  return value >= 0 ? value : METRICS_MAX_ROWS;
+}
+
+/**
+ * Switch the database to auto_vacuum=INCREMENTAL
+ * Takes effect immediately on a new file. An existing file needs one full
+ * VACUUM to convert, which rewrites the whole database and blocks startup
+ * while it runs, so it is only done when asked for (DB_CONVERT_AUTO_VACUUM=true)
+ * and when the disk has room for it. Unconverted files keep working; freed
+ * pages are reused but not returned to the file system.
+ * @param {Object} db - Better-sqlite3 database instance
+ * @param {Object} [options] - Conversion options
+ * @param {boolean} [options.convert] - Convert an existing file
+ *   (default: DB_CONVERT_AUTO_VACUUM === "true")
+ * @param {string} [options.dbPath] - Database file, for the free space check
+ * @returns {boolean} Whether the database now uses incremental auto-vacuum
+ */
+export function enableIncrementalVacuum(db, options = {}) {
+  const { convert = process.env.DB_CONVERT_AUTO_VACUUM === "true", dbPath } = options;
+  try {
+    if (db.pragma("auto_vacuum", { simple: true }) === 2) return true;
+    db.pragma("auto_vacuum = INCREMENTAL");
+    const hasTables = db.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").get();
+    if (!hasTables) return true;
+
+    if (!convert) {
+      console.log(
+        "[DB] Database does not use incremental auto-vacuum; set DB_CONVERT_AUTO_VACUUM=true " +
+          "to convert it on the next start (one-time full VACUUM)"
+      );
+      return false;
+    }
+
+    const size = db.pragma("page_count", { simple: true }) * db.pragma("page_size", { simple: true });
+    const free = freeDiskSpace(dbPath);
+    // VACUUM writes a full copy of the database before replacing it
+    if (free !== null && free < 2 * size) {
+      console.warn(
+        `[DB] Skipping auto-vacuum conversion: ${formatMB(free)} free, ` +
+          `${formatMB(2 * size)} needed for a ${formatMB(size)} database`
+      );
+      return false;
+    }
+
+    console.log(`[DB] Converting ${formatMB(size)} database to incremental auto-vacuum (full VACUUM)...`);
+    const started = Date.now();
+    db.exec("VACUUM");
+    console.log(`[DB] Converted database to incremental auto-vacuum in ${Date.now() - started}ms`);
+    return true;
+  } catch (e) {
+    console.warn("[DB] Could not enable incremental vacuum:", e.message);
+    return false;
+  }
+}
+
+/**
+ * Free space available to this process on the database's file system
+ * @param {string} [dbPath] - Database file
+ * @returns {number|null} Bytes, or null when unknown (in-memory database, no statfs)
+ */
+function freeDiskSpace(dbPath) {
+  if (!dbPath || dbPath === ":memory:" || typeof fs.statfsSync !== "function") return null;
+  try {
+    const stats = fs.statfsSync(path.dirname(path.resolve(dbPath)));
+    return stats.bavail * stats.bsize;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Format a byte count for log lines
+ * @param {number} bytes - Size in bytes
+ * @returns {string} Size in MB
+ */
+function formatMB(bytes) {
+  return `${(bytes / 1048576).toFixed(1)} MB`;
+}
+
+/**
+ * Return up to `pages` free pages to the file system
+ * @param {Object} db - Better-sqlite3 database instance
+ * @param {number} [pages] - Max pages released per call
+ * @returns {number} Pages released
+ */
+export function incrementalVacuum(db, pages = VACUUM_PAGES) {
+  const free = db.pragma("freelist_count", { simple: true });
+  if (!free) return 0;
+  db.pragma(`incremental_vacuum(${Math.min(free, pages)})`);
+  return free - db.pragma("freelist_count", { simple: true });
+}
+
 /**
  * Base DB class - initializes schema and repositories
  */
 export class DBBase {
   /**
    * @param {string} dbPath - Database file path
+   * @param {Object} [options] - Connection options
+   * @param {Object} [options.pragmas] - Pragma overrides (see DB_PRAGMA_DEFAULTS)
+   * @param {boolean} [options.statementCache=true] - Share prepared statements across repositories
+   * @param {Object|boolean} [options.writeBehind] - WriteQueue options for metrics and log
+   *   inserts, or false to write each row immediately
+   * @param {Object} [options.retention] - RetentionScheduler options
+   * @param {boolean} [options.worker] - Run the heavy methods on a worker thread
+   *   (default: DB_WORKER === "true"); those methods then return promises
    */
-  constructor(dbPath) {
+  constructor(dbPath, options = {}) {
     this.dbPath = dbPath || path.join(process.cwd(), "data", "llama-dashboard.db");
     this.db = new Database(this.dbPath);
+    // auto_vacuum first: on a new file it only applies before anything is written
+    enableIncrementalVacuum(this.db, { dbPath: this.dbPath });
+    this.pragmas = resolvePragmas(options.pragmas);
+    applyPragmas(this.db, this.pragmas);
+
+    // Every repository gets the same connection, so they all share the cache
+    this.statements = options.statementCache === false ? null : installStatementCache(this.db);
 
     // Initialize schema and run migrations
     initSchema(this.db);
     runAllMigrations(this.db);
+    seedAlertRules(this.db);
 
     // Initialize repositories
     this.models = new ModelsRepository(this.db);
@@ -39,6 +246,54 @@ export class DBBase {
     this.logs = new LogsRepository(this.db);
     this.config = new ConfigRepository(this.db);
     this.meta = new MetadataRepository(this.db);
+
+    // Metrics rows and log lines are committed in batches (see write-queue.js)
+    this.writes =
+      options.writeBehind === false
+        ? null
+        : new WriteQueue({
+            ...options.writeBehind,
+            db: this.db,
+            handlers: {
+              metrics: (m, gpus) => this.metrics.save(m, gpus),
+              log: (level, msg, source) => this.logs.add(level, msg, source),
+            },
+          });
+
+    // Chunked retention and incremental vacuum; started with startRetention()
+    this.retention = new RetentionScheduler(options.retention);
+    this.retention.addJob("logs", () => {
+      const limits = { ...getLogRetention(this.db), chunkSize: RETENTION_CHUNK_ROWS };
+      return limits.maxRows || limits.maxAgeDays ? () => this.logs.pruneChunk(limits) : null;
+    });
+    // Raw metrics row cap: the watermark is taken once per run, so rows
+    // written while the run is in progress are never touched by it
+    this.retention.addJob("metrics", () => {
+      const keep = resolveMetricsMaxRows();
+      if (!keep) return null;
+      this.writes?.flush();
+      const watermark = this.metrics.getPruneWatermark(keep);
+      return () => this.metrics.pruneChunk(watermark, RETENTION_CHUNK_ROWS);
+    });
+    // Age-based retention of the raw, 1m and 1h tiers; the cutoffs are taken
+    // once per run, so a large backlog is cleared in bounded chunks too
+    this.retention.addJob("metrics-tiers", () => {
+      this.writes?.flush();
+      const now = Math.floor(Date.now() / 1000);
+      return () => this.metrics.pruneTiersChunk(now, RETENTION_CHUNK_ROWS);
+    });
+    this.retention.addMaintenance("vacuum", () => incrementalVacuum(this.db));
+
+    // Heavy reads and model writes on a second connection (see db-worker-client.js)
+    const useWorker = options.worker ?? process.env.DB_WORKER === "true";
+    this.worker = useWorker ? installDBWorker(this) : null;
+  }
+
+  /**
+   * Start enforcing retention in the background
+   */
+  startRetention() {
+    this.retention.start();
   }
 }
 
@@ -0,0 +1,184 @@
+/**
+ * DB Worker Client - Main-thread side of the database worker
+ * better-sqlite3 is synchronous, so a large logs:get, a metrics history read
+ * or a models:scan full of upserts blocks Socket.IO for as long as it runs.
+ * installDBWorker() replaces the DB methods in WORKER_METHODS with async
+ * methods of the same name that run on a second connection in db-worker.js;
+ * WAL lets that connection read while the main thread keeps writing metrics.
+ * Everything else (config, metadata, write-behind inserts, retention) stays
+ * on the main thread. Enabled with DB_WORKER=true.
+ */
+
+import { Worker, MessageChannel } from "worker_threads";
+
+const WORKER_URL = new URL("./db-worker.js", import.meta.url);
+const REQUEST_TIMEOUT = 30000;
+const STOP_TIMEOUT = 2000;
+
+/**
+ * DB methods run on the worker; callers must await them
+ */
+export const WORKER_METHODS = [
+  "getModels",
+  "getModel",
+  "saveModel",
+  "updateModel",
+  "deleteModel",
+  "cleanupMissingFiles",
+  "getMetricsHistory",
+  "getMetricsHistoryRange",
+  "getMetricsRange",
+  "getGpuMetricsHistory",
+  "getLatestMetrics",
+  "getLogs",
+  "searchLogs",
+  "clearLogs",
+];
+
+// Methods touching the tables fed by the main thread's write-behind queue
+const FLUSH_FIRST = new Set([
+  "getMetricsHistory",
+  "getMetricsHistoryRange",
+  "getMetricsRange",
+  "getGpuMetricsHistory",
+  "getLatestMetrics",
+  "getLogs",
+  "searchLogs",
+  "clearLogs",
+]);
+
+export class DBWorkerClient {
+  /**
+   * @param {Object} config - Client configuration
+   * @param {string} config.dbPath - Database file opened by the worker
+   * @param {Object} [config.pragmas] - Connection pragmas (see DB_PRAGMA_DEFAULTS)
+   * @param {URL|string} [config.workerUrl] - Worker entry point
+   * @param {number} [config.timeout=30000] - Reply timeout per call (ms)
+   */
+  constructor(config) {
+    this.dbPath = config.dbPath;
+    this.pragmas = config.pragmas;
+    this.workerUrl = config.workerUrl || WORKER_URL;
+    this.timeout = config.timeout || REQUEST_TIMEOUT;
+
+    this.worker = null;
+    this.port = null;
+    this.pending = new Map(); // id -> { resolve, reject, timer }
+    this.nextId = 1;
+  }
+
+  /**
+   * Run a DB method on the worker.
+   * @param {string} method - DB method name
+   * @param {Array} [args] - Method arguments (structured-clonable)
+   * @returns {Promise<*>} Method result
+   */
+  call(method, args = []) {
+    this._ensureWorker();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`DB worker did not answer ${method} within ${this.timeout}ms`));
+      }, this.timeout);
+      timer.unref();
+      this.pending.set(id, { resolve, reject, timer });
+      this.port.postMessage({ type: "call", id, method, args });
+    });
+  }
+
+  /**
+   * Close the worker's connection and stop it. It is terminated if it has
+   * not exited after a moment (e.g. stuck in a long query).
+   */
+  stop() {
+    if (!this.worker) return;
+
+    const { worker, port } = this;
+    this._reset(new Error("DB worker stopped"));
+    port.postMessage({ type: "stop" });
+    setTimeout(() => worker.terminate().catch(() => {}), STOP_TIMEOUT).unref();
+  }
+
+  /**
+   * Start the worker if it is not running.
+   */
+  _ensureWorker() {
+    if (this.worker) return;
+
+    const { port1, port2 } = new MessageChannel();
+    const worker = new Worker(this.workerUrl, {
+      workerData: { port: port2, dbPath: this.dbPath, pragmas: this.pragmas },
+      transferList: [port2],
+    });
+    // Neither the worker nor its port may keep the process alive
+    worker.unref();
+    port1.unref();
+
+    port1.on("message", (message) => this._onMessage(message));
+    worker.on("error", (e) => {
+      console.error("[DB] DB worker failed:", e.message);
+      if (this.worker === worker) this._reset(e);
+    });
+    worker.on("exit", (code) => {
+      if (this.worker === worker) this._reset(new Error(`DB worker exited with code ${code}`));
+    });
+
+    this.worker = worker;
+    this.port = port1;
+    console.log("[DB] DB worker started");
+  }
+
+  /**
+   * Settle the pending call a reply belongs to.
+   * @param {Object} message - Reply from the worker
+   */
+  _onMessage(message) {
+    const request = this.pending.get(message.id);
+    if (!request) return;
+
+    this.pending.delete(message.id);
+    clearTimeout(request.timer);
+    if (message.error) request.reject(new Error(message.error));
+    else request.resolve(message.result);
+  }
+
+  /**
+   * Forget the worker and fail everything still waiting on it.
+   * The next call starts a new worker.
+   * @param {Error} error - Reason given to pending calls
+   */
+  _reset(error) {
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(error);
+    }
+    this.pending.clear();
+    this.worker = null;
+    this.port = null;
+  }
+}
+
+/**
+ * Move a DB's heavy methods to a worker thread
+ * Each method in WORKER_METHODS is replaced on the instance by an async
+ * method of the same name. Queued metrics and log rows are committed first,
+ * so the worker sees everything written before the call.
+ * @param {Object} db - DB instance
+ * @param {Object} [options] - DBWorkerClient options besides dbPath
+ * @returns {DBWorkerClient} The installed client
+ */
+export function installDBWorker(db, options = {}) {
+  const client = new DBWorkerClient({ dbPath: db.dbPath, pragmas: db.pragmas, ...options });
+  for (const method of WORKER_METHODS) {
+    const flush = FLUSH_FIRST.has(method);
+    db[method] = (...args) => {
+      if (flush) db.flushWrites();
+      return client.call(method, args);
+    };
+  }
+  return client;
+}
+
+export default DBWorkerClient;
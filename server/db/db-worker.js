@@ -0,0 +1,35 @@
+/**
+ * DB Worker - Runs the heavy database calls off the main event loop
+ * Opens its own connection to the database file and answers the calls
+ * db-worker-client.js forwards over the MessagePort handed in through
+ * workerData: each request carries an id, a DB method name and its arguments
+ * and gets exactly one reply with the result or the error message.
+ */
+
+import { workerData } from "worker_threads";
+import { DB } from "./index.js";
+
+const { port, dbPath, pragmas } = workerData;
+
+// Inserts, retention and the worker itself stay with the main thread's connection
+const db = new DB(dbPath, { pragmas, writeBehind: false, worker: false });
+
+port.on("message", (message) => {
+  const { id, type } = message;
+  try {
+    switch (type) {
+      case "call":
+        port.postMessage({ id, result: db[message.method](...message.args) });
+        break;
+      case "stop":
+        db.close();
+        port.close();
+        break;
+      default:
+        throw new Error(`Unknown message type: ${type}`);
+    }
+  } catch (e) {
+    if (id !== undefined) port.postMessage({ id, error: e.message });
+    else console.error(`[DB-WORKER] ${type} failed:`, e.message);
+  }
+});
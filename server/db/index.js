@@ -4,6 +4,14 @@
  *
  * This module composes all repositories and provides a unified API.
  * Replaces the monolithic server/db.js file.
+ *
+ * saveMetrics() and addLog() go through the write-behind queue; every method
+ * reading or deleting metrics or logs flushes it first, so callers always see
+ * their own writes.
+ *
+ * With DB_WORKER=true the heavy methods (see WORKER_METHODS in
+ * db-worker-client.js) run on a worker thread and return promises, so
+ * callers await them in both modes.
  */
 
 import { DBBase } from "./db-base.js";
@@ -76,11 +84,13 @@ class DB extends DBBase {
   // ==================== Metrics (delegate to repository) ====================
 
   /**
-   * Save metrics
+   * Save metrics (queued; committed with the next batch)
    * @param {Object} m
+   * @param {Array<Object>} [gpus] - Per-GPU rows written in the same transaction
    */
-  saveMetrics(m) {
-    this.metrics.save(m);
+  saveMetrics(m, gpus = []) {
+    if (this.writes) this.writes.push("metrics", m, gpus);
+    else this.metrics.save(m, gpus);
   }
 
   /**
@@ -89,14 +99,53 @@ class DB extends DBBase {
    * @returns {Array}
    */
   getMetricsHistory(limit = 100) {
+    this.flushWrites();
     return this.metrics.getHistory(limit);
   }
 
+  /**
+   * Get metrics for a time range from the coarsest satisfying tier
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} points - Minimum number of points wanted
+   * @returns {Object} { tier, rows }
+   */
+  getMetricsHistoryRange(from, to, points = 60) {
+    this.flushWrites();
+    return this.metrics.getHistoryRange(from, to, points);
+  }
+
+  /**
+   * Aggregate metrics into step-second buckets with min/avg/max
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} step - Bucket width in seconds
+   * @returns {Object} { tier, step, rows }
+   */
+  getMetricsRange(from, to, step) {
+    this.flushWrites();
+    return this.metrics.getRange(from, to, step);
+  }
+
+  /**
+   * Aggregate one GPU's readings into step-second buckets
+   * @param {number} gpuIndex - GPU index
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} step - Bucket width in seconds
+   * @returns {Object} { step, rows }
+   */
+  getGpuMetricsHistory(gpuIndex, from, to, step) {
+    this.flushWrites();
+    return this.metrics.getGpuHistory(gpuIndex, from, to, step);
+  }
+
   /**
    * Get latest metrics
    * @returns {Object|null}
    */
   getLatestMetrics() {
+    this.flushWrites();
     return this.metrics.getLatest();
   }
 
@@ -106,9 +155,19 @@ class DB extends DBBase {
    * @returns {number}
    */
   pruneMetrics(maxRecords = 10000) {
+    this.flushWrites();
     return this.metrics.prune(maxRecords);
   }
 
+  /**
+   * Prune each metrics tier (raw, 1m, 1h) by its own retention
+   * @returns {Object}
+   */
+  pruneMetricsTiers() {
+    this.flushWrites();
+    return this.metrics.pruneTiers();
+  }
+
   // ==================== Logs (delegate to repository) ====================
 
   /**
@@ -117,17 +176,29 @@ class DB extends DBBase {
    * @returns {Array}
    */
   getLogs(limit = 100) {
+    this.flushWrites();
     return this.logs.getAll(limit);
   }
 
   /**
-   * Add a log entry
+   * Search logs (full text, filters, pagination)
+   * @param {Object} options - See LogsRepository.search()
+   * @returns {Object} { hits, hasMore }
+   */
+  searchLogs(options = {}) {
+    this.flushWrites();
+    return this.logs.search(options);
+  }
+
+  /**
+   * Add a log entry (queued; committed with the next batch)
    * @param {string} level
    * @param {string} msg
    * @param {string} source
    */
   addLog(level, msg, source = "server") {
-    this.logs.add(level, msg, source);
+    if (this.writes) this.writes.push("log", level, msg, source);
+    else this.logs.add(level, msg, source);
   }
 
   /**
@@ -135,6 +206,7 @@ class DB extends DBBase {
    * @returns {number}
    */
   clearLogs() {
+    this.flushWrites();
     return this.logs.clear();
   }
 
@@ -156,6 +228,26 @@ class DB extends DBBase {
     this.config.save(c);
   }
 
+  // ==================== Write-behind queue ====================
+
+  /**
+   * Commit queued metrics and log rows now
+   * @returns {number} Rows written
+   */
+  flushWrites() {
+    return this.writes ? this.writes.flush() : 0;
+  }
+
+  /**
+   * Flush queued writes, stop the worker and close the database
+   */
+  close() {
+    this.retention.stop();
+    this.worker?.stop();
+    this.writes?.close();
+    this.db.close();
+  }
+
   // ==================== Metadata (delegate to repository) ====================
 
   /**
@@ -1,8 +1,40 @@
 /**
  * Logs Repository
- * Handles log entries CRUD operations
+ * Handles log entries CRUD operations and full-text search (logs_fts)
  */
 
+// Page size bounds for search()
+const DEFAULT_SEARCH_LIMIT = 50;
+const MAX_SEARCH_LIMIT = 500;
+
+/**
+ * Marks around matched terms in search snippets
+ * Plain characters rather than HTML, so clients escape the snippet as usual
+ * and split on these to highlight.
+ */
+export const SNIPPET_MARKS = ["\u00ab", "\u00bb"]; // « »
+
+/**
+ * Turn free text into an FTS5 query
+ * Each whitespace-separated term is quoted, so operators and punctuation in
+ * log text (e.g. "[ERROR]", "-ngl", "AND") never cause syntax errors; terms
+ * must all match. A trailing * keeps its prefix meaning ("cuda*").
+ * @param {string} text - Search text
+ * @returns {string} FTS5 MATCH expression, empty when there are no terms
+ */
+export function toFtsQuery(text) {
+  return String(text ?? "")
+    .trim()
+    .split(/\s+/)
+    .map((term) => {
+      const prefix = term.length > 1 && term.endsWith("*");
+      const word = (prefix ? term.slice(0, -1) : term).replace(/"/g, '""');
+      return word && word !== "*" ? `"${word}"${prefix ? "*" : ""}` : "";
+    })
+    .filter(Boolean)
+    .join(" ");
+}
+
 export class LogsRepository {
   /**
    * @param {Object} db - Better-sqlite3 database instance
@@ -56,6 +88,91 @@ export class LogsRepository {
     return logs;
   }
 
+  /**
+   * Delete one chunk of logs past the retention limits
+   * Works on the id range [MIN(id), MIN(id) + chunkSize) so each call touches
+   * at most chunkSize rows through the rowid. Ids and timestamps both grow,
+   * so the oldest chunk is the only one that can hold expired rows.
+   * @param {Object} retention - Retention limits
+   * @param {number} [retention.maxRows] - Rows kept (0 = unlimited)
+   * @param {number} [retention.maxAgeDays] - Days kept (0 = unlimited)
+   * @param {number} [retention.chunkSize=1000] - Max rows deleted per call
+   * @param {number} [now] - Current time (epoch seconds)
+   * @returns {number} Rows deleted (0 when nothing is past the limits)
+   */
+  pruneChunk({ maxRows = 0, maxAgeDays = 0, chunkSize = 1000 }, now = Math.floor(Date.now() / 1000)) {
+    const range = this.db.prepare("SELECT MIN(id) AS minId, MAX(id) AS maxId FROM logs").get();
+    if (!range || range.minId === null) return 0;
+
+    const end = range.minId + chunkSize;
+    // First id kept by the row limit, and the age cutoff; disabled limits never match
+    const keepFrom = maxRows > 0 ? range.maxId - maxRows + 1 : range.minId;
+    const cutoff = maxAgeDays > 0 ? now - maxAgeDays * 86400 : 0;
+    if (keepFrom <= range.minId && cutoff === 0) return 0;
+
+    return this.db
+      .prepare("DELETE FROM logs WHERE id < ? AND (id < ? OR timestamp < ?)")
+      .run(end, keepFrom, cutoff).changes;
+  }
+
+  /**
+   * Search logs
+   * With a query, hits come from the logs_fts index ranked by bm25 (best
+   * first) with a snippet around the matched terms; without one, the newest
+   * logs matching the filters are returned. One extra row is read to tell
+   * whether another page exists, so no COUNT(*) runs over large result sets.
+   * @param {Object} [options] - Search options
+   * @param {string} [options.query] - Free text (see toFtsQuery)
+   * @param {string} [options.level] - Exact level (e.g. "error")
+   * @param {string} [options.source] - Exact source (e.g. "llama-server")
+   * @param {number} [options.from] - Oldest timestamp (epoch seconds)
+   * @param {number} [options.to] - Newest timestamp (epoch seconds)
+   * @param {number} [options.limit=50] - Page size (max 500)
+   * @param {number} [options.offset=0] - Rows skipped
+   * @returns {Object} { hits, hasMore } with hits { id, level, message, source, timestamp, snippet, rank }
+   */
+  search({ query, level, source, from, to, limit = DEFAULT_SEARCH_LIMIT, offset = 0 } = {}) {
+    limit = Math.min(Math.max(Math.floor(limit) || DEFAULT_SEARCH_LIMIT, 1), MAX_SEARCH_LIMIT);
+    offset = Math.max(Math.floor(offset) || 0, 0);
+
+    const conditions = [];
+    const params = [];
+    const match = toFtsQuery(query);
+    if (match) {
+      conditions.push("logs_fts MATCH ?");
+      params.push(match);
+    }
+    for (const [clause, value] of [
+      ["l.level = ?", level],
+      ["l.source = ?", source],
+      ["l.timestamp >= ?", from],
+      ["l.timestamp <= ?", to],
+    ]) {
+      if (value !== undefined && value !== null && value !== "") {
+        conditions.push(clause);
+        params.push(value);
+      }
+    }
+    const where = conditions.length ? `WHERE ${conditions.join(" AND ")}` : "";
+
+    const sql = match
+      ? `SELECT l.id, l.level, l.message, l.source, l.timestamp,
+           snippet(logs_fts, 0, ?, ?, '...', 16) AS snippet, bm25(logs_fts) AS rank
+         FROM logs_fts JOIN logs l ON l.id = logs_fts.rowid
+         ${where}
+         ORDER BY rank, l.id DESC LIMIT ? OFFSET ?`
+      : `SELECT l.id, l.level, l.message, l.source, l.timestamp,
+           l.message AS snippet, NULL AS rank
+         FROM logs l
+         ${where}
+         ORDER BY l.id DESC LIMIT ? OFFSET ?`;
+    const rows = this.db
+      .prepare(sql)
+      .all(...(match ? SNIPPET_MARKS : []), ...params, limit + 1, offset);
+
+    return { hits: rows.slice(0, limit), hasMore: rows.length > limit };
+  }
+
   /**
    * Clear all logs
    * @returns {number} Number of logs cleared
@@ -1,38 +1,371 @@
 /**
  * Metrics Repository
- * Handles metrics CRUD operations and pruning
+ * Handles metrics CRUD operations, rollup tiers and pruning
+ * Per-GPU readings live in the narrow gpu_metrics table and follow the raw tier's retention
  */
 
+import { METRICS_ROLLUP_FIELDS, getMetricsRollupTiers } from "./schema.js";
+
+/**
+ * Retention per tier in seconds
+ */
+export const METRICS_RETENTION = {
+  raw: 24 * 3600, // 1 day at full resolution
+  "1m": 14 * 24 * 3600, // 2 weeks of per-minute rollups
+  "1h": 365 * 24 * 3600, // 1 year of per-hour rollups
+};
+
+// Raw rows kept regardless of age (~1 day at the 1s minimum interval)
+export const METRICS_MAX_ROWS = 100000;
+
+// Raw samples arrive every 2s by default (see server/metrics.js)
+const RAW_RESOLUTION = 2;
+
+// Upper bound on buckets returned by getRange(), roughly a 4K screen width
+export const MAX_RANGE_BUCKETS = 4000;
+
+const ROLLUP_COLUMNS = METRICS_ROLLUP_FIELDS.map((f) => `${f}_min, ${f}_avg, ${f}_max`).join(", ");
+const ROLLUP_PLACEHOLDERS = METRICS_ROLLUP_FIELDS.map(() => "?, ?, ?").join(", ");
+// Running min/avg/max: every SET expression sees the row's old values
+const ROLLUP_UPDATES = METRICS_ROLLUP_FIELDS.map(
+  (f) => `${f}_min = MIN(${f}_min, excluded.${f}_min),
+      ${f}_avg = ${f}_avg + (excluded.${f}_avg - ${f}_avg) / (samples + 1),
+      ${f}_max = MAX(${f}_max, excluded.${f}_max)`
+).join(",\n      ");
+const ROLLUP_SELECT = METRICS_ROLLUP_FIELDS.map(
+  (f) => `${f}_avg AS ${f}, ${f}_min, ${f}_max`
+).join(", ");
+// Re-bucketing: raw rows aggregate directly, rollup rows combine their
+// min/max and weight each average by its sample count
+const RAW_RANGE_SELECT = METRICS_ROLLUP_FIELDS.map(
+  (f) => `AVG(${f}) AS ${f}, MIN(${f}) AS ${f}_min, MAX(${f}) AS ${f}_max`
+).join(", ");
+const ROLLUP_RANGE_SELECT = METRICS_ROLLUP_FIELDS.map(
+  (f) =>
+    `SUM(${f}_avg * samples) / SUM(samples) AS ${f}, MIN(${f}_min) AS ${f}_min, MAX(${f}_max) AS ${f}_max`
+).join(", ");
+
+/**
+ * Get the current timestamp as Unix epoch seconds
+ * @returns {number} Current timestamp
+ */
+function nowSeconds() {
+  return Math.floor(Date.now() / 1000);
+}
+
+/**
+ * Map a sample's GPU list to gpu_metrics rows
+ * gpu_index is the GPU's position in the merged list: nvidia-smi and the AMD
+ * sysfs reader each number their devices from 0, so the vendor index would
+ * make a mixed host's cards overwrite each other under (gpu_index, timestamp).
+ * @param {Array<Object>} gpus - GPU readings (usage, memoryUsed, memoryTotal, temperature, power)
+ * @returns {Array<Object>} Rows for save()
+ */
+export function toGpuMetricsRows(gpus = []) {
+  return gpus.map((gpu, i) => ({
+    gpu_index: i,
+    usage: gpu.usage,
+    memory_used: gpu.memoryUsed,
+    memory_total: gpu.memoryTotal,
+    temperature: gpu.temperature,
+    power: gpu.power,
+  }));
+}
+
 export class MetricsRepository {
   /**
    * @param {Object} db - Better-sqlite3 database instance
    */
   constructor(db) {
     this.db = db;
+    this.tiers = [
+      { name: "raw", table: "metrics", resolution: RAW_RESOLUTION },
+      ...getMetricsRollupTiers(),
+    ];
   }
 
   /**
    * Save metrics to the database
+   * Inserts the raw row, its per-GPU rows and folds it into every rollup tier
+   * in one transaction
    * @param {Object} m - Metrics object
+   * @param {Array<Object>} [gpus=[]] - Per-GPU rows
+   *   ({ gpu_index, usage, memory_used, memory_total, temperature, power })
    */
-  save(m) {
-    const query = `INSERT INTO metrics (cpu_usage, memory_usage,
-      disk_usage, active_models, uptime, gpu_usage, gpu_memory_used, gpu_memory_total, swap_usage)
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`;
+  save(m, gpus = []) {
+    const timestamp = m.timestamp || nowSeconds();
+    const values = METRICS_ROLLUP_FIELDS.map((f) => m[f] || 0);
 
-    this.db
-      .prepare(query)
-      .run(
-        m.cpu_usage || 0,
-        m.memory_usage || 0,
-        m.disk_usage || 0,
-        m.active_models || 0,
-        m.uptime || 0,
-        m.gpu_usage || 0,
-        m.gpu_memory_used || 0,
-        m.gpu_memory_total || 0,
-        m.swap_usage || 0
-      );
+    this.db.transaction(() => {
+      const query = `INSERT INTO metrics (cpu_usage, memory_usage,
+        disk_usage, active_models, uptime, gpu_usage, gpu_memory_used, gpu_memory_total, swap_usage,
+        llama_prompt_tps, llama_predicted_tps, llama_requests_per_sec, llama_busy_ratio,
+        disk_read_bps, disk_write_bps, disk_read_iops, disk_write_iops, disk_io_utilization,
+        net_rx_bps, net_tx_bps,
+        timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
+
+      this.db
+        .prepare(query)
+        .run(
+          m.cpu_usage || 0,
+          m.memory_usage || 0,
+          m.disk_usage || 0,
+          m.active_models || 0,
+          m.uptime || 0,
+          m.gpu_usage || 0,
+          m.gpu_memory_used || 0,
+          m.gpu_memory_total || 0,
+          m.swap_usage || 0,
+          m.llama_prompt_tps || 0,
+          m.llama_predicted_tps || 0,
+          m.llama_requests_per_sec || 0,
+          m.llama_busy_ratio || 0,
+          m.disk_read_bps || 0,
+          m.disk_write_bps || 0,
+          m.disk_read_iops || 0,
+          m.disk_write_iops || 0,
+          m.disk_io_utilization || 0,
+          m.net_rx_bps || 0,
+          m.net_tx_bps || 0,
+          timestamp
+        );
+
+      if (gpus.length > 0) {
+        // Same-second duplicates (e.g. a legacy collectMetrics() call) replace the earlier reading
+        const insertGpu = this.db.prepare(
+          `INSERT OR REPLACE INTO gpu_metrics
+             (timestamp, gpu_index, usage, memory_used, memory_total, temperature, power)
+           VALUES (?, ?, ?, ?, ?, ?, ?)`
+        );
+        for (const g of gpus) {
+          insertGpu.run(
+            timestamp,
+            g.gpu_index,
+            g.usage || 0,
+            g.memory_used || 0,
+            g.memory_total || 0,
+            g.temperature ?? null,
+            g.power ?? null
+          );
+        }
+      }
+
+      const rollupValues = values.flatMap((v) => [v, v, v]);
+      for (const { table, resolution } of getMetricsRollupTiers()) {
+        this.db
+          .prepare(
+            `INSERT INTO ${table} (bucket, samples, ${ROLLUP_COLUMNS})
+             VALUES (?, 1, ${ROLLUP_PLACEHOLDERS})
+             ON CONFLICT(bucket) DO UPDATE SET
+               ${ROLLUP_UPDATES},
+               samples = samples + 1`
+          )
+          .run(timestamp - (timestamp % resolution), ...rollupValues);
+      }
+    })();
+  }
+
+  /**
+   * Pick the coarsest tier that still satisfies a time range
+   * A tier satisfies the range when its retention reaches back to `from` and its
+   * resolution yields at least `points` buckets. Falls back to the finest tier
+   * that still holds data for the range.
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} [points=60] - Minimum number of points wanted
+   * @param {number} [now] - Current time (epoch seconds)
+   * @returns {Object} Tier descriptor { name, table, resolution }
+   */
+  selectTier(from, to, points = 60, now = nowSeconds()) {
+    const range = Math.max(to - from, 1);
+    const retained = this.tiers.filter((t) => now - from <= METRICS_RETENTION[t.name]);
+    const candidates = retained.length > 0 ? retained : [this.tiers[this.tiers.length - 1]];
+
+    const satisfying = candidates.filter((t) => range / t.resolution >= points);
+    return satisfying.length > 0 ? satisfying[satisfying.length - 1] : candidates[0];
+  }
+
+  /**
+   * Get metrics for a time range from the coarsest satisfying tier
+   * Rollup rows expose the average under the raw column name plus *_min/*_max
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} [points=60] - Minimum number of points wanted
+   * @returns {Object} { tier, rows } with rows newest first
+   */
+  getHistoryRange(from, to, points = 60) {
+    const tier = this.selectTier(from, to, points);
+
+    if (tier.name === "raw") {
+      const rows = this.db
+        .prepare(
+          "SELECT * FROM metrics WHERE timestamp >= ? AND timestamp <= ? ORDER BY timestamp DESC"
+        )
+        .all(from, to);
+      return { tier: tier.name, rows };
+    }
+
+    const rows = this.db
+      .prepare(
+        `SELECT bucket AS timestamp, samples, ${ROLLUP_SELECT} FROM ${tier.table}
+         WHERE bucket >= ? AND bucket <= ? ORDER BY bucket DESC`
+      )
+      .all(from - (from % tier.resolution), to);
+    return { tier: tier.name, rows };
+  }
+
+  /**
+   * Aggregate metrics into fixed-width buckets in SQLite
+   * Reads the coarsest tier that still retains `from` and whose resolution
+   * fits within `step`, then groups by `timestamp / step`. Each bucket carries
+   * the average under the raw column name plus *_min/*_max and its sample
+   * count. Empty buckets are omitted.
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} step - Bucket width in seconds (raised so at most MAX_RANGE_BUCKETS are returned)
+   * @param {number} [now] - Current time (epoch seconds)
+   * @returns {Object} { tier, step, rows } with rows oldest first
+   */
+  getRange(from, to, step, now = nowSeconds()) {
+    const minStep = Math.ceil(Math.max(to - from, 1) / MAX_RANGE_BUCKETS);
+    step = Math.max(Math.floor(step) || 1, minStep, 1);
+
+    const retained = this.tiers.filter((t) => now - from <= METRICS_RETENTION[t.name]);
+    const candidates = retained.length > 0 ? retained : [this.tiers[this.tiers.length - 1]];
+    const fitting = candidates.filter((t) => t.resolution <= step);
+    const tier = fitting.length > 0 ? fitting[fitting.length - 1] : candidates[0];
+
+    if (tier.name === "raw") {
+      const rows = this.db
+        .prepare(
+          `SELECT timestamp - (timestamp % ?) AS timestamp, COUNT(*) AS samples,
+             MAX(active_models) AS active_models, MAX(uptime) AS uptime, ${RAW_RANGE_SELECT}
+           FROM metrics WHERE timestamp >= ? AND timestamp <= ?
+           GROUP BY 1 ORDER BY 1`
+        )
+        .all(step, from, to);
+      return { tier: tier.name, step, rows };
+    }
+
+    const rows = this.db
+      .prepare(
+        `SELECT bucket - (bucket % ?) AS timestamp, SUM(samples) AS samples, ${ROLLUP_RANGE_SELECT}
+         FROM ${tier.table} WHERE bucket >= ? AND bucket <= ?
+         GROUP BY 1 ORDER BY 1`
+      )
+      .all(step, from - (from % tier.resolution), to);
+    return { tier: tier.name, step, rows };
+  }
+
+  /**
+   * Aggregate one GPU's readings into fixed-width buckets
+   * Each bucket carries the average under the column name plus *_max for
+   * usage, memory, temperature and power. Temperature and power are NULL when
+   * the GPU never reported them. Empty buckets are omitted.
+   * @param {number} gpuIndex - Position of the GPU in the sample's GPU list
+   * @param {number} from - Range start (epoch seconds)
+   * @param {number} to - Range end (epoch seconds)
+   * @param {number} [step=1] - Bucket width in seconds (raised so at most MAX_RANGE_BUCKETS are returned)
+   * @returns {Object} { step, rows } with rows oldest first
+   */
+  getGpuHistory(gpuIndex, from, to, step = 1) {
+    const minStep = Math.ceil(Math.max(to - from, 1) / MAX_RANGE_BUCKETS);
+    step = Math.max(Math.floor(step) || 1, minStep, 1);
+
+    const rows = this.db
+      .prepare(
+        `SELECT timestamp - (timestamp % ?) AS timestamp, COUNT(*) AS samples,
+           AVG(usage) AS usage, MAX(usage) AS usage_max,
+           AVG(memory_used) AS memory_used, MAX(memory_used) AS memory_used_max,
+           MAX(memory_total) AS memory_total,
+           AVG(temperature) AS temperature, MAX(temperature) AS temperature_max,
+           AVG(power) AS power, MAX(power) AS power_max
+         FROM gpu_metrics WHERE gpu_index = ? AND timestamp >= ? AND timestamp <= ?
+         GROUP BY 1 ORDER BY 1`
+      )
+      .all(step, gpuIndex, from, to);
+    return { step, rows };
+  }
+
+  /**
+   * Expired-row targets for tier pruning: each tier past its own retention,
+   * plus per-GPU rows, which are raw samples and share the raw tier's
+   * @param {number} now - Current time (epoch seconds)
+   * @returns {Array<Object>} { name, table, column, key, cutoff } per table; key
+   *   lists the primary key columns
+   */
+  getTierPruneTargets(now) {
+    const targets = this.tiers.map((tier) => ({
+      name: tier.name,
+      table: tier.table,
+      column: tier.name === "raw" ? "timestamp" : "bucket",
+      key: [tier.name === "raw" ? "id" : "bucket"],
+      cutoff: now - METRICS_RETENTION[tier.name],
+    }));
+    targets.push({
+      name: "gpu",
+      table: "gpu_metrics",
+      column: "timestamp",
+      key: ["gpu_index", "timestamp"], // WITHOUT ROWID
+      cutoff: now - METRICS_RETENTION.raw,
+    });
+    return targets;
+  }
+
+  /**
+   * Delete the oldest expired rows of one prune target, at most chunkSize
+   * The rows are picked through the column's index, so the cost is
+   * proportional to the rows deleted, not to the backlog.
+   * @param {Object} target - One of getTierPruneTargets()
+   * @param {number} chunkSize - Max rows deleted
+   * @returns {number} Rows deleted
+   */
+  pruneTierTargetChunk({ table, column, key, cutoff }, chunkSize) {
+    const columns = key.join(", ");
+    return this.db
+      .prepare(
+        `DELETE FROM ${table} WHERE (${columns}) IN
+           (SELECT ${columns} FROM ${table} WHERE ${column} < ? ORDER BY ${column} LIMIT ?)`
+      )
+      .run(cutoff, chunkSize).changes;
+  }
+
+  /**
+   * Delete one chunk of rows older than their tier's retention
+   * Works through the targets in order; a target is only touched once the
+   * ones before it have nothing left to delete.
+   * @param {number} now - Current time (epoch seconds), fixed for a whole run
+   * @param {number} [chunkSize=1000] - Max rows deleted per call
+   * @returns {number} Rows deleted (0 when nothing has expired)
+   */
+  pruneTiersChunk(now, chunkSize = 1000) {
+    for (const target of this.getTierPruneTargets(now)) {
+      const deleted = this.pruneTierTargetChunk(target, chunkSize);
+      if (deleted > 0) return deleted;
+    }
+    return 0;
+  }
+
+  /**
+   * Delete rows older than each tier's retention
+   * Runs the same chunks as the retention scheduler, back to back
+   * @param {number} [now] - Current time (epoch seconds)
+   * @returns {Object} Deleted row counts per tier, plus gpu
+   */
+  pruneTiers(now = nowSeconds()) {
+    const deleted = {};
+    try {
+      for (const target of this.getTierPruneTargets(now)) {
+        deleted[target.name] = 0;
+        for (let chunk; (chunk = this.pruneTierTargetChunk(target, 1000)) > 0; ) {
+          deleted[target.name] += chunk;
+        }
+      }
+    } catch (e) {
+      console.error("[DB] Metrics tier pruning error:", e.message);
+    }
+    return deleted;
   }
 
   /**
@@ -52,26 +385,57 @@ export class MetricsRepository {
     return this.db.prepare("SELECT * FROM metrics ORDER BY timestamp DESC LIMIT 1").get();
   }
 
+  /**
+   * Get the prune watermark: the first id kept when keeping the newest rows
+   * Ids only grow, so everything below it is older than the rows kept.
+   * @param {number} keep - Rows to keep
+   * @returns {number} First id kept (0 when the table is empty)
+   */
+  getPruneWatermark(keep) {
+    const { maxId } = this.db.prepare("SELECT MAX(id) AS maxId FROM metrics").get();
+    return maxId === null ? 0 : maxId - keep + 1;
+  }
+
+  /**
+   * Delete one chunk of rows below the watermark
+   * Deletes the id range [MIN(id), MIN(id) + chunkSize) through the rowid, so
+   * the cost is proportional to the rows deleted, not to the table size.
+   * Per-GPU rows older than the oldest raw row still kept go with it.
+   * @param {number} watermark - First id kept (see getPruneWatermark)
+   * @param {number} [chunkSize=1000] - Max rows deleted per call
+   * @returns {number} Rows deleted (0 when nothing is below the watermark)
+   */
+  pruneChunk(watermark, chunkSize = 1000) {
+    const { minId } = this.db.prepare("SELECT MIN(id) AS minId FROM metrics").get();
+    if (minId === null || minId >= watermark) return 0;
+
+    const deleted = this.db
+      .prepare("DELETE FROM metrics WHERE id < ?")
+      .run(Math.min(minId + chunkSize, watermark)).changes;
+    this.db
+      .prepare("DELETE FROM gpu_metrics WHERE timestamp < (SELECT MIN(timestamp) FROM metrics)")
+      .run();
+    return deleted;
+  }
+
   /**
    * Prune old metrics to maintain bounded database size
+   * Deletes everything below the watermark chunk by chunk in one call; the
+   * retention scheduler runs the same chunks with pauses in between.
    * @param {number} maxRecords - Maximum records to keep
    * @returns {number} Number of records deleted
    */
   prune(maxRecords = 10000) {
     try {
-      const result = this.db.prepare("SELECT COUNT(*) as cnt FROM metrics").get();
-
-      if (result.cnt > maxRecords) {
-        const toDelete = result.cnt - maxRecords;
-        const deleteResult = this.db
-          .prepare(
-            "DELETE FROM metrics WHERE id IN (SELECT id FROM metrics ORDER BY timestamp ASC LIMIT ?)"
-          )
-          .run(toDelete);
-        console.log(`[DB] Pruned ${deleteResult.changes} old metrics, kept ${maxRecords}`);
-        return deleteResult.changes;
+      const watermark = this.getPruneWatermark(maxRecords);
+      let deleted = 0;
+      for (let chunk; (chunk = this.pruneChunk(watermark)) > 0; ) {
+        deleted += chunk;
       }
-      return 0;
+      if (deleted > 0) {
+        console.log(`[DB] Pruned ${deleted} old metrics, kept ${maxRecords}`);
+      }
+      return deleted;
     } catch (e) {
       console.error("[DB] Metrics pruning error:", e.message);
       return 0;
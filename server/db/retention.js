@@ -0,0 +1,142 @@
+/**
+ * Retention Scheduler
+ * Background timer that enforces retention in small chunks. Each job deletes
+ * one bounded chunk per step and the scheduler yields to the event loop
+ * between steps, so the SQLite write lock is only ever held for one chunk and
+ * socket handlers and metrics ticks run in between. Maintenance tasks (e.g.
+ * incremental vacuum) run after the jobs. The last run of every job is kept
+ * with its duration for reporting.
+ */
+
+const DEFAULT_INTERVAL = 60000;
+const DEFAULT_MAX_CHUNKS = 100; // Per job and run; the rest waits for the next run
+
+/**
+ * Let pending I/O and timers run before the next chunk.
+ * @returns {Promise<void>}
+ */
+function yieldToEventLoop() {
+  return new Promise((resolve) => setImmediate(resolve));
+}
+
+export class RetentionScheduler {
+  /**
+   * @param {Object} [options] - Scheduler options
+   * @param {number} [options.interval] - Ms between runs (DB_RETENTION_INTERVAL, default 60000)
+   * @param {number} [options.maxChunks=100] - Chunks per job and run
+   */
+  constructor(options = {}) {
+    this.interval = options.interval || parseInt(process.env.DB_RETENTION_INTERVAL, 10) || DEFAULT_INTERVAL;
+    this.maxChunks = options.maxChunks || DEFAULT_MAX_CHUNKS;
+    this.jobs = [];
+    this.maintenance = [];
+    this.timer = null;
+    this.running = null;
+    this.stopped = false;
+    this.lastRun = {}; // name -> { deleted, chunks, ms, maxChunkMs, at }
+  }
+
+  /**
+   * Register a chunked retention job.
+   * @param {string} name - Job name (used in reports)
+   * @param {Function} createStep - Called once per run; returns a step function
+   *   deleting one chunk and returning the rows it deleted (0 when done), or
+   *   null to skip this run
+   */
+  addJob(name, createStep) {
+    this.jobs.push({ name, createStep });
+  }
+
+  /**
+   * Register a task run once after the jobs of every run.
+   * @param {string} name - Task name
+   * @param {Function} fn - Task; its return value is recorded as the result
+   */
+  addMaintenance(name, fn) {
+    this.maintenance.push({ name, fn });
+  }
+
+  /**
+   * Start the timer.
+   */
+  start() {
+    if (this.timer) return;
+    this.timer = setInterval(() => this.run(), this.interval);
+    this.timer.unref?.();
+  }
+
+  /**
+   * Stop the timer. A run in progress finishes its current chunk and stops.
+   */
+  stop() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+    this.stopped = true;
+  }
+
+  /**
+   * Run every job to completion (or maxChunks), then the maintenance tasks.
+   * Overlapping calls share the run in progress.
+   * @returns {Promise<Object>} name -> last run report
+   */
+  run() {
+    if (!this.running) {
+      this.stopped = false;
+      this.running = this._run().finally(() => {
+        this.running = null;
+      });
+    }
+    return this.running;
+  }
+
+  /**
+   * One pass over the jobs and maintenance tasks.
+   * @returns {Promise<Object>} name -> last run report
+   */
+  async _run() {
+    for (const { name, createStep } of this.jobs) {
+      const report = { deleted: 0, chunks: 0, ms: 0, maxChunkMs: 0, at: Date.now() };
+      try {
+        const step = createStep();
+        while (step && report.chunks < this.maxChunks && !this.stopped) {
+          const start = process.hrtime.bigint();
+          const deleted = step();
+          const ms = Number(process.hrtime.bigint() - start) / 1e6;
+          report.chunks++;
+          report.ms += ms;
+          report.maxChunkMs = Math.max(report.maxChunkMs, ms);
+          if (!deleted) break;
+          report.deleted += deleted;
+          await yieldToEventLoop();
+        }
+      } catch (e) {
+        report.error = e.message;
+        console.error(`[DB] Retention job ${name} failed:`, e.message);
+      }
+      this.lastRun[name] = report;
+      if (report.deleted > 0) {
+        console.log(
+          `[DB] Retention ${name}: deleted ${report.deleted} rows in ${report.chunks} chunks ` +
+            `(${report.ms.toFixed(1)}ms, longest chunk ${report.maxChunkMs.toFixed(1)}ms)`
+        );
+      }
+    }
+
+    for (const { name, fn } of this.maintenance) {
+      if (this.stopped) break;
+      const start = process.hrtime.bigint();
+      try {
+        const result = fn();
+        this.lastRun[name] = { result, ms: Number(process.hrtime.bigint() - start) / 1e6, at: Date.now() };
+      } catch (e) {
+        this.lastRun[name] = { error: e.message, at: Date.now() };
+        console.error(`[DB] Retention task ${name} failed:`, e.message);
+      }
+    }
+    return this.lastRun;
+  }
+}
+
+export default RetentionScheduler;
@@ -43,6 +43,17 @@ export function getSchemaDefinition() {
       gpu_memory_used REAL DEFAULT 0,
       gpu_memory_total REAL DEFAULT 0,
       swap_usage REAL DEFAULT 0,
+      llama_prompt_tps REAL DEFAULT 0,
+      llama_predicted_tps REAL DEFAULT 0,
+      llama_requests_per_sec REAL DEFAULT 0,
+      llama_busy_ratio REAL DEFAULT 0,
+      disk_read_bps REAL DEFAULT 0,
+      disk_write_bps REAL DEFAULT 0,
+      disk_read_iops REAL DEFAULT 0,
+      disk_write_iops REAL DEFAULT 0,
+      disk_io_utilization REAL DEFAULT 0,
+      net_rx_bps REAL DEFAULT 0,
+      net_tx_bps REAL DEFAULT 0,
       timestamp INTEGER DEFAULT (strftime('%s', 'now'))
     );
     CREATE TABLE IF NOT EXISTS logs (
@@ -58,6 +69,118 @@ export function getSchemaDefinition() {
       value TEXT NOT NULL,
       updated_at INTEGER
     );
+    CREATE TABLE IF NOT EXISTS alert_rules (
+      id TEXT PRIMARY KEY,
+      value TEXT NOT NULL,
+      updated_at INTEGER
+    );
+    ${getGpuMetricsDefinition()}
+  `;
+}
+
+/**
+ * Metrics columns aggregated into the rollup tiers (min/avg/max each)
+ */
+export const METRICS_ROLLUP_FIELDS = [
+  "cpu_usage",
+  "memory_usage",
+  "swap_usage",
+  "disk_usage",
+  "gpu_usage",
+  "gpu_memory_used",
+  "gpu_memory_total",
+  "llama_prompt_tps",
+  "llama_predicted_tps",
+  "llama_requests_per_sec",
+  "llama_busy_ratio",
+  "disk_read_bps",
+  "disk_write_bps",
+  "disk_read_iops",
+  "disk_write_iops",
+  "disk_io_utilization",
+  "net_rx_bps",
+  "net_tx_bps",
+];
+
+/**
+ * Get the rollup tiers maintained on top of the raw metrics table
+ * @returns {Array} Array of { name, table, resolution } (resolution in seconds)
+ */
+export function getMetricsRollupTiers() {
+  return [
+    { name: "1m", table: "metrics_1m", resolution: 60 },
+    { name: "1h", table: "metrics_1h", resolution: 3600 },
+  ];
+}
+
+/**
+ * Get the SQL for the metrics rollup tables
+ * One row per bucket (bucket start in epoch seconds) with min/avg/max per field
+ * @returns {string} SQL CREATE TABLE statements
+ */
+export function getMetricsRollupDefinition() {
+  const columns = METRICS_ROLLUP_FIELDS.map(
+    (f) => `${f}_min REAL DEFAULT 0, ${f}_avg REAL DEFAULT 0, ${f}_max REAL DEFAULT 0`
+  ).join(",\n      ");
+
+  return getMetricsRollupTiers()
+    .map(
+      ({ table }) => `
+    CREATE TABLE IF NOT EXISTS ${table} (
+      bucket INTEGER PRIMARY KEY,
+      samples INTEGER NOT NULL DEFAULT 0,
+      ${columns}
+    );`
+    )
+    .join("\n");
+}
+
+/**
+ * Get the SQL for the per-GPU metrics table
+ * One narrow row per GPU per raw sample, keyed for per-GPU range scans.
+ * Temperature and power stay NULL when the vendor tooling does not report them.
+ * @returns {string} SQL CREATE TABLE statement
+ */
+export function getGpuMetricsDefinition() {
+  return `
+    CREATE TABLE IF NOT EXISTS gpu_metrics (
+      timestamp INTEGER NOT NULL,
+      gpu_index INTEGER NOT NULL,
+      usage REAL DEFAULT 0,
+      memory_used REAL DEFAULT 0,
+      memory_total REAL DEFAULT 0,
+      temperature REAL,
+      power REAL,
+      PRIMARY KEY (gpu_index, timestamp)
+    ) WITHOUT ROWID;
+  `;
+}
+
+/**
+ * Get the SQL for the log search index
+ * An external-content FTS5 table over logs.message: the text is stored once
+ * in logs and the triggers keep the index in step with every insert, delete
+ * (retention included) and update.
+ * @returns {string} SQL CREATE VIRTUAL TABLE and CREATE TRIGGER statements
+ */
+export function getLogsSearchDefinition() {
+  return `
+    CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+      message,
+      content='logs',
+      content_rowid='id',
+      tokenize='unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+      INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+    END;
+    CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+      INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END;
+    CREATE TRIGGER IF NOT EXISTS logs_fts_update AFTER UPDATE OF message ON logs BEGIN
+      INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+      INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+    END;
   `;
 }
 
@@ -71,6 +194,7 @@ export function getIndexesDefinition() {
     "CREATE INDEX IF NOT EXISTS idx_models_name ON models(name)",
     "CREATE INDEX IF NOT EXISTS idx_models_created ON models(created_at DESC)",
     "CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_gpu_metrics_timestamp ON gpu_metrics(timestamp)",
     "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp DESC)",
     "CREATE INDEX IF NOT EXISTS idx_logs_source ON logs(source)",
     "CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level)",
@@ -103,6 +227,17 @@ export function getMetricsMigrations() {
     { name: "gpu_usage", type: "REAL DEFAULT 0" },
     { name: "gpu_memory_used", type: "REAL DEFAULT 0" },
     { name: "gpu_memory_total", type: "REAL DEFAULT 0" },
+    { name: "llama_prompt_tps", type: "REAL DEFAULT 0" },
+    { name: "llama_predicted_tps", type: "REAL DEFAULT 0" },
+    { name: "llama_requests_per_sec", type: "REAL DEFAULT 0" },
+    { name: "llama_busy_ratio", type: "REAL DEFAULT 0" },
+    { name: "disk_read_bps", type: "REAL DEFAULT 0" },
+    { name: "disk_write_bps", type: "REAL DEFAULT 0" },
+    { name: "disk_read_iops", type: "REAL DEFAULT 0" },
+    { name: "disk_write_iops", type: "REAL DEFAULT 0" },
+    { name: "disk_io_utilization", type: "REAL DEFAULT 0" },
+    { name: "net_rx_bps", type: "REAL DEFAULT 0" },
+    { name: "net_tx_bps", type: "REAL DEFAULT 0" },
   ];
 }
 
@@ -112,9 +247,24 @@ export function getMetricsMigrations() {
  */
 export function initSchema(db) {
   db.exec(getSchemaDefinition());
+  db.exec(getMetricsRollupDefinition());
+  initLogsSearch(db);
   createIndexes(db);
 }
 
+/**
+ * Create the log search index and its triggers
+ * Log search is unavailable (logs:search fails) if SQLite lacks FTS5.
+ * @param {Object} db - Better-sqlite3 database instance
+ */
+export function initLogsSearch(db) {
+  try {
+    db.exec(getLogsSearchDefinition());
+  } catch (e) {
+    console.warn("[DB] Log search index unavailable:", e.message);
+  }
+}
+
 /**
  * Create all indexes
  * @param {Object} db - Better-sqlite3 database instance
@@ -169,6 +319,82 @@ export function runMetricsMigrations(db) {
   }
 }
 
+/**
+ * Add columns for newly aggregated fields to existing rollup tables
+ * @param {Object} db - Better-sqlite3 database instance
+ */
+export function runMetricsRollupMigrations(db) {
+  try {
+    for (const { table } of getMetricsRollupTiers()) {
+      const columnNames = db.prepare(`PRAGMA table_info(${table})`).all().map((c) => c.name);
+
+      for (const field of METRICS_ROLLUP_FIELDS) {
+        for (const suffix of ["min", "avg", "max"]) {
+          const column = `${field}_${suffix}`;
+          if (!columnNames.includes(column)) {
+            console.log(`[MIGRATION] Adding column: ${table}.${column}`);
+            db.exec(`ALTER TABLE ${table} ADD COLUMN ${column} REAL DEFAULT 0`);
+          }
+        }
+      }
+    }
+  } catch (e) {
+    console.warn("[MIGRATION] Rollup migration failed:", e.message);
+  }
+}
+
+/**
+ * Backfill empty rollup tiers from existing raw metrics
+ * Runs once after upgrading a database that already holds raw samples
+ * @param {Object} db - Better-sqlite3 database instance
+ */
+export function backfillMetricsRollups(db) {
+  try {
+    const aggregates = METRICS_ROLLUP_FIELDS.map(
+      (f) => `MIN(${f}), AVG(${f}), MAX(${f})`
+    ).join(", ");
+    const columns = METRICS_ROLLUP_FIELDS.map((f) => `${f}_min, ${f}_avg, ${f}_max`).join(", ");
+
+    for (const { table, resolution } of getMetricsRollupTiers()) {
+      const hasRows = db.prepare(`SELECT 1 FROM ${table} LIMIT 1`).get();
+      if (hasRows) continue;
+
+      const result = db
+        .prepare(
+          `INSERT INTO ${table} (bucket, samples, ${columns})
+           SELECT timestamp - timestamp % ${resolution}, COUNT(*), ${aggregates}
+           FROM metrics GROUP BY 1`
+        )
+        .run();
+      if (result.changes > 0) {
+        console.log(`[MIGRATION] Backfilled ${result.changes} ${table} buckets`);
+      }
+    }
+  } catch (e) {
+    console.warn("[MIGRATION] Rollup backfill failed:", e.message);
+  }
+}
+
+/**
+ * Index existing log rows for search
+ * Runs once after upgrading a database that already holds logs; rows written
+ * since the index was created are indexed by the triggers.
+ * @param {Object} db - Better-sqlite3 database instance
+ */
+export function backfillLogsSearch(db) {
+  try {
+    const indexed = db.prepare("SELECT 1 FROM logs_fts_docsize LIMIT 1").get();
+    if (indexed) return;
+    const hasLogs = db.prepare("SELECT 1 FROM logs LIMIT 1").get();
+    if (!hasLogs) return;
+
+    console.log("[MIGRATION] Indexing existing logs for search");
+    db.exec("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')");
+  } catch (e) {
+    console.warn("[MIGRATION] Log search backfill failed:", e.message);
+  }
+}
+
 /**
  * Run all migrations
  * @param {Object} db - Better-sqlite3 database instance
@@ -176,4 +402,7 @@ export function runMetricsMigrations(db) {
 export function runAllMigrations(db) {
   runModelsMigrations(db);
   runMetricsMigrations(db);
+  runMetricsRollupMigrations(db);
+  backfillMetricsRollups(db);
+  backfillLogsSearch(db);
 }
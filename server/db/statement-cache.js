@@ -0,0 +1,79 @@
+/**
+ * Statement Cache
+ * Prepared statements shared by every repository on a connection.
+ * Repositories keep calling db.prepare(sql) on each invocation; DBBase routes
+ * those calls through this cache, so each distinct SQL string is compiled once
+ * instead of on every metrics tick or log line.
+ */
+
+// Distinct SQL strings kept; repositories use well under a hundred
+const DEFAULT_MAX_STATEMENTS = 256;
+
+export class StatementCache {
+  /**
+   * @param {Function} prepare - Uncached prepare function (sql) => Statement
+   * @param {number} [maxSize=256] - Statements kept before the least recently used is dropped
+   */
+  constructor(prepare, maxSize = DEFAULT_MAX_STATEMENTS) {
+    this._prepare = prepare;
+    this.maxSize = maxSize;
+    this.statements = new Map(); // sql -> Statement, least recently used first
+    this.hits = 0;
+    this.misses = 0;
+  }
+
+  /**
+   * Get the prepared statement for a SQL string, compiling it on first use
+   * @param {string} sql - SQL text
+   * @returns {Object} better-sqlite3 Statement
+   */
+  prepare(sql) {
+    const cached = this.statements.get(sql);
+    if (cached) {
+      this.hits++;
+      // Move to the most recently used end
+      this.statements.delete(sql);
+      this.statements.set(sql, cached);
+      return cached;
+    }
+
+    this.misses++;
+    const statement = this._prepare(sql);
+    this.statements.set(sql, statement);
+    if (this.statements.size > this.maxSize) {
+      this.statements.delete(this.statements.keys().next().value);
+    }
+    return statement;
+  }
+
+  /**
+   * Drop every cached statement
+   */
+  clear() {
+    this.statements.clear();
+  }
+
+  /**
+   * Get cache statistics
+   * @returns {Object} { size, hits, misses }
+   */
+  stats() {
+    return { size: this.statements.size, hits: this.hits, misses: this.misses };
+  }
+}
+
+/**
+ * Route a connection's prepare() through a shared statement cache
+ * Statements are never switched to pluck/raw/expand mode in this codebase, so
+ * one instance per SQL string can safely serve every caller.
+ * @param {Object} db - Better-sqlite3 database instance
+ * @param {number} [maxSize] - Cache size
+ * @returns {StatementCache} The installed cache
+ */
+export function installStatementCache(db, maxSize = DEFAULT_MAX_STATEMENTS) {
+  const cache = new StatementCache(db.prepare.bind(db), maxSize);
+  db.prepare = (sql) => cache.prepare(sql);
+  return cache;
+}
+
+export default StatementCache;
@@ -0,0 +1,233 @@
+/**
+ * Write Queue
+ * Write-behind buffer for high-rate inserts (metrics rows and log lines).
+ * Writes are queued and committed together in one transaction every
+ * flushInterval ms or as soon as flushRows are waiting, so a burst of
+ * llama-server output costs one commit per interval instead of one per line.
+ *
+ * Backpressure: the producer that fills a batch pays for its commit
+ * synchronously, so the queue cannot outgrow flushRows while SQLite keeps up.
+ * If commits fail (e.g. the disk is full) rows are kept and retried once per
+ * interval, up to maxQueue; beyond that the oldest are dropped and counted.
+ * A batch that fails because of its rows (a constraint or type error) is
+ * replayed row by row instead: the rows that fail are dropped and counted as
+ * rejected, the rest are committed, so one bad row cannot stall the queue.
+ * Queues still holding rows are flushed when the process exits.
+ */
+
+const DEFAULT_FLUSH_INTERVAL = 100;
+const DEFAULT_FLUSH_ROWS = 500;
+const DEFAULT_MAX_QUEUE = 10000;
+
+// SQLite errors about the database rather than the row (extended codes included)
+const TRANSIENT_CODES = [
+  "SQLITE_BUSY",
+  "SQLITE_LOCKED",
+  "SQLITE_FULL",
+  "SQLITE_IOERR",
+  "SQLITE_READONLY",
+  "SQLITE_NOMEM",
+  "SQLITE_CANTOPEN",
+  "SQLITE_PROTOCOL",
+];
+
+/**
+ * Whether a write error says nothing about the row being written.
+ * @param {Error} error - Error thrown by a write or commit
+ * @returns {boolean} True for busy, full, I/O and similar errors
+ */
+function isTransientError(error) {
+  const code = typeof error?.code === "string" ? error.code : "";
+  return TRANSIENT_CODES.some((c) => code === c || code.startsWith(`${c}_`));
+}
+
+// Live queues, flushed on process exit
+const openQueues = new Set();
+let exitHookInstalled = false;
+
+/**
+ * Flush every open queue synchronously when the process exits
+ * (process.exit() from the shutdown handler included).
+ */
+function installExitHook() {
+  if (exitHookInstalled) return;
+  exitHookInstalled = true;
+  process.on("exit", () => {
+    for (const queue of openQueues) queue.close();
+  });
+}
+
+/**
+ * Read a positive integer from the environment.
+ * @param {string} name - Variable name
+ * @param {number} fallback - Default value
+ * @returns {number} Value
+ */
+function envInt(name, fallback) {
+  const value = parseInt(process.env[name], 10);
+  return value > 0 ? value : fallback;
+}
+
+export class WriteQueue {
+  /**
+   * @param {Object} options - Queue options
+   * @param {Object} options.db - Better-sqlite3 database instance (for the transaction)
+   * @param {Object} options.handlers - kind -> function(...args) performing one write
+   * @param {number} [options.flushInterval] - Max ms a row waits (DB_FLUSH_INTERVAL, default 100)
+   * @param {number} [options.flushRows] - Rows that trigger an immediate flush (DB_FLUSH_ROWS, default 500)
+   * @param {number} [options.maxQueue] - Rows kept while commits fail (DB_MAX_QUEUE, default 10000)
+   */
+  constructor({ db, handlers, flushInterval, flushRows, maxQueue }) {
+    this.db = db;
+    this.handlers = handlers;
+    this.flushInterval = flushInterval || envInt("DB_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL);
+    this.flushRows = flushRows || envInt("DB_FLUSH_ROWS", DEFAULT_FLUSH_ROWS);
+    this.maxQueue = Math.max(maxQueue || envInt("DB_MAX_QUEUE", DEFAULT_MAX_QUEUE), this.flushRows);
+    this.queue = [];
+    this.timer = null;
+    this.closed = false;
+    this.failing = false; // Last commit failed; wait for the retry timer
+    this.stats = { queued: 0, flushed: 0, commits: 0, dropped: 0, rejected: 0, failures: 0 };
+
+    openQueues.add(this);
+    installExitHook();
+  }
+
+  /**
+   * Queue one write.
+   * Written immediately when the queue is closed.
+   * @param {string} kind - Handler name
+   * @param {...*} args - Handler arguments
+   */
+  push(kind, ...args) {
+    if (this.closed) {
+      this.handlers[kind](...args);
+      return;
+    }
+
+    this.queue.push({ kind, args });
+    this.stats.queued++;
+    if (this.queue.length > this.maxQueue) {
+      this.queue.shift();
+      this.stats.dropped++;
+    }
+
+    if (this.queue.length >= this.flushRows && !this.failing) {
+      this.flush();
+    } else {
+      this._schedule();
+    }
+  }
+
+  /**
+   * Start the flush timer unless one is pending.
+   */
+  _schedule() {
+    if (this.timer || this.closed) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.flush();
+    }, this.flushInterval);
+    this.timer.unref?.();
+  }
+
+  /**
+   * Commit every queued write in one transaction.
+   * A batch rejected because of its rows is replayed row by row without them;
+   * any other failing commit keeps the rows queued (bounded by maxQueue) for
+   * the next flush.
+   * @returns {number} Rows written
+   */
+  flush() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.queue.length === 0) return 0;
+
+    const batch = this.queue;
+    this.queue = [];
+    let written = batch.length;
+    try {
+      try {
+        this.db.transaction(() => {
+          for (const { kind, args } of batch) this.handlers[kind](...args);
+        })();
+      } catch (e) {
+        if (isTransientError(e)) throw e;
+        written = this._flushRowByRow(batch);
+      }
+    } catch (e) {
+      this.stats.failures++;
+      this.failing = true;
+      this.queue = batch.concat(this.queue);
+      const overflow = this.queue.length - this.maxQueue;
+      if (overflow > 0) {
+        this.queue.splice(0, overflow);
+        this.stats.dropped += overflow;
+      }
+      console.error(`[DB] Write-behind flush of ${batch.length} rows failed:`, e.message);
+      this._schedule();
+      return 0;
+    }
+
+    this.failing = false;
+    this.stats.flushed += written;
+    this.stats.commits++;
+    return written;
+  }
+
+  /**
+   * Commit a batch with each write in its own savepoint, dropping the writes
+   * that fail. Transient errors abort the whole batch like a failed commit.
+   * @param {Array<Object>} batch - Queued writes
+   * @returns {number} Rows written
+   * @throws {Error} On a transient error; nothing is committed
+   */
+  _flushRowByRow(batch) {
+    const rejected = [];
+    this.db.transaction(() => {
+      for (const write of batch) {
+        try {
+          this.db.transaction(() => this.handlers[write.kind](...write.args))();
+        } catch (e) {
+          if (isTransientError(e)) throw e;
+          rejected.push({ kind: write.kind, error: e });
+        }
+      }
+    })();
+
+    if (rejected.length > 0) {
+      this.stats.rejected += rejected.length;
+      const [{ kind, error }] = rejected;
+      console.error(
+        `[DB] Dropped ${rejected.length} of ${batch.length} write-behind rows that cannot be written; first (${kind}):`,
+        error.message
+      );
+    }
+    return batch.length - rejected.length;
+  }
+
+  /**
+   * Flush what is queued and write synchronously from now on.
+   */
+  close() {
+    this.closed = true;
+    this.flush();
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    openQueues.delete(this);
+  }
+
+  /**
+   * Number of rows waiting to be written
+   * @returns {number} Pending rows
+   */
+  get pending() {
+    return this.queue.length;
+  }
+}
+
+export default WriteQueue;
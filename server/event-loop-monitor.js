@@ -0,0 +1,213 @@
+/**
+ * Event Loop Monitor - Lag, GC and heap instrumentation for this process
+ * SQLite writes, GGUF header reads and logging all run on the same thread as
+ * Socket.IO. This module samples event-loop delay with monitorEventLoopDelay,
+ * totals GC pauses from performance entries and reads V8 heap statistics.
+ * Handlers wrapped with wrap() have their synchronous time recorded so that,
+ * whenever the loop stalls past a threshold, the slowest ones are logged.
+ */
+
+import { monitorEventLoopDelay, performance, PerformanceObserver, constants } from "perf_hooks";
+import v8 from "v8";
+
+const DEFAULT_RESOLUTION = 20; // ms, histogram sampling resolution
+const DEFAULT_WINDOW = 5000; // ms, percentiles are reported per window
+const DEFAULT_LAG_THRESHOLD = parseInt(process.env.EVENT_LOOP_LAG_THRESHOLD_MS, 10) || 100;
+const SLOW_HANDLERS_LOGGED = 5;
+
+const GC_KINDS = {
+  [constants.NODE_PERFORMANCE_GC_MINOR]: "minor",
+  [constants.NODE_PERFORMANCE_GC_MAJOR]: "major",
+  [constants.NODE_PERFORMANCE_GC_INCREMENTAL]: "incremental",
+  [constants.NODE_PERFORMANCE_GC_WEAKCB]: "weakcb",
+};
+
+const NS_PER_MS = 1e6;
+
+export class EventLoopMonitor {
+  /**
+   * Create a new EventLoopMonitor.
+   * @param {Object} [config] - Monitor configuration.
+   * @param {number} [config.resolution=20] - Loop delay sampling resolution (ms).
+   * @param {number} [config.window=5000] - Reporting window (ms).
+   * @param {number} [config.lagThreshold=100] - Max delay (ms) above which slow handlers are logged.
+   */
+  constructor(config = {}) {
+    this.resolution = config.resolution || DEFAULT_RESOLUTION;
+    this.window = config.window || DEFAULT_WINDOW;
+    this.lagThreshold = config.lagThreshold || DEFAULT_LAG_THRESHOLD;
+
+    this.histogram = null;
+    this.gcObserver = null;
+    this.timer = null;
+    this.lastUtilization = null;
+
+    this.loop = { p50: 0, p99: 0, max: 0, mean: 0, utilization: 0 };
+    this.gc = { count: 0, pauseMs: 0, maxPauseMs: 0, byKind: {} };
+    this.handlers = new Map(); // name -> { count, totalMs, maxMs } for the current window
+  }
+
+  /**
+   * Start sampling. Safe to call more than once.
+   */
+  start() {
+    if (this.histogram) return;
+
+    this.histogram = monitorEventLoopDelay({ resolution: this.resolution });
+    this.histogram.enable();
+    this.lastUtilization = performance.eventLoopUtilization();
+
+    this.gcObserver = new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) this._recordGc(entry);
+    });
+    this.gcObserver.observe({ entryTypes: ["gc"] });
+
+    this.timer = setInterval(() => this._rollWindow(), this.window);
+    this.timer.unref();
+  }
+
+  /**
+   * Stop sampling and release the observers.
+   */
+  stop() {
+    if (this.timer) clearInterval(this.timer);
+    this.gcObserver?.disconnect();
+    this.histogram?.disable();
+    this.timer = null;
+    this.gcObserver = null;
+    this.histogram = null;
+  }
+
+  /**
+   * Wrap a function so its synchronous run time is attributed to a name.
+   * Async functions are measured up to their first await, which is the part
+   * that blocks the loop.
+   * @param {string} name - Handler name (e.g. "socket:models:scan").
+   * @param {Function} fn - Function to wrap.
+   * @returns {Function} Wrapped function.
+   */
+  wrap(name, fn) {
+    const monitor = this;
+    return function (...args) {
+      const start = performance.now();
+      try {
+        return fn.apply(this, args);
+      } finally {
+        monitor.recordHandler(name, performance.now() - start);
+      }
+    };
+  }
+
+  /**
+   * Record a handler's synchronous duration.
+   * @param {string} name - Handler name.
+   * @param {number} ms - Duration in milliseconds.
+   */
+  recordHandler(name, ms) {
+    let stats = this.handlers.get(name);
+    if (!stats) {
+      stats = { count: 0, totalMs: 0, maxMs: 0 };
+      this.handlers.set(name, stats);
+    }
+    stats.count++;
+    stats.totalMs += ms;
+    if (ms > stats.maxMs) stats.maxMs = ms;
+  }
+
+  /**
+   * Current process health as plain numbers.
+   * @returns {Object} { loop, gc, heap } with times in ms and sizes in bytes
+   */
+  snapshot() {
+    const heap = v8.getHeapStatistics();
+    const mem = process.memoryUsage();
+    return {
+      loop: { ...this.loop },
+      gc: { ...this.gc, byKind: { ...this.gc.byKind } },
+      heap: {
+        used: heap.used_heap_size,
+        total: heap.total_heap_size,
+        limit: heap.heap_size_limit,
+        external: mem.external,
+        rss: mem.rss,
+      },
+    };
+  }
+
+  /**
+   * The slowest handlers of the current window.
+   * @param {number} [limit=5] - Number of handlers.
+   * @returns {Array<Object>} { name, count, totalMs, maxMs } by descending maxMs
+   */
+  slowestHandlers(limit = SLOW_HANDLERS_LOGGED) {
+    return [...this.handlers.entries()]
+      .map(([name, stats]) => ({ name, ...stats }))
+      .sort((a, b) => b.maxMs - a.maxMs)
+      .slice(0, limit);
+  }
+
+  /**
+   * Accumulate one GC performance entry.
+   * @param {PerformanceEntry} entry - Entry of type "gc"
+   */
+  _recordGc(entry) {
+    const kind = GC_KINDS[entry.detail?.kind ?? entry.kind] || "other";
+    this.gc.count++;
+    this.gc.pauseMs += entry.duration;
+    if (entry.duration > this.gc.maxPauseMs) this.gc.maxPauseMs = entry.duration;
+    const byKind = (this.gc.byKind[kind] ||= { count: 0, pauseMs: 0 });
+    byKind.count++;
+    byKind.pauseMs += entry.duration;
+  }
+
+  /**
+   * Close the reporting window: publish percentiles, log slow handlers when
+   * the loop stalled past the threshold, and start a new window.
+   */
+  _rollWindow() {
+    const h = this.histogram;
+    if (!h) return;
+
+    const utilization = performance.eventLoopUtilization(this.lastUtilization);
+    this.lastUtilization = performance.eventLoopUtilization();
+
+    // Samples measure the whole timer period; only the excess over it is delay
+    const delay = (ns) => (Number.isFinite(ns) ? Math.max(0, ns / NS_PER_MS - this.resolution) : 0);
+    this.loop = {
+      p50: delay(h.percentile(50)),
+      p99: delay(h.percentile(99)),
+      max: delay(h.max),
+      mean: delay(h.mean),
+      utilization: utilization.utilization,
+    };
+    h.reset();
+
+    if (this.loop.max > this.lagThreshold) {
+      const slowest = this.slowestHandlers()
+        .map((s) => `${s.name} max=${s.maxMs.toFixed(1)}ms total=${s.totalMs.toFixed(1)}ms x${s.count}`)
+        .join("; ");
+      console.warn(
+        `[LOOP] Event loop delay ${this.loop.max.toFixed(1)}ms (p99 ${this.loop.p99.toFixed(1)}ms) over ${this.lagThreshold}ms` +
+          (slowest ? ` - slowest handlers: ${slowest}` : " - no instrumented handler ran")
+      );
+    }
+    this.handlers.clear();
+  }
+}
+
+// Process-wide monitor
+export const processMonitor = new EventLoopMonitor();
+
+/**
+ * Time every handler registered on a socket.
+ * Must run before other connection listeners register their handlers.
+ * @param {Object} socket - Socket.IO socket instance.
+ * @param {EventLoopMonitor} [monitor] - Monitor to record into.
+ */
+export function instrumentSocket(socket, monitor = processMonitor) {
+  const on = socket.on.bind(socket);
+  socket.on = (event, handler) =>
+    on(event, typeof handler === "function" ? monitor.wrap(`socket:${event}`, handler) : handler);
+}
+
+export default EventLoopMonitor;
@@ -7,10 +7,19 @@
 import { exec } from "child_process";
 import { promisify } from "util";
 import si from "systeminformation";
+import { NvidiaSmiStream } from "./nvidia-smi-stream.js";
+import { AmdSysfsReader } from "./amd-sysfs-reader.js";
 
 const execAsync = promisify(exec);
 
+// "stream" keeps one nvidia-smi running in loop mode; "exec" spawns it per tick
+const NVIDIA_SMI_MODE = process.env.NVIDIA_SMI_MODE || "stream";
+
 let gpuList = [];
+let nvidiaStream = null;
+let nvidiaStreamInterval = null; // nvidia-smi loop interval; default when null
+let nvidiaSmiUnavailable = false; // Sticky: outlives the streams replaced on pause and rate changes
+let amdReader = null;
 
 /**
  * Get current GPU list populated from last metrics collection.
@@ -28,11 +37,75 @@ export function updateGpuList(newGpuList) {
   gpuList = newGpuList;
 }
 
+/**
+ * Read NVIDIA GPUs from the long-lived nvidia-smi stream.
+ * Starts the collector on first use and waits briefly for its first sample.
+ * @returns {Promise<Array|null>} GPU list, or null when stream mode is disabled.
+ */
+async function readNvidiaStream() {
+  if (NVIDIA_SMI_MODE !== "stream") return null;
+  if (nvidiaSmiUnavailable) return [];
+
+  if (!nvidiaStream) {
+    nvidiaStream = new NvidiaSmiStream({ intervalMs: nvidiaStreamInterval });
+    nvidiaStream.start();
+    // Only the very first tick waits for output; later ticks read whatever is cached
+    await nvidiaStream.waitForData();
+  }
+
+  if (!nvidiaStream.isAvailable()) {
+    nvidiaSmiUnavailable = true;
+    return [];
+  }
+  return nvidiaStream.getGpus();
+}
+
+/**
+ * Set how often the nvidia-smi stream samples. A running stream is restarted
+ * with the new loop interval on the next read.
+ * @param {number} intervalMs - Loop interval in milliseconds.
+ */
+export function setGpuPollInterval(intervalMs) {
+  if (intervalMs === nvidiaStreamInterval) return;
+  nvidiaStreamInterval = intervalMs;
+  pauseGpuMonitor();
+}
+
+/**
+ * Stop the nvidia-smi stream while nobody needs GPU data. Cached AMD discovery
+ * is kept; the stream restarts on the next read unless nvidia-smi turned out
+ * to be unavailable, which is remembered so hosts without NVIDIA GPUs do not
+ * spawn it again on every rate change.
+ */
+export function pauseGpuMonitor() {
+  if (nvidiaStream) {
+    if (!nvidiaStream.isAvailable()) nvidiaSmiUnavailable = true;
+    nvidiaStream.stop();
+    nvidiaStream = null;
+  }
+}
+
+/**
+ * Stop the nvidia-smi stream collector and drop cached AMD discovery and the
+ * nvidia-smi availability.
+ */
+export function cleanupGpuMonitor() {
+  pauseGpuMonitor();
+  nvidiaStreamInterval = null;
+  nvidiaSmiUnavailable = false;
+  amdReader = null;
+}
+
 /**
  * Try to get GPU metrics from nvidia-smi as fallback.
  * @returns {Promise<Object|null>} Promise resolving to GPU metrics or null if unavailable.
  */
 async function tryNvidiaSmi() {
+  const streamed = await readNvidiaStream();
+  if (streamed) {
+    return streamed.length > 0 ? streamed : null;
+  }
+
   try {
     // Use async exec with timeout instead of blocking execSync
     const { stdout } = await execAsync(
@@ -69,6 +142,9 @@ async function tryNvidiaSmi() {
  * @returns {Promise<Array>} Array of GPU objects with full details.
  */
 async function getAllNvidiaGpus() {
+  const streamed = await readNvidiaStream();
+  if (streamed) return streamed;
+
   try {
     // Get GPU index, name, utilization, memory
     const { stdout } = await execAsync(
@@ -103,80 +179,21 @@ async function getAllNvidiaGpus() {
 }
 
 /**
- * Detect AMD GPUs via sysfs DRM devices.
+ * Read AMD GPUs via sysfs DRM devices.
+ * Discovery runs once; each call only reads busy percent, VRAM used and hwmon files.
  * @returns {Promise<Array>} Array of AMD GPU objects.
  */
 async function getAmdGpusFromSysfs() {
-  const gpus = [];
-  
+  if (!amdReader) {
+    amdReader = new AmdSysfsReader();
+  }
+
   try {
-    // Read DRM card directories
-    const fs = await import("fs");
-    const drmPath = "/sys/class/drm";
-    
-    const entries = fs.readdirSync(drmPath);
-    
-    for (const entry of entries) {
-      if (entry.startsWith("card") && !entry.includes("-")) {
-        const devicePath = `${drmPath}/${entry}/device`;
-        
-        // Check if it's an AMD GPU (vendor 0x1002)
-        const vendorPath = `${devicePath}/vendor`;
-        try {
-          const vendor = fs.readFileSync(vendorPath, "utf8").trim();
-          if (vendor === "0x1002") {
-            // AMD GPU found
-            const namePath = `${devicePath}/name`;
-            let name = "AMD GPU";
-            try {
-              name = fs.readFileSync(namePath, "utf8").trim();
-            } catch {
-              // Use device ID for name
-              const deviceIdPath = `${devicePath}/device`;
-              const deviceId = fs.readFileSync(deviceIdPath, "utf8").trim();
-              name = `AMD GPU (${deviceId})`;
-            }
-            
-            // Try to get memory info from VRAM
-            let memoryTotal = 0;
-            let memoryUsed = 0;
-            
-            // Check for VRAM info in various locations
-            const vramPath = `${devicePath}/mem_info_vram_total`;
-            const memPath = `${devicePath}/memory_total`;
-            
-            try {
-              const vramTotal = fs.readFileSync(vramPath, "utf8").trim();
-              memoryTotal = parseInt(vramTotal) || 0;
-            } catch {
-              try {
-                const memTotal = fs.readFileSync(memPath, "utf8").trim();
-                memoryTotal = parseInt(memTotal) || 0;
-              } catch {
-                // No memory info available
-              }
-            }
-            
-            gpus.push({
-              name: name,
-              vendor: "AMD",
-              usage: 0, // sysfs doesn't provide real-time usage
-              memoryUsed: memoryUsed,
-              memoryTotal: memoryTotal,
-              hasUtilizationData: memoryTotal > 0,
-              sysfsPath: devicePath,
-            });
-          }
-        } catch {
-          // Not an AMD GPU or no vendor info
-        }
-      }
-    }
+    return await amdReader.read();
   } catch (e) {
-    // sysfs not available or other error
+    console.debug("[METRICS] AMD sysfs read failed:", e.message);
+    return [];
   }
-  
-  return gpus;
 }
 
 /**
@@ -1,6 +1,6 @@
 /**
  * Config Handlers
- * Unified router and logging configuration handlers
+ * Unified router, logging and alert rule configuration handlers
  */
 
 import { fileLogger } from "./file-logger.js";
@@ -11,7 +11,11 @@ import {
   getLoggingConfig,
   saveLoggingConfig,
   resetLoggingConfig,
+  getAlertRules,
+  saveAlertRule,
+  deleteAlertRule,
 } from "../db/config.js";
+import { metricsAlerts, normalizeAlertRule } from "../metrics-alerts.js";
 
 function getRequestId(req) {
   return req?.requestId || `req_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
@@ -90,6 +94,48 @@ export function registerConfigHandlers(socket, db) {
     }
   });
 
+  // Alert Rules
+  socket.on("alerts:rules:get", (req, callback) => {
+    try {
+      const rules = getAlertRules(db);
+      callback({ success: true, data: { rules }, timestamp: new Date().toISOString() });
+    } catch (e) {
+      callback({ success: false, error: e.message, timestamp: new Date().toISOString() });
+    }
+  });
+
+  socket.on("alerts:rules:save", (req, callback) => {
+    try {
+      // Rejects rules the alert engine would skip, with the reason
+      normalizeAlertRule(req?.rule);
+      const rule = saveAlertRule(db, req.rule);
+      const rules = getAlertRules(db);
+      // Apply now rather than at the sampler's next periodic re-read
+      metricsAlerts.setRules(rules);
+
+      socket.broadcast.emit("alerts:rules:updated", { rules, timestamp: new Date().toISOString() });
+      callback({ success: true, data: { rule }, timestamp: new Date().toISOString() });
+    } catch (e) {
+      callback({ success: false, error: e.message, timestamp: new Date().toISOString() });
+    }
+  });
+
+  socket.on("alerts:rules:delete", (req, callback) => {
+    try {
+      const id = req?.id;
+      if (!deleteAlertRule(db, id)) {
+        throw new Error(`Alert rule not found: ${id}`);
+      }
+      const rules = getAlertRules(db);
+      metricsAlerts.setRules(rules);
+
+      socket.broadcast.emit("alerts:rules:updated", { rules, timestamp: new Date().toISOString() });
+      callback({ success: true, data: { id }, timestamp: new Date().toISOString() });
+    } catch (e) {
+      callback({ success: false, error: e.message, timestamp: new Date().toISOString() });
+    }
+  });
+
   // User Settings
   socket.on("settings:get", (req, ack) => {
     try {
@@ -1,13 +1,69 @@
 /**
  * Llama Router API
  * HTTP communication with llama-server
+ * All traffic goes through one keep-alive agent so polling reuses connections,
+ * and concurrent identical GETs share a single in-flight request.
  */
 
 import http from "http";
 
+let llamaAgent = null;
+
+/**
+ * Get the shared keep-alive agent for llama-server traffic.
+ * llama-server advertises its own Keep-Alive timeout, which the agent honours
+ * before reusing an idle socket.
+ * @returns {http.Agent} Shared agent.
+ */
+export function getLlamaAgent() {
+  if (!llamaAgent) {
+    llamaAgent = new http.Agent({
+      keepAlive: true,
+      keepAliveMsecs: 1000,
+      maxSockets: 8,
+      maxFreeSockets: 4,
+    });
+  }
+  return llamaAgent;
+}
+
+/**
+ * Close idle pooled connections (e.g. on shutdown or server restart).
+ */
+export function resetLlamaAgent() {
+  if (llamaAgent) {
+    llamaAgent.destroy();
+    llamaAgent = null;
+  }
+}
+
+/**
+ * Create a single-flight group: concurrent calls with the same key share one
+ * promise until it settles.
+ * @returns {Function} (key, fn) => Promise
+ */
+export function createSingleFlight() {
+  const inFlight = new Map();
+
+  return (key, fn) => {
+    const pending = inFlight.get(key);
+    if (pending) return pending;
+
+    // fn runs synchronously so the request is on the wire before we return
+    const promise = Promise.resolve(fn()).finally(() => {
+      inFlight.delete(key);
+    });
+    inFlight.set(key, promise);
+    return promise;
+  };
+}
+
+const sharedGet = createSingleFlight();
+
 /**
  * Make HTTP request to llama-server API.
  * Sends an HTTP request to the llama-server and returns the parsed response.
+ * GET requests without a body are de-duplicated while in flight.
  * @param {string} endpoint - API endpoint path (e.g., "/models", "/models/load").
  * @param {string} [method="GET"] - HTTP method (GET, POST, DELETE, etc.).
  * @param {Object|null} [body=null] - Request body for POST/PUT requests.
@@ -20,6 +76,25 @@ export async function llamaApiRequest(endpoint, method = "GET", body = null, lla
     throw new Error("llama-server not running");
   }
 
+  if (method === "GET" && !body) {
+    const key = new URL(endpoint, llamaServerUrl).href;
+    return sharedGet(key, () => sendApiRequest(endpoint, method, body, llamaServerUrl));
+  }
+  return sendApiRequest(endpoint, method, body, llamaServerUrl);
+}
+
+/**
+ * Send one request over the shared agent.
+ * An idempotent request that fails on a reused keep-alive socket (closed by
+ * the server while idle) is retried once on a fresh connection.
+ * @param {string} endpoint - API endpoint path.
+ * @param {string} method - HTTP method.
+ * @param {Object|null} body - Request body.
+ * @param {string} llamaServerUrl - Base URL of the llama-server.
+ * @param {boolean} [retried=false] - Whether this is the retry attempt.
+ * @returns {Promise<Object|string>} Parsed JSON response or raw string response.
+ */
+function sendApiRequest(endpoint, method, body, llamaServerUrl, retried = false) {
   return new Promise((resolve, reject) => {
     const url = new URL(endpoint, llamaServerUrl);
     const options = {
@@ -30,6 +105,7 @@ export async function llamaApiRequest(endpoint, method = "GET", body = null, lla
       headers: {
         "Content-Type": "application/json",
       },
+      agent: getLlamaAgent(),
       // Add timeout to prevent hanging connections
       timeout: 5000, // 5 second timeout for API calls
     };
@@ -47,6 +123,10 @@ export async function llamaApiRequest(endpoint, method = "GET", body = null, lla
     });
 
     req.on("error", (e) => {
+      if (req.reusedSocket && e.code === "ECONNRESET" && method === "GET" && !retried) {
+        resolve(sendApiRequest(endpoint, method, body, llamaServerUrl, true));
+        return;
+      }
       // Don't log connection errors as warnings - they're expected when server is down
       reject(new Error(`Connection failed: ${e.message}`));
     });
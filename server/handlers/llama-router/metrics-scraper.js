@@ -3,6 +3,56 @@
  * FIXED: Supports model-specific metrics from llama-server
  */
 import http from "http";
+import { getLlamaAgent, createSingleFlight } from "./api.js";
+import { PrometheusStreamParser, parsePrometheusText } from "../../prometheus-parser.js";
+
+// llama-server Prometheus names -> scraper fields (server_uptime_ms is converted to seconds)
+const PROMETHEUS_FIELDS = {
+  "llamacpp:prompt_tokens_seconds": ["tokensPerSecond"],
+  "llamacpp:predicted_tokens_seconds": ["predictedTokensSeconds"],
+  "llamacpp:server_uptime_ms": ["uptime"],
+  "llamacpp:requests_processing": ["activeModels"],
+  "llamacpp:requests_deferred": ["queueSize"],
+  "llamacpp:llm_server_vram_total": ["vramTotal"],
+  "llamacpp:llm_server_vram_used": ["vramUsed"],
+  "llamacpp:llm_server_n_ctx": ["nCtx"],
+  "llamacpp:llm_server_n_parallel": ["nParallel"],
+  "llamacpp:llm_server_n_threads": ["nThreads"],
+  "llamacpp:n_decode_total": ["nDecodeTotal", "totalRequests"],
+  "llamacpp:n_busy_slots_per_decode": ["nBusySlotsPerDecode"],
+  "llamacpp:prompt_tokens_total": ["promptTokensTotal", "nTokensProcessed"],
+  "llamacpp:tokens_predicted_total": ["predictedTokensTotal", "nTokensPredicted"],
+  "llamacpp:prompt_seconds_total": ["promptSecondsTotal"],
+  "llamacpp:tokens_predicted_seconds_total": ["predictedSecondsTotal"],
+  "llamacpp:n_tokens_max": ["nTokensMax"],
+};
+
+/**
+ * Zeroed metrics for a /metrics response.
+ * @returns {Object} Metrics with every mapped field set to 0
+ */
+function emptyPrometheusMetrics() {
+  return {
+    uptime: 0,
+    activeModels: 0,
+    totalRequests: 0,
+    tokensPerSecond: 0,
+    predictedTokensSeconds: 0,
+    queueSize: 0,
+    vramTotal: 0,
+    vramUsed: 0,
+    nCtx: 0,
+    nParallel: 0,
+    nThreads: 0,
+    promptTokensTotal: 0,
+    predictedTokensTotal: 0,
+    promptSecondsTotal: 0,
+    predictedSecondsTotal: 0,
+    nDecodeTotal: 0,
+    nBusySlotsPerDecode: 0,
+    nTokensMax: 0,
+  };
+}
 
 export class LlamaServerMetricsScraper {
   constructor(config) {
@@ -11,8 +61,12 @@ export class LlamaServerMetricsScraper {
     this.baseUrl = `http://${this.host}:${this.port}`;
     this.modelName = config.modelName || null;
     this.cache = new Map();
-    this.cacheTTL = 10000; // 10 seconds
+    // Below the sampler's llama interval (FAMILY_INTERVALS.llama), so each
+    // scheduled scrape reaches the server and gives llama-rates.js a fresh
+    // counter sample; only concurrent callers share a response
+    this.cacheTTL = 1000;
     this._errorLogged = false;
+    this._singleFlight = createSingleFlight();
   }
 
   updatePort(port) {
@@ -30,6 +84,24 @@ export class LlamaServerMetricsScraper {
     }
   }
 
+  /**
+   * Forget the tracked model (e.g. after it was unloaded).
+   */
+  clearModel() {
+    if (this.modelName) {
+      this.modelName = null;
+      this.cache.clear();
+    }
+  }
+
+  /**
+   * Time the cached metrics were fetched.
+   * @returns {number|null} Epoch ms, or null when nothing is cached
+   */
+  getMetricsTimestamp() {
+    return this.cache.get("metrics")?.timestamp ?? null;
+  }
+
   async getMetrics() {
     // Check cache first
     const cached = this.cache.get("metrics");
@@ -37,21 +109,14 @@ export class LlamaServerMetricsScraper {
       return cached.data;
     }
 
-    // Try multiple endpoints to get metrics
     try {
-      // First try /health endpoint (might return JSON or plain text)
-      const healthData = await this._fetchEndpoint("/health", 2000);
-      let metrics = this._extractMetricsFromHealth(healthData);
-
-      // If health endpoint returned valid data (hasData: true), use it
-      // Even if tokens are 0, we have valid uptime from server
-      if (metrics && metrics.hasData === true) {
-        this.cache.set("metrics", { data: metrics, timestamp: Date.now() });
-        return metrics;
+      // Counters and gauges come from /metrics; /health only tells whether a
+      // server without --metrics is alive (and sometimes its uptime)
+      let metrics = await this._tryMetricsEndpoint();
+      if (!metrics) {
+        const healthData = await this._fetchEndpoint("/health", 2000);
+        metrics = this._extractMetricsFromHealth(healthData);
       }
-
-      // Try /metrics endpoint if health didn't return valid data
-      metrics = await this._tryMetricsEndpoint();
       if (metrics) {
         this.cache.set("metrics", { data: metrics, timestamp: Date.now() });
         return metrics;
@@ -68,237 +133,188 @@ export class LlamaServerMetricsScraper {
   }
 
   /**
-   * Extract metrics from health endpoint response
-   * Handles both JSON and plain text responses
+   * Extract liveness from a /health response (JSON or plain text "ok")
+   * Counters stay 0 and source is "health", so the rate tracker skips it.
+   * @param {*} data - Parsed /health body
+   * @returns {Object|null} Metrics, or null for an empty response
    */
   _extractMetricsFromHealth(data) {
-    // If data is plain text "ok", return empty metrics
-    if (typeof data === "string") {
-      return {
-        tokensPerSecond: 0,
-        predictedTokensSeconds: 0,
-        uptime: 0,
-        activeModels: 0,
-        totalRequests: 0,
-        queueSize: 0,
-        vramTotal: 0,
-        vramUsed: 0,
-        nCtx: 0,
-        nParallel: 0,
-        nThreads: 0,
-        promptTokensTotal: 0,
-        predictedTokensTotal: 0,
-        promptSecondsTotal: 0,
-        predictedSecondsTotal: 0,
-        nDecodeTotal: 0,
-        nBusySlotsPerDecode: 0,
-        nTokensMax: 0,
-        hasData: true,
-      };
-    }
-
-    // If data is an object with raw text (from failed JSON parse), treat as "ok"
-    if (data && typeof data === "object" && data.raw !== undefined) {
-      return {
-        tokensPerSecond: 0,
-        predictedTokensSeconds: 0,
-        uptime: 0,
-        activeModels: 0,
-        totalRequests: 0,
-        queueSize: 0,
-        vramTotal: 0,
-        vramUsed: 0,
-        nCtx: 0,
-        nParallel: 0,
-        nThreads: 0,
-        promptTokensTotal: 0,
-        predictedTokensTotal: 0,
-        promptSecondsTotal: 0,
-        predictedSecondsTotal: 0,
-        nDecodeTotal: 0,
-        nBusySlotsPerDecode: 0,
-        nTokensMax: 0,
-        hasData: true,
-      };
-    }
+    if (data === null || data === undefined) return null;
 
-    // Try to extract from JSON response
-    if (data && typeof data === "object") {
-      return {
-        tokensPerSecond: data.tokens_per_second || data.tokensPerSecond || 0,
-        predictedTokensSeconds: data.predicted_tokens_seconds || data.predictedTokensSeconds || data.tokens_per_second || 0,
-        uptime: data.uptime || data.uptime_s || data.server_uptime || data["server-uptime"] || 0,
-        activeModels: data.active_models || data.activeModels || 0,
-        totalRequests: data.total_requests || data.totalRequests || 0,
-        queueSize: data.queue_size || data.queueSize || 0,
-        vramTotal: data.vram_total || data.vramTotal || 0,
-        vramUsed: data.vram_used || data.vramUsed || 0,
-        nCtx: data.n_ctx || data.nCtx || 0,
-        nParallel: data.n_parallel || data.nParallel || 0,
-        nThreads: data.n_threads || data.nThreads || 0,
-        promptTokensTotal: data.prompt_tokens_total || 0,
-        predictedTokensTotal: data.predicted_tokens_total || 0,
-        promptSecondsTotal: data.prompt_seconds_total || 0,
-        predictedSecondsTotal: data.predicted_seconds_total || 0,
-        nDecodeTotal: data.n_decode_total || 0,
-        nBusySlotsPerDecode: data.n_busy_slots_per_decode || 0,
-        nTokensMax: data.n_tokens_max || 0,
-        hasData: true,
-      };
+    const metrics = { ...emptyPrometheusMetrics(), hasData: true, source: "health" };
+    if (typeof data === "object" && data.raw === undefined) {
+      metrics.uptime = data.uptime || data.uptime_s || data.server_uptime || data["server-uptime"] || 0;
     }
-
-    return null;
+    return metrics;
   }
 
   /**
-   * Try to get metrics from /metrics endpoint
-   * llama-server requires a model name: /metrics?model=ModelName
+   * Try to get metrics from the /metrics endpoint
+   * In router mode the tracked model's metrics are at /metrics?model=ModelName;
+   * a single-model llama-server (or a router that rejects the model) answers
+   * plain /metrics.
+   * @returns {Promise<Object|null>} Metrics, or null when /metrics is unavailable
    */
   async _tryMetricsEndpoint() {
-    // FIRST: Try with model name if available (most accurate)
+    const endpoints = ["/metrics"];
     if (this.modelName) {
-      try {
-        const endpoint = `/metrics?model=${encodeURIComponent(this.modelName)}`;
-        const data = await this._fetchEndpoint(endpoint, 3000);
-        if (data && typeof data === "object") {
-          console.debug(`[METRICS] Got metrics for model: ${this.modelName}`);
-          return data;
-        }
-      } catch (e) {
-        console.debug(`[METRICS] Model-specific metrics failed: ${e.message}`);
-      }
+      endpoints.unshift(`/metrics?model=${encodeURIComponent(this.modelName)}`);
     }
 
-    // SECOND: Try common model paths (legacy support)
-    const modelPaths = ["/default", "/current"];
-
-    for (const modelPath of modelPaths) {
+    for (const endpoint of endpoints) {
       try {
-        const endpoint = `/metrics${modelPath}`;
         const data = await this._fetchEndpoint(endpoint, 3000);
-        if (data && typeof data === "object") {
-          return data;
-        }
+        if (data && typeof data === "object") return data;
       } catch (e) {
-        // Continue to next model path
+        console.debug(`[METRICS] ${endpoint} failed: ${e.message}`);
       }
     }
-
     return null;
   }
 
+  /**
+   * Parse Prometheus exposition text into scraper metrics.
+   * @param {string} text - Exposition text
+   * @returns {Object} Flat metrics plus per-model values and structured families
+   */
   _parsePrometheusMetrics(text) {
-    const metrics = {
-      uptime: 0,
-      activeModels: 0,
-      totalRequests: 0,
-      tokensPerSecond: 0,
-      predictedTokensSeconds: 0,
-      queueSize: 0,
-      vramTotal: 0,
-      vramUsed: 0,
-      nCtx: 0,
-      nParallel: 0,
-      nThreads: 0,
-      promptTokensTotal: 0,
-      predictedTokensTotal: 0,
-      promptSecondsTotal: 0,
-      predictedSecondsTotal: 0,
-      nDecodeTotal: 0,
-      nBusySlotsPerDecode: 0,
-      nTokensMax: 0,
-    };
+    return this._metricsFromFamilies(parsePrometheusText(text));
+  }
 
-    const lines = text.split("\n");
-    for (const line of lines) {
-      const trimmed = line.trim();
-      if (!trimmed || trimmed.startsWith("#")) continue;
+  /**
+   * Map parsed families onto the scraper's field names.
+   * Series labelled with a model go to metrics.models[model]; each flat field
+   * comes from its unlabelled series, or from the tracked model when the
+   * server only exports that metric with labels (router mode).
+   * @param {Object} result - Parser result ({ families })
+   * @returns {Object} Metrics
+   */
+  _metricsFromFamilies(result) {
+    const metrics = emptyPrometheusMetrics();
+    const models = {};
+    const unlabelled = new Set();
 
-      const spaceIndex = trimmed.lastIndexOf(" ");
-      if (spaceIndex === -1) continue;
+    for (const [name, family] of Object.entries(result.families)) {
+      const fields = PROMETHEUS_FIELDS[name];
+      if (!fields) continue;
 
-      const metricName = trimmed.substring(0, spaceIndex);
-      const valueStr = trimmed.substring(spaceIndex + 1);
-      const value = parseFloat(valueStr);
-      if (isNaN(value)) continue;
+      for (const series of family.series) {
+        if (typeof series.value !== "number" || Number.isNaN(series.value)) continue;
+        const model = series.labels.model;
+        let target = metrics;
+        if (model) {
+          target = models[model] ||= emptyPrometheusMetrics();
+        }
+        const value = name === "llamacpp:server_uptime_ms" ? series.value / 1000 : series.value;
+        for (const field of fields) {
+          target[field] = value;
+          if (!model) unlabelled.add(field);
+        }
+      }
+    }
 
-      // Map common metrics
-      if (metricName === "llamacpp:prompt_tokens_seconds") {
-        metrics.tokensPerSecond = value;
-      } else if (metricName === "llamacpp:predicted_tokens_seconds") {
-        metrics.predictedTokensSeconds = value;
-      } else if (metricName === "llamacpp:server_uptime_ms") {
-        metrics.uptime = value / 1000;
-      } else if (metricName === "llamacpp:requests_processing") {
-        metrics.activeModels = value;
-      } else if (metricName === "llamacpp:requests_deferred") {
-        metrics.queueSize = value;
-      } else if (metricName === "llamacpp:llm_server_vram_total") {
-        metrics.vramTotal = value;
-      } else if (metricName === "llamacpp:llm_server_vram_used") {
-        metrics.vramUsed = value;
-      } else if (metricName === "llamacpp:llm_server_n_ctx") {
-        metrics.nCtx = value;
-      } else if (metricName === "llamacpp:llm_server_n_parallel") {
-        metrics.nParallel = value;
-      } else if (metricName === "llamacpp:llm_server_n_threads") {
-        metrics.nThreads = value;
-      } else if (metricName === "llamacpp:n_decode_total") {
-        metrics.nDecodeTotal = value;
-        metrics.totalRequests = value;
-      } else if (metricName === "llamacpp:n_busy_slots_per_decode") {
-        metrics.nBusySlotsPerDecode = value;
-      } else if (metricName === "llamacpp:prompt_tokens_total") {
-        metrics.promptTokensTotal = value;
-        metrics.nTokensProcessed = value;
-      } else if (metricName === "llamacpp:tokens_predicted_total") {
-        metrics.predictedTokensTotal = value;
-        metrics.nTokensPredicted = value;
-      } else if (metricName === "llamacpp:prompt_seconds_total") {
-        metrics.promptSecondsTotal = value;
-      } else if (metricName === "llamacpp:tokens_predicted_seconds_total") {
-        metrics.predictedSecondsTotal = value;
-      } else if (metricName === "llamacpp:n_tokens_max") {
-        metrics.nTokensMax = value;
+    const tracked = models[this.modelName] || Object.values(models)[0];
+    if (tracked) {
+      for (const [field, value] of Object.entries(tracked)) {
+        if (!unlabelled.has(field)) metrics[field] = value;
       }
     }
 
+    metrics.models = models;
+    metrics.families = result.families;
+    metrics.hasData = true;
+    metrics.source = "metrics";
     return metrics;
   }
 
+  /**
+   * GET an endpoint over the shared keep-alive agent.
+   * Concurrent calls for the same URL share one request.
+   */
   async _fetchEndpoint(endpoint, timeoutMs = 2000) {
+    const url = new URL(endpoint, this.baseUrl);
+    return this._singleFlight(url.href, () => this._request(url, endpoint, timeoutMs));
+  }
+
+  /**
+   * Send one GET request and parse the response.
+   * Settles exactly once: on a timeout, a socket error or a response that
+   * ends early the promise rejects, so the single-flight entry shared by
+   * later scrapes is released. A request that fails on a reused keep-alive
+   * socket (closed by the server while idle) is retried once on a fresh one,
+   * as sendApiRequest() does.
+   * @param {URL} url - Request URL
+   * @param {string} endpoint - Endpoint path (selects the body parser)
+   * @param {number} timeoutMs - Timeout for the whole request
+   * @param {boolean} [retried=false] - Whether this is the retry attempt
+   * @returns {Promise<Object>} Parsed metrics or JSON body
+   */
+  _request(url, endpoint, timeoutMs, retried = false) {
     return new Promise((resolve, reject) => {
-      const url = new URL(endpoint, this.baseUrl);
+      let settled = false;
+      const settle = (fn, value) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(timer);
+        fn(value);
+      };
+      const fail = (error) => {
+        req.destroy();
+        settle(reject, error);
+      };
+
       const options = {
         hostname: url.hostname,
         port: url.port || 8080,
         path: url.pathname + url.search,
         method: "GET",
-        timeout: timeoutMs,
+        agent: getLlamaAgent(),
       };
 
       const req = http.request(options, (res) => {
+        // Prometheus text is parsed as it arrives instead of buffering the body
+        const isMetrics = endpoint.includes("/metrics");
+        const parser = isMetrics ? new PrometheusStreamParser() : null;
         let data = "";
-        res.on("data", (chunk) => { data += chunk; });
+        res.on("data", (chunk) => {
+          if (parser) {
+            parser.write(chunk);
+          } else {
+            data += chunk;
+          }
+        });
         res.on("end", () => {
-          if (res.statusCode === 200) {
-            if (endpoint.includes("/metrics")) {
-              resolve(this._parsePrometheusMetrics(data));
-            } else {
-              try {
-                resolve(JSON.parse(data));
-              } catch {
-                resolve({ raw: data });
-              }
-            }
+          if (res.statusCode !== 200) {
+            settle(reject, new Error(`HTTP ${res.statusCode}`));
+          } else if (isMetrics) {
+            settle(resolve, this._metricsFromFamilies(parser.end()));
           } else {
-            reject(new Error(`HTTP ${res.statusCode}`));
+            try {
+              settle(resolve, JSON.parse(data));
+            } catch {
+              settle(resolve, { raw: data });
+            }
           }
         });
+        res.on("error", fail);
+        res.on("aborted", () => fail(new Error("Response aborted")));
+        res.on("close", () => {
+          if (!res.complete) fail(new Error("Connection closed before the response ended"));
+        });
       });
 
-      req.on("error", reject);
-      req.setTimeout(timeoutMs, () => req.destroy());
+      req.on("error", (e) => {
+        if (req.reusedSocket && e.code === "ECONNRESET" && !retried && !settled) {
+          settled = true;
+          clearTimeout(timer);
+          resolve(this._request(url, endpoint, timeoutMs, true));
+          return;
+        }
+        settle(reject, e);
+      });
+      // Covers a server that stalls mid-body, which the socket idle timeout does not
+      const timer = setTimeout(() => fail(new Error(`Request timeout (${timeoutMs}ms)`)), timeoutMs);
+      timer.unref?.();
       req.end();
     });
   }
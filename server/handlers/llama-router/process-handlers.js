@@ -89,6 +89,7 @@ export function registerProcessHandlers(socket, io, db, processManager) {
     console.log("[DEBUG] llama-server:status request:", { requestId: id });
     try {
       const status = processManager.getStatus();
+      status.resources = await processManager.getResourceUsage();
       ok(socket, "llama-server:status:result", status, id, ack);
     } catch (e) {
       console.error("[DEBUG] llama-server:status error:", e);
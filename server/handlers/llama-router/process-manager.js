@@ -3,6 +3,9 @@
  * Handles spawning, monitoring, and cleanup of llama-server child process.
  * @class
  */
+
+import { ProcessTreeCollector } from "../../process-tree-collector.js";
+
 export class LlamaServerProcessManager {
   /**
    * Create a new LlamaServerProcessManager.
@@ -27,6 +30,7 @@ export class LlamaServerProcessManager {
     this.startTime = null;
     this.pid = null;
     this.io = config.io || null; // Socket.IO instance for broadcasting
+    this.processTree = new ProcessTreeCollector();
   }
 
   /**
@@ -190,6 +194,16 @@ export class LlamaServerProcessManager {
     };
   }
 
+  /**
+   * Get RSS, CPU, I/O and thread usage for llama-server and its children.
+   * Router-mode children are grouped under the model they serve.
+   * @returns {Promise<Object|null>} Process tree usage, or null when not running.
+   */
+  async getResourceUsage() {
+    if (!this.isRunning || !this.pid) return null;
+    return this.processTree.collect(this.pid);
+  }
+
   /**
    * Build command-line arguments for llama-server
    */
@@ -267,6 +281,7 @@ export class LlamaServerProcessManager {
    * Destroys stdout and stderr streams to free resources.
    */
   _cleanup() {
+    this.processTree.reset();
     if (this.process) {
       this.process.stdout.destroy();
       this.process.stderr.destroy();
@@ -16,6 +16,7 @@ import {
 import { llamaApiRequest } from "./api.js";
 import { initializeLlamaMetricsScraper } from "../../metrics.js";
 import { getRouterConfig } from "../../db/config.js";
+import { ProcessTreeCollector } from "../../process-tree-collector.js";
 
 // Module-level state
 let llamaServerProcess = null;
@@ -26,6 +27,7 @@ let logWriteStream = null;
 let notificationCallback = null;
 let stdoutListener = null; 
 let stderrListener = null; 
+const processTree = new ProcessTreeCollector();
 
 const LOGS_DIR = path.join(process.cwd(), "logs");
 if (!fs.existsSync(LOGS_DIR)) {
@@ -77,6 +79,15 @@ export function getServerUptime() {
   return Math.floor((Date.now() - llamaServerStartTime) / 1000);
 }
 
+/**
+ * Get resource usage for the spawned llama-server and its router children.
+ * @returns {Promise<Object|null>} Process tree usage, or null if not spawned by us
+ */
+export async function getServerResources() {
+  if (!llamaServerProcess?.pid || llamaServerProcess.exitCode !== null) return null;
+  return processTree.collect(llamaServerProcess.pid);
+}
+
 function notifyServerEvent(event, data) {
   console.log(`[LLAMA-NOTIFY] ${event}:`, data);
   if (notificationCallback) {
@@ -115,6 +126,7 @@ function cleanupProcess() {
   }
 
   // Clear ALL module-level state to ensure clean restart
+  processTree.reset();
   llamaServerProcess = null;
   llamaServerPort = null;
   llamaServerUrl = null;
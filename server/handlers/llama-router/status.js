@@ -188,6 +188,7 @@ export async function loadModel(modelName) {
   try {
     const result = await llamaApiRequest("/models/load", "POST", { model: modelName }, url);
     console.log("[LLAMA] Load result:", result);
+    await refreshMetricsModel();
     return { success: true, result };
   } catch (e) {
     console.error("[LLAMA] Failed to load model:", e.message);
@@ -195,6 +196,19 @@ export async function loadModel(modelName) {
   }
 }
 
+/**
+ * Point the metrics scraper at the model that is loaded now.
+ * Imported lazily: llama-metrics imports this module's dependencies.
+ */
+async function refreshMetricsModel() {
+  try {
+    const { refreshLlamaMetricsModel } = await import("../../llama-metrics.js");
+    await refreshLlamaMetricsModel();
+  } catch (e) {
+    console.debug("[LLAMA] Metrics model refresh skipped:", e.message);
+  }
+}
+
 /**
  * Unload a model (router mode).
  * Sends a request to llama-server to unload a specific model.
@@ -221,6 +235,7 @@ export async function unloadModel(modelName) {
   try {
     const result = await llamaApiRequest("/models/unload", "POST", { model: modelName }, url);
     console.log("[LLAMA] Unload result:", result);
+    await refreshMetricsModel();
     return { success: true, result };
   } catch (e) {
     console.error("[LLAMA] Failed to unload model:", e.message);
@@ -6,6 +6,7 @@
 import fs from "fs/promises";
 import path from "path";
 import { fileLogger } from "./file-logger.js";
+import { SNIPPET_MARKS } from "../db/logs-repository.js";
 
 // Constants for log directory and file
 const LOG_DIR = path.resolve(process.cwd(), "logs");
@@ -88,12 +89,12 @@ export function registerLogsHandlers(socket, db) {
    * - Input: { limit?: number }
    * - Output: { success: true, data: { logs }, timestamp: string }
    */
-  socket.on("logs:get", (req, callback) => {
+  socket.on("logs:get", async (req, callback) => {
     const id = getRequestId(req);
     console.log("[DEBUG] logs:get request", { requestId: id, limit: req?.limit });
 
     try {
-      const logs = db.getLogs(req?.limit || 100);
+      const logs = await db.getLogs(req?.limit || 100);
 
       console.log("[DEBUG] logs:get response", { requestId: id, count: logs.length });
 
@@ -112,6 +113,54 @@ export function registerLogsHandlers(socket, db) {
     }
   });
 
+  /**
+   * Search logs in the database (full text).
+   * CONTRACT:
+   * - Input: { query?: string, level?: string, source?: string, from?: number, to?: number,
+   *            limit?: number, offset?: number } (from/to in epoch seconds)
+   * - Output: { success: true, data: { hits, hasMore, offset, marks }, timestamp: string }
+   *   hits are ranked best first when a query is given, newest first otherwise;
+   *   each snippet wraps matched terms in marks[0] / marks[1]
+   */
+  socket.on("logs:search", async (req, callback) => {
+    const id = getRequestId(req);
+    console.log("[DEBUG] logs:search request", { requestId: id, query: req?.query, offset: req?.offset });
+
+    try {
+      const from = req?.from !== undefined ? Number(req.from) : undefined;
+      const to = req?.to !== undefined ? Number(req.to) : undefined;
+      if ((from !== undefined && !Number.isFinite(from)) || (to !== undefined && !Number.isFinite(to))) {
+        throw new Error("from and to must be timestamps");
+      }
+
+      const offset = Math.max(Number(req?.offset) || 0, 0);
+      const { hits, hasMore } = await db.searchLogs({
+        query: req?.query,
+        level: req?.level,
+        source: req?.source,
+        from,
+        to,
+        limit: req?.limit,
+        offset,
+      });
+
+      console.log("[DEBUG] logs:search response", { requestId: id, count: hits.length, hasMore });
+
+      callback({
+        success: true,
+        data: { hits, hasMore, offset, marks: SNIPPET_MARKS },
+        timestamp: new Date().toISOString(),
+      });
+    } catch (e) {
+      console.error("[ERROR] logs:search failed:", e.message);
+      callback({
+        success: false,
+        error: e.message || "Failed to search logs",
+        timestamp: new Date().toISOString(),
+      });
+    }
+  });
+
   /**
    * Get logs from file.
    * CONTRACT:
@@ -186,13 +235,13 @@ export function registerLogsHandlers(socket, db) {
    * - Output: { success: true, data: { cleared }, timestamp: string }
    * - Broadcasts: logs:cleared
    */
-  socket.on("logs:clear", (req, callback) => {
+  socket.on("logs:clear", async (req, callback) => {
     const id = getRequestId(req);
 
     console.log("[DEBUG] logs:clear request", { requestId: id });
 
     try {
-      const cleared = db.clearLogs();
+      const cleared = await db.clearLogs();
 
       // Broadcast to all clients
       socket.broadcast.emit("logs:cleared", {
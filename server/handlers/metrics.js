@@ -4,6 +4,7 @@
  */
 
 import { ok, err } from "./response.js";
+import { recentMetrics } from "../metrics-ring-buffer.js";
 
 // Store latest GPU list to include in responses
 let latestGpuList = [];
@@ -17,10 +18,10 @@ export function registerMetricsHandlers(socket, db) {
   /**
    * Get latest metrics - Send immediately without waiting for interval
    */
-  socket.on("metrics:get", (req, ack) => {
+  socket.on("metrics:get", async (req, ack) => {
     console.log("[METRICS] Received metrics:get request");
     try {
-      const m = db.getLatestMetrics() || {};
+      const m = (await db.getLatestMetrics()) || {};
       const metrics = {
         cpu: { usage: m.cpu_usage || 0 },
         memory: { used: m.memory_usage || 0 },
@@ -49,46 +50,197 @@ export function registerMetricsHandlers(socket, db) {
   });
 
   /**
-     * Get metrics history - Send immediately without waiting for interval
-     * Streamed progressively if history is large
-     */
-   socket.on("metrics:history", (req, ack) => {
-      try {
+   * Get metrics history - Send immediately without waiting for interval
+   * With { from, to } (epoch seconds, or { range } seconds back from now) the
+   * coarsest tier that still yields `points` buckets is used; otherwise the
+   * last `limit` raw rows are returned. Ranges the in-memory ring buffer still
+   * covers are served from it at full resolution without querying SQLite.
+   */
+  socket.on("metrics:history", async (req, ack) => {
+    try {
+      let rows;
+      let tier = "raw";
+
+      if (req?.from || req?.range) {
+        const to = req.to || Math.floor(Date.now() / 1000);
+        const from = req.from || to - req.range;
+        const points = req.points || 60;
+        console.log(`[METRICS] Sending metrics history (${from}-${to}, ${points} points)`);
+        if (recentMetrics.covers(from)) {
+          rows = recentMetrics.range(from, to);
+        } else {
+          ({ tier, rows } = await db.getMetricsHistoryRange(from, to, points));
+        }
+      } else {
         const limit = req?.limit || 60;
         console.log(`[METRICS] Sending metrics history (${limit} records)`);
+        rows = recentMetrics.size >= limit ? recentMetrics.latest(limit) : await db.getMetricsHistory(limit);
+      }
 
-        const history = db.getMetricsHistory(limit).map((m) => ({
-          cpu: { usage: m.cpu_usage || 0 },
-          memory: { used: m.memory_usage || 0 },
-          swap: { used: m.swap_usage || 0 },
-          disk: { used: m.disk_usage || 0 },
-          gpu: {
-            usage: m.gpu_usage || 0,
-            memoryUsed: m.gpu_memory_used || 0,
-            memoryTotal: m.gpu_memory_total || 0,
-          },
-          uptime: m.uptime || 0,
-          timestamp: m.timestamp,
-        }));
-
-        const response = {
-          success: true,
-          data: history,
-        };
-        if (typeof ack === "function") {
-          ack(response);
-        }
-      } catch (e) {
-        console.error("[METRICS] Error fetching metrics history:", e.message);
-        const response = {
-          success: false,
-          error: { message: e.message },
-        };
-        if (typeof ack === "function") {
-          ack(response);
-        }
+      const history = rows.map(toHistoryEntry);
+
+      const response = {
+        success: true,
+        data: history,
+        tier,
+      };
+      if (typeof ack === "function") {
+        ack(response);
+      }
+    } catch (e) {
+      console.error("[METRICS] Error fetching metrics history:", e.message);
+      const response = {
+        success: false,
+        error: { message: e.message },
+      };
+      if (typeof ack === "function") {
+        ack(response);
+      }
+    }
+  });
+
+  /**
+   * Get metrics aggregated into fixed-width buckets
+   * { from, to, step } in epoch seconds; `to` defaults to now. Charts pass
+   * step = (to - from) / width so they get one point per pixel whatever the
+   * window. Each entry carries min/max next to the bucket average.
+   */
+  socket.on("metrics:range", async (req, ack) => {
+    const id = req?.requestId;
+    try {
+      const to = Number(req?.to) || Math.floor(Date.now() / 1000);
+      const from = Number(req?.from);
+      if (!Number.isFinite(from) || from >= to) {
+        err(socket, "metrics:range:result", "from must be a timestamp before to", id, ack);
+        return;
       }
-    });
+      const step = Number(req?.step) || 1;
+
+      console.log(`[METRICS] Sending metrics range (${from}-${to}, step ${step}s)`);
+      const range = await db.getMetricsRange(from, to, step);
+      ok(
+        socket,
+        "metrics:range:result",
+        { tier: range.tier, step: range.step, from, to, history: range.rows.map(toHistoryEntry) },
+        id,
+        ack
+      );
+    } catch (e) {
+      console.error("[METRICS] Error fetching metrics range:", e.message);
+      err(socket, "metrics:range:result", e.message, id, ack);
+    }
+  });
+
+  /**
+   * Per-GPU history: one GPU's readings aggregated into step-second buckets
+   */
+  socket.on("metrics:gpu-history", async (req, ack) => {
+    const id = req?.requestId;
+    try {
+      const gpu = Number(req?.gpu);
+      if (!Number.isInteger(gpu) || gpu < 0) {
+        err(socket, "metrics:gpu-history:result", "gpu must be a GPU index", id, ack);
+        return;
+      }
+      const to = Number(req?.to) || Math.floor(Date.now() / 1000);
+      const from = Number(req?.from);
+      if (!Number.isFinite(from) || from >= to) {
+        err(socket, "metrics:gpu-history:result", "from must be a timestamp before to", id, ack);
+        return;
+      }
+      const step = Number(req?.step) || 1;
+
+      console.log(`[METRICS] Sending GPU ${gpu} history (${from}-${to}, step ${step}s)`);
+      const history = await db.getGpuMetricsHistory(gpu, from, to, step);
+      ok(
+        socket,
+        "metrics:gpu-history:result",
+        { gpu, step: history.step, from, to, history: history.rows.map(toGpuHistoryEntry) },
+        id,
+        ack
+      );
+    } catch (e) {
+      console.error("[METRICS] Error fetching GPU history:", e.message);
+      err(socket, "metrics:gpu-history:result", e.message, id, ack);
+    }
+  });
+}
+
+/**
+ * Map a gpu_metrics bucket to the frontend per-GPU history format
+ * Temperature and power stay null when the GPU does not report them
+ * @param {Object} g - Database row from getGpuHistory()
+ * @returns {Object} History entry
+ */
+function toGpuHistoryEntry(g) {
+  return {
+    usage: g.usage || 0,
+    usageMax: g.usage_max || 0,
+    memoryUsed: g.memory_used || 0,
+    memoryUsedMax: g.memory_used_max || 0,
+    memoryTotal: g.memory_total || 0,
+    temperature: g.temperature,
+    temperatureMax: g.temperature_max,
+    power: g.power,
+    powerMax: g.power_max,
+    samples: g.samples,
+    timestamp: g.timestamp,
+  };
+}
+
+/**
+ * Map a metrics row (raw or rollup) to the frontend history format
+ * Rollup rows also carry min/max for each field
+ * @param {Object} m - Database row
+ * @returns {Object} History entry
+ */
+function toHistoryEntry(m) {
+  const entry = {
+    cpu: { usage: m.cpu_usage || 0 },
+    memory: { used: m.memory_usage || 0 },
+    swap: { used: m.swap_usage || 0 },
+    disk: { used: m.disk_usage || 0 },
+    gpu: {
+      usage: m.gpu_usage || 0,
+      memoryUsed: m.gpu_memory_used || 0,
+      memoryTotal: m.gpu_memory_total || 0,
+    },
+    llama: {
+      promptTokensPerSecond: m.llama_prompt_tps || 0,
+      predictedTokensPerSecond: m.llama_predicted_tps || 0,
+      requestsPerSecond: m.llama_requests_per_sec || 0,
+      busySlotRatio: m.llama_busy_ratio || 0,
+    },
+    io: {
+      readBytesPerSec: m.disk_read_bps || 0,
+      writeBytesPerSec: m.disk_write_bps || 0,
+      readIops: m.disk_read_iops || 0,
+      writeIops: m.disk_write_iops || 0,
+      utilization: m.disk_io_utilization || 0,
+    },
+    network: {
+      rxBytesPerSec: m.net_rx_bps || 0,
+      txBytesPerSec: m.net_tx_bps || 0,
+    },
+    uptime: m.uptime || 0,
+    timestamp: m.timestamp,
+  };
+
+  if (m.samples !== undefined) {
+    entry.samples = m.samples;
+    entry.cpu.min = m.cpu_usage_min;
+    entry.cpu.max = m.cpu_usage_max;
+    entry.memory.min = m.memory_usage_min;
+    entry.memory.max = m.memory_usage_max;
+    entry.swap.min = m.swap_usage_min;
+    entry.swap.max = m.swap_usage_max;
+    entry.disk.min = m.disk_usage_min;
+    entry.disk.max = m.disk_usage_max;
+    entry.gpu.min = m.gpu_usage_min;
+    entry.gpu.max = m.gpu_usage_max;
+  }
+
+  return entry;
 }
 
 /**
@@ -27,11 +27,11 @@ export function registerModelsCrudHandlers(socket, io, db) {
    * - Input: {}
    * - Output: { success: true, data: { models: Model[] }, timestamp: string }
    */
-  socket.on("models:list", (req, ack) => {
+  socket.on("models:list", async (req, ack) => {
     console.log("[DEBUG] models:list request");
   
     try {
-      const models = db.getModels();
+      const models = await db.getModels();
       console.log("[DEBUG] models:list response", { count: models.length });
   
       if (typeof ack === "function") {
@@ -58,12 +58,12 @@ export function registerModelsCrudHandlers(socket, io, db) {
    * - Output: { success: true, data: { model: Model }, timestamp: string }
    * - Error: { success: false, error: string, timestamp: string }
    */
-  socket.on("models:get", (req, callback) => {
+  socket.on("models:get", async (req, callback) => {
     const id = getRequestId(req);
     console.log("[DEBUG] models:get request", { requestId: id, modelId: req?.modelId });
 
     try {
-      const model = db.getModel(req?.modelId);
+      const model = await db.getModel(req?.modelId);
       if (model) {
         callback({
           success: true,
@@ -94,12 +94,12 @@ export function registerModelsCrudHandlers(socket, io, db) {
    * - Output: { success: true, data: { model: Model }, timestamp: string }
    * - Broadcasts: models:created
    */
-  socket.on("models:create", (req, callback) => {
+  socket.on("models:create", async (req, callback) => {
     const id = getRequestId(req);
     console.log("[DEBUG] models:create request", { requestId: id, modelName: req?.model?.name });
 
     try {
-      const model = db.saveModel(req?.model || {});
+      const model = await db.saveModel(req?.model || {});
       console.log("[DEBUG] models:created", { requestId: id, modelId: model.id });
 
       // Broadcast to all clients
@@ -130,12 +130,12 @@ export function registerModelsCrudHandlers(socket, io, db) {
    * - Output: { success: true, data: { model: Model }, timestamp: string }
    * - Broadcasts: models:updated
    */
-  socket.on("models:update", (req, callback) => {
+  socket.on("models:update", async (req, callback) => {
     const id = getRequestId(req);
     console.log("[DEBUG] models:update request", { requestId: id, modelId: req?.modelId });
 
     try {
-      const model = db.updateModel(req?.modelId, req?.updates || {});
+      const model = await db.updateModel(req?.modelId, req?.updates || {});
       if (model) {
         console.log("[DEBUG] models:updated", { requestId: id, modelId: model.id });
 
@@ -174,12 +174,12 @@ export function registerModelsCrudHandlers(socket, io, db) {
    * - Output: { success: true, data: { deletedId: string }, timestamp: string }
    * - Broadcasts: models:deleted
    */
-  socket.on("models:delete", (req, callback) => {
+  socket.on("models:delete", async (req, callback) => {
     const id = getRequestId(req);
     console.log("[DEBUG] models:delete request", { requestId: id, modelId: req?.modelId });
 
     try {
-      db.deleteModel(req?.modelId);
+      await db.deleteModel(req?.modelId);
       console.log("[DEBUG] models:deleted", { requestId: id, modelId: req?.modelId });
 
       // Broadcast to all clients
@@ -142,7 +142,7 @@ export function registerModelsScanHandlers(socket, io, db, ggufParser) {
 
       if (dirExists) {
         const modelFiles = await findModelFiles(modelsDir);
-        const existingModels = db.getModels();
+        const existingModels = await db.getModels();
 
         console.log("[DEBUG] Found", modelFiles.length, "model files to process");
 
@@ -158,7 +158,7 @@ export function registerModelsScanHandlers(socket, io, db, ggufParser) {
             if (!existing) {
               console.log("[DEBUG] Processing new model file:", { fileName, path: fullPath });
               const meta = await ggufParser(fullPath);
-              db.saveModel({
+              await db.saveModel({
                 name: fileName.replace(/\.[^/.]+$/, ""),
                 type: meta.architecture || "llama",
                 status: "unloaded",
@@ -182,7 +182,7 @@ export function registerModelsScanHandlers(socket, io, db, ggufParser) {
               const needsGgufUpdate =
                 !existing.ctx_size || !existing.block_count || existing.ctx_size === 4096;
               if (needsBasicUpdate || needsGgufUpdate) {
-                db.updateModel(existing.id, {
+                await db.updateModel(existing.id, {
                   file_size: meta.size || existing.file_size,
                   params: meta.params || existing.params,
                   quantization: meta.quantization || existing.quantization,
@@ -229,7 +229,7 @@ export function registerModelsScanHandlers(socket, io, db, ggufParser) {
         });
       }
 
-      const allModels = db.getModels();
+      const allModels = await db.getModels();
 
       // Broadcast models:updated to all clients
       socket.broadcast.emit("models:updated", {
@@ -263,16 +263,16 @@ export function registerModelsScanHandlers(socket, io, db, ggufParser) {
    * - Output: { success: true, data: { deletedCount }, timestamp: string }
    * - Broadcasts: models:updated
    */
-  socket.on("models:cleanup", (req, callback) => {
+  socket.on("models:cleanup", async (req, callback) => {
     const id = getRequestId(req);
 
     console.log("[DEBUG] models:cleanup request", { requestId: id });
 
     try {
-      const deletedCount = db.cleanupMissingFiles();
+      const deletedCount = await db.cleanupMissingFiles();
 
       // Broadcast models:updated to all clients
-      const allModels = db.getModels();
+      const allModels = await db.getModels();
       socket.broadcast.emit("models:updated", {
         models: allModels,
         cleaned: deletedCount,
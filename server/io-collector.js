@@ -0,0 +1,215 @@
+/**
+ * IO Collector - Disk and network throughput from /proc counters
+ * /proc/diskstats and /proc/net/dev only expose cumulative counters, so every
+ * reading is a delta against the previous call divided by the elapsed time.
+ * The first call after startup (or cleanup) reports zeros.
+ */
+
+import fs from "fs";
+import { isProcAvailable, readDiskStats, readNetDev } from "./proc-collector.js";
+
+const useProc = isProcAvailable();
+
+// Virtual block devices with no physical IO of their own
+const VIRTUAL_DEVICE = /^(loop|ram|zram)\d/;
+
+let previous = null; // { time, disks, interfaces }
+const pathDevices = new Map(); // path -> { major, minor } or null
+const wholeDisks = new Map(); // device name -> boolean
+const physicalInterfaces = new Map(); // interface name -> boolean
+
+/**
+ * Split a Linux dev_t into major/minor numbers (glibc encoding).
+ * @param {number} dev - st_dev from stat()
+ * @returns {Object} { major, minor }
+ */
+export function splitDevice(dev) {
+  const high = Math.floor(dev / 2 ** 32);
+  const low = dev >>> 0;
+  return {
+    major: ((low >>> 8) & 0xfff) | (high & ~0xfff),
+    minor: (low & 0xff) | ((low >>> 12) & ~0xff),
+  };
+}
+
+/**
+ * Resolve the block device numbers of the filesystem holding a path.
+ * Cached per path; null when the path cannot be stat'ed.
+ * @param {string} ioPath - Any path on the filesystem
+ * @returns {Promise<Object|null>} { major, minor }
+ */
+async function resolvePathDevice(ioPath) {
+  if (pathDevices.has(ioPath)) return pathDevices.get(ioPath);
+
+  let device = null;
+  try {
+    device = splitDevice((await fs.promises.stat(ioPath)).dev);
+  } catch (e) {
+    console.debug(`[METRICS] Cannot stat IO path ${ioPath}:`, e.message);
+  }
+  pathDevices.set(ioPath, device);
+  return device;
+}
+
+/**
+ * Cached existence check for a sysfs entry.
+ * @param {Map} cache - Cache for this kind of entry
+ * @param {string} name - Device or interface name
+ * @param {string} sysPath - Path to test
+ * @returns {boolean}
+ */
+function sysfsExists(cache, name, sysPath) {
+  if (!cache.has(name)) cache.set(name, fs.existsSync(sysPath));
+  return cache.get(name);
+}
+
+/**
+ * Pick the diskstats entry that backs the IO path.
+ * Filesystems without a block device of their own (overlay, tmpfs, btrfs
+ * subvolumes) fall back to the whole disk with the most traffic.
+ * @param {Object} disks - Parsed /proc/diskstats
+ * @param {Object|null} device - { major, minor } of the IO path
+ * @param {Array<string>} names - Whole, non-virtual disks
+ * @returns {string|null} Device name
+ */
+function selectDevice(disks, device, names) {
+  if (device) {
+    for (const [name, d] of Object.entries(disks)) {
+      if (d.major === device.major && d.minor === device.minor) return name;
+    }
+  }
+
+  let busiest = null;
+  let busiestBytes = -1;
+  for (const name of names) {
+    const bytes = disks[name].readBytes + disks[name].writeBytes;
+    if (bytes > busiestBytes) {
+      busiest = name;
+      busiestBytes = bytes;
+    }
+  }
+  return busiest;
+}
+
+/**
+ * Per-second rate of a cumulative counter; counter resets yield 0.
+ * @param {number} current - Current counter value
+ * @param {number} last - Previous counter value
+ * @param {number} seconds - Elapsed seconds
+ * @returns {number} Rate rounded to one decimal
+ */
+function rate(current, last, seconds) {
+  if (last === undefined || seconds <= 0 || current < last) return 0;
+  return Math.round(((current - last) / seconds) * 10) / 10;
+}
+
+/**
+ * Throughput of one block device since the previous reading.
+ * @param {string} name - Device name
+ * @param {Object} current - Current counters
+ * @param {Object|undefined} last - Previous counters
+ * @param {number} elapsedMs - Elapsed milliseconds
+ * @returns {Object} { name, readBytesPerSec, writeBytesPerSec, readIops, writeIops, utilization }
+ */
+function deviceRates(name, current, last, elapsedMs) {
+  const seconds = elapsedMs / 1000;
+  const busyMs = last && current.ioMs >= last.ioMs ? current.ioMs - last.ioMs : 0;
+  return {
+    name,
+    readBytesPerSec: rate(current.readBytes, last?.readBytes, seconds),
+    writeBytesPerSec: rate(current.writeBytes, last?.writeBytes, seconds),
+    readIops: rate(current.reads, last?.reads, seconds),
+    writeIops: rate(current.writes, last?.writes, seconds),
+    utilization: elapsedMs > 0 ? Math.min(100, Math.round((busyMs / elapsedMs) * 1000) / 10) : 0,
+  };
+}
+
+/**
+ * Empty reading for platforms without /proc.
+ * @returns {Object} { io, network }
+ */
+function emptyIoMetrics() {
+  return {
+    io: {
+      device: null,
+      readBytesPerSec: 0,
+      writeBytesPerSec: 0,
+      readIops: 0,
+      writeIops: 0,
+      utilization: 0,
+      devices: [],
+    },
+    network: { rxBytesPerSec: 0, txBytesPerSec: 0, interfaces: [] },
+  };
+}
+
+/**
+ * Collect disk and network throughput since the previous call.
+ * @param {string} [ioPath="/"] - Path whose backing device is reported as io.device
+ * @returns {Promise<Object>} { io, network }
+ */
+export async function collectIoMetrics(ioPath = "/") {
+  if (!useProc) return emptyIoMetrics();
+
+  try {
+    const device = await resolvePathDevice(ioPath);
+    const time = Date.now();
+    const disks = readDiskStats();
+    const interfaces = readNetDev();
+    const elapsedMs = previous ? time - previous.time : 0;
+    const last = previous || { disks: {}, interfaces: {} };
+    previous = { time, disks, interfaces };
+
+    const diskNames = Object.keys(disks).filter(
+      (name) => !VIRTUAL_DEVICE.test(name) && sysfsExists(wholeDisks, name, `/sys/block/${name}`)
+    );
+    const selected = selectDevice(disks, device, diskNames);
+    const selectedRates = selected
+      ? deviceRates(selected, disks[selected], last.disks[selected], elapsedMs)
+      : emptyIoMetrics().io;
+
+    const seconds = elapsedMs / 1000;
+    const nets = Object.keys(interfaces)
+      .filter((name) => name !== "lo")
+      .map((name) => ({
+        name,
+        rxBytesPerSec: rate(interfaces[name].rxBytes, last.interfaces[name]?.rxBytes, seconds),
+        txBytesPerSec: rate(interfaces[name].txBytes, last.interfaces[name]?.txBytes, seconds),
+      }));
+    // Bridges, veths and tunnels re-count traffic already seen on the physical NIC
+    const physical = nets.filter((n) =>
+      sysfsExists(physicalInterfaces, n.name, `/sys/class/net/${n.name}/device`)
+    );
+    const counted = physical.length > 0 ? physical : nets;
+
+    return {
+      io: {
+        device: selected,
+        readBytesPerSec: selectedRates.readBytesPerSec,
+        writeBytesPerSec: selectedRates.writeBytesPerSec,
+        readIops: selectedRates.readIops,
+        writeIops: selectedRates.writeIops,
+        utilization: selectedRates.utilization,
+        devices: diskNames.map((name) => deviceRates(name, disks[name], last.disks[name], elapsedMs)),
+      },
+      network: {
+        rxBytesPerSec: Math.round(counted.reduce((sum, n) => sum + n.rxBytesPerSec, 0) * 10) / 10,
+        txBytesPerSec: Math.round(counted.reduce((sum, n) => sum + n.txBytesPerSec, 0) * 10) / 10,
+        interfaces: nets,
+      },
+    };
+  } catch (e) {
+    console.debug("[METRICS] IO counters not available:", e.message);
+    return emptyIoMetrics();
+  }
+}
+
+/**
+ * Forget the previous reading and cached device lookups.
+ */
+export function resetIoMetrics() {
+  previous = null;
+  pathDevices.clear();
+  wholeDisks.clear();
+  physicalInterfaces.clear();
+}
@@ -2,14 +2,20 @@
  * Llama Metrics - llama-server specific metrics collection
  * Simplified with minimal logging and efficient broadcasting
  * Uses detectLlamaServer() as the single source of truth for port detection
+ * The loaded model is looked up on scraper setup and on load/unload events,
+ * not on every scrape
  */
 
-import { LlamaServerMetricsScraper } from "./handlers/llama-router/metrics-scraper.js";
-import { llamaApiRequest } from "./handlers/llama-router/api.js";
-import { getServerUptime } from "./handlers/llama-router/start.js";
+import { metricsWorker } from "./metrics-worker-client.js";
+import { llamaApiRequest, resetLlamaAgent } from "./handlers/llama-router/api.js";
+import { getServerUptime, getServerResources } from "./handlers/llama-router/start.js";
 import { getRouterConfig } from "./db/config.js";
 
 let llamaMetricsScraper = null;
+let lastModelRefresh = 0;
+
+// While no model is known (e.g. router autoload), look one up at most this often
+const MODEL_RETRY_INTERVAL = 30000;
 
 /**
  * Get the loaded model name from llama-server
@@ -74,16 +80,19 @@ async function updateScraper(port, modelName = null) {
   if (llamaMetricsScraper) {
     llamaMetricsScraper.updatePort(port);
   } else {
-    llamaMetricsScraper = new LlamaServerMetricsScraper({
+    // Scrapes and parsing run in the metrics worker unless it is disabled
+    llamaMetricsScraper = metricsWorker.createScraper({
       host: "127.0.0.1",
       port: port,
       modelName: modelName,
     });
   }
 
-  // Update model name if provided
+  // Update model name if provided, otherwise ask the (re)started server
   if (modelName) {
     llamaMetricsScraper.updateModel(modelName);
+  } else {
+    refreshLlamaMetricsModel();
   }
 
   console.log(`[LlamaMetrics] Scraper ready: port=${port}, model=${modelName || "none"}`);
@@ -103,16 +112,20 @@ export function initializeLlamaMetricsScraper(port, db = null) {
 }
 
 /**
- * Refresh the loaded model name in the scraper
+ * Refresh the loaded model name in the scraper.
+ * Called on scraper setup and after a model load/unload.
  */
 export async function refreshLlamaMetricsModel() {
   if (!llamaMetricsScraper) return;
+  lastModelRefresh = Date.now();
 
   try {
     const modelName = await getLoadedModelName(llamaMetricsScraper.port);
     if (modelName) {
       llamaMetricsScraper.updateModel(modelName);
       console.log(`[LlamaMetrics] Updated model to: ${modelName}`);
+    } else {
+      llamaMetricsScraper.clearModel();
     }
   } catch (e) {
     // Ignore
@@ -145,187 +158,122 @@ function getDefaultMetrics() {
   };
 }
 
-export async function collectLlamaMetrics(socket, db = null) {
-  // Validate socket has emit method
-  if (!socket || typeof socket.emit !== "function") {
-    console.debug("[LlamaMetrics] Invalid socket, skipping metrics emission");
-    return;
+/**
+ * Build a stopped/running status payload with default metrics.
+ * @param {string} status - "running" or "stopped"
+ * @param {Object|null} detected - Detected server info ({ url, port }) or null
+ * @returns {Object} llama-server status data
+ */
+function buildDefaultStatus(status, detected = null) {
+  return {
+    status,
+    url: detected?.url || null,
+    port: detected?.port || null,
+    metrics: getDefaultMetrics(),
+    rawMetrics: null,
+  };
+}
+
+/**
+ * Fall back to server detection when metrics are unavailable.
+ * Running with zeros if the server answers, stopped otherwise.
+ * @returns {Promise<Object>} llama-server status data
+ */
+async function detectFallbackStatus() {
+  try {
+    const { detectLlamaServer } = await import("./handlers/llama-router/status.js");
+    const detected = await detectLlamaServer();
+    return detected ? buildDefaultStatus("running", detected) : buildDefaultStatus("stopped");
+  } catch (detectError) {
+    return buildDefaultStatus("running");
   }
+}
 
-  // Emit stopped status when server is not running
+/**
+ * Collect llama-server status once, without emitting.
+ * Used by the shared metrics sampler so a single scrape serves every subscriber.
+ * @returns {Promise<Object>} llama-server status data ({ status, url, port, model, sampledAt, metrics, rawMetrics, resources })
+ */
+export async function collectLlamaStatus() {
   if (!llamaMetricsScraper) {
-    console.debug("[DEBUG] LlamaMetrics: Scraper not initialized, emitting stopped status");
-    socket.broadcast.emit("llama-server:status", {
-      type: "broadcast",
-      data: {
-        status: "stopped",
-        url: null,
-        port: null,
-        metrics: getDefaultMetrics(),
-        rawMetrics: null,
-      },
-      timestamp: Date.now(),
-    });
-    return;
+    return buildDefaultStatus("stopped");
   }
 
-  // REFRESH: Update the model name before fetching metrics
-  // This ensures we get metrics for the currently loaded model
-  try {
-    const loadedModel = await getLoadedModelName(llamaMetricsScraper.port);
-    if (loadedModel) {
-      llamaMetricsScraper.updateModel(loadedModel);
-    }
-  } catch (e) {
-    // Ignore - will try without model name
+  // The model name is kept current by load/unload events; only retry the
+  // lookup occasionally while none is known (models autoloaded by requests)
+  if (!llamaMetricsScraper.modelName && Date.now() - lastModelRefresh >= MODEL_RETRY_INTERVAL) {
+    await refreshLlamaMetricsModel();
   }
 
   try {
-    console.debug("[DEBUG] LlamaMetrics: Fetching metrics...");
     const metrics = await llamaMetricsScraper.getMetrics();
+    if (!metrics) {
+      return detectFallbackStatus();
+    }
 
-    if (metrics) {
-      const currentPort = llamaMetricsScraper.port || 8080;
-      const url = `http://127.0.0.1:${currentPort}`;
-
-      // Build frontend-compatible format
-      const frontendMetrics = {
-        promptTokensSeconds: metrics.tokensPerSecond || 0,
-        predictedTokensSeconds: metrics.predictedTokensSeconds || metrics.tokensPerSecond || 0,
-        promptTokensTotal: metrics.promptTokensTotal || 0,
-        predictedTokensTotal: metrics.predictedTokensTotal || 0,
-        vramTotal: metrics.vramTotal || 0,
-        vramUsed: metrics.vramUsed || 0,
-        nCtx: metrics.nCtx || 0,
-        nParallel: metrics.nParallel || 0,
-        nThreads: metrics.nThreads || 0,
-        activeModels: metrics.activeModels || 0,
-        queueSize: metrics.queueSize || 0,
-        totalRequests: metrics.totalRequests || 0,
-        nDecodeTotal: metrics.nDecodeTotal || 0,
-        nBusySlotsPerDecode: metrics.nBusySlotsPerDecode || 0,
-        nTokensMax: metrics.nTokensMax || 0,
-        promptSecondsTotal: metrics.promptSecondsTotal || 0,
-        predictedSecondsTotal: metrics.predictedSecondsTotal || 0,
-        uptime: metrics.uptime || getServerUptime(),
-      };
+    const currentPort = llamaMetricsScraper.port || 8080;
 
-      // Broadcast metrics with type for filtering
-      socket.broadcast.emit("llama-server:status", {
-        type: "broadcast",
-        data: {
-          status: "running",
-          url: url,
-          port: currentPort,
-          metrics: frontendMetrics,
-          rawMetrics: metrics,
-        },
-        timestamp: Date.now(),
-      });
-      console.debug("[DEBUG] LlamaMetrics: Emitted running status with metrics");
-    } else {
-      // No metrics data - try to detect if server is actually running
-      try {
-        const { detectLlamaServer } = await import("./handlers/llama-router/status.js");
-        const detected = await detectLlamaServer();
+    // Build frontend-compatible format
+    const frontendMetrics = {
+      promptTokensSeconds: metrics.tokensPerSecond || 0,
+      predictedTokensSeconds: metrics.predictedTokensSeconds || metrics.tokensPerSecond || 0,
+      promptTokensTotal: metrics.promptTokensTotal || 0,
+      predictedTokensTotal: metrics.predictedTokensTotal || 0,
+      vramTotal: metrics.vramTotal || 0,
+      vramUsed: metrics.vramUsed || 0,
+      nCtx: metrics.nCtx || 0,
+      nParallel: metrics.nParallel || 0,
+      nThreads: metrics.nThreads || 0,
+      activeModels: metrics.activeModels || 0,
+      queueSize: metrics.queueSize || 0,
+      totalRequests: metrics.totalRequests || 0,
+      nDecodeTotal: metrics.nDecodeTotal || 0,
+      nBusySlotsPerDecode: metrics.nBusySlotsPerDecode || 0,
+      nTokensMax: metrics.nTokensMax || 0,
+      promptSecondsTotal: metrics.promptSecondsTotal || 0,
+      predictedSecondsTotal: metrics.predictedSecondsTotal || 0,
+      uptime: metrics.uptime || getServerUptime(),
+    };
 
-        if (detected) {
-          // Server is running but metrics endpoint not responding
-          console.debug("[DEBUG] LlamaMetrics: Server detected but metrics unavailable");
-          socket.broadcast.emit("llama-server:status", {
-            type: "broadcast",
-            data: {
-              status: "running",
-              url: detected.url,
-              port: detected.port,
-              metrics: getDefaultMetrics(),
-              rawMetrics: null,
-            },
-            timestamp: Date.now(),
-          });
-        } else {
-          // No server detected
-          console.debug("[DEBUG] LlamaMetrics: No server detected, emitting stopped");
-          socket.broadcast.emit("llama-server:status", {
-            type: "broadcast",
-            data: {
-              status: "stopped",
-              url: null,
-              port: null,
-              metrics: getDefaultMetrics(),
-              rawMetrics: null,
-            },
-            timestamp: Date.now(),
-          });
-        }
-      } catch (detectError) {
-        // Fallback to running with zeros
-        console.debug("[DEBUG] LlamaMetrics: No metrics data, emitting running with zeros");
-        socket.broadcast.emit("llama-server:status", {
-          type: "broadcast",
-          data: {
-            status: "running",
-            url: null,
-            port: null,
-            metrics: getDefaultMetrics(),
-            rawMetrics: null,
-          },
-          timestamp: Date.now(),
-        });
-      }
-    }
+    return {
+      status: "running",
+      url: `http://127.0.0.1:${currentPort}`,
+      port: currentPort,
+      model: llamaMetricsScraper.modelName || null,
+      sampledAt: llamaMetricsScraper.getMetricsTimestamp() || Date.now(),
+      metrics: frontendMetrics,
+      rawMetrics: metrics,
+      resources: await getServerResources().catch(() => null),
+    };
   } catch (e) {
     console.warn("[LlamaMetrics] Metrics collection failed:", e.message);
+    return detectFallbackStatus();
+  }
+}
 
-    // Try to detect if server is running
-    try {
-      const { detectLlamaServer } = await import("./handlers/llama-router/status.js");
-      const detected = await detectLlamaServer();
-
-      if (detected) {
-        // Server is running but there's an error - emit running with zeros
-        socket.broadcast.emit("llama-server:status", {
-          type: "broadcast",
-          data: {
-            status: "running",
-            url: detected.url,
-            port: detected.port,
-            metrics: getDefaultMetrics(),
-            rawMetrics: null,
-          },
-          timestamp: Date.now(),
-        });
-      } else {
-        // Server is not running - emit stopped
-        socket.broadcast.emit("llama-server:status", {
-          type: "broadcast",
-          data: {
-            status: "stopped",
-            url: null,
-            port: null,
-            metrics: getDefaultMetrics(),
-            rawMetrics: null,
-          },
-          timestamp: Date.now(),
-        });
-      }
-    } catch (detectError) {
-      // Emit running with zeros on complete failure
-      socket.broadcast.emit("llama-server:status", {
-        type: "broadcast",
-        data: {
-          status: "running",
-          url: null,
-          port: null,
-          metrics: getDefaultMetrics(),
-          rawMetrics: null,
-        },
-        timestamp: Date.now(),
-      });
-    }
+/**
+ * Collect llama-server metrics and broadcast them from a socket.
+ * Kept for callers that still emit per socket; the sampler uses collectLlamaStatus().
+ * @param {Object} socket - Socket.IO socket instance
+ * @param {Object|null} db - Database instance (unused)
+ */
+export async function collectLlamaMetrics(socket, db = null) {
+  // Validate socket has emit method
+  if (!socket || typeof socket.emit !== "function") {
+    console.debug("[LlamaMetrics] Invalid socket, skipping metrics emission");
+    return;
   }
+
+  const data = await collectLlamaStatus();
+  socket.broadcast.emit("llama-server:status", {
+    type: "broadcast",
+    data,
+    timestamp: Date.now(),
+  });
 }
 
 export function cleanupLlamaMetrics() {
   llamaMetricsScraper = null;
+  lastModelRefresh = 0;
+  resetLlamaAgent();
 }
@@ -0,0 +1,177 @@
+/**
+ * llama-server Counter Rates - Windowed rates over monotonic counters
+ * llama-server only reports cumulative counters and its own instantaneous
+ * gauges. Each scrape is recorded here (reset-adjusted, bounded history) and
+ * true rates are computed over fixed windows: tokens/sec, requests/sec and the
+ * fraction of slot time spent busy.
+ */
+
+// Rate windows in seconds
+export const RATE_WINDOWS = {
+  "10s": 10,
+  "1m": 60,
+  "5m": 300,
+};
+
+// Window persisted with each system metrics row
+export const PERSISTED_RATE_WINDOW = "1m";
+
+// Window the alert rules see; short enough that a slowdown is not smoothed
+// into the drop rules' baseline
+export const ALERT_RATE_WINDOW = "10s";
+
+// Scraper fields tracked as counters
+export const LLAMA_COUNTERS = [
+  "promptTokensTotal",
+  "predictedTokensTotal",
+  "nDecodeTotal",
+  "promptSecondsTotal",
+  "predictedSecondsTotal",
+];
+
+const DEFAULT_MAX_SAMPLES = 512;
+
+export class CounterRateTracker {
+  /**
+   * Create a new CounterRateTracker.
+   * @param {Object} config - Tracker configuration.
+   * @param {Array<string>} config.counters - Counter names to track.
+   * @param {number} [config.maxAge=300] - Longest window in seconds; older samples are dropped.
+   * @param {number} [config.maxSamples=512] - Hard cap on retained samples.
+   */
+  constructor(config) {
+    this.counters = config.counters;
+    this.maxAge = config.maxAge || Math.max(...Object.values(RATE_WINDOWS));
+    this.maxSamples = config.maxSamples || DEFAULT_MAX_SAMPLES;
+    this.reset();
+  }
+
+  /**
+   * Record one scrape.
+   * A counter that goes down was reset (server restart); its new value is
+   * counted as the increase since the reset, as Prometheus rate() does.
+   * @param {number} timestamp - Scrape time (epoch ms).
+   * @param {Object} values - Counter values keyed by name.
+   * @returns {boolean} False when the scrape is not newer than the last one.
+   */
+  observe(timestamp, values) {
+    const last = this.samples[this.samples.length - 1];
+    if (last && timestamp <= last.timestamp) return false;
+
+    const adjusted = {};
+    for (const name of this.counters) {
+      const raw = Number(values[name]) || 0;
+      const previous = this.lastRaw[name];
+      if (previous !== undefined && raw < previous) {
+        this.offsets[name] += previous;
+      }
+      this.lastRaw[name] = raw;
+      adjusted[name] = raw + this.offsets[name];
+    }
+    this.samples.push({ timestamp, values: adjusted });
+
+    // Keep one sample older than the longest window so it stays fully covered
+    const cutoff = timestamp - this.maxAge * 1000;
+    let drop = 0;
+    while (drop + 1 < this.samples.length && this.samples[drop + 1].timestamp <= cutoff) drop++;
+    drop = Math.max(drop, this.samples.length - this.maxSamples);
+    if (drop > 0) this.samples.splice(0, drop);
+    return true;
+  }
+
+  /**
+   * Per-second increase of a counter over a window ending at the newest sample.
+   * Uses the latest sample at or before the window start, or the oldest one
+   * while history is shorter than the window.
+   * @param {string} name - Counter name.
+   * @param {number} windowSeconds - Window length.
+   * @returns {number|null} Rate, or null with fewer than two samples.
+   */
+  rate(name, windowSeconds) {
+    const n = this.samples.length;
+    if (n < 2) return null;
+
+    const end = this.samples[n - 1];
+    const start = this._windowStart(end.timestamp - windowSeconds * 1000);
+    if (start === end) return null;
+
+    const elapsed = (end.timestamp - start.timestamp) / 1000;
+    return (end.values[name] - start.values[name]) / elapsed;
+  }
+
+  /**
+   * Forget all history and reset offsets.
+   */
+  reset() {
+    this.samples = [];
+    this.lastRaw = {};
+    this.offsets = {};
+    for (const name of this.counters) this.offsets[name] = 0;
+  }
+
+  /**
+   * Find the sample a window starts from (binary search; samples are time ordered).
+   * @param {number} from - Window start (epoch ms).
+   * @returns {Object} Sample.
+   */
+  _windowStart(from) {
+    let lo = 0;
+    let hi = this.samples.length - 1;
+    while (lo < hi) {
+      const mid = (lo + hi + 1) >> 1;
+      if (this.samples[mid].timestamp <= from) lo = mid;
+      else hi = mid - 1;
+    }
+    return this.samples[lo];
+  }
+}
+
+/**
+ * Compute llama-server rates for every window.
+ * requestsPerSecond follows the scraper's totalRequests, which counts llama_decode() calls.
+ * busySlotRatio is busy slot-seconds per wall second divided by the slot count.
+ * generationTokensPerSecond is predicted tokens per second spent generating
+ * (decode speed), which unlike the per-wall-second rates does not follow the
+ * load; it is null when the window saw no generation.
+ * @param {CounterRateTracker} tracker - Tracker fed with scraper metrics.
+ * @param {number} [slots=1] - Parallel slots (nParallel).
+ * @returns {Object|null} Window name -> rates, or null without enough history.
+ */
+export function computeLlamaRates(tracker, slots = 1) {
+  if (tracker.samples.length < 2) return null;
+
+  const rates = {};
+  for (const [window, seconds] of Object.entries(RATE_WINDOWS)) {
+    const predictedSeconds = tracker.rate("predictedSecondsTotal", seconds);
+    const busySeconds = tracker.rate("promptSecondsTotal", seconds) + predictedSeconds;
+    const predictedTokens = tracker.rate("predictedTokensTotal", seconds);
+    rates[window] = {
+      promptTokensPerSecond: tracker.rate("promptTokensTotal", seconds),
+      predictedTokensPerSecond: predictedTokens,
+      requestsPerSecond: tracker.rate("nDecodeTotal", seconds),
+      busySlotRatio: busySeconds / Math.max(slots || 1, 1),
+      generationTokensPerSecond: predictedSeconds > 0 ? predictedTokens / predictedSeconds : null,
+    };
+  }
+  return rates;
+}
+
+// Process-wide tracker fed by the llama-server scrape
+export const llamaCounterRates = new CounterRateTracker({ counters: LLAMA_COUNTERS });
+
+/**
+ * Record a llama-server status and compute its windowed rates.
+ * Cached scrapes (same sampledAt) are not recorded twice, and /health
+ * fallbacks are not recorded at all: their zero counters are not readings.
+ * @param {Object} status - Status from collectLlamaStatus()
+ * @returns {Object|null} Rates per window, or null when not running or without history
+ */
+export function updateLlamaRates(status) {
+  if (status?.status !== "running" || !status.rawMetrics) return null;
+  if (status.rawMetrics.source === "health") return null;
+
+  llamaCounterRates.observe(status.sampledAt || Date.now(), status.rawMetrics);
+  return computeLlamaRates(llamaCounterRates, status.metrics?.nParallel);
+}
+
+export default CounterRateTracker;
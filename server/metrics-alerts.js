@@ -0,0 +1,371 @@
+/**
+ * Metrics Alerts - Streaming rule evaluation on the metrics stream
+ * Every sample from the shared sampler is run through the alert rules once.
+ * Rules only keep constant-size state (EWMA mean and variance, a fixed ring of
+ * recent values, consecutive-breach counters), so a tick costs O(1) per rule
+ * however long the server has been up, and history is never read back from
+ * SQLite. Rules raise after `for` breaching samples in a row and clear after
+ * `clearAfter` good ones.
+ *
+ * Rule types:
+ * - threshold: value above `above` (or below `below`); clears once back past
+ *   `clear`, which defaults to the limit itself
+ * - rising: value grew by at least `minDelta` over the last `window` samples
+ * - drop: value fell `ratio` below its EWMA baseline; the baseline stops
+ *   learning while the rule breaches so a sustained drop is not absorbed
+ * - anomaly: value is more than `zScore` EWMA standard deviations from the mean
+ *
+ * A rule with `activeWhen: { metric, above }` is only evaluated while that
+ * metric is above the bound (e.g. tokens/sec only while llama-server is busy);
+ * other samples count towards clearing it.
+ */
+
+export const ALERT_RULE_TYPES = ["threshold", "rising", "drop", "anomaly"];
+
+const DEFAULT_ALPHA = 0.1; // EWMA smoothing factor
+const DEFAULT_WARMUP = 20; // Samples before drop/anomaly rules may fire
+const DEFAULT_WINDOW = 30; // Samples compared by rising rules
+const MAX_WINDOW = 3600; // Same bound as the in-memory ring buffer
+const DEFAULT_Z_SCORE = 3;
+
+/**
+ * Validate a rule and fill in its defaults.
+ * @param {Object} rule - Rule as stored in the alert_rules table.
+ * @returns {Object} Normalized rule.
+ * @throws {Error} When the rule cannot be evaluated.
+ */
+export function normalizeAlertRule(rule) {
+  if (!rule || typeof rule.id !== "string" || !rule.id) {
+    throw new Error("Alert rule needs an id");
+  }
+  if (typeof rule.metric !== "string" || !rule.metric) {
+    throw new Error(`Alert rule ${rule.id} needs a metric`);
+  }
+  if (!ALERT_RULE_TYPES.includes(rule.type)) {
+    throw new Error(`Alert rule ${rule.id} has unknown type "${rule.type}"`);
+  }
+  if (rule.type === "threshold" && !Number.isFinite(rule.above) && !Number.isFinite(rule.below)) {
+    throw new Error(`Threshold rule ${rule.id} needs "above" or "below"`);
+  }
+  if (rule.type === "drop" && !(rule.ratio > 0 && rule.ratio < 1)) {
+    throw new Error(`Drop rule ${rule.id} needs a ratio between 0 and 1`);
+  }
+
+  const consecutive = Math.max(1, parseInt(rule.for, 10) || 1);
+  return {
+    ...rule,
+    name: rule.name || rule.id,
+    severity: rule.severity || "warning",
+    enabled: rule.enabled !== false,
+    for: consecutive,
+    clearAfter: Math.max(1, parseInt(rule.clearAfter, 10) || consecutive),
+    alpha: rule.alpha > 0 && rule.alpha <= 1 ? rule.alpha : DEFAULT_ALPHA,
+    warmup: Number.isInteger(rule.warmup) && rule.warmup >= 0 ? rule.warmup : DEFAULT_WARMUP,
+    window: Math.min(Math.max(2, parseInt(rule.window, 10) || DEFAULT_WINDOW), MAX_WINDOW),
+    minDelta: Number.isFinite(rule.minDelta) ? rule.minDelta : 0,
+    zScore: rule.zScore > 0 ? rule.zScore : DEFAULT_Z_SCORE,
+    minBaseline: Number.isFinite(rule.minBaseline) ? rule.minBaseline : 0,
+  };
+}
+
+/**
+ * Running state for one rule.
+ */
+class RuleState {
+  /**
+   * @param {Object} rule - Normalized rule.
+   */
+  constructor(rule) {
+    this.rule = rule;
+    this.key = JSON.stringify(rule);
+    this.breaches = 0;
+    this.passes = 0;
+    this.active = null; // Raised alert, null when clear
+    // EWMA / EWMVar (drop, anomaly)
+    this.count = 0;
+    this.mean = 0;
+    this.variance = 0;
+    // Fixed ring of the last `window` values (rising)
+    this.ring = rule.type === "rising" ? new Float64Array(rule.window) : null;
+    this.ringPos = 0;
+  }
+
+  /**
+   * Fold one value into the rule's state.
+   * @param {number} value - Metric value.
+   * @returns {Object|null} { breach, reference }, or null while warming up.
+   */
+  update(value) {
+    const { rule } = this;
+    switch (rule.type) {
+      case "threshold":
+        return this._threshold(value);
+      case "rising":
+        return this._rising(value);
+      case "drop":
+        return this._drop(value);
+      default:
+        return this._anomaly(value);
+    }
+  }
+
+  /**
+   * @param {number} value - Metric value.
+   * @returns {Object} { breach, reference: limit }
+   */
+  _threshold(value) {
+    const { above, below, clear } = this.rule;
+    // While raised, the alert holds until the value is back past the clear level
+    if (Number.isFinite(above)) {
+      const limit = this.active && Number.isFinite(clear) ? clear : above;
+      return { breach: value > limit, reference: above };
+    }
+    const limit = this.active && Number.isFinite(clear) ? clear : below;
+    return { breach: value < limit, reference: below };
+  }
+
+  /**
+   * @param {number} value - Metric value.
+   * @returns {Object|null} { breach, reference: value `window` samples ago }
+   */
+  _rising(value) {
+    const oldest = this.ring[this.ringPos];
+    this.ring[this.ringPos] = value;
+    this.ringPos = (this.ringPos + 1) % this.ring.length;
+    this.count++;
+    if (this.count <= this.ring.length) return null;
+
+    return { breach: value - oldest >= Math.max(this.rule.minDelta, Number.EPSILON), reference: oldest };
+  }
+
+  /**
+   * @param {number} value - Metric value.
+   * @returns {Object|null} { breach, reference: baseline }
+   */
+  _drop(value) {
+    const { ratio, warmup, minBaseline } = this.rule;
+    const baseline = this.mean;
+    const ready = this.count >= Math.max(warmup, 1) && baseline > minBaseline;
+    const breach = ready && value < baseline * (1 - ratio);
+    if (!breach) this._learn(value);
+    return ready ? { breach, reference: baseline } : null;
+  }
+
+  /**
+   * @param {number} value - Metric value.
+   * @returns {Object|null} { breach, reference: mean }
+   */
+  _anomaly(value) {
+    const { warmup, zScore } = this.rule;
+    const ready = this.count >= Math.max(warmup, 2);
+    const mean = this.mean;
+    const deviation = Math.sqrt(this.variance);
+    this._learn(value);
+    if (!ready) return null;
+
+    const breach = deviation > 0 ? Math.abs(value - mean) > zScore * deviation : value !== mean;
+    return { breach, reference: mean };
+  }
+
+  /**
+   * Incremental EWMA mean and variance (Finch, "Incremental calculation of
+   * weighted mean and variance"). The first value seeds the mean.
+   * @param {number} value - Metric value.
+   */
+  _learn(value) {
+    if (this.count === 0) {
+      this.mean = value;
+    } else {
+      const { alpha } = this.rule;
+      const diff = value - this.mean;
+      const increment = alpha * diff;
+      this.mean += increment;
+      this.variance = (1 - alpha) * (this.variance + diff * increment);
+    }
+    this.count++;
+  }
+}
+
+/**
+ * Format a value for alert messages.
+ * @param {number} value - Value.
+ * @returns {string} Rounded value.
+ */
+function formatValue(value) {
+  return Number.isInteger(value) ? String(value) : value.toFixed(2);
+}
+
+/**
+ * Build the human-readable alert message.
+ * @param {Object} rule - Rule.
+ * @param {string} state - "raised" or "cleared".
+ * @param {number} value - Current value.
+ * @param {number} reference - Limit, baseline, mean or window start.
+ * @returns {string} Message.
+ */
+function describe(rule, state, value, reference) {
+  const current = `${rule.metric}=${formatValue(value)}`;
+  if (state === "cleared") return `[ALERT] Cleared: ${rule.name} (${current})`;
+
+  const details = {
+    threshold: `limit ${formatValue(reference)}`,
+    rising: `was ${formatValue(reference)} ${rule.window} samples ago`,
+    drop: `baseline ${formatValue(reference)}`,
+    anomaly: `mean ${formatValue(reference)}`,
+  };
+  return `[ALERT] ${rule.name} (${current}, ${details[rule.type]})`;
+}
+
+export class AlertEngine {
+  constructor() {
+    this.states = new Map(); // rule id -> RuleState
+  }
+
+  /**
+   * Replace the rule set. Rules whose definition did not change keep their
+   * state (baselines, windows, raised alerts); alerts of removed or edited
+   * rules are dropped.
+   * @param {Array<Object>} rules - Rules as stored.
+   * @returns {number} Number of enabled, valid rules.
+   */
+  setRules(rules) {
+    const next = new Map();
+    for (const raw of rules || []) {
+      let rule;
+      try {
+        rule = normalizeAlertRule(raw);
+      } catch (e) {
+        console.warn("[ALERTS] Skipping rule:", e.message);
+        continue;
+      }
+      if (!rule.enabled) continue;
+
+      const previous = this.states.get(rule.id);
+      const key = JSON.stringify(rule);
+      next.set(rule.id, previous && previous.key === key ? previous : new RuleState(rule));
+    }
+    this.states = next;
+    return next.size;
+  }
+
+  /**
+   * Evaluate every rule against one sample.
+   * @param {number} timestamp - Sample time (epoch ms).
+   * @param {Object} values - Metric values keyed by name.
+   * @returns {Array<Object>} Alerts raised or cleared by this sample.
+   */
+  evaluate(timestamp, values) {
+    const events = [];
+    for (const state of this.states.values()) {
+      const { rule } = state;
+      const value = values[rule.metric];
+      if (typeof value !== "number" || !Number.isFinite(value)) continue;
+
+      let result;
+      const guard = rule.activeWhen;
+      if (guard && !(values[guard.metric] > (guard.above ?? 0))) {
+        result = { breach: false };
+      } else {
+        result = state.update(value);
+        if (!result) continue;
+      }
+
+      const event = this._advance(state, result, value, timestamp);
+      if (event) events.push(event);
+    }
+    return events;
+  }
+
+  /**
+   * Move a rule's consecutive counters and raise or clear its alert.
+   * @param {RuleState} state - Rule state.
+   * @param {Object} result - { breach, reference } for this sample.
+   * @param {number} value - Metric value.
+   * @param {number} timestamp - Sample time (epoch ms).
+   * @returns {Object|null} Alert event, or null when nothing changed.
+   */
+  _advance(state, { breach, reference }, value, timestamp) {
+    const { rule } = state;
+    if (breach) {
+      state.breaches++;
+      state.passes = 0;
+      if (state.active || state.breaches < rule.for) return null;
+
+      state.active = {
+        ruleId: rule.id,
+        name: rule.name,
+        metric: rule.metric,
+        type: rule.type,
+        severity: rule.severity,
+        value,
+        reference,
+        message: describe(rule, "raised", value, reference),
+        raisedAt: timestamp,
+      };
+      return { ...state.active, state: "raised", timestamp };
+    }
+
+    state.passes++;
+    state.breaches = 0;
+    if (!state.active || state.passes < rule.clearAfter) return null;
+
+    const raised = state.active;
+    state.active = null;
+    return {
+      ...raised,
+      state: "cleared",
+      value,
+      message: describe(rule, "cleared", value, reference),
+      timestamp,
+    };
+  }
+
+  /**
+   * Get the alerts currently raised.
+   * @returns {Array<Object>} Active alerts.
+   */
+  getActive() {
+    const active = [];
+    for (const state of this.states.values()) {
+      if (state.active) active.push(state.active);
+    }
+    return active;
+  }
+
+  /**
+   * Forget all rules and their state.
+   */
+  reset() {
+    this.states = new Map();
+  }
+}
+
+/**
+ * Metric values the rules can refer to: the persisted metrics row plus
+ * gpu_memory_percent, the VRAM use of the fullest GPU (an almost full card
+ * would be hidden by the aggregate when another one is idle), and
+ * llama_generation_tps, llama-server's decode speed (null while it is not
+ * generating, so rules on it skip idle samples).
+ * @param {Object} row - Metrics row as saved to the metrics table.
+ * @param {Array<Object>} [gpus] - Per-GPU readings (memoryUsed, memoryTotal).
+ * @param {Object} [llamaRates] - llama-server rates for one window (see computeLlamaRates).
+ * @returns {Object} Values keyed by metric name.
+ */
+export function getAlertValues(row, gpus = [], llamaRates = null) {
+  let gpuMemoryPercent = row.gpu_memory_total > 0 ? (row.gpu_memory_used / row.gpu_memory_total) * 100 : null;
+  for (const gpu of gpus) {
+    if (gpu.memoryTotal > 0) {
+      gpuMemoryPercent = Math.max(gpuMemoryPercent ?? 0, (gpu.memoryUsed / gpu.memoryTotal) * 100);
+    }
+  }
+  return {
+    ...row,
+    gpu_memory_percent: gpuMemoryPercent,
+    llama_generation_tps: llamaRates?.generationTokensPerSecond ?? null,
+  };
+}
+
+// Process-wide engine fed by the shared sampler
+export const metricsAlerts = new AlertEngine();
+
+export default AlertEngine;
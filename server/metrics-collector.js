@@ -1,14 +1,25 @@
 /**
  * System Metrics Collector - CPU, Memory, Disk collection
  * Part of metrics.js refactoring (≤200 lines)
+ * Uses native /proc + statfs readers on Linux; systeminformation elsewhere
  */
 
+import fs from "fs";
 import os from "os";
 import si from "systeminformation";
+import {
+  isProcAvailable,
+  readMemory,
+  readCpuTimes,
+  readDiskUsage,
+  closeProcReaders,
+} from "./proc-collector.js";
+
+const useProc = isProcAvailable();
+const DISK_MOUNT_PATH = process.env.METRICS_DISK_PATH || "/";
 
 let lastCpuTimes = null;
-let metricsCallCount = 0;
-const MAX_METRICS_CALL_COUNT = 1000000;
+let lastProcCpuTimes = null;
 
 /**
  * Initialize CPU times for delta-based calculation.
@@ -16,6 +27,34 @@ const MAX_METRICS_CALL_COUNT = 1000000;
  */
 export function initCpuTimes() {
   lastCpuTimes = null;
+  lastProcCpuTimes = null;
+}
+
+/**
+ * Collect CPU usage from /proc/stat deltas.
+ * @returns {number|null} CPU usage percentage, or null if /proc/stat is unreadable
+ */
+function collectProcCpuMetrics() {
+  let times;
+  try {
+    times = readCpuTimes();
+  } catch (e) {
+    console.debug("[METRICS] /proc/stat not readable:", e.message);
+    return null;
+  }
+  if (!times) return null;
+
+  let cpuUsage = 0;
+  if (lastProcCpuTimes) {
+    const totalDelta = times.total - lastProcCpuTimes.total;
+    const idleDelta = times.idle - lastProcCpuTimes.idle;
+    if (totalDelta > 0) {
+      cpuUsage = ((totalDelta - idleDelta) / totalDelta) * 100;
+    }
+  }
+  lastProcCpuTimes = times;
+
+  return Math.round(cpuUsage * 10) / 10;
 }
 
 /**
@@ -24,6 +63,11 @@ export function initCpuTimes() {
  * @returns {number} CPU usage percentage (0-100)
  */
 export function collectCpuMetrics() {
+  if (useProc) {
+    const procUsage = collectProcCpuMetrics();
+    if (procUsage !== null) return procUsage;
+  }
+
   const cpus = os.cpus();
   let cpuUsage = 0;
 
@@ -55,10 +99,33 @@ export function collectCpuMetrics() {
 }
 
 /**
- * Collect memory and swap metrics from system information.
+ * Convert raw memory figures into rounded percentages.
+ * @param {number} total - Total memory in bytes
+ * @param {number} available - Available memory in bytes
+ * @param {number} swapTotal - Total swap in bytes
+ * @param {number} swapUsed - Used swap in bytes
+ * @returns {Object} memoryUsedPercent and swapUsedPercent
+ */
+function toMemoryPercents(total, available, swapTotal, swapUsed) {
+  const memoryUsedPercent = total > 0 ? Math.round(((total - available) / total) * 1000) / 10 : 0;
+  const swapUsedPercent = swapTotal > 0 ? Math.round((swapUsed / swapTotal) * 1000) / 10 : 0;
+  return { memoryUsedPercent, swapUsedPercent };
+}
+
+/**
+ * Collect memory and swap metrics (/proc/meminfo on Linux, systeminformation elsewhere).
  * @returns {Object} Memory usage data with memoryUsedPercent and swapUsedPercent
  */
 export async function collectMemoryMetrics() {
+  if (useProc) {
+    try {
+      const mem = readMemory();
+      return toMemoryPercents(mem.total, mem.available, mem.swapTotal, mem.swapUsed);
+    } catch (e) {
+      console.debug("[METRICS] /proc/meminfo not readable:", e.message);
+    }
+  }
+
   try {
     const memInfo = await si.mem();
     if (!memInfo) {
@@ -66,26 +133,7 @@ export async function collectMemoryMetrics() {
       return { memoryUsedPercent: 0, swapUsedPercent: 0 };
     }
 
-    // Debug logging for swap diagnostics
-    const hasSwap = memInfo.swaptotal > 0;
-    console.log("[DEBUG] Memory metrics retrieved:", {
-      total: memInfo.total,
-      available: memInfo.available,
-      swapTotal: memInfo.swaptotal,
-      swapUsed: memInfo.swapused,
-      hasSwap: hasSwap,
-      swapUsage: hasSwap ? Math.round((memInfo.swapused / memInfo.swaptotal) * 1000) / 10 : 0,
-    });
-
-    const actualUsed = memInfo.total - memInfo.available;
-    const memoryUsedPercent = Math.round((actualUsed / memInfo.total) * 1000) / 10;
-    let swapUsedPercent = 0;
-
-    if (hasSwap) {
-      swapUsedPercent = Math.round((memInfo.swapused / memInfo.swaptotal) * 1000) / 10;
-    }
-
-    return { memoryUsedPercent, swapUsedPercent };
+    return toMemoryPercents(memInfo.total, memInfo.available, memInfo.swaptotal, memInfo.swapused);
   } catch (e) {
     console.debug("[METRICS] Memory data not available:", e.message);
     return { memoryUsedPercent: 0, swapUsedPercent: 0 };
@@ -93,18 +141,38 @@ export async function collectMemoryMetrics() {
 }
 
 /**
- * Collect disk usage metrics for the root filesystem.
+ * Disk usage the way df reports it: blocks reserved for root count as
+ * neither used nor available.
+ * @param {number} used - Used bytes
+ * @param {number} available - Bytes available to unprivileged users
+ * @returns {number} Percentage with one decimal
+ */
+function diskUsedPercent(used, available) {
+  const total = used + available;
+  return total > 0 ? Math.round((used / total) * 1000) / 10 : 0;
+}
+
+/**
+ * Collect disk usage metrics for the configured mount (METRICS_DISK_PATH, default "/").
+ * @param {string} [mountPath] - Mount point to report
  * @returns {Object} Disk usage percentage
  */
-export async function collectDiskMetrics() {
+export async function collectDiskMetrics(mountPath = DISK_MOUNT_PATH) {
+  if (useProc && typeof fs.promises.statfs === "function") {
+    try {
+      const { used, available } = await readDiskUsage(mountPath);
+      return { diskUsedPercent: diskUsedPercent(used, available) };
+    } catch (e) {
+      console.debug("[METRICS] statfs failed:", e.message);
+    }
+  }
+
   try {
     const disks = await si.fsSize();
     if (!disks || disks.length === 0) return { diskUsedPercent: 0 };
 
-    const rootDisk = disks.find((d) => d.mount === "/") || disks[0];
-    const diskUsedPercent = Math.round((rootDisk.used / rootDisk.size) * 1000) / 10;
-
-    return { diskUsedPercent };
+    const rootDisk = disks.find((d) => d.mount === mountPath) || disks.find((d) => d.mount === "/") || disks[0];
+    return { diskUsedPercent: diskUsedPercent(rootDisk.used, rootDisk.available) };
   } catch (e) {
     console.debug("[METRICS] Disk data not available:", e.message);
     return { diskUsedPercent: 0 };
@@ -112,21 +180,8 @@ export async function collectDiskMetrics() {
 }
 
 /**
- * Get current metrics call count and increment.
- * Used for periodic task scheduling (e.g., prune old metrics).
- * @returns {number} Current count after increment
- */
-export function getMetricsCallCount() {
-  metricsCallCount++;
-  if (metricsCallCount >= MAX_METRICS_CALL_COUNT) {
-    metricsCallCount = 1;
-  }
-  return metricsCallCount;
-}
-
-/**
- * Reset metrics call count to zero.
+ * Release the cached /proc file descriptors.
  */
-export function resetMetricsCallCount() {
-  metricsCallCount = 0;
+export function cleanupSystemCollectors() {
+  closeProcReaders();
 }
@@ -0,0 +1,154 @@
+/**
+ * Metrics Ring Buffer - Recent history kept in process memory
+ * Stores the last N system samples at full resolution as parallel Float64Arrays,
+ * one per field, so recent history requests never touch SQLite and pushing a
+ * sample allocates nothing. Rows are returned in the same shape as the
+ * metrics table so callers can treat both sources alike.
+ */
+
+// Fields mirrored from the metrics table
+export const RING_BUFFER_FIELDS = [
+  "cpu_usage",
+  "memory_usage",
+  "swap_usage",
+  "disk_usage",
+  "gpu_usage",
+  "gpu_memory_used",
+  "gpu_memory_total",
+  "uptime",
+  "llama_prompt_tps",
+  "llama_predicted_tps",
+  "llama_requests_per_sec",
+  "llama_busy_ratio",
+  "disk_read_bps",
+  "disk_write_bps",
+  "disk_read_iops",
+  "disk_write_iops",
+  "disk_io_utilization",
+  "net_rx_bps",
+  "net_tx_bps",
+];
+
+// One hour at the fastest subscription interval (1s)
+const DEFAULT_CAPACITY = 3600;
+
+export class MetricsRingBuffer {
+  /**
+   * Create a new MetricsRingBuffer.
+   * @param {Object} [config] - Buffer configuration.
+   * @param {number} [config.capacity=3600] - Number of samples kept.
+   * @param {Array<string>} [config.fields] - Field names stored per sample.
+   */
+  constructor(config = {}) {
+    this.capacity = config.capacity || DEFAULT_CAPACITY;
+    this.fields = config.fields || RING_BUFFER_FIELDS;
+    this.timestamps = new Float64Array(this.capacity);
+    this.columns = {};
+    for (const field of this.fields) {
+      this.columns[field] = new Float64Array(this.capacity);
+    }
+    this.head = 0; // Next write position
+    this.size = 0;
+  }
+
+  /**
+   * Append a sample, overwriting the oldest one when full.
+   * @param {number} timestamp - Sample time (epoch seconds).
+   * @param {Object} values - Field values keyed by column name.
+   */
+  push(timestamp, values) {
+    const i = this.head;
+    this.timestamps[i] = timestamp;
+    for (const field of this.fields) {
+      this.columns[field][i] = values[field] || 0;
+    }
+    this.head = (i + 1) % this.capacity;
+    if (this.size < this.capacity) this.size++;
+  }
+
+  /**
+   * Timestamp of the oldest retained sample.
+   * @returns {number|null} Epoch seconds, or null when empty.
+   */
+  oldestTimestamp() {
+    if (this.size === 0) return null;
+    return this.timestamps[this._slot(this.size - 1)];
+  }
+
+  /**
+   * Whether the buffer holds every sample since the given time.
+   * @param {number} from - Range start (epoch seconds).
+   * @returns {boolean}
+   */
+  covers(from) {
+    // Samples are contiguous from the oldest one; anything earlier lives only in SQLite
+    const oldest = this.oldestTimestamp();
+    return oldest !== null && oldest <= from;
+  }
+
+  /**
+   * Get the newest samples.
+   * @param {number} limit - Maximum number of rows.
+   * @returns {Array<Object>} Rows newest first.
+   */
+  latest(limit) {
+    const count = Math.min(limit, this.size);
+    const rows = new Array(count);
+    for (let n = 0; n < count; n++) {
+      rows[n] = this._row(this._slot(n));
+    }
+    return rows;
+  }
+
+  /**
+   * Get the samples within a time range.
+   * @param {number} from - Range start (epoch seconds).
+   * @param {number} to - Range end (epoch seconds).
+   * @returns {Array<Object>} Rows newest first.
+   */
+  range(from, to) {
+    const rows = [];
+    for (let n = 0; n < this.size; n++) {
+      const slot = this._slot(n);
+      const ts = this.timestamps[slot];
+      if (ts < from) break;
+      if (ts <= to) rows.push(this._row(slot));
+    }
+    return rows;
+  }
+
+  /**
+   * Drop all samples.
+   */
+  clear() {
+    this.head = 0;
+    this.size = 0;
+  }
+
+  /**
+   * Slot index of the n-th newest sample.
+   * @param {number} n - 0 for the newest sample.
+   * @returns {number} Array index.
+   */
+  _slot(n) {
+    return (this.head - 1 - n + this.capacity) % this.capacity;
+  }
+
+  /**
+   * Materialize one slot as a metrics-table shaped row.
+   * @param {number} slot - Array index.
+   * @returns {Object} Row.
+   */
+  _row(slot) {
+    const row = { timestamp: this.timestamps[slot] };
+    for (const field of this.fields) {
+      row[field] = this.columns[field][slot];
+    }
+    return row;
+  }
+}
+
+// Process-wide buffer filled by the shared sampler
+export const recentMetrics = new MetricsRingBuffer();
+
+export default MetricsRingBuffer;
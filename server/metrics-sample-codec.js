@@ -0,0 +1,145 @@
+/**
+ * Metrics Sample Codec - Compact transferable encoding of system samples
+ * The metrics worker sends each sample as one Float64Array whose buffer is
+ * transferred, not copied, to the main thread. Numeric fields sit at fixed
+ * offsets; strings (GPU names, device and interface names) rarely change and
+ * travel separately as "meta", only when they differ from the previous sample.
+ *
+ * Layout: [...SCALAR_FIELDS, one count per LIST_FIELDS entry,
+ *          ...each list's items x its numeric fields]
+ * Missing numbers (e.g. an unreadable temperature) are encoded as NaN.
+ */
+
+// Numeric per-GPU fields, in buffer order
+export const GPU_FIELDS = [
+  "index",
+  "usage",
+  "memoryUsed",
+  "memoryTotal",
+  "temperature",
+  "power",
+  "hasUtilizationData",
+];
+
+const DEVICE_FIELDS = ["readBytesPerSec", "writeBytesPerSec", "readIops", "writeIops", "utilization"];
+const INTERFACE_FIELDS = ["rxBytesPerSec", "txBytesPerSec"];
+const BOOLEAN_FIELDS = new Set(["hasUtilizationData"]);
+
+// [section, field] pairs, in buffer order
+const SCALAR_FIELDS = [
+  ["cpu", "usage"],
+  ["memory", "used"],
+  ["swap", "used"],
+  ["disk", "used"],
+  ["gpu", "usage"],
+  ["gpu", "memoryUsed"],
+  ["gpu", "memoryTotal"],
+  ["io", "readBytesPerSec"],
+  ["io", "writeBytesPerSec"],
+  ["io", "readIops"],
+  ["io", "writeIops"],
+  ["io", "utilization"],
+  ["network", "rxBytesPerSec"],
+  ["network", "txBytesPerSec"],
+];
+
+// Per-item lists: section.field holds an array of objects; key names its meta entry
+const LIST_FIELDS = [
+  { section: "gpu", field: "list", key: "gpus", fields: GPU_FIELDS },
+  { section: "io", field: "devices", key: "devices", fields: DEVICE_FIELDS },
+  { section: "network", field: "interfaces", key: "interfaces", fields: INTERFACE_FIELDS },
+];
+
+const HEADER_FIELDS = SCALAR_FIELDS.length + LIST_FIELDS.length;
+
+/**
+ * Encode a number, keeping null/undefined distinguishable as NaN.
+ * @param {*} value - Field value
+ * @returns {number} Encoded value
+ */
+function num(value) {
+  if (typeof value === "boolean") return value ? 1 : 0;
+  return value === null || value === undefined ? NaN : Number(value);
+}
+
+/**
+ * Non-numeric fields of a list item.
+ * @param {Object} item - GPU, block device or interface object
+ * @param {Array<string>} fields - Numeric fields carried in the buffer
+ * @returns {Object} String fields only
+ */
+function itemMeta(item, fields) {
+  const meta = {};
+  for (const [key, value] of Object.entries(item)) {
+    if (!fields.includes(key) && (typeof value === "string" || value === null)) {
+      meta[key] = value;
+    }
+  }
+  return meta;
+}
+
+/**
+ * Encode a system sample.
+ * @param {Object} sample - Result of collectSystemMetrics()
+ * @returns {Object} { values: Float64Array, meta: Object } - meta holds io.device
+ *   and one array of string fields per list (gpus, devices, interfaces)
+ */
+export function encodeSystemSample(sample) {
+  const lists = LIST_FIELDS.map(({ section, field }) => sample[section]?.[field] || []);
+  const size = lists.reduce((sum, list, i) => sum + list.length * LIST_FIELDS[i].fields.length, HEADER_FIELDS);
+  const values = new Float64Array(size);
+
+  let offset = 0;
+  for (const [section, field] of SCALAR_FIELDS) {
+    values[offset++] = num(sample[section]?.[field]);
+  }
+  for (const list of lists) {
+    values[offset++] = list.length;
+  }
+
+  const meta = { device: sample.io?.device ?? null };
+  lists.forEach((list, i) => {
+    const { key, fields } = LIST_FIELDS[i];
+    for (const item of list) {
+      for (const field of fields) {
+        values[offset++] = num(item[field]);
+      }
+    }
+    meta[key] = list.map((item) => itemMeta(item, fields));
+  });
+
+  return { values, meta };
+}
+
+/**
+ * Decode a system sample.
+ * @param {Float64Array} values - Encoded values
+ * @param {Object} [meta={}] - Meta from the latest sample that carried it
+ * @returns {Object} Sample in the collectSystemMetrics() shape
+ */
+export function decodeSystemSample(values, meta = {}) {
+  const sample = {};
+  let offset = 0;
+  for (const [section, field] of SCALAR_FIELDS) {
+    const v = values[offset++];
+    (sample[section] ||= {})[field] = Number.isNaN(v) ? null : v;
+  }
+  sample.io.device = meta.device ?? null;
+
+  const counts = LIST_FIELDS.map(() => values[offset++] || 0);
+  LIST_FIELDS.forEach(({ section, field, key, fields }, i) => {
+    const list = [];
+    for (let n = 0; n < counts[i]; n++) {
+      const item = { ...meta[key]?.[n] };
+      for (const name of fields) {
+        const v = values[offset++];
+        if (BOOLEAN_FIELDS.has(name)) item[name] = v === 1;
+        else item[name] = Number.isNaN(v) ? null : v;
+      }
+      list.push(item);
+    }
+    sample[section][field] = list;
+  });
+
+  return sample;
+}
@@ -0,0 +1,245 @@
+/**
+ * Metrics Sampler - Single shared collection loop
+ * One sampler per process runs at the fastest interval any subscriber requested.
+ * Each subscriber receives the latest sample at its own cadence, so the cost of
+ * a tick (collection + DB write) stays flat as the number of dashboards grows.
+ * Subscribers that are not rendering (hidden tab) fall back to the idle interval,
+ * so the loop slows down on its own when nobody is watching.
+ */
+
+// Timer jitter tolerated when deciding whether a subscriber is due
+const DELIVERY_TOLERANCE = 100;
+// Interval used for subscribers that are not actively rendering
+const DEFAULT_IDLE_INTERVAL = 30000;
+
+export class MetricsSampler {
+  /**
+   * Create a new MetricsSampler.
+   * @param {Object} options - Sampler options.
+   * @param {Function} options.collect - Async function returning one sample.
+   * @param {Function} [options.onSample] - Called once per collected sample (e.g. persistence).
+   * @param {Function} [options.onRateChange] - Called with (interval, idle) when the loop
+   *   speeds up, slows down or stops (interval null).
+   * @param {number} [options.idleInterval=30000] - Interval for inactive subscribers.
+   */
+  constructor({ collect, onSample = null, onRateChange = null, idleInterval = DEFAULT_IDLE_INTERVAL }) {
+    this.collect = collect;
+    this.onSample = onSample;
+    this.onRateChange = onRateChange;
+    this.idleInterval = idleInterval;
+    this.subscribers = new Map(); // id -> { interval, deliver, lastDelivered, active }
+    this.latest = null;
+    this.interval = null;
+    this.timerId = null;
+    this._collecting = false;
+  }
+
+  /**
+   * Add or update a subscriber.
+   * @param {string} id - Subscriber ID (socket.id).
+   * @param {number} interval - Requested delivery interval in milliseconds.
+   * @param {Function} deliver - Called with the latest sample when the subscriber is due.
+   * @param {boolean} [active] - Whether the subscriber is rendering; keeps the previous
+   *   state on re-subscribe, defaults to true.
+   */
+  subscribe(id, interval, deliver, active = this.subscribers.get(id)?.active ?? true) {
+    const wasRunning = this.timerId !== null;
+    const subscriber = { interval, deliver, lastDelivered: 0, active };
+    this.subscribers.set(id, subscriber);
+    this._reschedule();
+
+    // Hand the newcomer the current sample right away instead of waiting a tick
+    if (wasRunning && this.latest) {
+      this._deliver(id, subscriber, this.latest, Date.now());
+    }
+  }
+
+  /**
+   * Remove a subscriber. Stops the sampler when nobody is left.
+   * @param {string} id - Subscriber ID.
+   * @returns {boolean} True if the subscriber existed.
+   */
+  unsubscribe(id) {
+    const existed = this.subscribers.delete(id);
+    if (existed) {
+      this._reschedule();
+    }
+    return existed;
+  }
+
+  /**
+   * Mark a subscriber as actively rendering or not (e.g. tab visibility).
+   * Inactive subscribers are served at the idle interval.
+   * @param {string} id - Subscriber ID.
+   * @param {boolean} active - Whether the subscriber is rendering.
+   * @returns {boolean} True if the subscriber exists.
+   */
+  setActive(id, active) {
+    const subscriber = this.subscribers.get(id);
+    if (!subscriber) return false;
+    if (subscriber.active !== active) {
+      subscriber.active = active;
+      this._reschedule();
+    }
+    return true;
+  }
+
+  /**
+   * Whether no subscriber is actively rendering.
+   * @returns {boolean}
+   */
+  isIdle() {
+    for (const subscriber of this.subscribers.values()) {
+      if (subscriber.active) return false;
+    }
+    return true;
+  }
+
+  /**
+   * Check whether a subscriber is registered.
+   * @param {string} id - Subscriber ID.
+   * @returns {boolean}
+   */
+  has(id) {
+    return this.subscribers.has(id);
+  }
+
+  /**
+   * Get the most recent sample.
+   * @returns {Object|null} Latest sample or null if nothing collected yet.
+   */
+  getLatest() {
+    return this.latest;
+  }
+
+  /**
+   * Get the current sampling interval (fastest subscriber).
+   * @returns {number|null} Interval in milliseconds or null when stopped.
+   */
+  getInterval() {
+    return this.interval;
+  }
+
+  /**
+   * Collect one sample, run the onSample hook and fan out to due subscribers.
+   * Overlapping ticks are skipped so a slow collection never piles up.
+   * @returns {Promise<Object|null>} The collected sample or null if skipped/failed.
+   */
+  async tick() {
+    if (this._collecting) return null;
+    this._collecting = true;
+
+    try {
+      const sample = await this.collect();
+      this.latest = sample;
+
+      if (this.onSample) {
+        try {
+          await this.onSample(sample);
+        } catch (e) {
+          console.error("[METRICS] Sample hook failed:", e.message);
+        }
+      }
+
+      const now = Date.now();
+      const tolerance = Math.min(DELIVERY_TOLERANCE, (this.interval || 0) / 10);
+      for (const [id, subscriber] of this.subscribers) {
+        if (now - subscriber.lastDelivered + tolerance >= this._effectiveInterval(subscriber)) {
+          this._deliver(id, subscriber, sample, now);
+        }
+      }
+
+      return sample;
+    } catch (e) {
+      console.error("[METRICS] Error collecting metrics:", e.message);
+      return null;
+    } finally {
+      this._collecting = false;
+    }
+  }
+
+  /**
+   * Stop the sampler and drop all subscribers.
+   */
+  stop() {
+    if (this.timerId) {
+      clearInterval(this.timerId);
+    }
+    this.timerId = null;
+    this.interval = null;
+    this.subscribers.clear();
+    this.latest = null;
+  }
+
+  /**
+   * Interval a subscriber is actually served at.
+   * @param {Object} subscriber - Subscriber entry.
+   * @returns {number} Interval in milliseconds.
+   */
+  _effectiveInterval(subscriber) {
+    return subscriber.active ? subscriber.interval : Math.max(subscriber.interval, this.idleInterval);
+  }
+
+  /**
+   * Deliver a sample to one subscriber, isolating delivery errors.
+   */
+  _deliver(id, subscriber, sample, now) {
+    subscriber.lastDelivered = now;
+    try {
+      subscriber.deliver(sample);
+    } catch (e) {
+      console.error(`[METRICS] Delivery to ${id} failed:`, e.message);
+    }
+  }
+
+  /**
+   * Restart the timer at the fastest requested interval, or stop it if idle.
+   * A stopped sampler forgets its latest sample, which would only get older.
+   */
+  _reschedule() {
+    if (this.subscribers.size === 0) {
+      if (this.timerId) clearInterval(this.timerId);
+      const wasRunning = this.timerId !== null;
+      this.timerId = null;
+      this.interval = null;
+      this.latest = null;
+      if (wasRunning) this._notifyRateChange();
+      return;
+    }
+
+    let fastest = Infinity;
+    for (const subscriber of this.subscribers.values()) {
+      fastest = Math.min(fastest, this._effectiveInterval(subscriber));
+    }
+
+    if (fastest === this.interval && this.timerId) return;
+
+    const wasRunning = this.timerId !== null;
+    if (this.timerId) clearInterval(this.timerId);
+
+    this.interval = fastest;
+    this.timerId = setInterval(() => {
+      this.tick();
+    }, fastest);
+    this._notifyRateChange();
+
+    // First subscriber: collect immediately rather than waiting a full interval
+    if (!wasRunning) {
+      this.tick();
+    }
+  }
+
+  /**
+   * Report the current loop interval to the onRateChange hook.
+   */
+  _notifyRateChange() {
+    if (!this.onRateChange) return;
+    try {
+      this.onRateChange(this.interval, this.isIdle());
+    } catch (e) {
+      console.error("[METRICS] Rate change hook failed:", e.message);
+    }
+  }
+}
+
+export default MetricsSampler;
@@ -0,0 +1,302 @@
+/**
+ * Metrics Worker Client - Main-thread side of the metrics worker
+ * Starts metrics-worker.js on first use and talks to it over a MessageChannel.
+ * A collection that waits on a hung nvidia-smi or a slow llama-server only
+ * delays its own reply; Socket.IO handlers keep running in the meantime.
+ * With METRICS_WORKER=false everything runs in-process instead.
+ */
+
+import { Worker, MessageChannel } from "worker_threads";
+import { collectSystemMetrics, cleanupSystemMetrics } from "./system-metrics.js";
+import { decodeSystemSample } from "./metrics-sample-codec.js";
+import { pauseGpuMonitor, setGpuPollInterval } from "./gpu-monitor.js";
+import { LlamaServerMetricsScraper } from "./handlers/llama-router/metrics-scraper.js";
+
+const WORKER_URL = new URL("./metrics-worker.js", import.meta.url);
+const USE_WORKER = process.env.METRICS_WORKER !== "false";
+const REQUEST_TIMEOUT = 15000; // Longer than any collector's own timeout
+const STOP_TIMEOUT = 2000;
+
+export class MetricsWorkerClient {
+  /**
+   * Create a new MetricsWorkerClient.
+   * @param {Object} [config] - Client configuration.
+   * @param {boolean} [config.enabled] - Use a worker thread (default: METRICS_WORKER !== "false").
+   * @param {URL|string} [config.workerUrl] - Worker entry point.
+   * @param {number} [config.timeout=15000] - Reply timeout per request (ms).
+   */
+  constructor(config = {}) {
+    this.enabled = config.enabled ?? USE_WORKER;
+    this.workerUrl = config.workerUrl || WORKER_URL;
+    this.timeout = config.timeout || REQUEST_TIMEOUT;
+
+    this.worker = null;
+    this.port = null;
+    this.pending = new Map(); // id -> { resolve, reject, timer }
+    this.nextId = 1;
+    this.meta = {};
+    this.needMeta = true; // Ask the worker for meta with the next sample
+
+    // Replayed to a restarted worker
+    this.gpuInterval = null;
+    this.llamaConfig = null;
+  }
+
+  /**
+   * Collect one system sample (CPU, memory, disk, IO, GPU).
+   * @param {Object} [options] - collectSystemMetrics() options.
+   * @param {string} [options.ioPath] - Path whose backing block device is reported as io.device.
+   * @returns {Promise<Object>} Sample in the collectSystemMetrics() shape
+   */
+  async collect(options = {}) {
+    if (!this.enabled) return collectSystemMetrics(options);
+
+    const request = { type: "sample", ioPath: options.ioPath };
+    if (this.needMeta) request.needMeta = true;
+    let reply;
+    try {
+      reply = await this._request(request);
+    } catch (e) {
+      // The worker may still answer, with meta this client will never see
+      this.needMeta = true;
+      throw e;
+    }
+    if (reply.meta) {
+      this.meta = reply.meta;
+      this.needMeta = false;
+    }
+    return decodeSystemSample(reply.values, this.meta);
+  }
+
+  /**
+   * Set the nvidia-smi loop interval.
+   * @param {number} intervalMs - Loop interval in milliseconds.
+   */
+  setGpuPollInterval(intervalMs) {
+    if (!this.enabled) {
+      setGpuPollInterval(intervalMs);
+      return;
+    }
+    this.gpuInterval = intervalMs;
+    this._send({ type: "gpu:interval", interval: intervalMs });
+  }
+
+  /**
+   * Stop the nvidia-smi stream while nobody needs GPU data.
+   */
+  pauseGpu() {
+    if (!this.enabled) {
+      pauseGpuMonitor();
+      return;
+    }
+    // Nothing to pause if the worker never started
+    if (this.port) this._send({ type: "gpu:pause" });
+  }
+
+  /**
+   * Create a llama-server metrics scraper that runs where collection runs.
+   * @param {Object} config - { host, port, modelName }
+   * @returns {LlamaServerMetricsScraper|WorkerMetricsScraper} Scraper
+   */
+  createScraper(config) {
+    return this.enabled ? new WorkerMetricsScraper(this, config) : new LlamaServerMetricsScraper(config);
+  }
+
+  /**
+   * Point the worker's scraper at a llama-server.
+   * @param {Object} config - { port, modelName }
+   */
+  configureLlama(config) {
+    this.llamaConfig = config;
+    this._send({ type: "llama:configure", ...config });
+  }
+
+  /**
+   * Scrape llama-server in the worker.
+   * @returns {Promise<Object>} { metrics, timestamp }
+   */
+  scrapeLlama() {
+    return this._request({ type: "llama:scrape" });
+  }
+
+  /**
+   * Release collectors and stop the worker. The worker stops its nvidia-smi
+   * child and exits on its own; it is terminated if it has not after a moment.
+   */
+  stop() {
+    this.gpuInterval = null;
+    this.llamaConfig = null;
+    if (!this.enabled) {
+      cleanupSystemMetrics();
+      return;
+    }
+    if (!this.worker) return;
+
+    const { worker, port } = this;
+    this._reset(new Error("Metrics worker stopped"));
+    port.postMessage({ type: "stop" });
+    setTimeout(() => worker.terminate().catch(() => {}), STOP_TIMEOUT).unref();
+  }
+
+  /**
+   * Start the worker if it is not running and replay its configuration.
+   */
+  _ensureWorker() {
+    if (this.worker) return;
+
+    const { port1, port2 } = new MessageChannel();
+    const worker = new Worker(this.workerUrl, {
+      workerData: { port: port2 },
+      transferList: [port2],
+    });
+    // Neither the worker nor its port may keep the process alive
+    worker.unref();
+    port1.unref();
+
+    port1.on("message", (message) => this._onMessage(message));
+    worker.on("error", (e) => {
+      console.error("[METRICS] Metrics worker failed:", e.message);
+      if (this.worker === worker) this._reset(e);
+    });
+    worker.on("exit", (code) => {
+      if (this.worker === worker) this._reset(new Error(`Metrics worker exited with code ${code}`));
+    });
+
+    this.worker = worker;
+    this.port = port1;
+    console.log("[METRICS] Metrics worker started");
+
+    if (this.gpuInterval) this.port.postMessage({ type: "gpu:interval", interval: this.gpuInterval });
+    if (this.llamaConfig) this.port.postMessage({ type: "llama:configure", ...this.llamaConfig });
+  }
+
+  /**
+   * Post a message that expects no reply.
+   * @param {Object} message - Message with a type.
+   */
+  _send(message) {
+    this._ensureWorker();
+    this.port.postMessage(message);
+  }
+
+  /**
+   * Post a request and wait for the reply with the same id.
+   * @param {Object} message - Message with a type.
+   * @param {number} [timeout] - Reply timeout (ms).
+   * @returns {Promise<Object>} Reply message
+   */
+  _request(message, timeout = this.timeout) {
+    this._ensureWorker();
+    const id = this.nextId++;
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Metrics worker did not answer ${message.type} within ${timeout}ms`));
+      }, timeout);
+      timer.unref();
+      this.pending.set(id, { resolve, reject, timer });
+      this.port.postMessage({ ...message, id });
+    });
+  }
+
+  /**
+   * Settle the pending request a reply belongs to.
+   * @param {Object} message - Reply from the worker.
+   */
+  _onMessage(message) {
+    const request = this.pending.get(message.id);
+    if (!request) {
+      // Late reply to a request that timed out; the meta it carries is lost
+      if (message.meta) this.needMeta = true;
+      return;
+    }
+
+    this.pending.delete(message.id);
+    clearTimeout(request.timer);
+    if (message.error) request.reject(new Error(message.error));
+    else request.resolve(message);
+  }
+
+  /**
+   * Forget the worker and fail everything still waiting on it.
+   * The next request starts a new worker.
+   * @param {Error} error - Reason given to pending requests.
+   */
+  _reset(error) {
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(error);
+    }
+    this.pending.clear();
+    this.worker = null;
+    this.port = null;
+    this.meta = {};
+    this.needMeta = true;
+  }
+}
+
+/**
+ * llama-server scraper whose requests and parsing run in the metrics worker.
+ * Mirrors the LlamaServerMetricsScraper interface used by llama-metrics.js.
+ */
+export class WorkerMetricsScraper {
+  /**
+   * @param {MetricsWorkerClient} client - Worker client.
+   * @param {Object} config - { port, modelName }
+   */
+  constructor(client, config) {
+    this.client = client;
+    this.port = config.port || 8080;
+    this.modelName = config.modelName || null;
+    this.timestamp = null;
+    this._configure();
+  }
+
+  updatePort(port) {
+    if (port && port !== this.port) {
+      this.port = port;
+      this._configure();
+    }
+  }
+
+  updateModel(modelName) {
+    if (modelName && modelName !== this.modelName) {
+      this.modelName = modelName;
+      this._configure();
+    }
+  }
+
+  /**
+   * Forget the tracked model (e.g. after it was unloaded).
+   */
+  clearModel() {
+    if (this.modelName) {
+      this.modelName = null;
+      this._configure();
+    }
+  }
+
+  /**
+   * Time the worker's cached metrics were fetched.
+   * @returns {number|null} Epoch ms, or null when nothing is cached
+   */
+  getMetricsTimestamp() {
+    return this.timestamp;
+  }
+
+  async getMetrics() {
+    const { metrics, timestamp } = await this.client.scrapeLlama();
+    this.timestamp = timestamp;
+    return metrics;
+  }
+
+  _configure() {
+    this.client.configureLlama({ port: this.port, modelName: this.modelName });
+  }
+}
+
+// Process-wide client used by metrics.js and llama-metrics.js
+export const metricsWorker = new MetricsWorkerClient();
+
+export default MetricsWorkerClient;
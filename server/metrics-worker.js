@@ -0,0 +1,101 @@
+/**
+ * Metrics Worker - Runs the collection stack off the main event loop
+ * systeminformation calls, nvidia-smi, sysfs reads, the llama-server scrape
+ * and result shaping all happen here. The main thread talks to this worker
+ * over the MessagePort handed in through workerData (see
+ * metrics-worker-client.js): each request carries an id and gets exactly one
+ * reply. System samples are answered with a transferred Float64Array.
+ */
+
+import { workerData } from "worker_threads";
+import { collectSystemMetrics, cleanupSystemMetrics } from "./system-metrics.js";
+import { encodeSystemSample } from "./metrics-sample-codec.js";
+import { pauseGpuMonitor, setGpuPollInterval } from "./gpu-monitor.js";
+import { LlamaServerMetricsScraper } from "./handlers/llama-router/metrics-scraper.js";
+
+const { port } = workerData;
+
+let scraper = null;
+let lastMeta = null;
+
+/**
+ * Collect one system sample and transfer it to the main thread.
+ * Meta (GPU, device and interface names) is attached only when it changed
+ * since the previous sample, or when the client asks for it because a reply
+ * that carried it never reached the caller.
+ * @param {number} id - Request id
+ * @param {Object} options - collectSystemMetrics() options ({ ioPath })
+ * @param {boolean} [needMeta=false] - Attach meta even if unchanged
+ */
+async function replySample(id, options, needMeta = false) {
+  const sample = await collectSystemMetrics(options);
+  const { values, meta } = encodeSystemSample(sample);
+  const serialized = JSON.stringify(meta);
+  const message = { id, values };
+  if (needMeta || serialized !== lastMeta) {
+    message.meta = meta;
+    lastMeta = serialized;
+  }
+  port.postMessage(message, [values.buffer]);
+}
+
+/**
+ * Scrape llama-server and reply with the shaped metrics.
+ * @param {number} id - Request id
+ */
+async function replyLlama(id) {
+  const metrics = scraper ? await scraper.getMetrics() : null;
+  port.postMessage({
+    id,
+    metrics,
+    timestamp: scraper?.getMetricsTimestamp() ?? null,
+  });
+}
+
+/**
+ * Point the scraper at a llama-server port and model.
+ * @param {Object} config - { port, modelName }; a null modelName clears the model
+ */
+function configureScraper({ port: llamaPort, modelName }) {
+  if (!scraper) {
+    scraper = new LlamaServerMetricsScraper({ host: "127.0.0.1", port: llamaPort, modelName });
+    return;
+  }
+  scraper.updatePort(llamaPort);
+  if (modelName) scraper.updateModel(modelName);
+  else scraper.clearModel();
+}
+
+port.on("message", async (message) => {
+  const { id, type } = message;
+  try {
+    switch (type) {
+      case "sample":
+        await replySample(id, { ioPath: message.ioPath }, message.needMeta);
+        break;
+      case "llama:scrape":
+        await replyLlama(id);
+        break;
+      case "llama:configure":
+        configureScraper(message);
+        break;
+      case "gpu:interval":
+        setGpuPollInterval(message.interval);
+        break;
+      case "gpu:pause":
+        pauseGpuMonitor();
+        break;
+      case "stop":
+        // Closing the port lets the worker exit once the collectors are released
+        cleanupSystemMetrics();
+        scraper = null;
+        port.close();
+        break;
+      default:
+        throw new Error(`Unknown message type: ${type}`);
+    }
+  } catch (e) {
+    if (id !== undefined) port.postMessage({ id, error: e.message });
+    else console.error(`[METRICS-WORKER] ${type} failed:`, e.message);
+  }
+});
@@ -1,30 +1,66 @@
 /**
  * Metrics Collection - Event-Driven Architecture
  * Replaces fixed interval polling with WebSocket subscriptions
- * Clients subscribe to metrics updates with configurable intervals
+ * Clients subscribe to metrics updates with configurable intervals;
+ * a single shared sampler collects once per tick and fans out to subscribers.
+ * Each metric family has its own minimum interval (CPU/memory every tick, GPU,
+ * disk and the llama-server scrape less often), and the sampler slows down
+ * when no subscriber is rendering. Collection itself runs in a worker thread
+ * (see metrics-worker-client.js) so slow collectors never stall Socket.IO.
+ * Each sample is also run through the streaming alert rules (metrics-alerts.js).
+ * Pruning is left to the database's retention scheduler, off the sampling path.
  */
 
-import {
-  initCpuTimes,
-  collectCpuMetrics,
-  collectMemoryMetrics,
-  collectDiskMetrics,
-  getMetricsCallCount,
-  resetMetricsCallCount,
-} from "./metrics-collector.js";
-import { collectGpuMetrics, getGpuList } from "./gpu-monitor.js";
+import { initCpuTimes } from "./metrics-collector.js";
 import {
   initializeLlamaMetricsScraper as initLlamaScraper,
-  collectLlamaMetrics,
+  collectLlamaStatus,
   cleanupLlamaMetrics,
 } from "./llama-metrics.js";
+import { MetricsSampler } from "./metrics-sampler.js";
+import { recentMetrics } from "./metrics-ring-buffer.js";
+import {
+  updateLlamaRates,
+  llamaCounterRates,
+  PERSISTED_RATE_WINDOW,
+  ALERT_RATE_WINDOW,
+} from "./llama-rates.js";
+import { processMonitor } from "./event-loop-monitor.js";
+import { createFamily, FAMILY_INTERVALS } from "./system-metrics.js";
+import { metricsWorker } from "./metrics-worker-client.js";
+import { getRouterConfig, getAlertRules } from "./db/config.js";
+import { metricsAlerts, getAlertValues } from "./metrics-alerts.js";
+import { fileLogger } from "./handlers/file-logger.js";
+import { toGpuMetricsRows } from "./db/metrics-repository.js";
 
-// Subscription management
-const subscriptions = new Map(); // socket.id -> { interval, lastEmit, timeoutId }
 const DEFAULT_INTERVAL = 2000; // 2 seconds default
 const MIN_INTERVAL = 1000; // 1 second minimum
 const MAX_INTERVAL = 60000; // 60 seconds maximum
-const PRUNE_INTERVAL = 10000; // Prune old metrics every 10 calls at default rate
+const EXPORT_INTERVAL = 15000; // Sampler cadence kept alive for the /metrics exporter
+const EXPORT_SUBSCRIBER_ID = "prometheus-exporter";
+const IO_PATH_REFRESH = 60000; // Re-read modelsPath from the router config at most once a minute
+const ALERT_RULES_REFRESH = 60000; // Re-read the alert_rules table at most once a minute
+
+// Shared sampler - one collection loop per process, fanned out to subscribers
+let sampler = null;
+let latestLlamaStatus = null;
+let llamaStatusPending = false;
+let ioPath = null;
+let ioPathReadAt = 0;
+let alertsIo = null;
+let alertRulesReadAt = 0;
+
+const llamaFamily = createFamily(FAMILY_INTERVALS.llama, collectLlamaStatusWithRates);
+
+/**
+ * Collect llama-server status with windowed counter rates attached.
+ * @returns {Promise<Object>} llama-server status data plus rates
+ */
+async function collectLlamaStatusWithRates() {
+  const status = await collectLlamaStatus();
+  status.rates = updateLlamaRates(status);
+  return status;
+}
 
 /**
  * Initialize llama-server metrics scraper.
@@ -49,89 +85,198 @@ function getClampedInterval(requestedInterval) {
 }
 
 /**
- * Collect and emit metrics to a specific socket.
- * @param {Object} socket - Socket.IO socket instance.
- * @param {Object} db - Database instance.
+ * Get the path whose block device is reported as the IO device.
+ * METRICS_IO_PATH wins; otherwise the configured modelsPath, since model
+ * loads are the disk traffic worth watching; "/" when neither is set.
+ * @param {Object|null} db - Database instance.
+ * @returns {string} Path on the filesystem to watch.
  */
-async function collectAndEmitMetrics(socket, db) {
-  try {
-    // Collect system metrics in parallel
-    const [cpuUsage, memoryMetrics, diskMetrics, gpuMetrics] = await Promise.all([
-      Promise.resolve(collectCpuMetrics()),
-      collectMemoryMetrics(),
-      collectDiskMetrics(),
-      collectGpuMetrics(),
-    ]);
-
-    const { memoryUsedPercent, swapUsedPercent } = memoryMetrics;
-    const { diskUsedPercent } = diskMetrics;
-    const { gpuUsage, gpuMemoryUsed, gpuMemoryTotal } = gpuMetrics;
-
-    // Save to database
-    db.saveMetrics({
-      cpu_usage: cpuUsage,
-      memory_usage: memoryUsedPercent,
-      swap_usage: swapUsedPercent,
-      disk_usage: diskUsedPercent,
+function getIoPath(db) {
+  if (process.env.METRICS_IO_PATH) return process.env.METRICS_IO_PATH;
+
+  const now = Date.now();
+  if (ioPath === null || now - ioPathReadAt >= IO_PATH_REFRESH) {
+    ioPathReadAt = now;
+    try {
+      ioPath = (db && getRouterConfig(db).modelsPath) || "/";
+    } catch (e) {
+      ioPath = "/";
+    }
+  }
+  return ioPath;
+}
+
+/**
+ * Collect one system metrics sample (CPU, memory, disk, IO, GPU).
+ * The readings come from the metrics worker; uptime and event-loop health
+ * describe this thread and are added here.
+ * @param {Object|null} db - Database instance (for the models path).
+ * @returns {Promise<Object>} Sample with timestamp and frontend-shaped metrics.
+ */
+async function collectSample(db = null) {
+  const system = await metricsWorker.collect({ ioPath: getIoPath(db) });
+
+  return {
+    timestamp: Date.now(),
+    metrics: {
+      ...system,
       uptime: process.uptime(),
-      gpu_usage: gpuUsage,
-      gpu_memory_used: gpuMemoryUsed,
-      gpu_memory_total: gpuMemoryTotal,
-    });
+      process: processMonitor.snapshot(),
+    },
+  };
+}
+
+/**
+ * Persist a sample to the database (one row per tick plus one per GPU) and the
+ * in-memory ring buffer.
+ * llama-server throughput is stored as the latest scrape's 1-minute rates.
+ * @param {Object} db - Database instance.
+ * @param {Object} sample - Sample from collectSample().
+ * @returns {Object} The saved metrics row.
+ */
+function saveSample(db, sample) {
+  const { metrics } = sample;
+  const rates = latestLlamaStatus?.rates?.[PERSISTED_RATE_WINDOW] || {};
+  const row = {
+    timestamp: Math.floor(sample.timestamp / 1000),
+    cpu_usage: metrics.cpu.usage,
+    memory_usage: metrics.memory.used,
+    swap_usage: metrics.swap.used,
+    disk_usage: metrics.disk.used,
+    uptime: metrics.uptime,
+    gpu_usage: metrics.gpu.usage,
+    gpu_memory_used: metrics.gpu.memoryUsed,
+    gpu_memory_total: metrics.gpu.memoryTotal,
+    llama_prompt_tps: rates.promptTokensPerSecond,
+    llama_predicted_tps: rates.predictedTokensPerSecond,
+    llama_requests_per_sec: rates.requestsPerSecond,
+    llama_busy_ratio: rates.busySlotRatio,
+    disk_read_bps: metrics.io?.readBytesPerSec,
+    disk_write_bps: metrics.io?.writeBytesPerSec,
+    disk_read_iops: metrics.io?.readIops,
+    disk_write_iops: metrics.io?.writeIops,
+    disk_io_utilization: metrics.io?.utilization,
+    net_rx_bps: metrics.network?.rxBytesPerSec,
+    net_tx_bps: metrics.network?.txBytesPerSec,
+  };
+  const gpus = toGpuMetricsRows(metrics.gpu.list);
+  recentMetrics.push(row.timestamp, row);
+  db.saveMetrics(row, gpus);
+  return row;
+}
+
+/**
+ * Reload the alert rules when they are due; unchanged rules keep their state.
+ * @param {Object} db - Database instance.
+ */
+function refreshAlertRules(db) {
+  const now = Date.now();
+  if (alertRulesReadAt && now - alertRulesReadAt < ALERT_RULES_REFRESH) return;
+  alertRulesReadAt = now;
+  metricsAlerts.setRules(getAlertRules(db));
+}
 
-    // Broadcast metrics update to ALL connected clients (except sender)
-    // Using socket.broadcast.emit to reach all clients
-    socket.broadcast.emit("metrics:update", {
+/**
+ * Run a saved sample through the alert rules and publish what changed:
+ * a metrics:alert broadcast plus a fileLogger entry (file, logs table, logs:entry).
+ * @param {Object} db - Database instance.
+ * @param {Object} sample - Sample from collectSample().
+ * @param {Object} row - Row returned by saveSample().
+ */
+function checkAlerts(db, sample, row) {
+  refreshAlertRules(db);
+  const llamaRates = latestLlamaStatus?.rates?.[ALERT_RATE_WINDOW];
+  const values = getAlertValues(row, sample.metrics.gpu.list, llamaRates);
+  const alerts = metricsAlerts.evaluate(sample.timestamp, values);
+
+  for (const alert of alerts) {
+    const level = alert.state === "cleared" ? "info" : alert.severity === "critical" ? "error" : "warn";
+    fileLogger.log(level, alert.message, "alerts");
+    alertsIo?.emit("metrics:alert", {
       type: "broadcast",
-      timestamp: Date.now(),
-      data: {
-        metrics: {
-          cpu: { usage: cpuUsage },
-          memory: { used: memoryUsedPercent },
-          swap: { used: swapUsedPercent },
-          disk: { used: diskUsedPercent },
-          gpu: {
-            usage: gpuUsage,
-            memoryUsed: gpuMemoryUsed,
-            memoryTotal: gpuMemoryTotal,
-            list: gpuMetrics.gpuList, // Use the GPU list from collected metrics
-          },
-          uptime: process.uptime(),
-        },
-      },
+      data: { alert },
+      timestamp: alert.timestamp,
     });
+  }
+}
 
-    // Collect llama-server metrics (fire and forget)
-    collectLlamaMetrics(socket, db).catch((e) => {
+/**
+ * Refresh the cached llama-server status (fire and forget, single in flight).
+ * One scrape per llama interval serves every subscriber.
+ */
+function refreshLlamaStatus() {
+  if (llamaStatusPending) return;
+  llamaStatusPending = true;
+
+  llamaFamily
+    .get()
+    .then((data) => {
+      latestLlamaStatus = data;
+    })
+    .catch((e) => {
       console.debug("[METRICS] Llama metrics collection skipped:", e.message);
+    })
+    .finally(() => {
+      llamaStatusPending = false;
     });
-  } catch (e) {
-    console.error("[METRICS] Error collecting metrics:", e.message);
+}
+
+/**
+ * Follow the sampler's loop rate with the nvidia-smi stream: never faster than
+ * the GPU family needs, and stopped entirely when nobody is subscribed.
+ * @param {number|null} interval - Sampler interval in milliseconds, null when stopped.
+ * @param {boolean} idle - Whether no subscriber is actively rendering.
+ */
+function handleRateChange(interval, idle) {
+  if (interval === null) {
+    console.log("[METRICS] No subscribers, sampling stopped");
+    metricsWorker.pauseGpu();
+    return;
   }
+
+  console.log(`[METRICS] Sampling every ${interval}ms${idle ? " (no visible subscribers)" : ""}`);
+  metricsWorker.setGpuPollInterval(Math.max(interval, FAMILY_INTERVALS.gpu));
 }
 
 /**
- * Start the metrics collection interval for a subscription.
- * @param {Object} socket - Socket.IO socket instance.
+ * Get or create the shared sampler.
  * @param {Object} db - Database instance.
- * @param {number} interval - Collection interval in milliseconds.
+ * @returns {MetricsSampler} Shared sampler.
  */
-function startCollectionInterval(socket, db, interval) {
-  const subscription = subscriptions.get(socket.id);
-  if (!subscription) return;
-
-  // Clear any existing interval
-  if (subscription.timeoutId) {
-    clearInterval(subscription.timeoutId);
+function getSampler(db) {
+  if (!sampler) {
+    sampler = new MetricsSampler({
+      collect: () => collectSample(db),
+      onSample: processMonitor.wrap("metrics:sample", (sample) => {
+        const row = saveSample(db, sample);
+        checkAlerts(db, sample, row);
+        refreshLlamaStatus();
+      }),
+      onRateChange: handleRateChange,
+    });
   }
+  return sampler;
+}
 
-  // Set up new interval
-  subscription.timeoutId = setInterval(() => {
-    collectAndEmitMetrics(socket, db);
-  }, interval);
+/**
+ * Send a sample (and the latest llama-server status) to one subscriber.
+ * @param {Object} socket - Socket.IO socket instance.
+ * @param {Object} sample - Sample from collectSample().
+ */
+function deliverSample(socket, sample) {
+  socket.emit("metrics:update", {
+    type: "broadcast",
+    timestamp: sample.timestamp,
+    data: { metrics: sample.metrics },
+  });
 
-  // Emit initial metrics immediately
-  collectAndEmitMetrics(socket, db);
+  if (latestLlamaStatus) {
+    socket.emit("llama-server:status", {
+      type: "broadcast",
+      data: latestLlamaStatus,
+      timestamp: Date.now(),
+    });
+  }
 }
 
 /**
@@ -147,17 +292,11 @@ export function registerMetricsHandlers(socket, io, db) {
    */
   socket.on("metrics:subscribe", (req, callback) => {
     const interval = getClampedInterval(req?.interval);
-    const subscription = subscriptions.get(socket.id) || {};
-
-    subscription.interval = interval;
-    subscription.lastEmit = Date.now();
-
-    subscriptions.set(socket.id, subscription);
 
     console.log(`[METRICS] Socket ${socket.id} subscribed with interval ${interval}ms`);
 
-    // Start collection interval for this socket
-    startCollectionInterval(socket, db, interval);
+    // Join the shared sampler; it speeds up if this is the fastest subscriber
+    getSampler(db).subscribe(socket.id, interval, (sample) => deliverSample(socket, sample));
 
     // Acknowledge subscription with callback
     if (callback) {
@@ -181,8 +320,8 @@ export function registerMetricsHandlers(socket, io, db) {
    * @param {Object} req - Request object with new interval.
    */
   socket.on("metrics:update-interval", (req) => {
-    const subscription = subscriptions.get(socket.id);
-    if (!subscription) {
+    const shared = getSampler(db);
+    if (!shared.has(socket.id)) {
       socket.emit("metrics:update-interval:result", {
         success: false,
         error: "Not subscribed to metrics",
@@ -191,12 +330,11 @@ export function registerMetricsHandlers(socket, io, db) {
     }
 
     const newInterval = getClampedInterval(req?.interval);
-    subscription.interval = newInterval;
 
     console.log(`[METRICS] Socket ${socket.id} updated interval to ${newInterval}ms`);
 
-    // Restart collection with new interval
-    startCollectionInterval(socket, db, newInterval);
+    // Re-subscribe with the new cadence; the sampler re-derives its own interval
+    shared.subscribe(socket.id, newInterval, (sample) => deliverSample(socket, sample));
 
     socket.emit("metrics:update-interval:result", {
       success: true,
@@ -204,16 +342,19 @@ export function registerMetricsHandlers(socket, io, db) {
     });
   });
 
+  /**
+   * Client visibility signal: hidden dashboards are served at the idle interval.
+   * @param {Object} req - Request object with visible flag.
+   */
+  socket.on("metrics:visibility", (req) => {
+    sampler?.setActive(socket.id, req?.visible !== false);
+  });
+
   /**
    * Unsubscribe from metrics updates.
    */
   socket.on("metrics:unsubscribe", () => {
-    const subscription = subscriptions.get(socket.id);
-    if (subscription) {
-      if (subscription.timeoutId) {
-        clearInterval(subscription.timeoutId);
-      }
-      subscriptions.delete(socket.id);
+    if (sampler?.unsubscribe(socket.id)) {
       console.log(`[METRICS] Socket ${socket.id} unsubscribed from metrics`);
     }
 
@@ -227,16 +368,20 @@ export function registerMetricsHandlers(socket, io, db) {
    * Handle socket disconnect - clean up subscription.
    */
   socket.on("disconnect", () => {
-    const subscription = subscriptions.get(socket.id);
-    if (subscription) {
-      if (subscription.timeoutId) {
-        clearInterval(subscription.timeoutId);
-      }
-      subscriptions.delete(socket.id);
+    if (sampler?.unsubscribe(socket.id)) {
       console.log(`[METRICS] Socket ${socket.id} disconnected, subscription cleaned up`);
     }
   });
 
+  /**
+   * Get the alerts currently raised (new dashboards missed the metrics:alert broadcasts).
+   */
+  socket.on("metrics:alerts", (req, callback) => {
+    const result = { success: true, alerts: metricsAlerts.getActive() };
+    if (callback) callback(result);
+    socket.emit("metrics:alerts:result", result);
+  });
+
   /**
    * Get current metrics on demand.
    */
@@ -253,32 +398,45 @@ export function registerMetricsHandlers(socket, io, db) {
 
 /**
  * Collect metrics for a one-time request.
+ * Serves the shared sampler's latest sample while it is running and the
+ * sample is current (one tick of slack for a slow collection); otherwise
+ * collects a fresh one.
  * @param {Object} db - Database instance.
  * @returns {Promise<Object>} Metrics object.
  */
 async function collectMetricsForRequest(db) {
-  const [cpuUsage, memoryMetrics, diskMetrics, gpuMetrics] = await Promise.all([
-    Promise.resolve(collectCpuMetrics()),
-    collectMemoryMetrics(),
-    collectDiskMetrics(),
-    collectGpuMetrics(),
-  ]);
+  const latest = sampler?.getLatest();
+  const interval = sampler?.getInterval();
+  if (latest && interval && Date.now() - latest.timestamp <= 2 * interval) {
+    return latest.metrics;
+  }
+
+  const sample = await collectSample(db);
+  return sample.metrics;
+}
 
+/**
+ * Get the cached state rendered by the /metrics exporter.
+ * Never triggers a collection.
+ * @returns {Object} { sample, llama } - latest sample and llama-server status, or null
+ */
+export function getMetricsSnapshot() {
   return {
-    cpu: { usage: cpuUsage },
-    memory: { used: memoryMetrics.memoryUsedPercent },
-    swap: { used: memoryMetrics.swapUsedPercent },
-    disk: { used: diskMetrics.diskUsedPercent },
-    gpu: {
-      usage: gpuMetrics.gpuUsage,
-      memoryUsed: gpuMetrics.gpuMemoryUsed,
-      memoryTotal: gpuMetrics.gpuMemoryTotal,
-      list: gpuMetrics.gpuList, // Use the GPU list from collected metrics
-    },
-    uptime: process.uptime(),
+    sample: sampler?.getLatest() || null,
+    llama: latestLlamaStatus,
   };
 }
 
+/**
+ * Keep the shared sampler running for the /metrics exporter even when no
+ * dashboard is subscribed. Scrapes read the snapshot; they never collect.
+ * @param {Object} db - Database instance.
+ */
+export function enableMetricsExport(db) {
+  getSampler(db).subscribe(EXPORT_SUBSCRIBER_ID, EXPORT_INTERVAL, () => {});
+  console.log(`[METRICS] Prometheus export enabled (sampling every ${EXPORT_INTERVAL}ms)`);
+}
+
 /**
  * Start metrics collection system.
  * @param {Object} io - Socket.IO server instance.
@@ -286,6 +444,7 @@ async function collectMetricsForRequest(db) {
  */
 export async function startMetricsCollection(io, db) {
   initCpuTimes();
+  alertsIo = io;
 
   // Register handlers for all sockets
   io.on("connection", (socket) => {
@@ -301,25 +460,40 @@ export async function startMetricsCollection(io, db) {
  * @param {Object} db - Database instance.
  */
 export async function collectMetrics(io, db) {
-  // In the new architecture, metrics are collected per-subscription
+  // In the new architecture, metrics are collected by the shared sampler
   // This function is kept for any legacy code that calls it directly
-  await collectAndEmitMetrics(io, db);
+  try {
+    const sample = await collectSample(db);
+    saveSample(db, sample);
+    io.emit("metrics:update", {
+      type: "broadcast",
+      timestamp: sample.timestamp,
+      data: { metrics: sample.metrics },
+    });
+  } catch (e) {
+    console.error("[METRICS] Error collecting metrics:", e.message);
+  }
 }
 
 /**
  * Cleanup metrics collection.
  */
 export function cleanupMetrics() {
-  subscriptions.forEach(sub => {
-    if (sub.timeoutId) clearInterval(sub.timeoutId);
-  });
-  subscriptions.clear();
+  if (sampler) {
+    sampler.stop();
+    sampler = null;
+  }
+  latestLlamaStatus = null;
+  ioPath = null;
+  ioPathReadAt = 0;
+  alertsIo = null;
+  alertRulesReadAt = 0;
+  metricsAlerts.reset();
+  llamaCounterRates.reset();
+  llamaFamily.reset();
 
-  resetMetricsCallCount();
   cleanupLlamaMetrics();
 
-  // Add GPU cleanup - check if function exists first
-  if (typeof cleanupGpuMonitor === "function") {
-    cleanupGpuMonitor();
-  }
+  // Stop the collectors (and the long-lived nvidia-smi stream) in the worker
+  metricsWorker.stop();
 }
@@ -0,0 +1,276 @@
+/**
+ * NVIDIA SMI Stream - Long-lived nvidia-smi collector
+ * Starts nvidia-smi once in looping mode (-lms) and parses CSV lines from stdout
+ * incrementally, so a metrics tick reads the latest per-GPU sample from memory
+ * instead of forking a shell + nvidia-smi every time.
+ */
+
+import { spawn } from "child_process";
+
+const QUERY_FIELDS = [
+  "index",
+  "name",
+  "utilization.gpu",
+  "memory.used",
+  "memory.total",
+  "temperature.gpu",
+  "power.draw",
+];
+const DEFAULT_INTERVAL = 1000;
+const RESTART_DELAY = 1000;
+const MAX_RESTART_DELAY = 60000;
+const MAX_FAILED_STARTS = 5; // Give up after this many exits without a single sample
+
+/**
+ * Parse a numeric nvidia-smi field ("[N/A]", "[Not Supported]" become null).
+ * @param {string} value - Raw CSV field
+ * @returns {number|null} Parsed number or null
+ */
+function parseField(value) {
+  const num = parseFloat(value);
+  return isNaN(num) ? null : num;
+}
+
+/**
+ * Parse one CSV line from nvidia-smi into a GPU object.
+ * @param {string} line - CSV line (noheader, nounits)
+ * @returns {Object|null} GPU object or null if the line is malformed
+ */
+export function parseNvidiaSmiLine(line) {
+  const parts = line.split(",").map((p) => p.trim());
+  if (parts.length < 5) return null;
+
+  const index = parseInt(parts[0], 10);
+  if (isNaN(index)) return null;
+
+  return {
+    index,
+    name: parts[1] || `GPU ${index}`,
+    vendor: "NVIDIA",
+    usage: parseField(parts[2]) || 0,
+    memoryUsed: (parseField(parts[3]) || 0) * 1024 * 1024, // MB to bytes
+    memoryTotal: (parseField(parts[4]) || 0) * 1024 * 1024, // MB to bytes
+    temperature: parts.length > 5 ? parseField(parts[5]) : null,
+    power: parts.length > 6 ? parseField(parts[6]) : null,
+    hasUtilizationData: true,
+  };
+}
+
+export class NvidiaSmiStream {
+  /**
+   * Create a new NvidiaSmiStream.
+   * @param {Object} [config] - Collector configuration.
+   * @param {string} [config.command="nvidia-smi"] - Executable to spawn.
+   * @param {Array<string>} [config.args] - Override arguments (defaults to the looping CSV query).
+   * @param {number} [config.intervalMs=1000] - nvidia-smi loop interval.
+   * @param {number} [config.restartDelay=1000] - Initial delay before restarting a dead child.
+   */
+  constructor(config = {}) {
+    this.command = config.command || "nvidia-smi";
+    this.intervalMs = config.intervalMs || DEFAULT_INTERVAL;
+    this.args = config.args || [
+      `--query-gpu=${QUERY_FIELDS.join(",")}`,
+      "--format=csv,noheader,nounits",
+      `-lms`,
+      String(this.intervalMs),
+    ];
+    this.restartDelay = config.restartDelay || RESTART_DELAY;
+    this.staleAfter = Math.max(5000, this.intervalMs * 5);
+
+    this.process = null;
+    this.gpus = new Map(); // index -> GPU object with timestamp
+    this.unavailable = false;
+    this.restarts = 0;
+    this._buffer = "";
+    this._running = false;
+    this._failedStarts = 0;
+    this._currentDelay = this.restartDelay;
+    this._restartTimer = null;
+    this._waiters = [];
+  }
+
+  /**
+   * Start the nvidia-smi child process.
+   * @returns {boolean} True if started (or already running)
+   */
+  start() {
+    if (this.unavailable) return false;
+    if (this.process) return true;
+
+    this._running = true;
+    this._buffer = "";
+    let gotSample = false;
+
+    try {
+      this.process = spawn(this.command, this.args, {
+        stdio: ["ignore", "pipe", "ignore"],
+      });
+    } catch (e) {
+      this._markUnavailable(e.message);
+      return false;
+    }
+
+    // Do not keep the event loop alive just for the collector
+    this.process.unref();
+
+    this.process.stdout.setEncoding("utf8");
+    this.process.stdout.on("data", (chunk) => {
+      if (this._consume(chunk) > 0 && !gotSample) {
+        gotSample = true;
+        this._failedStarts = 0;
+        this._currentDelay = this.restartDelay;
+      }
+    });
+
+    this.process.on("error", (error) => {
+      if (error.code === "ENOENT") {
+        this._markUnavailable(`${this.command} not found`);
+      } else {
+        console.debug("[GPU] nvidia-smi stream error:", error.message);
+      }
+    });
+
+    this.process.on("exit", (code, signal) => {
+      this.process = null;
+      if (!this._running || this.unavailable) return;
+
+      if (!gotSample) this._failedStarts++;
+      if (this._failedStarts >= MAX_FAILED_STARTS) {
+        this._markUnavailable(`exited ${this._failedStarts} times without output`);
+        return;
+      }
+
+      console.debug(`[GPU] nvidia-smi stream exited (code=${code}, signal=${signal}), restarting`);
+      this._scheduleRestart();
+    });
+
+    return true;
+  }
+
+  /**
+   * Stop the child process and cancel any pending restart.
+   */
+  stop() {
+    this._running = false;
+    if (this._restartTimer) {
+      clearTimeout(this._restartTimer);
+      this._restartTimer = null;
+    }
+    if (this.process) {
+      this.process.kill("SIGTERM");
+      this.process = null;
+    }
+    this._resolveWaiters();
+  }
+
+  /**
+   * Whether the collector can still produce data.
+   * @returns {boolean}
+   */
+  isAvailable() {
+    return !this.unavailable;
+  }
+
+  /**
+   * Whether at least one fresh sample is in memory.
+   * @returns {boolean}
+   */
+  hasData() {
+    return this.getGpus().length > 0;
+  }
+
+  /**
+   * Get the latest per-GPU samples, dropping stale entries.
+   * @returns {Array<Object>} GPU objects sorted by index
+   */
+  getGpus() {
+    const now = Date.now();
+    const gpus = [];
+    for (const gpu of this.gpus.values()) {
+      if (now - gpu.timestamp <= this.staleAfter) {
+        gpus.push(gpu);
+      }
+    }
+    return gpus.sort((a, b) => a.index - b.index);
+  }
+
+  /**
+   * Wait until the first sample arrives, the collector fails, or the timeout expires.
+   * @param {number} [timeoutMs=2000] - Maximum wait
+   * @returns {Promise<boolean>} True if data is available
+   */
+  waitForData(timeoutMs = 2000) {
+    if (this.hasData() || this.unavailable || !this._running) {
+      return Promise.resolve(this.hasData());
+    }
+
+    return new Promise((resolve) => {
+      const waiter = () => {
+        clearTimeout(timer);
+        resolve(this.hasData());
+      };
+      const timer = setTimeout(() => {
+        this._waiters = this._waiters.filter((w) => w !== waiter);
+        resolve(this.hasData());
+      }, timeoutMs);
+      this._waiters.push(waiter);
+    });
+  }
+
+  /**
+   * Consume a stdout chunk, parsing complete lines and keeping the partial tail.
+   * @param {string} chunk - Raw stdout data
+   * @returns {number} Number of GPU samples parsed
+   */
+  _consume(chunk) {
+    this._buffer += chunk;
+    const lines = this._buffer.split("\n");
+    this._buffer = lines.pop();
+
+    const now = Date.now();
+    let parsed = 0;
+    for (const line of lines) {
+      const gpu = parseNvidiaSmiLine(line);
+      if (gpu) {
+        gpu.timestamp = now;
+        this.gpus.set(gpu.index, gpu);
+        parsed++;
+      }
+    }
+
+    if (parsed > 0) this._resolveWaiters();
+    return parsed;
+  }
+
+  _scheduleRestart() {
+    if (this._restartTimer) return;
+    const delay = this._currentDelay;
+    this._currentDelay = Math.min(this._currentDelay * 2, MAX_RESTART_DELAY);
+
+    this._restartTimer = setTimeout(() => {
+      this._restartTimer = null;
+      if (!this._running) return;
+      this.restarts++;
+      this.start();
+    }, delay);
+    this._restartTimer.unref?.();
+  }
+
+  _markUnavailable(reason) {
+    if (!this.unavailable) {
+      console.debug(`[GPU] nvidia-smi stream unavailable: ${reason}`);
+    }
+    this.unavailable = true;
+    this._running = false;
+    this.process = null;
+    this._resolveWaiters();
+  }
+
+  _resolveWaiters() {
+    const waiters = this._waiters;
+    this._waiters = [];
+    waiters.forEach((w) => w());
+  }
+}
+
+export default NvidiaSmiStream;
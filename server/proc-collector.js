@@ -0,0 +1,218 @@
+/**
+ * Proc Collector - Native Linux system metrics
+ * Reads /proc/meminfo, /proc/stat, /proc/diskstats and /proc/net/dev through
+ * file descriptors that stay open between ticks, and statfs() for disk usage. Avoids systeminformation on the
+ * hot path, which spawns df and parses several files per call.
+ * procfs reads are served from kernel memory, so positional sync reads are safe.
+ */
+
+import fs from "fs";
+
+const INITIAL_BUFFER_SIZE = 8192;
+
+/**
+ * Reusable reader for a virtual file (procfs/sysfs).
+ * Opens the file once and re-reads it from offset 0 on each call.
+ */
+export class ProcFileReader {
+  /**
+   * @param {string} filePath - File to read (e.g. /proc/meminfo)
+   */
+  constructor(filePath) {
+    this.filePath = filePath;
+    this.fd = null;
+    this.buffer = Buffer.alloc(INITIAL_BUFFER_SIZE);
+  }
+
+  /**
+   * Read the whole file content.
+   * @returns {string} File content
+   */
+  read() {
+    if (this.fd === null) {
+      this.fd = fs.openSync(this.filePath, "r");
+    }
+
+    try {
+      let bytesRead = fs.readSync(this.fd, this.buffer, 0, this.buffer.length, 0);
+      // Grow until the content fits (e.g. /proc/stat on many-core hosts)
+      while (bytesRead === this.buffer.length) {
+        this.buffer = Buffer.alloc(this.buffer.length * 2);
+        bytesRead = fs.readSync(this.fd, this.buffer, 0, this.buffer.length, 0);
+      }
+      return this.buffer.toString("utf8", 0, bytesRead);
+    } catch (e) {
+      this.close();
+      throw e;
+    }
+  }
+
+  /**
+   * Close the underlying file descriptor.
+   */
+  close() {
+    if (this.fd !== null) {
+      try {
+        fs.closeSync(this.fd);
+      } catch {
+        // Already closed
+      }
+      this.fd = null;
+    }
+  }
+}
+
+/**
+ * Parse /proc/meminfo content.
+ * @param {string} text - File content
+ * @returns {Object} Memory values in bytes: total, available, swapTotal, swapUsed
+ */
+export function parseMeminfo(text) {
+  const values = {};
+  for (const line of text.split("\n")) {
+    const colon = line.indexOf(":");
+    if (colon === -1) continue;
+    values[line.slice(0, colon)] = parseInt(line.slice(colon + 1), 10) * 1024; // kB
+  }
+
+  const total = values.MemTotal || 0;
+  // MemAvailable exists since Linux 3.14; approximate it on older kernels
+  const available = values.MemAvailable
+    ?? (values.MemFree || 0) + (values.Buffers || 0) + (values.Cached || 0);
+  const swapTotal = values.SwapTotal || 0;
+  const swapUsed = swapTotal - (values.SwapFree || 0);
+
+  return { total, available, swapTotal, swapUsed };
+}
+
+/**
+ * Parse the aggregate "cpu" line of /proc/stat.
+ * @param {string} text - File content
+ * @returns {Object|null} { idle, total } in clock ticks, or null if missing
+ */
+export function parseProcStat(text) {
+  const end = text.indexOf("\n");
+  const line = end === -1 ? text : text.slice(0, end);
+  if (!line.startsWith("cpu ")) return null;
+
+  // user nice system idle iowait irq softirq steal (guest fields are already in user)
+  const fields = line.trim().split(/\s+/).slice(1, 9).map(Number);
+  const idle = (fields[3] || 0) + (fields[4] || 0);
+  const total = fields.reduce((sum, v) => sum + (v || 0), 0);
+
+  return { idle, total };
+}
+
+/**
+ * Parse /proc/diskstats content.
+ * Sector counts are always in 512-byte units, whatever the device's block size.
+ * @param {string} text - File content
+ * @returns {Object} Device name -> cumulative { major, minor, reads, readBytes, writes, writeBytes, ioMs }
+ */
+export function parseDiskstats(text) {
+  const devices = {};
+  for (const line of text.split("\n")) {
+    // major minor name reads merged sectors ms writes merged sectors ms in_flight io_ms ...
+    const f = line.trim().split(/\s+/);
+    if (f.length < 13) continue;
+    devices[f[2]] = {
+      major: Number(f[0]),
+      minor: Number(f[1]),
+      reads: Number(f[3]),
+      readBytes: Number(f[5]) * 512,
+      writes: Number(f[7]),
+      writeBytes: Number(f[9]) * 512,
+      ioMs: Number(f[12]),
+    };
+  }
+  return devices;
+}
+
+/**
+ * Parse /proc/net/dev content.
+ * @param {string} text - File content
+ * @returns {Object} Interface name -> cumulative { rxBytes, txBytes }
+ */
+export function parseNetDev(text) {
+  const interfaces = {};
+  for (const line of text.split("\n")) {
+    const colon = line.indexOf(":");
+    if (colon === -1) continue; // Two header lines
+    // rx: bytes packets errs drop fifo frame compressed multicast, then tx: bytes ...
+    const f = line.slice(colon + 1).trim().split(/\s+/);
+    if (f.length < 9) continue;
+    interfaces[line.slice(0, colon).trim()] = {
+      rxBytes: Number(f[0]),
+      txBytes: Number(f[8]),
+    };
+  }
+  return interfaces;
+}
+
+/**
+ * Whether the native collectors can be used on this platform.
+ * @returns {boolean}
+ */
+export function isProcAvailable() {
+  return process.platform === "linux" && fs.existsSync("/proc/meminfo");
+}
+
+const meminfoReader = new ProcFileReader("/proc/meminfo");
+const statReader = new ProcFileReader("/proc/stat");
+const diskstatsReader = new ProcFileReader("/proc/diskstats");
+const netDevReader = new ProcFileReader("/proc/net/dev");
+
+/**
+ * Read memory and swap figures from /proc/meminfo.
+ * @returns {Object} { total, available, swapTotal, swapUsed } in bytes
+ */
+export function readMemory() {
+  return parseMeminfo(meminfoReader.read());
+}
+
+/**
+ * Read aggregate CPU times from /proc/stat.
+ * @returns {Object|null} { idle, total } in clock ticks
+ */
+export function readCpuTimes() {
+  return parseProcStat(statReader.read());
+}
+
+/**
+ * Read cumulative block device counters from /proc/diskstats.
+ * @returns {Object} Device name -> counters
+ */
+export function readDiskStats() {
+  return parseDiskstats(diskstatsReader.read());
+}
+
+/**
+ * Read cumulative interface byte counters from /proc/net/dev.
+ * @returns {Object} Interface name -> counters
+ */
+export function readNetDev() {
+  return parseNetDev(netDevReader.read());
+}
+
+/**
+ * Read disk usage for a mount point with statfs().
+ * @param {string} mountPath - Mount point or any path on the filesystem
+ * @returns {Promise<Object>} { size, used, available } in bytes
+ */
+export async function readDiskUsage(mountPath) {
+  const stats = await fs.promises.statfs(mountPath);
+  const size = stats.blocks * stats.bsize;
+  const used = (stats.blocks - stats.bfree) * stats.bsize;
+  const available = stats.bavail * stats.bsize;
+  return { size, used, available };
+}
+
+/**
+ * Close the cached /proc file descriptors.
+ */
+export function closeProcReaders() {
+  meminfoReader.close();
+  statReader.close();
+  diskstatsReader.close();
+  netDevReader.close();
+}
@@ -0,0 +1,284 @@
+/**
+ * Process Tree Collector - Per-process resource accounting from /proc
+ * Walks a process tree from a root PID using /proc/<pid>/task/<tid>/children
+ * and reads RSS, CPU ticks, I/O bytes and thread count for every member from
+ * /proc/<pid>/stat, status and io. In router mode llama-server spawns one child
+ * per loaded model; those children are attributed to their model using the
+ * --alias / --model arguments on their command line. No `ps` is spawned.
+ */
+
+import fs from "fs";
+import path from "path";
+
+// USER_HZ is 100 on every mainstream Linux architecture
+const CLOCK_TICKS_PER_SECOND = 100;
+
+/**
+ * Read a file, returning null when it is missing or unreadable.
+ * @param {string} filePath - Absolute file path
+ * @returns {Promise<string|null>} File contents or null
+ */
+async function readOptional(filePath) {
+  try {
+    return await fs.promises.readFile(filePath, "utf8");
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Parse /proc/<pid>/stat.
+ * The command name is parenthesized and may contain spaces, so fields are
+ * split after the last ")".
+ * @param {string} text - File content
+ * @returns {Object|null} { pid, name, state, ppid, utime, stime, threads, startTime }
+ */
+export function parsePidStat(text) {
+  const open = text.indexOf("(");
+  const close = text.lastIndexOf(")");
+  if (open === -1 || close === -1) return null;
+
+  // Fields after the name start at field 3 (state)
+  const fields = text.slice(close + 2).trim().split(" ");
+  return {
+    pid: parseInt(text.slice(0, open), 10),
+    name: text.slice(open + 1, close),
+    state: fields[0],
+    ppid: parseInt(fields[1], 10),
+    utime: parseInt(fields[11], 10) || 0,
+    stime: parseInt(fields[12], 10) || 0,
+    threads: parseInt(fields[17], 10) || 0,
+    startTime: parseInt(fields[19], 10) || 0,
+  };
+}
+
+/**
+ * Parse /proc/<pid>/status for memory figures.
+ * @param {string} text - File content
+ * @returns {Object} { rss, vmSize, threads } with sizes in bytes
+ */
+export function parsePidStatus(text) {
+  const values = {};
+  for (const line of text.split("\n")) {
+    const colon = line.indexOf(":");
+    if (colon === -1) continue;
+    values[line.slice(0, colon)] = parseInt(line.slice(colon + 1), 10);
+  }
+  return {
+    rss: (values.VmRSS || 0) * 1024, // kB
+    vmSize: (values.VmSize || 0) * 1024,
+    threads: values.Threads || 0,
+  };
+}
+
+/**
+ * Parse /proc/<pid>/io.
+ * @param {string} text - File content
+ * @returns {Object} { readBytes, writeBytes } actually hitting storage
+ */
+export function parsePidIo(text) {
+  const values = {};
+  for (const line of text.split("\n")) {
+    const colon = line.indexOf(":");
+    if (colon === -1) continue;
+    values[line.slice(0, colon)] = parseInt(line.slice(colon + 1), 10);
+  }
+  return {
+    readBytes: values.read_bytes || 0,
+    writeBytes: values.write_bytes || 0,
+  };
+}
+
+/**
+ * Find the model a llama-server process serves from its arguments.
+ * @param {Array<string>} args - Command line arguments (argv without argv[0])
+ * @returns {string|null} Model alias or GGUF file name without extension
+ */
+export function modelFromArgs(args) {
+  const valueOf = (...flags) => {
+    const i = args.findIndex((a) => flags.includes(a));
+    return i !== -1 && i + 1 < args.length ? args[i + 1] : null;
+  };
+
+  const alias = valueOf("-a", "--alias");
+  if (alias) return alias;
+
+  const model = valueOf("-m", "--model");
+  return model ? path.basename(model).replace(/\.gguf$/i, "") : null;
+}
+
+export class ProcessTreeCollector {
+  /**
+   * Create a new ProcessTreeCollector.
+   * @param {Object} [config] - Collector configuration.
+   * @param {string} [config.procPath="/proc"] - procfs mount (overridable for tests).
+   */
+  constructor(config = {}) {
+    this.procPath = config.procPath || "/proc";
+    this.lastTicks = new Map(); // pid -> { ticks, at }
+  }
+
+  /**
+   * Collect resource usage for a process and all of its descendants.
+   * @param {number} rootPid - PID of the tracked llama-server.
+   * @returns {Promise<Object|null>} { pid, processes, totals, models }, or null if the root is gone
+   */
+  async collect(rootPid) {
+    if (!rootPid) return null;
+
+    const pids = await this._walk(rootPid);
+    const now = Date.now();
+    const processes = (await Promise.all(pids.map((pid) => this._readProcess(pid, now)))).filter(Boolean);
+    if (processes.length === 0 || processes[0].pid !== rootPid) return null;
+
+    // Forget exited processes so CPU deltas don't leak across PID reuse
+    const alive = new Set(processes.map((p) => p.pid));
+    for (const pid of this.lastTicks.keys()) {
+      if (!alive.has(pid)) this.lastTicks.delete(pid);
+    }
+
+    return {
+      pid: rootPid,
+      processes,
+      totals: sumUsage(processes),
+      models: groupByModel(processes),
+    };
+  }
+
+  /**
+   * Drop CPU history (e.g. after the server restarts).
+   */
+  reset() {
+    this.lastTicks.clear();
+  }
+
+  /**
+   * Breadth-first walk of the process tree through each thread's children file.
+   * @param {number} rootPid - Root PID
+   * @returns {Promise<Array<number>>} PIDs, root first
+   */
+  async _walk(rootPid) {
+    const pids = [rootPid];
+    const seen = new Set(pids);
+
+    for (let i = 0; i < pids.length; i++) {
+      const taskDir = path.join(this.procPath, String(pids[i]), "task");
+      let tids;
+      try {
+        tids = await fs.promises.readdir(taskDir);
+      } catch {
+        continue;
+      }
+
+      // Children are listed per thread that forked them
+      const lists = await Promise.all(
+        tids.map((tid) => readOptional(path.join(taskDir, tid, "children")))
+      );
+      for (const list of lists) {
+        if (!list) continue;
+        for (const child of list.trim().split(/\s+/)) {
+          const pid = parseInt(child, 10);
+          if (pid && !seen.has(pid)) {
+            seen.add(pid);
+            pids.push(pid);
+          }
+        }
+      }
+    }
+
+    return pids;
+  }
+
+  /**
+   * Read stat, status, io and cmdline for one process.
+   * @param {number} pid - Process ID
+   * @param {number} now - Current time (ms) for CPU rate
+   * @returns {Promise<Object|null>} Process usage, or null if it exited
+   */
+  async _readProcess(pid, now) {
+    const dir = path.join(this.procPath, String(pid));
+    const [statText, statusText, ioText, cmdline] = await Promise.all([
+      readOptional(path.join(dir, "stat")),
+      readOptional(path.join(dir, "status")),
+      readOptional(path.join(dir, "io")), // Needs same user or CAP_SYS_PTRACE
+      readOptional(path.join(dir, "cmdline")),
+    ]);
+
+    const stat = statText ? parsePidStat(statText) : null;
+    if (!stat) return null;
+
+    const status = statusText ? parsePidStatus(statusText) : { rss: 0, threads: stat.threads };
+    const io = ioText ? parsePidIo(ioText) : null;
+    const args = cmdline ? cmdline.split("\0").filter(Boolean).slice(1) : [];
+
+    const ticks = stat.utime + stat.stime;
+    const last = this.lastTicks.get(pid);
+    let cpuPercent = 0;
+    if (last && now > last.at && ticks >= last.ticks) {
+      const cpuSeconds = (ticks - last.ticks) / CLOCK_TICKS_PER_SECOND;
+      cpuPercent = (cpuSeconds / ((now - last.at) / 1000)) * 100;
+    }
+    this.lastTicks.set(pid, { ticks, at: now });
+
+    return {
+      pid,
+      ppid: stat.ppid,
+      name: stat.name,
+      model: modelFromArgs(args),
+      rss: status.rss,
+      cpuSeconds: ticks / CLOCK_TICKS_PER_SECOND,
+      cpuPercent,
+      threads: status.threads || stat.threads,
+      readBytes: io ? io.readBytes : null,
+      writeBytes: io ? io.writeBytes : null,
+    };
+  }
+}
+
+/**
+ * Sum usage over a set of processes.
+ * @param {Array<Object>} processes - Process usage entries
+ * @returns {Object} { rss, cpuSeconds, cpuPercent, threads, readBytes, writeBytes, processes }
+ */
+function sumUsage(processes) {
+  const totals = { rss: 0, cpuSeconds: 0, cpuPercent: 0, threads: 0, readBytes: 0, writeBytes: 0 };
+  for (const p of processes) {
+    totals.rss += p.rss;
+    totals.cpuSeconds += p.cpuSeconds;
+    totals.cpuPercent += p.cpuPercent;
+    totals.threads += p.threads;
+    totals.readBytes += p.readBytes || 0;
+    totals.writeBytes += p.writeBytes || 0;
+  }
+  totals.processes = processes.length;
+  return totals;
+}
+
+/**
+ * Group model-serving processes (and their own descendants) by model.
+ * A router root has no model argument and stays out of every group.
+ * @param {Array<Object>} processes - Process usage entries, root first
+ * @returns {Object} Model name -> summed usage
+ */
+function groupByModel(processes) {
+  const modelOf = new Map();
+  for (const p of processes) {
+    // Inherit the parent's model for helpers spawned by a model process
+    modelOf.set(p.pid, p.model || modelOf.get(p.ppid) || null);
+  }
+
+  const groups = {};
+  for (const p of processes) {
+    const model = modelOf.get(p.pid);
+    if (!model) continue;
+    (groups[model] ||= []).push(p);
+  }
+
+  const models = {};
+  for (const [model, members] of Object.entries(groups)) {
+    models[model] = sumUsage(members);
+  }
+  return models;
+}
+
+export default ProcessTreeCollector;
@@ -0,0 +1,232 @@
+/**
+ * Prometheus Exporter - Text exposition of the cached metrics snapshot
+ * Renders the shared sampler's latest sample, the cached llama-server status
+ * and this process's own stats. Rendering never collects or queries the
+ * database, so a scrape costs the same no matter how often it runs.
+ */
+
+const PREFIX = "llama_proxy";
+
+// System gauges from the sampler: [name, help, value accessor]
+const SYSTEM_GAUGES = [
+  ["cpu_usage_percent", "Host CPU usage", (m) => m.cpu?.usage],
+  ["memory_usage_percent", "Host memory usage", (m) => m.memory?.used],
+  ["swap_usage_percent", "Host swap usage", (m) => m.swap?.used],
+  ["disk_usage_percent", "Usage of the monitored filesystem", (m) => m.disk?.used],
+];
+
+// Per-GPU gauges: [name, help, field in the gpu-monitor list]
+const GPU_GAUGES = [
+  ["gpu_utilization_percent", "GPU utilization", "usage"],
+  ["gpu_memory_used_bytes", "GPU memory in use", "memoryUsed"],
+  ["gpu_memory_total_bytes", "GPU memory size", "memoryTotal"],
+  ["gpu_temperature_celsius", "GPU temperature", "temperature"],
+  ["gpu_power_watts", "GPU power draw", "power"],
+];
+
+// llama-server values from the cached status: [name, type, help, field in status.metrics]
+const LLAMA_METRICS = [
+  ["llama_prompt_tokens_total", "counter", "Prompt tokens processed", "promptTokensTotal"],
+  ["llama_predicted_tokens_total", "counter", "Tokens generated", "predictedTokensTotal"],
+  ["llama_prompt_seconds_total", "counter", "Time spent on prompt processing", "promptSecondsTotal"],
+  ["llama_predicted_seconds_total", "counter", "Time spent on generation", "predictedSecondsTotal"],
+  ["llama_decode_total", "counter", "llama_decode() calls", "nDecodeTotal"],
+  ["llama_prompt_tokens_per_second", "gauge", "Prompt throughput", "promptTokensSeconds"],
+  ["llama_predicted_tokens_per_second", "gauge", "Generation throughput", "predictedTokensSeconds"],
+  ["llama_busy_slots_per_decode", "gauge", "Average busy slots per decode", "nBusySlotsPerDecode"],
+  ["llama_tokens_max", "gauge", "Largest token count observed", "nTokensMax"],
+  ["llama_queue_size", "gauge", "Requests deferred by llama-server", "queueSize"],
+  ["llama_ctx_size", "gauge", "Context size", "nCtx"],
+  ["llama_parallel_slots", "gauge", "Parallel slots", "nParallel"],
+];
+
+// llama-server process tree usage: [name, type, help, field in the usage totals]
+const LLAMA_PROCESS_METRICS = [
+  ["llama_process_resident_memory_bytes", "gauge", "llama-server resident set size", "rss"],
+  ["llama_process_cpu_seconds_total", "counter", "llama-server CPU time", "cpuSeconds"],
+  ["llama_process_threads", "gauge", "llama-server threads", "threads"],
+  ["llama_process_read_bytes_total", "counter", "llama-server bytes read from storage", "readBytes"],
+  ["llama_process_write_bytes_total", "counter", "llama-server bytes written to storage", "writeBytes"],
+];
+
+/**
+ * Escape a label value per the exposition format.
+ * @param {*} value - Label value
+ * @returns {string} Escaped value
+ */
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, "\\\\").replace(/\n/g, "\\n").replace(/"/g, '\\"');
+}
+
+/**
+ * Format a label set.
+ * @param {Object} labels - Label names to values
+ * @returns {string} "{a=\"b\"}" or "" when empty
+ */
+function formatLabels(labels) {
+  const parts = Object.entries(labels).map(([k, v]) => `${k}="${escapeLabel(v)}"`);
+  return parts.length > 0 ? `{${parts.join(",")}}` : "";
+}
+
+/**
+ * Accumulates metric families into exposition text.
+ */
+class ExpositionWriter {
+  constructor() {
+    this.lines = [];
+  }
+
+  /**
+   * Add one metric family.
+   * @param {string} name - Metric name without prefix
+   * @param {string} type - "gauge" or "counter"
+   * @param {string} help - HELP text
+   * @param {Array<Array>} samples - [labels, value] pairs; non-finite values are skipped
+   */
+  family(name, type, help, samples) {
+    const valid = samples.filter(([, value]) => typeof value === "number" && Number.isFinite(value));
+    if (valid.length === 0) return;
+
+    const fullName = `${PREFIX}_${name}`;
+    this.lines.push(`# HELP ${fullName} ${help}`);
+    this.lines.push(`# TYPE ${fullName} ${type}`);
+    for (const [labels, value] of valid) {
+      this.lines.push(`${fullName}${formatLabels(labels)} ${value}`);
+    }
+  }
+
+  /**
+   * @returns {string} Exposition text
+   */
+  toString() {
+    return `${this.lines.join("\n")}\n`;
+  }
+}
+
+/**
+ * Render the metrics snapshot in Prometheus text exposition format.
+ * @param {Object} snapshot - Cached state
+ * @param {Object|null} snapshot.sample - Latest sampler sample ({ timestamp, metrics })
+ * @param {Object|null} snapshot.llama - Latest llama-server status
+ * @param {Object} [snapshot.process] - Process stats (defaults to this process)
+ * @returns {string} Exposition text
+ */
+export function renderPrometheusMetrics({ sample, llama, process: proc = readProcessStats() }) {
+  const out = new ExpositionWriter();
+
+  if (sample) {
+    const { metrics } = sample;
+    out.family("sample_timestamp_seconds", "gauge", "Time of the latest system sample", [
+      [{}, sample.timestamp / 1000],
+    ]);
+    for (const [name, help, get] of SYSTEM_GAUGES) {
+      out.family(name, "gauge", help, [[{}, get(metrics)]]);
+    }
+
+    // Labelled by position in the merged list, as in gpu_metrics: NVIDIA and
+    // AMD both number their own devices from 0
+    const gpus = metrics.gpu?.list || [];
+    for (const [name, help, field] of GPU_GAUGES) {
+      out.family(
+        name,
+        "gauge",
+        help,
+        gpus.map((gpu, i) => [
+          { gpu: i, name: gpu.name || "unknown", vendor: gpu.vendor || "unknown" },
+          gpu[field],
+        ])
+      );
+    }
+  }
+
+  // Event loop, GC and heap of the proxy itself (from the event-loop monitor)
+  const health = sample?.metrics.process;
+  if (health) {
+    const { loop, gc, heap } = health;
+    out.family("event_loop_delay_p50_seconds", "gauge", "Median event loop delay", [[{}, loop.p50 / 1000]]);
+    out.family("event_loop_delay_p99_seconds", "gauge", "99th percentile event loop delay", [
+      [{}, loop.p99 / 1000],
+    ]);
+    out.family("event_loop_delay_max_seconds", "gauge", "Largest event loop delay", [[{}, loop.max / 1000]]);
+    out.family("event_loop_utilization_ratio", "gauge", "Share of time the event loop was busy", [
+      [{}, loop.utilization],
+    ]);
+    const kinds = Object.entries(gc.byKind);
+    out.family(
+      "gc_pause_seconds_total",
+      "counter",
+      "Time spent in garbage collection pauses",
+      kinds.map(([kind, k]) => [{ kind }, k.pauseMs / 1000])
+    );
+    out.family(
+      "gc_collections_total",
+      "counter",
+      "Garbage collections",
+      kinds.map(([kind, k]) => [{ kind }, k.count])
+    );
+    out.family("process_heap_limit_bytes", "gauge", "V8 heap size limit", [[{}, heap.limit]]);
+  }
+
+  if (llama) {
+    out.family("llama_server_up", "gauge", "Whether llama-server is running", [
+      [{}, llama.status === "running" ? 1 : 0],
+    ]);
+    const values = llama.metrics || {};
+    const labels = llama.model ? { model: llama.model } : {};
+    for (const [name, type, help, field] of LLAMA_METRICS) {
+      out.family(name, type, help, [[labels, values[field]]]);
+    }
+
+    // Process tree usage: the whole tree plus one series per router-mode model
+    const resources = llama.resources;
+    if (resources) {
+      const series = [
+        [{ model: "all" }, resources.totals],
+        ...Object.entries(resources.models).map(([model, usage]) => [{ model }, usage]),
+      ];
+      for (const [name, type, help, field] of LLAMA_PROCESS_METRICS) {
+        out.family(name, type, help, series.map(([l, usage]) => [l, usage[field]]));
+      }
+    }
+  }
+
+  out.family("process_cpu_seconds_total", "counter", "CPU time used by the proxy", [
+    [{}, proc.cpuSeconds],
+  ]);
+  out.family("process_resident_memory_bytes", "gauge", "Proxy resident set size", [
+    [{}, proc.rss],
+  ]);
+  out.family("process_heap_used_bytes", "gauge", "V8 heap in use", [[{}, proc.heapUsed]]);
+  out.family("process_heap_total_bytes", "gauge", "V8 heap size", [[{}, proc.heapTotal]]);
+  out.family("process_uptime_seconds", "gauge", "Proxy uptime", [[{}, proc.uptime]]);
+
+  return out.toString();
+}
+
+/**
+ * Read this process's own resource usage (cheap, no I/O).
+ * @returns {Object} { cpuSeconds, rss, heapUsed, heapTotal, uptime }
+ */
+export function readProcessStats() {
+  const cpu = process.cpuUsage();
+  const mem = process.memoryUsage();
+  return {
+    cpuSeconds: (cpu.user + cpu.system) / 1e6,
+    rss: mem.rss,
+    heapUsed: mem.heapUsed,
+    heapTotal: mem.heapTotal,
+    uptime: process.uptime(),
+  };
+}
+
+/**
+ * Create an express handler serving the exposition text.
+ * @param {Function} getSnapshot - Returns { sample, llama } from memory
+ * @returns {Function} Express request handler
+ */
+export function createPrometheusHandler(getSnapshot) {
+  return (req, res) => {
+    res.set("Content-Type", "text/plain; version=0.0.4; charset=utf-8");
+    res.send(renderPrometheusMetrics(getSnapshot()));
+  };
+}
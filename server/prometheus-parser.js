@@ -0,0 +1,356 @@
+/**
+ * Prometheus Parser - Streaming, label-aware text exposition parser
+ * Consumes a /metrics response chunk by chunk (no full-body string, no split())
+ * and groups samples into families. Labels are kept, so series from different
+ * models stay apart, and histogram/summary samples (_bucket, _sum, _count,
+ * quantile) are folded into one series per label set.
+ */
+
+import { StringDecoder } from "string_decoder";
+
+const HISTOGRAM_SUFFIXES = ["_bucket", "_sum", "_count"];
+const SUMMARY_SUFFIXES = ["_sum", "_count"];
+
+const SPACE = 32;
+const TAB = 9;
+const CR = 13;
+const HASH = 35;
+const OPEN_BRACE = 123;
+
+/**
+ * @param {number} code - Char code
+ * @returns {boolean} Whether it is a space or tab
+ */
+function isBlank(code) {
+  return code === SPACE || code === TAB;
+}
+
+/**
+ * Parse a sample value, including the exposition format's special values.
+ * @param {string} token - Value token
+ * @returns {number} Parsed value (NaN if invalid)
+ */
+function parseValue(token) {
+  switch (token) {
+    case "+Inf":
+    case "Inf":
+      return Infinity;
+    case "-Inf":
+      return -Infinity;
+    default:
+      return Number(token);
+  }
+}
+
+/**
+ * Parse a label set starting right after "{".
+ * @param {string} line - Sample line
+ * @param {number} start - Index after the opening brace
+ * @returns {Object|null} { labels, end } with end after "}", or null if malformed
+ */
+function parseLabels(line, start) {
+  const labels = {};
+  let i = start;
+
+  while (i < line.length) {
+    while (line[i] === " " || line[i] === ",") i++;
+    if (line[i] === "}") return { labels, end: i + 1 };
+
+    const eq = line.indexOf("=", i);
+    if (eq === -1 || line[eq + 1] !== '"') return null;
+    const name = line.slice(i, eq).trim();
+
+    // Quoted value with \\, \" and \n escapes; unescaped values are one slice
+    let value = "";
+    let chunkStart = eq + 2;
+    let j = line.indexOf('"', chunkStart);
+    let escape = line.indexOf("\\", chunkStart);
+    while (escape !== -1 && j !== -1 && escape < j) {
+      value += line.slice(chunkStart, escape);
+      const next = line[escape + 1];
+      value += next === "n" ? "\n" : next;
+      chunkStart = escape + 2;
+      j = line.indexOf('"', chunkStart);
+      escape = line.indexOf("\\", chunkStart);
+    }
+    if (j === -1) return null;
+    value += line.slice(chunkStart, j);
+
+    labels[name] = value;
+    i = j + 1;
+  }
+
+  return null;
+}
+
+/**
+ * Stable key for a label set.
+ * @param {Object} labels - Label names to values
+ * @returns {string} Key
+ */
+function labelKey(labels) {
+  const names = Object.keys(labels);
+  if (names.length === 0) return "";
+  if (names.length > 1) names.sort();
+  let key = "";
+  for (const name of names) key += `${name}\u0000${labels[name]}\u0001`;
+  return key;
+}
+
+/**
+ * Return the labels without one name.
+ * @param {Object} labels - Label set
+ * @param {string} omit - Label to drop
+ * @returns {Object} Copy without the label
+ */
+function withoutLabel(labels, omit) {
+  const rest = {};
+  for (const name in labels) {
+    if (name !== omit) rest[name] = labels[name];
+  }
+  return rest;
+}
+
+export class PrometheusStreamParser {
+  constructor() {
+    this.decoder = new StringDecoder("utf8");
+    this.remainder = "";
+    this.families = new Map(); // name -> { type, help, series: Map(key -> series) }
+    this.routes = new Map(); // sample name -> { family, suffix } (suffix null for plain samples)
+    this.lines = 0;
+  }
+
+  /**
+   * Feed a chunk of the response body.
+   * @param {Buffer|string} chunk - Next chunk
+   */
+  write(chunk) {
+    const text = this.remainder + (typeof chunk === "string" ? chunk : this.decoder.write(chunk));
+    let start = 0;
+    let nl = text.indexOf("\n", start);
+    while (nl !== -1) {
+      this._line(text, start, nl);
+      start = nl + 1;
+      nl = text.indexOf("\n", start);
+    }
+    this.remainder = text.slice(start);
+  }
+
+  /**
+   * Finish parsing and return the structured result.
+   * @returns {Object} { families } - plain, JSON-serializable
+   */
+  end() {
+    const text = this.remainder + this.decoder.end();
+    if (text) this._line(text, 0, text.length);
+    this.remainder = "";
+
+    const families = {};
+    for (const [name, family] of this.families) {
+      families[name] = {
+        type: family.type,
+        help: family.help,
+        series: [...family.series.values()],
+      };
+    }
+    return { families };
+  }
+
+  /**
+   * Parse one line of the exposition.
+   */
+  _line(text, start, end) {
+    // Trim without allocating for the common case
+    while (start < end && isBlank(text.charCodeAt(start))) start++;
+    while (end > start && (isBlank(text.charCodeAt(end - 1)) || text.charCodeAt(end - 1) === CR)) end--;
+    if (start === end) return;
+    this.lines++;
+
+    const line = text.slice(start, end);
+    if (line.charCodeAt(0) === HASH) {
+      this._comment(line);
+    } else {
+      this._sample(line);
+    }
+  }
+
+  /**
+   * Handle "# TYPE" and "# HELP" lines; other comments are ignored.
+   */
+  _comment(line) {
+    const parts = line.split(" ");
+    if (parts.length < 3) return;
+    const kind = parts[1];
+    if (kind !== "TYPE" && kind !== "HELP") return;
+
+    const family = this._family(parts[2]);
+    if (kind === "TYPE") {
+      family.type = parts[3] || "untyped";
+      this.routes.clear(); // Suffixed names may now belong to this family
+    } else {
+      family.help = parts.slice(3).join(" ");
+    }
+  }
+
+  /**
+   * Parse a sample line: name{labels} value [timestamp]
+   */
+  _sample(line) {
+    const length = line.length;
+    let i = 0;
+    let code = line.charCodeAt(0);
+    while (i < length && code !== OPEN_BRACE && !isBlank(code)) code = line.charCodeAt(++i);
+    const name = line.slice(0, i);
+    if (!name) return;
+
+    let labels = {};
+    if (code === OPEN_BRACE) {
+      const parsed = parseLabels(line, i + 1);
+      if (!parsed) return;
+      labels = parsed.labels;
+      i = parsed.end;
+    }
+
+    while (i < length && isBlank(line.charCodeAt(i))) i++;
+    let valueEnd = i;
+    while (valueEnd < length && !isBlank(line.charCodeAt(valueEnd))) valueEnd++;
+    if (valueEnd === i) return;
+    const token = line.slice(i, valueEnd);
+    const value = parseValue(token);
+    if (Number.isNaN(value) && token !== "NaN") return;
+
+    this._record(name, labels, value);
+  }
+
+  /**
+   * Route a sample to its family, folding histogram/summary parts together.
+   */
+  _record(name, labels, value) {
+    let route = this.routes.get(name);
+    if (!route) {
+      route = this._route(name);
+      this.routes.set(name, route);
+    }
+    const { family, suffix } = route;
+
+    if (suffix !== null) {
+      if (family.type === "histogram") {
+        this._histogram(family, suffix, labels, value);
+      } else {
+        this._summary(family, suffix, labels, value);
+      }
+      return;
+    }
+
+    if (family.type === "summary" && labels.quantile !== undefined) {
+      this._summary(family, "", labels, value);
+      return;
+    }
+
+    const key = labelKey(labels);
+    const existing = family.series.get(key);
+    if (existing) {
+      existing.value = value;
+    } else {
+      family.series.set(key, { labels, value });
+    }
+  }
+
+  /**
+   * Resolve the family a sample name belongs to, folding the _bucket, _sum
+   * and _count samples of histograms and summaries into their base family.
+   * @param {string} name - Sample name
+   * @returns {Object} { family, suffix } with suffix null for plain samples
+   */
+  _route(name) {
+    if (!this.families.has(name)) {
+      for (const suffix of HISTOGRAM_SUFFIXES) {
+        if (!name.endsWith(suffix)) continue;
+        const family = this.families.get(name.slice(0, -suffix.length));
+        if (!family) continue;
+        if (family.type === "histogram") return { family, suffix };
+        if (family.type === "summary" && SUMMARY_SUFFIXES.includes(suffix)) return { family, suffix };
+      }
+    }
+    return { family: this._family(name), suffix: null };
+  }
+
+  _histogram(family, suffix, labels, value) {
+    const seriesLabels = suffix === "_bucket" ? withoutLabel(labels, "le") : labels;
+    const series = this._compositeSeries(family, seriesLabels, "buckets");
+    if (suffix === "_bucket") {
+      series.buckets.push({ le: parseValue(labels.le), count: value });
+    } else if (suffix === "_sum") {
+      series.sum = value;
+    } else {
+      series.count = value;
+    }
+  }
+
+  _summary(family, suffix, labels, value) {
+    const seriesLabels = suffix === "" ? withoutLabel(labels, "quantile") : labels;
+    const series = this._compositeSeries(family, seriesLabels, "quantiles");
+    if (suffix === "") {
+      series.quantiles.push({ quantile: parseValue(labels.quantile), value });
+    } else if (suffix === "_sum") {
+      series.sum = value;
+    } else {
+      series.count = value;
+    }
+  }
+
+  _compositeSeries(family, labels, listName) {
+    const key = labelKey(labels);
+    let series = family.series.get(key);
+    if (!series) {
+      series = { labels, [listName]: [], sum: 0, count: 0 };
+      family.series.set(key, series);
+    }
+    return series;
+  }
+
+  _family(name) {
+    let family = this.families.get(name);
+    if (!family) {
+      family = { type: "untyped", help: "", series: new Map() };
+      this.families.set(name, family);
+    }
+    return family;
+  }
+}
+
+/**
+ * Parse a complete exposition text.
+ * @param {string} text - Exposition text
+ * @returns {Object} { families }
+ */
+export function parsePrometheusText(text) {
+  const parser = new PrometheusStreamParser();
+  parser.write(text || "");
+  return parser.end();
+}
+
+/**
+ * Get the value of a plain (counter/gauge/untyped) family for one label match.
+ * @param {Object} result - Parser result
+ * @param {string} name - Family name
+ * @param {Object} [match] - Labels that must match; {} matches the first series
+ * @returns {number|undefined} Value or undefined if absent
+ */
+export function getSampleValue(result, name, match = {}) {
+  const family = result.families[name];
+  if (!family) return undefined;
+  for (const series of family.series) {
+    let matches = true;
+    for (const label in match) {
+      if (series.labels[label] !== match[label]) {
+        matches = false;
+        break;
+      }
+    }
+    if (matches) return series.value;
+  }
+  return undefined;
+}
+
+export default PrometheusStreamParser;
@@ -1,4 +1,5 @@
 import { cleanupMetrics } from "./metrics.js";
+import { processMonitor } from "./event-loop-monitor.js";
 
 /**
  * Setup graceful shutdown handlers for SIGTERM and SIGINT signals.
@@ -11,6 +12,7 @@ export function setupGracefulShutdown(server) {
     
     // Cleanup metrics collection
     cleanupMetrics();
+    processMonitor.stop();
     
     server.close(() => {
       console.log("Server closed");
@@ -0,0 +1,111 @@
+/**
+ * System Metrics - One CPU, memory, disk, IO and GPU reading
+ * Shared by the metrics worker and the in-process fallback. Disk and GPU are
+ * metric families with their own minimum interval; CPU, memory and the
+ * disk/network throughput counters come from cheap /proc reads and are taken
+ * on every call.
+ */
+
+import {
+  collectCpuMetrics,
+  collectMemoryMetrics,
+  collectDiskMetrics,
+  cleanupSystemCollectors,
+} from "./metrics-collector.js";
+import { collectGpuMetrics, cleanupGpuMonitor } from "./gpu-monitor.js";
+import { collectIoMetrics, resetIoMetrics } from "./io-collector.js";
+
+const FAMILY_TOLERANCE = 100; // Timer jitter tolerated when deciding whether a family is due
+
+// Minimum interval per metric family; /proc CPU and memory reads are cheap enough for every tick
+export const FAMILY_INTERVALS = {
+  disk: parseInt(process.env.METRICS_DISK_INTERVAL, 10) || 30000,
+  gpu: parseInt(process.env.METRICS_GPU_INTERVAL, 10) || 5000,
+  llama: parseInt(process.env.METRICS_LLAMA_INTERVAL, 10) || 5000,
+};
+
+/**
+ * Create a cached metric family that only re-reads once its interval has elapsed.
+ * Concurrent callers share one in-flight read.
+ * @param {number} interval - Minimum interval between reads in milliseconds.
+ * @param {Function} read - Async function producing the family's value.
+ * @returns {Object} Family with get() and reset().
+ */
+export function createFamily(interval, read) {
+  let value;
+  let readAt = 0;
+  let pending = null;
+
+  return {
+    get() {
+      if (pending) return pending;
+      const now = Date.now();
+      if (value !== undefined && now - readAt + FAMILY_TOLERANCE < interval) {
+        return Promise.resolve(value);
+      }
+      pending = Promise.resolve(read())
+        .then((result) => {
+          value = result;
+          readAt = now;
+          return result;
+        })
+        .finally(() => {
+          pending = null;
+        });
+      return pending;
+    },
+    reset() {
+      value = undefined;
+      readAt = 0;
+    },
+  };
+}
+
+const families = {
+  disk: createFamily(FAMILY_INTERVALS.disk, () => collectDiskMetrics()),
+  gpu: createFamily(FAMILY_INTERVALS.gpu, collectGpuMetrics),
+};
+
+/**
+ * Collect one system reading (CPU, memory, disk, IO, GPU).
+ * @param {Object} [options] - Collection options.
+ * @param {string} [options.ioPath="/"] - Path whose backing block device is reported as io.device.
+ * @returns {Promise<Object>} { cpu, memory, swap, disk, io, network, gpu } in the frontend metrics shape
+ */
+export async function collectSystemMetrics({ ioPath = "/" } = {}) {
+  const [cpuUsage, memoryMetrics, diskMetrics, ioMetrics, gpuMetrics] = await Promise.all([
+    Promise.resolve(collectCpuMetrics()),
+    collectMemoryMetrics(),
+    families.disk.get(),
+    collectIoMetrics(ioPath),
+    families.gpu.get(),
+  ]);
+
+  return {
+    cpu: { usage: cpuUsage },
+    memory: { used: memoryMetrics.memoryUsedPercent },
+    swap: { used: memoryMetrics.swapUsedPercent },
+    disk: { used: diskMetrics.diskUsedPercent },
+    io: ioMetrics.io,
+    network: ioMetrics.network,
+    gpu: {
+      usage: gpuMetrics.gpuUsage,
+      memoryUsed: gpuMetrics.gpuMemoryUsed,
+      memoryTotal: gpuMetrics.gpuMemoryTotal,
+      list: gpuMetrics.gpuList,
+    },
+  };
+}
+
+/**
+ * Drop cached family values and release collector resources
+ * (/proc descriptors, the nvidia-smi stream).
+ */
+export function cleanupSystemMetrics() {
+  for (const family of Object.values(families)) {
+    family.reset();
+  }
+  resetIoMetrics();
+  cleanupSystemCollectors();
+  cleanupGpuMonitor();
+}